@@ -0,0 +1,85 @@
+"""
+Asynchroniczny dostęp do danych dla pętli pygame.
+
+Operacje na bazie wykonywane są w puli wątków (AsyncData), a ekran dostaje
+DataRequest, który sprawdza raz na klatkę - bez czekania. W tym czasie ekran
+rysuje wskaźnik ładowania, a po błędzie komunikat, zamiast zamrażać
+wejście i renderowanie na czas zapytania.
+
+Backend zwraca wartości "puste" zamiast wyjątków, dlatego po każdej operacji
+sprawdzane jest is_available() - wynik ostatniego wywołania backendu w tym samym
+wątku puli, niezależny od równoległych operacji w innych wątkach. Jeśli baza
+zgłosiła awarię, żądanie kończy się stanem "error" (DataUnavailable), a nie pustą listą.
+
+Niezależne żądania (np. statystyki i osiągnięcia po quizie) zlecane są osobno
+i wykonują się równolegle; gather() łączy je w jedno żądanie. Pula ma mniej
+wątków niż pula połączeń MySQL (DB_POOL_SIZE), żeby zostało połączenie dla
+wątku interfejsu i hashowania haseł.
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+DATA_WORKERS = int(os.environ.get("QUIZ_DATA_WORKERS", "3"))
+
+LOADING = "loading"
+READY = "ready"
+ERROR = "error"
+
+
+class DataUnavailable(Exception):
+    """Operacja zakończyła się, ale baza zgłosiła awarię (wynik to wartość "pusta")"""
+
+
+class DataRequest:
+    """Jedna lub kilka operacji w tle: stan loading / ready / error sprawdzany bez czekania"""
+
+    def __init__(self, *futures: Future):
+        self.futures = futures
+
+    @property
+    def state(self) -> str:
+        if not all(future.done() for future in self.futures):
+            return LOADING
+        return ERROR if self.error() is not None else READY
+
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def error(self) -> Optional[BaseException]:
+        """Pierwszy błąd zakończonej operacji (None, gdy wszystkie się powiodły lub trwają)"""
+        for future in self.futures:
+            if future.done() and future.exception() is not None:
+                return future.exception()
+        return None
+
+    def result(self):
+        """Wynik (krotka wyników dla gather); czeka, jeśli operacje jeszcze trwają"""
+        values = tuple(future.result() for future in self.futures)
+        return values[0] if len(values) == 1 else values
+
+
+def gather(*requests: DataRequest) -> DataRequest:
+    """Łączy żądania zlecone osobno (wykonują się równolegle) w jedno"""
+    return DataRequest(*(future for request in requests for future in request.futures))
+
+
+class AsyncData:
+    """Pula wątków dla operacji na bazie zlecanych z pętli ekranu"""
+
+    def __init__(self, workers: int = DATA_WORKERS, is_available: Optional[Callable[[], bool]] = None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="data")
+        self.is_available = is_available
+
+    def call(self, func, *args):
+        result = func(*args)
+        if self.is_available is not None and not self.is_available():
+            raise DataUnavailable(getattr(func, "__name__", "operacja"))
+        return result
+
+    def submit(self, func, *args) -> DataRequest:
+        return DataRequest(self.executor.submit(self.call, func, *args))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark warstwy danych w kilku skalach.
+
+Dla każdej skali (użytkownicy / moduły / pytania na moduł) tworzy świeżą bazę,
+wypełnia ją generatorem (datagen.py) i mierzy najważniejsze operacje:
+p50/p95/p99 czasu wykonania oraz liczbę zapytań SQL na operację. Wyniki można
+zapisać jako JSON (--output) i porównać z przebiegiem z innego commitu (--compare).
+
+    python benchmarks/bench_data_layer.py --backend sqlite --scales small medium
+    python benchmarks/bench_data_layer.py --output wyniki.json
+    python benchmarks/bench_data_layer.py --compare stare.json --fail-threshold 20 --audit
+
+Backend MySQL używa osobnej bazy (--mysql-database, domyślnie quiz_bench),
+usuwanej i tworzonej od nowa przed każdą skalą.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import storage  # noqa: E402
+import datagen  # noqa: E402
+
+# nazwa: (użytkownicy, moduły, pytania na moduł)
+SCALES = {
+    "small": (100, 3, 20),
+    "medium": (1000, 10, 100),
+    "large": (10000, 20, 500),
+}
+DELETE_MODULE = "bench_delete"
+WARMUP = 3
+
+
+def operations(backend, users, module_names, rng):
+    """Mierzone operacje: nazwa -> funkcja bez argumentów"""
+    usernames = list(users)
+    delete_ids = iter(backend.get_module_question_ids(DELETE_MODULE))
+
+    def save_user():
+        username = rng.choice(usernames)
+        backend.save_user(username, users[username])
+
+    def login():
+        """Ścieżka logowania auth_screen: hash hasła i naprawa starego konta"""
+        username = rng.choice(usernames)
+        backend.get_password_hash(username)
+        backend.ensure_first_module(username)
+
+    return {
+        "get_all_users": backend.get_all_users,
+        "get_quiz_data": backend.get_quiz_data,
+        "save_user": save_user,
+        "login": login,
+        "update_user_stats": lambda: backend.update_user_stats(rng.choice(usernames), 10, 1, 0,
+                                                               rng.choice(module_names)),
+        "check_achievement": lambda: backend.check_achievement(rng.choice(usernames),
+                                                               rng.choice(datagen.ACHIEVEMENT_IDS)),
+        "delete_question": lambda: backend.delete_question_by_id(DELETE_MODULE, next(delete_ids)),
+        "leaderboard": lambda: backend.get_leaderboard(5),
+    }
+
+
+def count_queries(backend, func):
+    """Liczba zapytań SQL wykonanych przez jedno wywołanie"""
+    calls = []
+    listener = lambda *args: calls.append(1)  # noqa: E731
+    backend.add_query_listener(listener)
+    try:
+        func()
+    finally:
+        backend.remove_query_listener(listener)
+    return len(calls)
+
+
+def measure(backend, func, repeat, max_seconds):
+    """Zwraca statystyki czasu wykonania (ms) i liczbę zapytań na operację"""
+    for _ in range(WARMUP):
+        func()
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < repeat:
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+        # Wolne operacje w dużej skali - wystarczy kilka próbek
+        if len(samples) >= 5 and time.perf_counter() > deadline:
+            break
+    samples.sort()
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    return {
+        "samples": len(samples),
+        "p50_ms": round(cuts[49], 4),
+        "p95_ms": round(cuts[94], 4),
+        "p99_ms": round(cuts[98], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "queries_per_op": count_queries(backend, func),
+    }
+
+
+def create_backend(args, work_dir, scale):
+    if args.backend == "sqlite":
+        return storage.SQLiteStorage(os.path.join(work_dir, f"bench_{scale}.db"))
+    import quiz
+    backend = storage.MySQLStorage(dict(quiz.DB_CONFIG, database=args.mysql_database))
+
+    def recreate(connection):
+        cursor = connection.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {args.mysql_database}")
+        cursor.close()
+        return True
+    backend.run("drop_database", recreate, False, use_database=False)
+    return backend
+
+
+def run_scale(args, work_dir, scale, users_count, modules, questions):
+    backend = create_backend(args, work_dir, scale)
+    if not backend.ensure_schema():
+        raise RuntimeError("Nie można zainicjalizować bazy danych")
+    quiz_data = datagen.generate_quiz_data(modules, questions, args.seed)
+    users = datagen.generate_users(users_count, list(quiz_data), args.seed)
+    start = time.perf_counter()
+    datagen.load(backend, quiz_data, users)
+    # Pytania do usuwania: rozgrzewka + pomiar + liczenie zapytań
+    backend.add_module(DELETE_MODULE)
+    for i in range(WARMUP + args.repeat + 1):
+        backend.add_question(DELETE_MODULE, {"question": f"Do usunięcia {i}", "options": list("ABCD"), "correct": 0})
+    print(f"[{scale}] {users_count} użytkowników, {modules} modułów x {questions} pytań "
+          f"(wypełnienie {time.perf_counter() - start:.1f} s)")
+
+    rng = random.Random(args.seed)
+    results = []
+    try:
+        for name, func in operations(backend, users, list(quiz_data), rng).items():
+            result = measure(backend, func, args.repeat, args.max_seconds)
+            result.update({"scale": scale, "users": users_count, "modules": modules,
+                           "questions": modules * questions, "operation": name})
+            results.append(result)
+            print(f"  {name:<20}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                  f"{result['queries_per_op']:>9}")
+    finally:
+        backend.close()
+    return results
+
+
+def git_revision():
+    """(commit, czy są niezatwierdzone zmiany) - do porównywania wyników między commitami"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(results, old_path, threshold):
+    """Porównuje z wcześniejszym przebiegiem; zwraca listę regresji"""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    old_results = {(r["scale"], r["operation"]): r for r in old["results"]}
+    print(f"\nPorównanie z {old_path} (commit {old['meta'].get('commit')}):")
+    print(f"{'skala':<8}{'operacja':<20}{'p50':>16}{'p95':>16}{'zapytania':>12}")
+    failed = []
+    for r in results:
+        o = old_results.get((r["scale"], r["operation"]))
+        if not o:
+            continue
+        change = (r["p95_ms"] - o["p95_ms"]) / o["p95_ms"] * 100 if o["p95_ms"] else 0.0
+        print(f"{r['scale']:<8}{r['operation']:<20}{o['p50_ms']:>7.3f}->{r['p50_ms']:<7.3f}"
+              f"{o['p95_ms']:>7.3f}->{r['p95_ms']:<7.3f}{o['queries_per_op']:>5}->{r['queries_per_op']:<5}")
+        if threshold is not None and change > threshold:
+            failed.append(f"{r['scale']}/{r['operation']}: p95 +{change:.0f}%")
+        if r["queries_per_op"] > o["queries_per_op"]:
+            failed.append(f"{r['scale']}/{r['operation']}: zapytań {o['queries_per_op']} -> {r['queries_per_op']}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark warstwy danych")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=50, help="liczba pomiarów każdej operacji")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="limit czasu pomiaru jednej operacji")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mysql-database", default="quiz_bench")
+    parser.add_argument("--output", help="zapisz wyniki do pliku JSON")
+    parser.add_argument("--compare", metavar="PLIK", help="porównaj z wynikami z pliku JSON")
+    parser.add_argument("--fail-threshold", type=float, help="z --compare: kod 1, gdy p95 wzrośnie o więcej %%")
+    parser.add_argument("--audit", action="store_true", help="uruchom też query_audit.py (kod 1 przy regresji planu)")
+    parser.add_argument("--audit-baseline", help="plik bazowy dla query_audit.py")
+    args = parser.parse_args()
+
+    commit, dirty = git_revision()
+    meta = {"commit": commit, "dirty": dirty, "date": datetime.now().isoformat(timespec="seconds"),
+            "backend": args.backend, "python": platform.python_version(), "repeat": args.repeat,
+            "seed": args.seed}
+    print(f"{'operacja':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'zapytań':>9}")
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in args.scales:
+            results.extend(run_scale(args, work_dir, scale, *SCALES[scale]))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"\nWyniki zapisano do {args.output}")
+
+    failed = compare(results, args.compare, args.fail_threshold) if args.compare else []
+    if args.audit:
+        command = [sys.executable, os.path.join(ROOT, "benchmarks", "query_audit.py"), "--backend", args.backend]
+        if args.audit_baseline:
+            command += ["--baseline", args.audit_baseline]
+        audit = subprocess.run(command, capture_output=True, text=True)
+        print("\n" + audit.stdout.strip().splitlines()[-1] if audit.stdout.strip() else "")
+        if audit.returncode != 0:
+            failed.append("query_audit: regresja planu zapytania w gorącej operacji")
+    for failure in failed:
+        print(f"REGRESJA: {failure}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark strumieniowego eksportu (export_data.py).
+
+Wypełnia dwie bazy SQLite generatorem (datagen.py) - pełną (--users, --modules x
+--questions) i dziesięciokrotnie mniejszą - i eksportuje każdą w osobnym procesie
+(python export_data.py), żeby zmierzyć szczytowe zużycie pamięci na skalę. Przy
+eksporcie strumieniowym pamięć dużej bazy jest praktycznie taka sama jak małej.
+
+Sprawdzane jest też:
+- eksport JSON odczytany json.load daje to samo co get_all_users / get_quiz_data
+  (czyli nadaje się dla migrate_json_to_mysql.py),
+- JSON Lines z gzip po rozpakowaniu zawiera te same konta i pytania,
+- --verify akceptuje eksport i odrzuca zmieniony plik,
+- zapis z innego połączenia w trakcie eksportu nie czeka na blokadę i nie
+  trafia do eksportu (jeden spójny odczyt).
+
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --users 50000 --modules 50 --questions 400
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import datagen  # noqa: E402
+import export_data  # noqa: E402
+import storage  # noqa: E402
+
+
+def fill(path, users_count, modules, questions):
+    """Baza SQLite z danymi generatora; pytania dodawane add_questions (jedna transakcja na moduł)"""
+    backend = storage.SQLiteStorage(path)
+    backend.init_database()
+    backend.migrate()
+    quiz_data = datagen.generate_quiz_data(modules, questions)
+    for module_name, module_questions in quiz_data.items():
+        backend.add_module(module_name)
+        backend.add_questions(module_name, module_questions)
+    backend.add_module("Pusty_modul")
+    for username, user_data in datagen.generate_users(users_count, list(quiz_data)).items():
+        backend.save_user(username, user_data)
+    return backend
+
+
+def run_export(db_path, out_dir, *options):
+    """export_data.py w osobnym procesie; zwraca (czas w s, szczytowa pamięć w MB)"""
+    env = dict(os.environ, QUIZ_STORAGE="sqlite", QUIZ_SQLITE_PATH=db_path, SDL_VIDEODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env.pop("QUIZ_OFFLINE_REPLICA", None)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "export_data.py"), "--output", out_dir, *options],
+                            env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout + result.stderr)
+        sys.exit(1)
+    peak = re.search(r"Szczytowe zużycie pamięci: (\d+) MB", result.stdout)
+    return elapsed, int(peak.group(1))
+
+
+def read_jsonl(path):
+    users, quiz_data = {}, {}
+    with gzip.open(os.path.join(path, "users.jsonl.gz"), "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            users[record.pop("username")] = record
+    with gzip.open(os.path.join(path, "quiz_data.jsonl.gz"), "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            module_questions = quiz_data.setdefault(record.pop("module"), [])
+            if record:
+                module_questions.append(record)
+    return users, quiz_data
+
+
+def normalized(users):
+    """Osiągnięcia i odblokowane moduły to zbiory - eksport podaje je w kolejności klucza głównego"""
+    return {name: {**user, "achievements": sorted(user["achievements"]), "unlocked": sorted(user["unlocked"])}
+            for name, user in users.items()}
+
+
+class WritingSink(export_data.UsersSink):
+    """Przy pierwszym koncie zapisuje nowe konto innym połączeniem - w trakcie eksportu"""
+
+    def __init__(self, directory, db_path):
+        super().__init__(directory, "users", "json", False)
+        self.db_path = db_path
+        self.write_s = None
+
+    def add(self, username, user):
+        if self.write_s is None:
+            writer = storage.SQLiteStorage(self.db_path)
+            start = time.perf_counter()
+            writer.create_user("zapis_w_trakcie", "x")
+            self.write_s = time.perf_counter() - start
+            writer.close()
+        super().add(username, user)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strumieniowego eksportu danych")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=500, help="pytań na moduł")
+    args = parser.parse_args()
+
+    checks = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        small_db, large_db = os.path.join(work_dir, "small.db"), os.path.join(work_dir, "large.db")
+        fill(small_db, args.users // 10, max(1, args.modules // 10), args.questions).close()
+        backend = fill(large_db, args.users, args.modules, args.questions)
+        total_questions = args.modules * args.questions
+
+        small_s, small_mb = run_export(small_db, os.path.join(work_dir, "small"))
+        json_dir = os.path.join(work_dir, "json")
+        json_s, json_mb = run_export(large_db, json_dir)
+        jsonl_dir = os.path.join(work_dir, "jsonl")
+        jsonl_s, jsonl_mb = run_export(large_db, jsonl_dir, "--format", "jsonl", "--gzip")
+        sizes = {name: os.path.getsize(os.path.join(directory, name))
+                 for directory, names in ((json_dir, ("users.json", "quiz_data.json")),
+                                          (jsonl_dir, ("users.jsonl.gz", "quiz_data.jsonl.gz")))
+                 for name in names}
+
+        users, quiz_data = normalized(backend.get_all_users()), backend.get_quiz_data()
+        with open(os.path.join(json_dir, "users.json"), encoding="utf-8") as f:
+            checks.append(("users.json = baza", True, normalized(json.load(f)) == users))
+        with open(os.path.join(json_dir, "quiz_data.json"), encoding="utf-8") as f:
+            checks.append(("quiz_data.json = baza", True, json.load(f) == quiz_data))
+        jsonl_users, jsonl_quiz_data = read_jsonl(jsonl_dir)
+        checks.append(("JSON Lines + gzip = baza", True,
+                       (normalized(jsonl_users), jsonl_quiz_data) == (users, quiz_data)))
+        with open(os.path.join(jsonl_dir, export_data.MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        checks.append(("manifest: liczba rekordów", (args.users, total_questions),
+                       (manifest["files"]["users.jsonl.gz"]["records"],
+                        manifest["files"]["quiz_data.jsonl.gz"]["records"])))
+        checks.append(("--verify eksportu", True, export_data.verify_export(jsonl_dir)))
+        with open(os.path.join(json_dir, "users.json"), "r+b") as f:
+            f.seek(10)
+            f.write(b"X")
+        checks.append(("--verify zmienionego pliku", False, export_data.verify_export(json_dir)))
+        # Bez zmian w bazie dwa eksporty gzip są identyczne bajt w bajt (mtime=0)
+        run_export(large_db, os.path.join(work_dir, "jsonl2"), "--format", "jsonl", "--gzip")
+        with open(os.path.join(work_dir, "jsonl2", export_data.MANIFEST_FILE), encoding="utf-8") as f:
+            checks.append(("powtórny eksport - te same sumy", manifest["files"], json.load(f)["files"]))
+        checks.append(("pamięć nie rośnie ze skalą (+<20 MB)", True, json_mb - small_mb < 20))
+
+        os.makedirs(os.path.join(work_dir, "concurrent"))
+        sink = WritingSink(os.path.join(work_dir, "concurrent"), large_db)
+        count = backend.export_users(sink)
+        sink.finish()
+        checks.append(("zapis w trakcie eksportu bez czekania", True, sink.write_s < 0.5))
+        checks.append(("spójny odczyt - nowe konto poza eksportem", args.users, count))
+        checks.append(("nowe konto zapisane", True, "zapis_w_trakcie" in backend.get_all_users()))
+        backend.close()
+
+    print(f"Dane: {args.users} kont, {args.modules} modułów x {args.questions} pytań")
+    print(f"Eksport 1/10 danych (JSON):  {small_s:5.2f} s, szczytowo {small_mb} MB")
+    print(f"Eksport pełny (JSON):        {json_s:5.2f} s, szczytowo {json_mb} MB")
+    print(f"Eksport pełny (JSONL, gzip): {jsonl_s:5.2f} s, szczytowo {jsonl_mb} MB")
+    print("Rozmiary: " + ", ".join(f"{name} {size / 1e6:.1f} MB" for name, size in sizes.items()))
+    failed = 0
+    for description, expected, actual in checks:
+        ok = expected == actual
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:<42} oczekiwano {expected!s:<20.20} otrzymano {actual!s:.40}")
+    print("WYNIK: " + ("zgodny" if not failed else f"{failed} niezgodności"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
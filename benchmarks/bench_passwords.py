@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark logowania przy wybranym koszcie hashowania haseł (passwords.py).
+
+Baza SQLite w katalogu tymczasowym dostaje --users kont ze starym hashem
+(SHA-256 ze stałą solą). Pierwsze logowanie każdego konta przelicza hash do
+nowego formatu (needs_rehash) - raportowany jest czas tej jednorazowej zmiany.
+Potem mierzone są:
+- czas pojedynczego hash_password i verify_password (p50, ms),
+- przepustowość pełnej ścieżki login_user z quiz.py (zapytanie + weryfikacja)
+  dla puli PasswordService z --workers wątkami: logowania/s, p50/p95 opóźnienia,
+- najdłuższa klatka pętli 60 FPS, gdy w tym czasie trwa logowanie - w tle
+  (PasswordService) i dawniej, bezpośrednio w pętli zdarzeń.
+
+    python benchmarks/bench_passwords.py
+    python benchmarks/bench_passwords.py --kdf scrypt --scrypt-n 32768 --workers 1 2 4
+    python benchmarks/bench_passwords.py --iterations 1200000 --logins 40
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import passwords  # noqa: E402
+import quiz  # noqa: E402
+import storage  # noqa: E402
+
+FRAME_MS = 1000 / 60
+
+
+def user_name(i):
+    return f"bench_login_{i:03d}"
+
+
+def user_password(i):
+    return f"haslo{i}"
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+def time_call(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def prepare(path, users):
+    """Baza z kontami w starym formacie hasła"""
+    backend = storage.SQLiteStorage(path)
+    if not backend.ensure_schema(["Bench"]):
+        raise RuntimeError("Nie można zainicjalizować bazy danych")
+    for i in range(users):
+        backend.save_user(user_name(i), {"pw": passwords.legacy_hash(user_password(i)), "unlocked": []})
+    quiz.set_storage(backend)
+    return backend
+
+
+def upgrade_legacy(backend, users):
+    """Pierwsze logowanie każdego konta - przeliczenie starego hasha; zwraca (ulepszone, czas ms)"""
+    start = time.perf_counter()
+    for i in range(users):
+        if not quiz.login_user(user_name(i), user_password(i)):
+            raise RuntimeError(f"Logowanie {user_name(i)} nie powiodło się")
+    elapsed = (time.perf_counter() - start) * 1000 / users
+    upgraded = sum(1 for i in range(users)
+                   if not passwords.needs_rehash(backend.get_password_hash(user_name(i))))
+    return upgraded, elapsed
+
+
+def timed_login(i, submitted):
+    """login_user w wątku puli: (wynik, ms od zlecenia - razem z czekaniem w kolejce)"""
+    ok = quiz.login_user(user_name(i), user_password(i))
+    return ok, (time.perf_counter() - submitted) * 1000
+
+
+def login_throughput(workers, logins, users):
+    """Logowania przez pulę PasswordService: (logowania/s, p50 ms, p95 ms)"""
+    service = passwords.PasswordService(workers)
+    try:
+        start = time.perf_counter()
+        futures = [service.submit(timed_login, n % users, time.perf_counter()) for n in range(logins)]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    finally:
+        service.executor.shutdown(wait=True)
+    if not all(ok for ok, _ in results):
+        raise RuntimeError("Nieudane logowanie w pomiarze przepustowości")
+    p50, p95 = percentiles([latency for _, latency in results])
+    return logins / elapsed, p50, p95
+
+
+def frame_gaps(background):
+    """Najdłuższa klatka pętli 60 FPS w trakcie jednego logowania (w tle albo w pętli zdarzeń)"""
+    service = passwords.PasswordService(1)
+    pending = None
+    gaps = []
+    last = time.perf_counter()
+    frames = 0
+    try:
+        while True:
+            if frames == 2:
+                if background:
+                    pending = service.submit(quiz.login_user, user_name(0), user_password(0))
+                else:
+                    quiz.login_user(user_name(0), user_password(0))
+            # "Klatka": odczekanie do następnego odświeżenia, jak clock.tick(60)
+            time.sleep(FRAME_MS / 1000)
+            now = time.perf_counter()
+            gaps.append((now - last) * 1000)
+            last = now
+            frames += 1
+            if frames > 2 and (pending is None or pending.done()):
+                break
+    finally:
+        service.executor.shutdown(wait=True)
+    return max(gaps), frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logowania przy wybranym koszcie hashowania")
+    parser.add_argument("--kdf", choices=["pbkdf2_sha256", "scrypt"], default=passwords.PASSWORD_KDF)
+    parser.add_argument("--iterations", type=int, default=passwords.PBKDF2_ITERATIONS, help="iteracje PBKDF2")
+    parser.add_argument("--scrypt-n", type=int, default=passwords.SCRYPT_N, help="koszt N dla scrypt")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="wątki puli PasswordService")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=16, help="logowań na pomiar przepustowości")
+    parser.add_argument("--repeat", type=int, default=5, help="pomiarów hash/verify")
+    args = parser.parse_args()
+
+    passwords.PASSWORD_KDF = args.kdf
+    passwords.PBKDF2_ITERATIONS = args.iterations
+    passwords.SCRYPT_N = args.scrypt_n
+    cost = passwords.configured_cost(args.kdf)
+    print(f"Algorytm: {args.kdf}, koszt: {cost}, rdzeni CPU: {os.cpu_count()}")
+
+    stored = passwords.hash_password("benchmark")
+    print(f"hash_password:   {time_call(lambda: passwords.hash_password('benchmark'), args.repeat):8.1f} ms")
+    print(f"verify_password: {time_call(lambda: passwords.verify_password('benchmark', stored), args.repeat):8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        backend = prepare(os.path.join(work_dir, "passwords.db"), args.users)
+        try:
+            upgraded, upgrade_ms = upgrade_legacy(backend, args.users)
+            print(f"Przeliczone stare hashe: {upgraded}/{args.users} "
+                  f"(pierwsze logowanie {upgrade_ms:.1f} ms na konto)")
+
+            print(f"\n{'wątki':>6}{'logowań/s':>12}{'p50 ms':>10}{'p95 ms':>10}")
+            for workers in args.workers:
+                rate, p50, p95 = login_throughput(workers, args.logins, args.users)
+                print(f"{workers:>6}{rate:>12.2f}{p50:>10.1f}{p95:>10.1f}")
+
+            print(f"\nNajdłuższa klatka (cel {FRAME_MS:.1f} ms) podczas logowania:")
+            for background, label in ((True, "PasswordService (w tle)"), (False, "w pętli zdarzeń")):
+                gap, frames = frame_gaps(background)
+                print(f"  {label:<26}{gap:>8.1f} ms  ({frames} klatek)")
+        finally:
+            quiz.wait_for_database()
+            backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark przygotowanych zapytań (server-side prepared statements).
+
+Symuluje salę z wieloma stanowiskami (wątki) wykonującymi najczęstsze operacje
+quizu i porównuje przebieg z przygotowanymi zapytaniami i bez nich.
+Liczniki serwera (Com_stmt_prepare, Com_stmt_execute, Com_select, Com_update,
+Com_insert) pokazują, ile razy serwer musiał parsować zapytania.
+
+Wymaga działającego serwera MySQL skonfigurowanego w DB_CONFIG (quiz.py).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quiz  # noqa: E402
+import storage  # noqa: E402
+
+BENCH_MODULE = "bench_prepared"
+BENCH_USER_PREFIX = "bench_prep_"
+STATUS_COUNTERS = ("Com_stmt_prepare", "Com_stmt_execute", "Com_select", "Com_update", "Com_insert")
+
+
+def read_server_counters():
+    """Odczytuje globalne liczniki poleceń serwera"""
+    connection = quiz.get_db_connection()
+    if not connection:
+        return {}
+    cursor = connection.cursor()
+    placeholders = ", ".join(["%s"] * len(STATUS_COUNTERS))
+    cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})", STATUS_COUNTERS)
+    counters = {name: int(value) for name, value in cursor.fetchall()}
+    cursor.close()
+    connection.close()
+    return counters
+
+
+def seed(clients, questions):
+    """Tworzy moduł z pytaniami i konta stanowisk"""
+    quiz.add_module(BENCH_MODULE)
+    existing = len(quiz.get_module_questions(BENCH_MODULE))
+    for i in range(existing, questions):
+        quiz.add_question(BENCH_MODULE, {
+            "question": f"Pytanie testowe {i}",
+            "options": ["A", "B", "C", "D"],
+            "correct": i % 4
+        })
+    for i in range(clients):
+        username = f"{BENCH_USER_PREFIX}{i}"
+        quiz.save_user(username, {"pw": quiz.hash_password("benchmark"), "unlocked": [BENCH_MODULE]})
+
+
+def cleanup(clients):
+    """Usuwa dane benchmarku"""
+    connection = quiz.get_db_connection()
+    if not connection:
+        return
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM users WHERE username LIKE %s", (BENCH_USER_PREFIX + "%",))
+    cursor.execute("DELETE FROM modules WHERE module_name = %s", (BENCH_MODULE,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def client_loop(username, ops, latencies):
+    """Jedno stanowisko: cykl operacji jak podczas quizu"""
+    for i in range(ops):
+        start = time.perf_counter()
+        step = i % 4
+        if step == 0:
+            quiz.get_module_questions(BENCH_MODULE)
+        elif step == 1:
+            quiz.update_user_stats(username, 0, 0, 0)
+        elif step == 2:
+            quiz.get_user_stats(username)
+        else:
+            quiz.check_achievement(username, "first_quiz")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run(clients, ops, prepared):
+    """Uruchamia jeden przebieg i zwraca podsumowanie"""
+    quiz.get_storage().use_prepared = prepared
+    before = read_server_counters()
+    latencies = []
+    threads = [threading.Thread(target=client_loop, args=(f"{BENCH_USER_PREFIX}{i}", ops, latencies))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    after = read_server_counters()
+
+    latencies.sort()
+    return {
+        "ops_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        "server": {name: after.get(name, 0) - before.get(name, 0) for name in STATUS_COUNTERS},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark przygotowanych zapytań")
+    parser.add_argument("--clients", type=int, default=30, help="liczba równoległych stanowisk (maks. 32)")
+    parser.add_argument("--ops", type=int, default=200, help="liczba operacji na stanowisko")
+    parser.add_argument("--questions", type=int, default=50, help="liczba pytań w module testowym")
+    parser.add_argument("--keep", action="store_true", help="nie usuwaj danych testowych")
+    args = parser.parse_args()
+
+    clients = max(1, min(args.clients, 32))
+    quiz.set_storage(storage.MySQLStorage(quiz.DB_CONFIG, pool_size=clients))
+    if not (quiz.init_database() and quiz.get_storage().migrate()):
+        print("BŁĄD: Nie można zainicjalizować bazy danych!")
+        sys.exit(1)
+    seed(clients, args.questions)
+
+    try:
+        # Rozgrzewka - przygotowanie zapytań na wszystkich połączeniach z puli
+        run(clients, 4, True)
+        results = {
+            "tekstowe": run(clients, args.ops, False),
+            "przygotowane": run(clients, args.ops, True),
+        }
+    finally:
+        if not args.keep:
+            cleanup(clients)
+
+    print(f"Stanowiska: {clients}, operacji na stanowisko: {args.ops}")
+    print(f"{'Tryb':<14}{'op/s':>10}{'p50 ms':>10}{'p95 ms':>10}  Liczniki serwera")
+    for mode, result in results.items():
+        counters = ", ".join(f"{k}={v}" for k, v in result["server"].items())
+        print(f"{mode:<14}{result['ops_per_s']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}  {counters}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark skompilowanego banku pytań (question_bank.py).
+
+Dla banków o rosnącej liczbie pytań porównuje start stanowiska:
+- json.load pliku w formacie quiz_data.json,
+- otwarcie banku przez mmap i odczyt jednego quizu (QUIZ_SIZE pytań).
+Mierzony jest czas i szczytowa pamięć alokowana przez Pythona (tracemalloc).
+Dla banku obie wartości powinny być stałe niezależnie od rozmiaru.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import QuestionBank, compile_question_bank  # noqa: E402
+
+QUIZ_SIZE = 10
+MODULES = 20
+
+
+def generate(total):
+    """Generuje quiz_data z `total` pytaniami rozłożonymi na MODULES modułów"""
+    quiz_data = {}
+    for i in range(total):
+        module = quiz_data.setdefault(f"Moduł_{i % MODULES:02d}", [])
+        module.append({
+            "id": i + 1,
+            "question": f"Pytanie {i}: które zdanie najlepiej opisuje praktykę zespołu Scrum nr {i}?",
+            "options": [f"Odpowiedź {c} do pytania {i} - zażółć gęślą jaźń" for c in "ABCD"],
+            "correct": i % 4,
+        })
+    return quiz_data
+
+
+def measure(func):
+    """Zwraca (czas w ms, szczytowa pamięć w KiB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def start_from_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    module = data[next(iter(data))]
+    return random.sample(module, min(QUIZ_SIZE, len(module)))
+
+
+def start_from_bank(path):
+    with QuestionBank(path) as bank:
+        module = bank.module_questions(bank.module_names()[0])
+        return [module[i] for i in random.sample(range(len(module)), min(QUIZ_SIZE, len(module)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark banku pytań (mmap) w porównaniu z JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'Pytań':>8}{'JSON MiB':>10}{'bank MiB':>10}{'JSON ms':>10}{'JSON KiB':>11}"
+          f"{'bank ms':>10}{'bank KiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            quiz_data = generate(size)
+            json_path = os.path.join(tmp, f"quiz_{size}.json")
+            bank_path = os.path.join(tmp, f"quiz_{size}.qbank")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(quiz_data, f, ensure_ascii=False)
+            compile_question_bank(quiz_data, bank_path)
+            del quiz_data
+
+            json_ms, json_kib = measure(lambda: start_from_json(json_path))
+            bank_ms, bank_kib = measure(lambda: start_from_bank(bank_path))
+            print(f"{size:>8}{os.path.getsize(json_path) / 2 ** 20:>10.2f}{os.path.getsize(bank_path) / 2 ** 20:>10.2f}"
+                  f"{json_ms:>10.2f}{json_kib:>11.0f}{bank_ms:>10.2f}{bank_kib:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
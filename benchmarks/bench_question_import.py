@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark importu pytań z pliku (panel moderatora, quiz.import_questions).
+
+Generuje plik CSV (lub JSON) z --questions pytaniami i importuje go do modułu:
+odczyt, walidacja validate_question i zapis jednym add_questions (executemany,
+jedna transakcja). Dla porównania ta sama liczba pytań dodawana jest dawną
+ścieżką - add_question z osobnym commitem na pytanie. Na końcu eksport modułu
+do pliku i ponowny import eksportu do drugiego modułu (treść musi się zgadzać).
+Dodatkowo sprawdzane jest, że plik z błędnym wierszem nie zapisuje niczego.
+
+    python benchmarks/bench_question_import.py
+    python benchmarks/bench_question_import.py --questions 20000 --format json
+    python benchmarks/bench_question_import.py --backend mysql   # DB_CONFIG z quiz.py
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import quiz  # noqa: E402
+import storage  # noqa: E402
+
+PREFIX = "bench_import_"
+USER = PREFIX + "mod"
+
+
+def question(i):
+    return {"question": f"Pytanie {i}: co oznacza pojęcie nr {i}, jeśli zespół pracuje w sprintach?",
+            "options": [f"Odpowiedź A{i}", f"Odpowiedź B{i}", f"Odpowiedź C{i}", f"Odpowiedź D{i}"],
+            "correct": i % 4}
+
+
+def write_source(path, count, fmt, broken_row=None):
+    questions = [question(i) for i in range(count)]
+    if broken_row is not None:
+        questions[broken_row]["options"][2] = ""
+    if fmt == "json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(questions, f, ensure_ascii=False)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["question", "option_a", "option_b", "option_c", "option_d", "correct"])
+        writer.writerows([q["question"], *q["options"], "ABCD"[q["correct"]]] for q in questions)
+
+
+def cleanup(backend):
+    """Usuwa dane testowe z bazy MySQL (SQLite korzysta z pliku tymczasowego)"""
+    def operation(connection):
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM users WHERE username LIKE %s", (PREFIX + "%",))
+        cursor.execute("DELETE FROM modules WHERE module_name LIKE %s", (PREFIX + "%",))
+        connection.commit()
+        cursor.close()
+        return True
+    backend.run("cleanup", operation, False)
+
+
+def question_contents(backend, module_name):
+    """Pytania modułu bez ID (te same pytania w innym module mają inne ID)"""
+    return [(q["question"], q["options"], q["correct"]) for q in backend.get_module_questions(module_name)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark importu pytań z pliku")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--single", type=int, default=500,
+                        help="pytań dodawanych pojedynczo (add_question) do porównania")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.backend == "sqlite":
+            backend = storage.SQLiteStorage(os.path.join(work_dir, "import.db"))
+        else:
+            backend = storage.MySQLStorage(quiz.DB_CONFIG)
+        quiz.set_storage(backend)
+        if not backend.ensure_schema():
+            print("BŁĄD: Nie można zainicjalizować bazy danych!")
+            sys.exit(1)
+        if args.backend == "mysql":
+            cleanup(backend)
+        modules = [PREFIX + name for name in ("bulk", "single", "roundtrip", "broken")]
+        for module_name in modules:
+            backend.add_module(module_name)
+        backend.create_user(USER, "x", True)
+
+        checks = []
+        try:
+            source = os.path.join(work_dir, f"questions.{args.format}")
+            write_source(source, args.questions, args.format)
+            progress = quiz.ImportProgress()
+            start = time.perf_counter()
+            count, errors = quiz.import_questions(modules[0], source, USER, progress)
+            bulk_s = time.perf_counter() - start
+            checks.append(("import", (args.questions, []), (count, errors[:3])))
+            checks.append(("postęp walidacji", args.questions, progress.done))
+
+            start = time.perf_counter()
+            for i in range(args.single):
+                backend.add_question(modules[1], question(i))
+            single_s = time.perf_counter() - start
+
+            exported = os.path.join(work_dir, f"export.{args.format}")
+            start = time.perf_counter()
+            checks.append(("eksport", (args.questions, []), quiz.export_questions(modules[0], exported)))
+            export_s = time.perf_counter() - start
+            quiz.import_questions(modules[2], exported, USER, quiz.ImportProgress())
+            checks.append(("eksport -> import bez zmian", True,
+                           question_contents(backend, modules[0]) == question_contents(backend, modules[2])))
+
+            broken = os.path.join(work_dir, f"broken.{args.format}")
+            write_source(broken, 100, args.format, broken_row=57)
+            count, errors = quiz.import_questions(modules[3], broken, USER, quiz.ImportProgress())
+            checks.append(("błędny wiersz - nic nie zapisano", (0, 0), (count, len(backend.get_module_questions(modules[3])))))
+            checks.append(("komunikat błędu", ["Pytanie 58: Wszystkie opcje są wymagane!"], errors))
+        finally:
+            if args.backend == "mysql":
+                cleanup(backend)
+            backend.close()
+
+    print(f"Backend: {args.backend}, format: {args.format}")
+    print(f"Import {args.questions} pytań: {bulk_s:.2f} s ({args.questions / bulk_s:.0f} pytań/s)")
+    print(f"add_question pojedynczo, {args.single} pytań: {single_s:.2f} s ({args.single / single_s:.0f} pytań/s)")
+    print(f"Eksport {args.questions} pytań: {export_s:.2f} s")
+    failed = 0
+    for description, expected, actual in checks:
+        ok = expected == actual
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:<34} oczekiwano {expected!s:<20.20} otrzymano {actual!s:.40}")
+    print("WYNIK: " + ("zgodny" if not failed else f"{failed} niezgodności"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
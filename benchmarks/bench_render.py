@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Benchmark renderowania ekranów pygame (koszt jednej klatki).
+
+Każdy ekran (menu główne, wybór modułu, quiz, ranking, osiągnięcia, usuwanie
+pytań) uruchamiany jest bez okna (SDL_VIDEODRIVER=dummy) na stałych danych
+z generatora (datagen.py, baza SQLite w katalogu tymczasowym). Wejście jest
+skryptowane: kursor przesuwa się po siatce punktów, więc przyciski zmieniają
+stan podświetlenia, ale nic nie jest klikane - ekran pozostaje w tym samym
+stanie przez cały pomiar.
+
+Granicą klatki jest pygame.display.flip(). Dla każdego ekranu raportowane są:
+- p50/p95/p99/max czasu klatki (ms),
+- liczba konstrukcji Button, wywołań font.render, pygame.draw.rect, renderowań
+  widżetów do atlasu (quiz.WIDGET_ATLAS) i pygame.font.SysFont na klatkę,
+- szczyt alokacji na klatkę (KiB, tracemalloc - osobny przebieg, żeby nie
+  zawyżał czasów).
+
+Ekrany działają w pętli aplikacji (quiz.App) tak jak w programie; clock.tick(FPS)
+jest wyłączone - mierzymy pracę, nie limit FPS.
+
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --frames 500 --screens main_menu quiz_loop
+    python benchmarks/bench_render.py --output render.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import quiz  # noqa: E402
+import storage  # noqa: E402
+import datagen  # noqa: E402
+from bench_data_layer import git_revision  # noqa: E402
+
+PLAYER = "gracz_000000"  # Moderator (datagen: is_mod dla pierwszych trzech)
+WARMUP = 10
+
+
+class FramesDone(Exception):
+    """Zgłaszany z flip() po zebraniu wszystkich klatek - kończy pętlę ekranu"""
+
+
+class FrameRecorder:
+    """Zbiera czasy klatek, liczniki wywołań i alokacje"""
+
+    def __init__(self, frames, track_memory):
+        self.frames = frames
+        self.track_memory = track_memory
+        self.times, self.allocations = [], []
+        self.counts = {"buttons": 0, "render": 0, "rect": 0, "atlas": 0, "sysfont": 0}
+        self.totals = {key: 0 for key in self.counts}
+        self.flips = 0
+        self.frame_start = None
+        self.memory_start = 0
+        self.atlas_start = 0
+
+    def start(self):
+        self.frame_start = time.perf_counter()
+        self.atlas_start = quiz.WIDGET_ATLAS.renders
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        """Wywoływane po oryginalnym flip(); pierwsze WARMUP klatek nie jest liczone"""
+        now = time.perf_counter()
+        self.flips += 1
+        self.counts["atlas"] = quiz.WIDGET_ATLAS.renders - self.atlas_start
+        if self.flips > WARMUP:
+            self.times.append((now - self.frame_start) * 1000)
+            for key, value in self.counts.items():
+                self.totals[key] += value
+            if self.track_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                self.allocations.append((peak - self.memory_start) / 1024)
+        for key in self.counts:
+            self.counts[key] = 0
+        if self.flips >= WARMUP + self.frames:
+            raise FramesDone()
+        self.start()
+
+
+def mouse_path(width, height, step=37):
+    """Skryptowany ruch kursora: siatka punktów przechodzących przez przyciski"""
+    points = [(x, y) for y in range(0, height, step) for x in range(0, width, step * 3)]
+    random.Random(1).shuffle(points)
+    return points
+
+
+@contextmanager
+def instrumented(pygame, recorder):
+    """Podmienia flip, zdarzenia, kursor, SysFont, draw.rect, Button i Clock na czas pomiaru"""
+    originals = (pygame.display.flip, pygame.event.get, pygame.mouse.get_pos, pygame.font.SysFont,
+                 pygame.draw.rect, pygame.time.Clock, pygame.time.wait, quiz.Button)
+    flip, _, _, sysfont, draw_rect, _, _, button = originals
+    path = mouse_path(quiz.INIT_WIDTH, quiz.INIT_HEIGHT)
+    position = [path[0]]
+
+    class CountingFont(pygame.font.Font):
+        def render(self, *args, **kwargs):
+            recorder.counts["render"] += 1
+            return super().render(*args, **kwargs)
+
+    def make_font(path, size, bold, italic):
+        font = CountingFont(path, size)
+        font.set_bold(bold)
+        font.set_italic(italic)
+        return font
+
+    def counting_sysfont(name, size, bold=False, italic=False, constructor=None):
+        recorder.counts["sysfont"] += 1
+        return sysfont(name, size, bold, italic, constructor=make_font)
+
+    def counting_rect(*args, **kwargs):
+        recorder.counts["rect"] += 1
+        return draw_rect(*args, **kwargs)
+
+    class CountingButton(button):
+        def __init__(self, *args, **kwargs):
+            recorder.counts["buttons"] += 1
+            super().__init__(*args, **kwargs)
+
+    class NoLimitClock:
+        def tick(self, framerate=0):
+            return 0
+
+    def scripted_events():
+        position[0] = path[recorder.flips % len(path)]
+        return [pygame.event.Event(pygame.MOUSEMOTION, pos=position[0], rel=(0, 0), buttons=(0, 0, 0))]
+
+    def recorded_flip():
+        flip()
+        recorder.end_frame()
+
+    pygame.display.flip = recorded_flip
+    pygame.event.get = scripted_events
+    pygame.mouse.get_pos = lambda: position[0]
+    pygame.font.SysFont = counting_sysfont
+    pygame.draw.rect = counting_rect
+    pygame.time.Clock = NoLimitClock
+    pygame.time.wait = lambda ms: 0
+    quiz.Button = CountingButton
+    try:
+        yield
+    finally:
+        (pygame.display.flip, pygame.event.get, pygame.mouse.get_pos, pygame.font.SysFont,
+         pygame.draw.rect, pygame.time.Clock, pygame.time.wait, quiz.Button) = originals
+
+
+def screens(module):
+    """Nazwa ekranu -> funkcja(app) tworząca ekran (quiz.Screen)"""
+    return {
+        "main_menu": lambda app: quiz.MainMenuScreen(app, PLAYER),
+        "select_module_screen": lambda app: quiz.SelectModuleScreen(app, PLAYER, True,
+                                                                     lambda m: quiz.QuizScreen(app, m, PLAYER)),
+        "quiz_loop": lambda app: quiz.QuizScreen(app, module, PLAYER),
+        "show_leaderboard": lambda app: quiz.LeaderboardScreen(app),
+        "show_achievements": lambda app: quiz.AchievementsScreen(app, PLAYER),
+        "delete_manager_screen": lambda app: quiz.DeleteManagerScreen(app, module),
+    }
+
+
+def run_screen(pygame, factory, frames, track_memory):
+    """Uruchamia pętlę aplikacji z jednym ekranem do zebrania frames klatek; zwraca FrameRecorder"""
+    recorder = FrameRecorder(frames, track_memory)
+    random.seed(1)  # Kolejność pytań i odpowiedzi w quiz_loop
+    with instrumented(pygame, recorder):
+        app = quiz.App(quiz.Window((quiz.INIT_WIDTH, quiz.INIT_HEIGHT)))
+        app.push(factory(app))
+        if track_memory:
+            tracemalloc.start()
+        recorder.start()
+        try:
+            app.run()
+        except FramesDone:
+            pass
+        finally:
+            if track_memory:
+                tracemalloc.stop()
+    if recorder.flips < WARMUP + frames:
+        raise RuntimeError(f"Ekran zakończył się po {recorder.flips} klatkach")
+    return recorder
+
+
+def summarize(name, timing, memory):
+    times = sorted(timing.times)
+    cuts = statistics.quantiles(times, n=100, method="inclusive")
+    frames = len(times)
+    return {
+        "screen": name,
+        "frames": frames,
+        "p50_ms": round(cuts[49], 4),
+        "p95_ms": round(cuts[94], 4),
+        "p99_ms": round(cuts[98], 4),
+        "max_ms": round(times[-1], 4),
+        "buttons_per_frame": round(timing.totals["buttons"] / frames, 2),
+        "render_per_frame": round(timing.totals["render"] / frames, 2),
+        "rect_per_frame": round(timing.totals["rect"] / frames, 2),
+        "atlas_per_frame": round(timing.totals["atlas"] / frames, 2),
+        "sysfont_per_frame": round(timing.totals["sysfont"] / frames, 2),
+        "alloc_kib_per_frame": round(statistics.median(memory.allocations), 2) if memory else None,
+    }
+
+
+def prepare_data(path, users, modules, questions):
+    """Baza SQLite ze stałymi danymi; zwraca nazwę modułu dla quizu i usuwania pytań"""
+    backend = storage.SQLiteStorage(path)
+    if not backend.ensure_schema():
+        raise RuntimeError("Nie można zainicjalizować bazy danych")
+    quiz_data = datagen.generate_quiz_data(modules, questions)
+    user_data = datagen.generate_users(users, list(quiz_data))
+    user_data[PLAYER]["unlocked"] = list(quiz_data)
+    datagen.load(backend, quiz_data, user_data)
+    quiz.set_storage(backend)
+    quiz.QUESTION_BANK_PATH = None
+    return backend, next(iter(quiz_data))
+
+
+def main():
+    names = list(screens(None))
+    parser = argparse.ArgumentParser(description="Benchmark renderowania ekranów pygame")
+    parser.add_argument("--screens", nargs="+", choices=names, default=names)
+    parser.add_argument("--frames", type=int, default=300, help="mierzonych klatek na ekran")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=40, help="pytań na moduł")
+    parser.add_argument("--no-memory", action="store_true", help="pomiń przebieg z tracemalloc")
+    parser.add_argument("--output", help="zapisz wyniki do pliku JSON")
+    args = parser.parse_args()
+
+    pygame = quiz.import_pygame()
+    pygame.init()
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        backend, module = prepare_data(os.path.join(work_dir, "render.db"), args.users, args.modules,
+                                       args.questions)
+        try:
+            print(f"{'ekran':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+                  f"{'Button':>8}{'render':>8}{'rect':>8}{'atlas':>8}{'SysFont':>8}{'KiB':>9}")
+            for name in args.screens:
+                func = screens(module)[name]
+                timing = run_screen(pygame, func, args.frames, False)
+                memory = None if args.no_memory else run_screen(pygame, func, args.frames, True)
+                r = summarize(name, timing, memory)
+                results.append(r)
+                alloc = f"{r['alloc_kib_per_frame']:>9.1f}" if memory else f"{'-':>9}"
+                print(f"{name:<24}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['max_ms']:>9.3f}"
+                      f"{r['buttons_per_frame']:>8.1f}{r['render_per_frame']:>8.1f}"
+                      f"{r['rect_per_frame']:>8.1f}{r['atlas_per_frame']:>8.1f}"
+                      f"{r['sysfont_per_frame']:>8.1f}{alloc}")
+        finally:
+            quiz.wait_for_database()
+            backend.close()
+    pygame.quit()
+
+    if args.output:
+        commit, dirty = git_revision()
+        meta = {"commit": commit, "dirty": dirty, "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(), "pygame": pygame.version.ver,
+                "video_driver": os.environ.get("SDL_VIDEODRIVER"), "frames": args.frames,
+                "size": [quiz.INIT_WIDTH, quiz.INIT_HEIGHT]}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"\nWyniki zapisano do {args.output}")
+
+
+if __name__ == "__main__":
+    main()
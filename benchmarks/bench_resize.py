@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark obsługi zmiany rozmiaru okna (quiz.Window, quiz.App).
+
+Odtwarza przeciąganie rogu okna bez okna (SDL_VIDEODRIVER=dummy): przez --drag-frames
+klatek pętla aplikacji dostaje po --events-per-frame zdarzeń VIDEORESIZE ze
+zmieniającym się rozmiarem, potem okno stoi. Czas jest symulowany (16 ms na klatkę),
+więc wynik nie zależy od szybkości maszyny. Zliczane są wywołania set_mode,
+przeliczenia układu ekranów (Screen.layout) i tworzenie czcionek (SysFont).
+Dawna obsługa w każdym ekranie wykonywała set_mode, get_scale_factor, SysFont
+i nowy układ dla każdego zdarzenia.
+
+Sprawdzane jest też: wymuszanie minimalnego rozmiaru, nowy układ ekranu
+przykrytego innym ekranem (po powrocie, raz) i brak nowego układu bez zmiany
+rozmiaru.
+
+    python benchmarks/bench_resize.py
+    python benchmarks/bench_resize.py --drag-frames 120 --events-per-frame 5
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import quiz  # noqa: E402
+
+FRAME_MS = 16
+
+
+class Stop(Exception):
+    """Zgłaszany z flip() po ostatniej klatce scenariusza"""
+
+
+class Scenario:
+    """Skryptowane klatki: zdarzenia dla każdej klatki, symulowany czas i liczniki"""
+
+    def __init__(self, pygame, frames):
+        self.pygame = pygame
+        self.frames = frames  # Lista list zdarzeń - po jednej na klatkę
+        self.frame = 0
+        self.counts = {"set_mode": 0, "sysfont": 0}
+        self.layouts = {}
+
+    def __enter__(self):
+        pygame = self.pygame
+        self.originals = (pygame.display.flip, pygame.event.get, pygame.time.get_ticks, pygame.display.set_mode,
+                          pygame.font.SysFont, pygame.time.Clock, quiz.Screen.layout)
+        flip, _, _, set_mode, sysfont, _, layout = self.originals
+        scenario = self
+
+        def scripted_flip():
+            flip()
+            scenario.frame += 1
+            if scenario.frame >= len(scenario.frames):
+                raise Stop()
+
+        def counting_set_mode(*args, **kwargs):
+            scenario.counts["set_mode"] += 1
+            return set_mode(*args, **kwargs)
+
+        def counting_sysfont(*args, **kwargs):
+            scenario.counts["sysfont"] += 1
+            return sysfont(*args, **kwargs)
+
+        def counting_layout(screen, window):
+            scenario.layouts[screen.name] = scenario.layouts.get(screen.name, 0) + 1
+            layout(screen, window)
+
+        class NoLimitClock:
+            def tick(self, framerate=0):
+                return 0
+
+        pygame.display.flip = scripted_flip
+        pygame.event.get = lambda: self.frames[self.frame] if self.frame < len(self.frames) else []
+        pygame.time.get_ticks = lambda: self.frame * FRAME_MS
+        pygame.display.set_mode = counting_set_mode
+        pygame.font.SysFont = counting_sysfont
+        pygame.time.Clock = NoLimitClock
+        quiz.Screen.layout = counting_layout
+        return self
+
+    def __exit__(self, *exc):
+        pygame = self.pygame
+        (pygame.display.flip, pygame.event.get, pygame.time.get_ticks, pygame.display.set_mode,
+         pygame.font.SysFont, pygame.time.Clock, quiz.Screen.layout) = self.originals
+
+
+def drag(pygame, start, end, frames, per_frame):
+    """Zdarzenia VIDEORESIZE przeciągania rogu okna od rozmiaru start do end"""
+    events = []
+    total = frames * per_frame
+    for i in range(total):
+        w = start[0] + (end[0] - start[0]) * (i + 1) // total
+        h = start[1] + (end[1] - start[1]) * (i + 1) // total
+        events.append(pygame.event.Event(pygame.VIDEORESIZE, w=w, h=h, size=(w, h)))
+    return [events[i:i + per_frame] for i in range(0, total, per_frame)]
+
+
+def idle(frames):
+    return [[] for _ in range(frames)]
+
+
+def run(pygame, frames, setup):
+    """Uruchamia pętlę aplikacji na skryptowanych klatkach; zwraca (scenariusz, okno, aplikacja)"""
+    with Scenario(pygame, frames) as scenario:
+        window = quiz.Window((quiz.INIT_WIDTH, quiz.INIT_HEIGHT))
+        app = quiz.App(window)
+        setup(app)
+        scenario.counts = {key: 0 for key in scenario.counts}
+        try:
+            app.run()
+        except Stop:
+            pass
+    return scenario, window, app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark obsługi zmiany rozmiaru okna")
+    parser.add_argument("--drag-frames", type=int, default=60, help="klatek przeciągania rogu okna")
+    parser.add_argument("--events-per-frame", type=int, default=3, help="zdarzeń VIDEORESIZE na klatkę")
+    args = parser.parse_args()
+
+    pygame = quiz.import_pygame()
+    pygame.init()
+    settle = quiz.RESIZE_DEBOUNCE_MS // FRAME_MS + 2
+    start, end = (quiz.INIT_WIDTH, quiz.INIT_HEIGHT), (1400, 1000)
+    checks = []
+
+    # 1. Przeciąganie rogu okna na ekranie logowania
+    frames = idle(2) + drag(pygame, start, end, args.drag_frames, args.events_per_frame) + idle(settle)
+    events = args.drag_frames * args.events_per_frame
+    scenario, window, app = run(pygame, frames, lambda app: app.push(quiz.AuthScreen(app)))
+    checks.append(("rozmiar po przeciąganiu", end, window.size))
+    # Pierwszy układ przy wejściu na ekran, drugi po ustaleniu rozmiaru
+    checks.append(("układ ekranu: raz po ustaleniu", {"auth_screen": 2}, scenario.layouts))
+    checks.append(("set_mode najwyżej raz", True, scenario.counts["set_mode"] <= 1))
+    checks.append(("SysFont najwyżej raz", True, scenario.counts["sysfont"] <= 1))
+    checks.append(("przyciski w nowej skali", quiz.get_scale_factor(*end), app.current.btn_action.scale))
+    drag_counts = dict(scenario.counts, layout=scenario.layouts["auth_screen"] - 1)
+
+    # 2. Zmniejszenie poniżej minimum - rozmiar wymuszony
+    frames = idle(2) + drag(pygame, start, (500, 400), 10, 1) + idle(settle)
+    scenario, window, app = run(pygame, frames, lambda app: app.push(quiz.AuthScreen(app)))
+    checks.append(("minimalny rozmiar okna", (quiz.MIN_WIDTH, quiz.MIN_HEIGHT), window.size))
+
+    # 3. Zmiana rozmiaru pod komunikatem - ekran pod spodem dostaje układ dopiero po powrocie
+    message_frames = quiz.MESSAGE_MS // FRAME_MS + 2
+    frames = idle(2) + drag(pygame, start, end, 10, 2) + idle(message_frames)
+
+    def covered(app):
+        app.push(quiz.AuthScreen(app))
+        app.push(quiz.MessageScreen(app, "Komunikat"))
+
+    scenario, window, app = run(pygame, frames, covered)
+    checks.append(("ekran przykryty: układ raz po powrocie", {"message": 2, "auth_screen": 1}, scenario.layouts))
+    checks.append(("po powrocie ekran w nowej skali", quiz.get_scale_factor(*end), app.current.btn_action.scale))
+
+    # 4. Bez zmiany rozmiaru - bez nowego układu
+    scenario, window, app = run(pygame, idle(100), lambda app: app.push(quiz.AuthScreen(app)))
+    checks.append(("100 klatek bez zmiany rozmiaru", {"auth_screen": 1}, scenario.layouts))
+    pygame.quit()
+
+    print(f"Przeciąganie: {args.drag_frames} klatek, {events} zdarzeń VIDEORESIZE")
+    print(f"{'':<16}{'set_mode':>10}{'SysFont':>10}{'układ':>10}")
+    print(f"{'dawniej':<16}{events:>10}{events:>10}{events:>10}")
+    print(f"{'teraz':<16}{drag_counts['set_mode']:>10}{drag_counts['sysfont']:>10}{drag_counts['layout']:>10}")
+    failed = 0
+    for description, expected, actual in checks:
+        ok = expected == actual
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:<40} oczekiwano {expected!s:<36.36} otrzymano {actual!s:.40}")
+    print("WYNIK: " + ("zgodny" if not failed else f"{failed} niezgodności"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
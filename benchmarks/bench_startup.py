@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark startu aplikacji: czas do pierwszej klatki (time-to-first-frame).
+
+Uruchamia quiz.py w osobnym procesie (SDL_VIDEODRIVER=dummy) i mierzy czas
+od startu procesu do pierwszego pygame.display.flip(). Tryb --eager odtwarza
+dawny start: pełne init_database() i add_module dla każdego domyślnego modułu
+przed pierwszą klatką.
+
+    python benchmarks/bench_startup.py --runs 10
+    QUIZ_STORAGE=sqlite python benchmarks/bench_startup.py --eager
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Kod uruchamiany w procesie potomnym - zgłasza pierwszą klatkę i kończy proces
+PROBE = """
+import os, sys
+sys.path.insert(0, {root!r})
+import quiz
+if {eager!r}:
+    quiz.init_database()
+    for module in quiz.DEFAULT_MODULES:
+        quiz.add_module(module)
+pygame = quiz.import_pygame()
+def first_flip():
+    print("FIRST_FRAME", flush=True)
+    os._exit(0)
+pygame.display.flip = first_flip
+quiz.main()
+"""
+
+
+def measure(eager):
+    """Zwraca czas (ms) od uruchomienia procesu do pierwszej klatki"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", PROBE.format(root=ROOT, eager=eager)],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=env)
+    for line in process.stdout:
+        if line.startswith("FIRST_FRAME"):
+            elapsed = (time.perf_counter() - start) * 1000
+            process.wait()
+            return elapsed
+    process.wait()
+    raise RuntimeError("Aplikacja zakończyła się przed pierwszą klatką")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Czas do pierwszej klatki aplikacji")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="dawny start: baza inicjalizowana przed pierwszą klatką")
+    args = parser.parse_args()
+
+    measure(args.eager)  # Rozgrzewka (pamięć podręczna plików .pyc)
+    samples = sorted(measure(args.eager) for _ in range(args.runs))
+    mode = "eager" if args.eager else "lazy"
+    print(f"Tryb: {mode}, przebiegów: {args.runs}")
+    print(f"time-to-first-frame: min {samples[0]:.1f} ms, mediana {statistics.median(samples):.1f} ms, "
+          f"max {samples[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
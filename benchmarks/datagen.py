@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Generator syntetycznych danych quizu do benchmarków.
+
+Dane mają ten sam kształt co users.json i quiz_data.json: użytkownicy z hashem
+hasła, XP, licznikami odpowiedzi, osiągnięciami i odblokowanymi modułami oraz
+moduły z pytaniami o czterech odpowiedziach. Generator jest deterministyczny
+(ziarno), więc przebiegi z różnych commitów działają na identycznych danych.
+
+    python benchmarks/datagen.py --users 1000 --modules 10 --questions 100 --out /tmp/dane
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+ACHIEVEMENT_IDS = ["first_quiz", "add_q", "top5", "correct_25", "wrong_10"]
+TOPICS = ["Sprint", "Product Backlog", "Daily Scrum", "retrospektywa", "Definition of Done",
+          "User Story", "Scrum Master", "Product Owner", "Kanban", "Increment"]
+
+
+def password(i):
+    return f"haslo{i}"
+
+
+def password_hash(i):
+    return hashlib.sha256(f"{password(i)}agile_scrum_quiz_2024".encode("utf-8")).hexdigest()
+
+
+def generate_quiz_data(modules: int, questions_per_module: int, seed: int = 1,
+                       prefix: str = "Modul") -> Dict[str, List[Dict]]:
+    """Moduły z pytaniami w formacie quiz_data.json"""
+    rng = random.Random(seed)
+    quiz_data = {}
+    for m in range(modules):
+        questions = []
+        for q in range(questions_per_module):
+            topic = rng.choice(TOPICS)
+            questions.append({
+                "question": f"Pytanie {q + 1}: które stwierdzenie o elemencie \"{topic}\" jest prawdziwe?",
+                "options": [f"Odpowiedź {c}: {topic} - wariant {rng.randint(1, 999)} opisu praktyki zespołu"
+                            for c in "ABCD"],
+                "correct": rng.randrange(4),
+            })
+        quiz_data[f"{prefix}_{m + 1:03d}"] = questions
+    return quiz_data
+
+
+def generate_users(count: int, module_names: List[str], seed: int = 1, prefix: str = "gracz") -> Dict[str, Dict]:
+    """Użytkownicy w formacie users.json (długi ogon XP - większość graczy ma mało punktów)"""
+    rng = random.Random(seed)
+    users = {}
+    for i in range(count):
+        correct = int(rng.expovariate(1 / 40))
+        wrong = int(rng.expovariate(1 / 15))
+        unlocked = module_names[:1 + min(len(module_names) - 1, correct // 30)] if module_names else []
+        users[f"{prefix}_{i:06d}"] = {
+            "pw": password_hash(i),
+            "is_mod": i < 3,
+            "xp": correct * 10 + rng.randrange(10),
+            "stats_correct": correct,
+            "stats_wrong": wrong,
+            "achievements": [a for a in ACHIEVEMENT_IDS if rng.random() < 0.4],
+            "unlocked": unlocked,
+        }
+    return users
+
+
+def generate_attempts(usernames: List[str], question_ids: List[int], count: int, seed: int = 1) -> List[Tuple]:
+    """Wiersze dziennika odpowiedzi (username, question_id, chosen_option, is_correct, latency_ms, answered_at)"""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    rows = []
+    for _ in range(count):
+        chosen = rng.randrange(4)
+        rows.append((rng.choice(usernames), rng.choice(question_ids), chosen, rng.random() < 0.7,
+                     rng.randint(500, 15000), now - timedelta(minutes=rng.randrange(60 * 24 * 30))))
+    return rows
+
+
+def load(backend, quiz_data: Dict[str, List[Dict]], users: Dict[str, Dict], attempts: int = 0,
+         seed: int = 1) -> List[int]:
+    """Zapisuje dane przez interfejs QuizStorage; zwraca ID pytań"""
+    question_ids = []
+    for module_name, questions in quiz_data.items():
+        backend.add_module(module_name)
+        for q in questions:
+            backend.add_question(module_name, q)
+        question_ids.extend(row[0] for row in backend.get_question_weights("", module_name))
+    for username, user_data in users.items():
+        backend.save_user(username, user_data)
+    if attempts and users and question_ids:
+        rows = generate_attempts(list(users), question_ids, attempts, seed)
+        for start in range(0, len(rows), 1000):
+            backend.insert_question_attempts(rows[start:start + 1000])
+    return question_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator danych w formacie users.json / quiz_data.json")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=100, help="pytań na moduł")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=".", help="katalog na users.json i quiz_data.json")
+    args = parser.parse_args()
+
+    quiz_data = generate_quiz_data(args.modules, args.questions, args.seed)
+    users = generate_users(args.users, list(quiz_data), args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    for name, data in (("quiz_data.json", quiz_data), ("users.json", users)):
+        with open(os.path.join(args.out, name), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"Zapisano {len(users)} użytkowników i {args.modules * args.questions} pytań do {args.out}")
+
+
+if __name__ == "__main__":
+    main()
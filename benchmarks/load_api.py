@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Test obciążeniowy usługi danych (quiz_api.py) - w całości na localhost.
+
+Usługa startuje jako osobny proces na wolnym porcie, z bazą SQLite wypełnioną
+generatorem (datagen.py) albo z MySQL (--backend mysql, baza --mysql-database).
+Każdy klient to osobny proces ze stanowiskiem RemoteStorage, który powtarza
+sesję gracza tak jak quiz.py - część operacji zlecana równolegle (trzy wątki,
+jak pula AsyncData):
+- logowanie (weryfikacja hasła i naprawa konta w usłudze), statystyki gracza,
+- wybór modułu: lista modułów i odblokowania (równolegle),
+- losowanie pytań: wagi i treść pytań,
+- QUIZ_SIZE odpowiedzi (update_user_stats), zapis dziennika odpowiedzi,
+- osiągnięcia i ranking (równolegle).
+
+Raport: operacje/s, p50/p95 czasu operacji z perspektywy stanowiska, liczba
+operacji na żądanie HTTP (łączenie w partie) i trafienia bufora usługi.
+--direct uruchamia te same sesje bezpośrednio na bazie (bez usługi) do porównania.
+
+    python benchmarks/load_api.py --clients 8 --sessions 20
+    python benchmarks/load_api.py --clients 8 --sessions 20 --direct
+    python benchmarks/load_api.py --backend mysql --clients 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Przy pierwszym logowaniu usługa przelicza stare hashe z datagen - z niskim kosztem test mierzy
+# warstwę danych, a nie hashowanie (to mierzy bench_passwords.py)
+os.environ.setdefault("QUIZ_PBKDF2_ITERATIONS", "1000")
+
+import datagen  # noqa: E402
+import quiz_api  # noqa: E402
+import storage  # noqa: E402
+
+QUIZ_SIZE = 10
+ACHIEVEMENTS = ["first_quiz", "correct_25", "wrong_10"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def open_backend(args):
+    if args.backend == "sqlite":
+        return storage.SQLiteStorage(args.sqlite_path)
+    import quiz
+    return storage.MySQLStorage(dict(quiz.DB_CONFIG, database=args.mysql_database))
+
+
+def prepare(args):
+    """Świeża baza z użytkownikami i pytaniami; zwraca (nazwy użytkowników, moduły)"""
+    backend = open_backend(args)
+    if args.backend == "mysql":
+        def recreate(connection):
+            cursor = connection.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {args.mysql_database}")
+            cursor.close()
+            return True
+        backend.run("drop_database", recreate, False, use_database=False)
+    if not backend.ensure_schema():
+        raise RuntimeError("Nie można zainicjalizować bazy danych")
+    quiz_data = datagen.generate_quiz_data(args.modules, args.questions, args.seed)
+    users = datagen.generate_users(args.users, list(quiz_data), args.seed)
+    datagen.load(backend, quiz_data, users)
+    backend.close()
+    return list(users), list(quiz_data)
+
+
+def start_service(args, port):
+    env = dict(os.environ, QUIZ_STORAGE=args.backend, QUIZ_SQLITE_PATH=args.sqlite_path,
+               QUIZ_QUERY_MONITOR="0")
+    env.pop("QUIZ_OFFLINE_REPLICA", None)
+    command = [sys.executable, os.path.join(ROOT, "quiz_api.py"), "--port", str(port)]
+    if args.backend == "mysql":
+        command += ["--mysql-database", args.mysql_database]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Usługa nie wystartowała")
+
+
+def timed(samples, name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def session(backend, pool, samples, username, modules, rng):
+    """Jedna sesja gracza - kolejność i równoległość operacji jak w quiz.py"""
+    timed(samples, "login", backend.login, username, datagen.password(int(username.rsplit("_", 1)[1])))
+    timed(samples, "get_user_stats", backend.get_user_stats, username)
+    quiz_data, _ = [f.result() for f in (pool.submit(timed, samples, "get_quiz_data", backend.get_quiz_data),
+                                         pool.submit(timed, samples, "get_user_unlocked_modules",
+                                                     backend.get_user_unlocked_modules, username))]
+    module_name = rng.choice(modules)
+    weights = timed(samples, "get_question_weights", backend.get_question_weights, username, module_name)
+    ids = rng.sample([row[0] for row in weights], min(QUIZ_SIZE, len(weights)))
+    questions = timed(samples, "get_questions_by_ids", backend.get_questions_by_ids, ids)
+    writes, rows = [], []
+    for q in questions:
+        correct = rng.random() < 0.7
+        writes.append(pool.submit(timed, samples, "update_user_stats", backend.update_user_stats,
+                                  username, 10 if correct else 0, int(correct), int(not correct), module_name))
+        rows.append((username, q["id"], rng.randrange(4), correct, rng.randrange(500, 5000), datetime.now()))
+    writes.append(pool.submit(timed, samples, "insert_question_attempts", backend.insert_question_attempts, rows))
+    for future in writes:
+        future.result()
+    final = [pool.submit(timed, samples, "check_achievement", backend.check_achievement, username, ach_id)
+             for ach_id in ACHIEVEMENTS]
+    final.append(pool.submit(timed, samples, "get_leaderboard", backend.get_leaderboard, 5))
+    for future in final:
+        future.result()
+    return len(questions)
+
+
+def client(args, index, usernames, modules, barrier, results):
+    if args.direct:
+        backend = open_backend(args)
+    else:
+        backend = quiz_api.RemoteStorage(args.url, batch_window=args.batch_window)
+    rng = random.Random(args.seed + index)
+    samples = {}
+    answers = 0
+    barrier.wait()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for _ in range(args.sessions):
+            answers += session(backend, pool, samples, rng.choice(usernames), modules, rng)
+    elapsed = time.perf_counter() - start
+    errors = sum(stat["errors"] for stat in backend.get_db_stats().values())
+    backend.close()
+    results.put({"samples": samples, "answers": answers, "seconds": elapsed, "errors": errors})
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test obciążeniowy usługi danych quiz_api.py")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--clients", type=int, default=8, help="stanowiska (procesy)")
+    parser.add_argument("--sessions", type=int, default=20, help="sesji gracza na stanowisko")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=50, help="pytań w module")
+    parser.add_argument("--batch-window", type=float, default=quiz_api.BATCH_WINDOW,
+                        help="dodatkowe czekanie klienta na wywołania do partii (s)")
+    parser.add_argument("--direct", action="store_true", help="bez usługi - każde stanowisko łączy się z bazą")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mysql-database", default="quiz_api_load")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        args.sqlite_path = os.path.join(work_dir, "api.db")
+        usernames, modules = prepare(args)
+        port = free_port()
+        args.url = f"http://127.0.0.1:{port}"
+        service = None if args.direct else start_service(args, port)
+        try:
+            barrier = multiprocessing.Barrier(args.clients)
+            results = multiprocessing.Queue()
+            processes = [multiprocessing.Process(target=client, args=(args, i, usernames, modules, barrier, results))
+                         for i in range(args.clients)]
+            start = time.perf_counter()
+            for process in processes:
+                process.start()
+            reports = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - start
+            health = None
+            if service is not None:
+                with urllib.request.urlopen(f"{args.url}/health", timeout=5) as response:
+                    health = json.loads(response.read())
+        finally:
+            if service is not None:
+                service.terminate()
+                service.wait()
+
+    samples = {}
+    for report in reports:
+        for name, values in report["samples"].items():
+            samples.setdefault(name, []).extend(values)
+    operations = sum(len(values) for values in samples.values())
+    mode = "bezpośrednio do bazy" if args.direct else f"usługa {args.url}"
+    print(f"Backend: {args.backend}, {mode}, stanowisk: {args.clients}, sesji: {args.clients * args.sessions}, "
+          f"czas: {elapsed:.1f} s")
+    print(f"Operacji: {operations} ({operations / elapsed:.0f}/s), odpowiedzi: "
+          f"{sum(r['answers'] for r in reports)}, błędów: {sum(r['errors'] for r in reports)}")
+    if health is not None:
+        cached = health["cache_hits"] + health["cache_misses"]
+        print(f"Żądań HTTP: {health['requests']}, operacji na żądanie: {health['calls'] / health['requests']:.2f}, "
+              f"trafienia bufora: {health['cache_hits']}/{cached}")
+    print(f"\n{'operacja':<28}{'liczba':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, values in sorted(samples.items()):
+        print(f"{name:<28}{len(values):>8}{percentile(values, 0.5):>10.2f}{percentile(values, 0.95):>10.2f}")
+    sys.exit(1 if sum(r["errors"] for r in reports) else 0)
+
+
+if __name__ == "__main__":
+    main()
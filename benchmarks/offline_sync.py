@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Symulacja awarii serwera dla trybu offline stanowiska (offline.py).
+
+Główna baza (SQLite w katalogu tymczasowym) i dwa stanowiska z własnymi
+replikami. Przebieg:
+1. oba stanowiska logują tego samego użytkownika przy działającym serwerze
+   (profil i bank pytań trafiają do replik),
+2. "awaria": backend główny odrzuca wszystkie operacje; stanowiska dalej
+   logują się z repliki, grają quizy (XP, statystyki modułu, odpowiedzi,
+   osiągnięcie, odblokowanie modułu) - zapisy czekają w dzienniku,
+3. w czasie awarii moderator usuwa moduł, którego dotyczą część zapisów,
+4. serwer wraca; dziennik wysyłany jest partiami, jedna partia dwukrotnie
+   (utracone potwierdzenie) - wynik nie może się zdublować.
+
+Na końcu stan bazy głównej porównywany jest z oczekiwanym.
+
+    python benchmarks/offline_sync.py
+    python benchmarks/offline_sync.py --answers 500 --batch-size 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import offline  # noqa: E402
+import passwords  # noqa: E402
+import storage  # noqa: E402
+
+MODULES = ["offline_A", "offline_B", "offline_C"]
+USER = "offline_user"
+PASSWORD = "haslo123"
+XP_PER_ANSWER = 10
+
+
+class FlakyStorage(storage.SQLiteStorage):
+    """Backend główny, który na czas "awarii" odrzuca operacje jak otwarty bezpiecznik"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.down = False
+
+    def run(self, name, operation, default=None, idempotent=True, use_database=True):
+        if self.down:
+            self.breaker.failures = self.breaker.failure_threshold
+            self.record_stat(name, rejected=True)
+            return default
+        self.breaker.failures = 0
+        return super().run(name, operation, default, idempotent, use_database)
+
+
+def prepare(path, questions):
+    primary = FlakyStorage(path)
+    if not primary.ensure_schema(MODULES):
+        raise RuntimeError("Nie można zainicjalizować bazy danych")
+    for module_name in MODULES:
+        for i in range(questions):
+            primary.add_question(module_name, {"question": f"{module_name} {i}", "options": list("ABCD"),
+                                               "correct": 0})
+    primary.create_user(USER, passwords.hash_password(PASSWORD, cost=1000))
+    return primary
+
+
+def login(kiosk):
+    """Ścieżka login_user z quiz.py: hasło sprawdzane na serwerze albo (przy awarii) w replice"""
+    return kiosk.login(USER, PASSWORD) is True
+
+
+def play(kiosk, answers):
+    """Quiz w module A: statystyki po każdej odpowiedzi i partia odpowiedzi na końcu"""
+    ids = [row[0] for row in kiosk.get_question_weights(USER, MODULES[0])]
+    rows = []
+    for i in range(answers):
+        kiosk.update_user_stats(USER, XP_PER_ANSWER, 1, 0, MODULES[0])
+        rows.append((USER, ids[i % len(ids)], 0, True, 900, datetime.now()))
+    kiosk.insert_question_attempts(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symulacja awarii serwera w trybie offline stanowiska")
+    parser.add_argument("--answers", type=int, default=100, help="odpowiedzi na stanowisko w czasie awarii")
+    parser.add_argument("--questions", type=int, default=10, help="pytań w module")
+    parser.add_argument("--batch-size", type=int, default=offline.SYNC_BATCH_SIZE)
+    args = parser.parse_args()
+    offline.SYNC_BATCH_SIZE = args.batch_size
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        primary = prepare(os.path.join(work_dir, "primary.db"), args.questions)
+        kiosks = [offline.OfflineStorage(primary, os.path.join(work_dir, f"kiosk{i}.db"), start_worker=False)
+                  for i in range(2)]
+        checks = []
+
+        for kiosk in kiosks:
+            checks.append(("logowanie online", True, login(kiosk)))
+            kiosk.sync_once()
+        checks.append(("profil w replice", True, all(USER in kiosk.profiles for kiosk in kiosks)))
+
+        primary.down = True
+        start = time.perf_counter()
+        for kiosk in kiosks:
+            checks.append(("logowanie offline", True, login(kiosk)))
+            checks.append(("błędne hasło offline", False, kiosk.login(USER, PASSWORD + "x")))
+            play(kiosk, args.answers)
+            checks.append(("osiągnięcie offline (nowe)", True, kiosk.check_achievement(USER, "first_quiz")))
+            kiosk.update_user_stats(USER, 0, 0, 1, MODULES[2])
+            kiosk.unlock_module_for_user(USER, MODULES[1])
+            kiosk.unlock_module_for_user(USER, MODULES[2])
+            checks.append(("XP w replice", args.answers * XP_PER_ANSWER,
+                           kiosk.get_user_stats(USER)["xp"]))
+        offline_ms = (time.perf_counter() - start) * 1000 / (2 * args.answers)
+        pending = [kiosk.pending_writes() for kiosk in kiosks]
+        checks.append(("sync bez serwera nie gubi dziennika", False, kiosks[0].sync_once()))
+        checks.append(("dziennik po nieudanej synchronizacji", pending[0], kiosks[0].pending_writes()))
+
+        primary.down = False
+        primary.run("delete_module", lambda connection: (
+            connection.execute("DELETE FROM modules WHERE module_name = ?", (MODULES[2],)), connection.commit()))
+        # Utracone potwierdzenie: pierwsza partia wysłana, ale nieusunięta z dziennika
+        first = kiosks[0].replica.run("read_journal", lambda connection: connection.execute(
+            "SELECT seq, operation, args FROM sync_journal ORDER BY seq LIMIT ?", (args.batch_size,)).fetchall())
+        entries = [(f"{kiosks[0].replica_id}:{seq}", op, json.loads(a)) for seq, op, a in first]
+        replayed = primary.apply_journal(entries)
+        start = time.perf_counter()
+        synced = [kiosk.sync_once() for kiosk in kiosks]
+        sync_ms = (time.perf_counter() - start) * 1000
+
+        stats = primary.get_user_stats(USER)
+        module_stats = primary.get_user_module_stats(USER)
+        difficulty = primary.get_question_difficulty(MODULES[0])
+        total = 2 * args.answers
+        checks += [
+            ("synchronizacja", [True, True], synced),
+            ("pusty dziennik", [0, 0], [kiosk.pending_writes() for kiosk in kiosks]),
+            ("XP na serwerze", total * XP_PER_ANSWER, stats["xp"]),
+            ("poprawne odpowiedzi", total, stats["stats_correct"]),
+            ("błędne (usunięty moduł - tylko licznik)", 2, stats["stats_wrong"]),
+            ("statystyki modułu A", total, module_stats.get(MODULES[0], {}).get("correct")),
+            ("odpowiedzi w dzienniku", total, sum(row["attempts"] for row in difficulty)),
+            ("osiągnięcie (raz)", ["first_quiz"], primary.get_user_achievements(USER)),
+            ("odblokowane moduły", sorted(MODULES[:2]), sorted(primary.get_user_unlocked_modules(USER))),
+            ("profil po synchronizacji", total * XP_PER_ANSWER, kiosks[1].get_user_stats(USER)["xp"]),
+        ]
+        print(f"Wpisów w dzienniku: {pending}, partia {args.batch_size}, powtórzona partia: {replayed} wpisów")
+        print(f"Zapis offline: {offline_ms:.3f} ms na odpowiedź, synchronizacja obu stanowisk: {sync_ms:.1f} ms")
+        for kiosk in kiosks:
+            kiosk.replica.close()
+        primary.close()
+
+    failed = 0
+    for description, expected, actual in checks:
+        ok = expected == actual
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:<40} oczekiwano {expected!s:<14.14} otrzymano {actual!s:.30}")
+    print("WYNIK: " + ("zgodny" if not failed else f"{failed} niezgodności"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Audyt planów zapytań warstwy danych (EXPLAIN / EXPLAIN ANALYZE).
+
+Wypełnia bazę danymi testowymi, wywołuje każdą operację QuizStorage i zbiera
+wszystkie wykonane zapytania (add_query_listener). Dla każdego zapytania
+uruchamia EXPLAIN (MySQL) lub EXPLAIN QUERY PLAN (SQLite) i oznacza:
+- full_scan  - pełne przeszukanie tabeli,
+- index_scan - przeszukanie całego indeksu,
+- filesort   - sortowanie wyników poza indeksem,
+- temporary  - tabela tymczasowa (GROUP BY / DISTINCT).
+
+Znaleziska w gorących operacjach (HOT_OPERATIONS - ścieżka quizu) kończą audyt
+kodem 1, chyba że są zapisane w pliku bazowym (--baseline). Dzięki temu audyt
+może przerwać przebieg benchmarku, gdy zapytanie z gorącej ścieżki się pogorszy.
+
+    python benchmarks/query_audit.py --backend sqlite
+    python benchmarks/query_audit.py --backend mysql --analyze
+    python benchmarks/query_audit.py --write-baseline benchmarks/audit_baseline.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+import datagen  # noqa: E402
+
+PREFIX = "audit_"
+
+# Operacje wykonywane przy każdej odpowiedzi lub ekranie quizu
+HOT_OPERATIONS = {
+    "get_user_stats", "update_user_stats", "check_achievement", "get_module_questions",
+    "get_question_weights", "get_questions_by_ids", "insert_question_attempts",
+    "get_user_unlocked_modules", "get_user_achievements", "unlock_module_for_user",
+    "get_user_module_stats", "get_password_hash", "ensure_first_module",
+}
+# Operacje, które z założenia czytają całe tabele (nie są oznaczane jako regresje)
+FULL_READ_OPERATIONS = {"get_all_users", "get_quiz_data", "get_module_stats", "rebuild_stats_rollups"}
+
+EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+INSERT_SELECT = re.compile(r"^\s*INSERT\b.*\bSELECT\b", re.IGNORECASE | re.DOTALL)
+# Przejście indeksu w kolejności ORDER BY zatrzymane po pierwszym wierszu - nie jest przeszukaniem całego indeksu
+FIRST_ROW = re.compile(r"\bORDER BY\b[^()]*\bLIMIT 1\s*$", re.IGNORECASE)
+
+
+def seed(backend, users, modules, questions_per_module, attempts):
+    """Wypełnia bazę danymi z generatora (tabele nie mogą być zbyt małe -
+    przy kilku wierszach optymalizator i tak wybiera pełne przeszukanie)"""
+    quiz_data = datagen.generate_quiz_data(modules, questions_per_module, prefix=PREFIX + "module")
+    user_data = datagen.generate_users(users, list(quiz_data), prefix=PREFIX + "user")
+    question_ids = datagen.load(backend, quiz_data, user_data, attempts)
+    return list(quiz_data), question_ids, list(user_data)
+
+
+def workload(backend, module_names, question_ids, usernames):
+    """Wywołuje każdą operację interfejsu QuizStorage (bez DDL i migracji)"""
+    user = usernames[-1]
+    module = module_names[0]
+    now = datetime.now().replace(microsecond=0)
+    backend.get_all_users()
+    backend.get_user_stats(user)
+    backend.get_leaderboard(5)
+    backend.get_password_hash(user)
+    backend.ensure_first_module(user)
+    backend.save_user(f"{PREFIX}new_user", {"pw": "0" * 64, "achievements": ["first_quiz"], "unlocked": [module]})
+    backend.update_user_stats(user, 10, 1, 0, module)
+    backend.get_quiz_data()
+    backend.add_module(f"{PREFIX}extra_module")
+    backend.add_question(module, {"question": "Nowe pytanie?", "options": list("ABCD"), "correct": 0})
+    backend.delete_question_by_id(module, backend.get_module_questions(module)[0]["id"])
+    backend.get_question_weights(user, module)
+    backend.get_questions_by_ids(question_ids[1:11])
+    backend.get_module_question_ids(module)
+    backend.unlock_module_for_user(user, module_names[-1])
+    backend.get_user_unlocked_modules(user)
+    backend.get_user_achievements(user)
+    backend.check_achievement(user, "xp_100")
+    backend.insert_question_attempts([(user, question_ids[1], 0, True, 900, now)])
+    backend.get_question_difficulty(module)
+    backend.get_user_module_stats(user)
+    backend.get_module_stats()
+    backend.rebuild_stats_rollups()
+
+
+def capture(backend, func, *args):
+    """Zwraca {operacja: {sql: parametry}} - pierwsze wystąpienie każdego zapytania"""
+    statements = {}
+
+    def listener(operation, sql, params, elapsed_ms):
+        if isinstance(params, list):  # executemany - wystarczy pierwszy zestaw parametrów
+            params = params[0] if params else ()
+        statements.setdefault(operation, {}).setdefault(" ".join(sql.split()), params)
+
+    backend.add_query_listener(listener)
+    try:
+        func(*args)
+    finally:
+        backend.remove_query_listener(listener)
+    return statements
+
+
+def explain_sqlite(backend, sql, params):
+    """Zwraca (linie planu, znaleziska) dla SQLite"""
+    rows = backend.run("explain", lambda c: c.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall(), [])
+    plan, findings = [], []
+    sorted_by_index = not any("TEMP B-TREE FOR ORDER BY" in row[-1] for row in rows)
+    for row in rows:
+        detail = row[-1]
+        plan.append(detail)
+        words = detail.split()
+        if words[0] == "SCAN" and words[1] != "CONSTANT":
+            if "INDEX" in words and sorted_by_index and FIRST_ROW.search(sql):
+                continue
+            kind = "index_scan" if "INDEX" in words else "full_scan"
+            findings.append(f"{kind}:{words[1]}")
+        elif detail.startswith("USE TEMP B-TREE"):
+            findings.append("filesort" if "ORDER BY" in detail else "temporary")
+    return plan, findings
+
+
+def explain_mysql(backend, sql, params, analyze):
+    """Zwraca (linie planu, znaleziska) dla MySQL; z analyze dołącza EXPLAIN ANALYZE zapytań SELECT"""
+    def operation(connection):
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("EXPLAIN " + sql, params)
+        rows = cursor.fetchall()
+        tree = []
+        if analyze and sql.upper().startswith("SELECT"):
+            cursor.execute("EXPLAIN ANALYZE " + sql, params)
+            tree = cursor.fetchall()[0]["EXPLAIN"].splitlines()
+        cursor.close()
+        return rows, tree
+
+    rows, tree = backend.run("explain", operation, ([], []))
+    plan, findings = [], []
+    for row in rows:
+        extra = row.get("Extra") or ""
+        plan.append(f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {extra}".rstrip())
+        if row["type"] == "ALL":
+            findings.append(f"full_scan:{row['table']}")
+        elif row["type"] == "index" and not (FIRST_ROW.search(sql) and "Using filesort" not in extra):
+            findings.append(f"index_scan:{row['table']}")
+        if "Using filesort" in extra:
+            findings.append("filesort")
+        if "Using temporary" in extra:
+            findings.append("temporary")
+    return plan + tree, findings
+
+
+def audit(backend, statements, analyze=False):
+    """Uruchamia EXPLAIN dla zebranych zapytań; zwraca listę wyników"""
+    results = []
+    for operation, queries in sorted(statements.items()):
+        for sql, params in queries.items():
+            if not (EXPLAINABLE.match(sql) or INSERT_SELECT.match(sql)):
+                continue
+            if backend.name == "mysql":
+                plan, findings = explain_mysql(backend, sql, params, analyze)
+            else:
+                plan, findings = explain_sqlite(backend, sql, params)
+            results.append({"operation": operation, "sql": sql, "plan": plan, "findings": findings,
+                            "hot": operation in HOT_OPERATIONS})
+    return results
+
+
+def regressions(results, baseline):
+    """Znaleziska w gorących operacjach, których nie ma w pliku bazowym"""
+    found = []
+    for result in results:
+        if not result["hot"]:
+            continue
+        allowed = set(baseline.get(result["operation"], []))
+        found.extend((result["operation"], f) for f in result["findings"] if f not in allowed)
+    return found
+
+
+def print_report(results):
+    for result in results:
+        if result["findings"] and result["operation"] in FULL_READ_OPERATIONS:
+            marker = "~"  # Pełny odczyt z założenia
+        elif result["findings"]:
+            marker = "✗"
+        else:
+            marker = "✓"
+        hot = " [gorąca]" if result["hot"] else ""
+        print(f"{marker} {result['operation']}{hot}: {result['sql'][:100]}")
+        for line in result["plan"]:
+            print(f"      {line}")
+        if result["findings"]:
+            print(f"      -> {', '.join(result['findings'])}")
+
+
+def cleanup(backend):
+    """Usuwa dane audytu z bazy MySQL"""
+    def operation(connection):
+        cursor = connection.cursor()
+        for table, column in (("question_attempts", "username"), ("users", "username"),
+                              ("module_stats", "module_name"), ("modules", "module_name")):
+            cursor.execute(f"DELETE FROM {table} WHERE {column} LIKE %s", (PREFIX + "%",))
+        connection.commit()
+        cursor.close()
+        return True
+    backend.run("cleanup", operation, False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audyt planów zapytań warstwy danych")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=100, help="pytań na moduł")
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--analyze", action="store_true", help="MySQL: dołącz EXPLAIN ANALYZE zapytań SELECT")
+    parser.add_argument("--baseline", help="plik JSON z akceptowanymi znaleziskami gorących operacji")
+    parser.add_argument("--write-baseline", metavar="PLIK", help="zapisz bieżące znaleziska jako plik bazowy")
+    parser.add_argument("--json", action="store_true", help="wypisz wyniki jako JSON")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.backend == "sqlite":
+        temp_dir = tempfile.TemporaryDirectory()
+        backend = storage.SQLiteStorage(os.path.join(temp_dir.name, "audit.db"))
+    else:
+        import quiz
+        backend = storage.MySQLStorage(quiz.DB_CONFIG)
+    if not backend.ensure_schema():
+        print("BŁĄD: Nie można zainicjalizować bazy danych!")
+        sys.exit(1)
+
+    try:
+        if args.backend == "mysql":
+            cleanup(backend)
+        module_names, question_ids, usernames = seed(backend, args.users, args.modules, args.questions,
+                                                     args.attempts)
+        # Aktualne statystyki dla optymalizatora
+        if args.backend == "mysql":
+            backend.run("analyze", lambda c: c.cursor().execute(
+                "ANALYZE TABLE users, questions, question_attempts, user_achievements, user_unlocked_modules"), None)
+        else:
+            backend.run("analyze", lambda c: c.execute("ANALYZE"), None)
+        statements = capture(backend, workload, backend, module_names, question_ids, usernames)
+        results = audit(backend, statements, args.analyze)
+    finally:
+        if args.backend == "mysql":
+            cleanup(backend)
+        backend.close()
+        if temp_dir:
+            temp_dir.cleanup()
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get(args.backend, {})
+    if args.write_baseline:
+        data = {}
+        if os.path.exists(args.write_baseline):
+            with open(args.write_baseline, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        data[args.backend] = {}
+        for result in results:
+            if result["hot"] and result["findings"]:
+                data[args.backend].setdefault(result["operation"], []).extend(result["findings"])
+        with open(args.write_baseline, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+    failed = regressions(results, baseline)
+    if args.json:
+        print(json.dumps({"backend": args.backend, "results": results,
+                          "regressions": [f"{op}: {f}" for op, f in failed]}, indent=2, ensure_ascii=False))
+    else:
+        print_report(results)
+        print()
+        for operation, finding in failed:
+            print(f"REGRESJA: {operation} - {finding}")
+        print(f"Zapytań: {len(results)}, z uwagami: {sum(1 for r in results if r['findings'])}, "
+              f"regresji w gorących operacjach: {len(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
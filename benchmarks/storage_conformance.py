@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Wspólny test zgodności i wydajności backendów danych (storage.py).
+
+Te same scenariusze uruchamiane są na wybranym backendzie: najpierw sprawdzane
+jest zachowanie wszystkich operacji interfejsu QuizStorage, potem mierzony jest
+czas najczęstszych operacji quizu. Kod wyjścia różny od zera oznacza niezgodność.
+
+    python benchmarks/storage_conformance.py --backend sqlite
+    python benchmarks/storage_conformance.py --backend mysql   # DB_CONFIG z quiz.py
+
+Dla SQLite domyślnie używany jest plik tymczasowy; dla MySQL dane testowe
+(moduł i użytkownicy z prefiksem) są usuwane po zakończeniu.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+
+PREFIX = "conf_"
+MODULE = PREFIX + "module"
+OTHER_MODULE = PREFIX + "other"
+IMPORT_MODULE = PREFIX + "import"
+USER = PREFIX + "user"
+NEW_USER = PREFIX + "new_user"
+
+
+def question(i):
+    return {"question": f"Pytanie {i}", "options": [f"A{i}", f"B{i}", f"C{i}", f"D{i}"], "correct": 0}
+
+
+def without_id(q):
+    return {key: value for key, value in q.items() if key != "id"}
+
+
+def check_users(backend):
+    assert backend.add_module(MODULE)
+    assert backend.save_user(USER, {"pw": "hash", "is_mod": True, "xp": 10, "stats_correct": 2, "stats_wrong": 1,
+                                    "achievements": ["first_quiz"], "unlocked": [MODULE]})
+    user = backend.get_all_users()[USER]
+    assert user["pw"] == "hash" and user["is_mod"] is True and user["xp"] == 10, user
+    assert (user["stats_correct"], user["stats_wrong"]) == (2, 1), user
+    assert user["achievements"] == ["first_quiz"] and user["unlocked"] == [MODULE], user
+
+    # Ponowny zapis nadpisuje dane, a nie dubluje wierszy
+    assert backend.save_user(USER, {"pw": "hash2", "xp": 20, "achievements": ["first_quiz"], "unlocked": [MODULE]})
+    stats = backend.get_user_stats(USER)
+    assert stats["xp"] == 20 and not stats["is_mod"], stats
+    assert backend.get_user_stats(PREFIX + "missing") is None
+
+    # Rejestracja: zajęta nazwa to False (nie błąd), nowe konto ma odblokowany pierwszy moduł
+    assert backend.create_user(USER, "hash3") is False
+    assert backend.create_user(NEW_USER, "old") is True
+    assert len(backend.get_user_unlocked_modules(NEW_USER)) == 1
+    assert backend.update_password_hash(NEW_USER, "old", "new")
+    assert not backend.update_password_hash(NEW_USER, "old", "newer")  # Hash już zmieniony
+    assert backend.get_all_users()[NEW_USER]["pw"] == "new"
+    assert backend.get_password_hash(NEW_USER) == "new"
+    assert backend.get_password_hash(PREFIX + "missing") is None
+    assert not backend.ensure_first_module(NEW_USER)  # Ma już odblokowany moduł
+
+    # Ranking: malejąco wg XP
+    leaderboard = [entry for entry in backend.get_leaderboard(100) if entry[0].startswith(PREFIX)]
+    assert leaderboard == [(USER, {"xp": 20}), (NEW_USER, {"xp": 0})], leaderboard
+    assert len(backend.get_leaderboard(1)) == 1
+
+
+def check_questions(backend):
+    assert backend.add_module(MODULE)  # Istniejący moduł nie jest błędem
+    for i in range(3):
+        assert backend.add_question(MODULE, question(i))
+    questions = backend.get_module_questions(MODULE)
+    assert [q["question"] for q in questions] == ["Pytanie 0", "Pytanie 1", "Pytanie 2"], questions
+    assert questions[0]["options"] == ["A0", "B0", "C0", "D0"] and questions[0]["correct"] == 0
+    assert backend.get_quiz_data()[MODULE] == [without_id(q) for q in questions]
+    assert [q["id"] for q in questions] == backend.get_module_question_ids(MODULE)
+
+    assert not backend.delete_question_by_id(IMPORT_MODULE, questions[1]["id"])  # Inny moduł
+    assert backend.delete_question_by_id(MODULE, questions[1]["id"])
+    assert not backend.delete_question_by_id(MODULE, questions[1]["id"])  # Już usunięte
+    assert [q["question"] for q in backend.get_module_questions(MODULE)] == ["Pytanie 0", "Pytanie 2"]
+
+    # Import z pliku - partia pytań w jednej transakcji
+    assert backend.add_module(IMPORT_MODULE)
+    assert backend.add_questions(IMPORT_MODULE, [question(i) for i in range(3, 6)])
+    assert [without_id(q) for q in backend.get_module_questions(IMPORT_MODULE)] == [question(i) for i in range(3, 6)]
+    assert backend.get_module_questions(PREFIX + "missing") == []
+
+
+def check_unlocks_and_achievements(backend):
+    assert backend.add_module(OTHER_MODULE)
+    assert backend.unlock_module_for_user(USER, OTHER_MODULE)
+    assert not backend.unlock_module_for_user(USER, OTHER_MODULE)  # Już odblokowany
+    assert sorted(backend.get_user_unlocked_modules(USER)) == sorted([MODULE, OTHER_MODULE])
+
+    assert backend.check_achievement(USER, "xp_100")
+    assert not backend.check_achievement(USER, "xp_100")  # Już zdobyte
+    assert sorted(backend.get_user_achievements(USER)) == ["first_quiz", "xp_100"]
+
+
+def check_attempts_and_stats(backend):
+    weights = backend.get_question_weights(USER, MODULE)
+    assert len(weights) == 2 and all(w[1:] == (0, 0) for w in weights), weights
+    first_id, second_id = weights[0][0], weights[1][0]
+
+    by_ids = backend.get_questions_by_ids([second_id, first_id])
+    assert [q["id"] for q in by_ids] == [second_id, first_id], by_ids
+    assert by_ids[0]["question"] == "Pytanie 2"
+    assert backend.get_questions_by_ids([]) == []
+    assert backend.get_module_question_ids(MODULE) == [first_id, second_id]
+    assert backend.get_module_question_ids("brak_modulu") == []
+
+    assert backend.update_user_stats(USER, xp_delta=5, correct_delta=1, module_name=MODULE)
+    assert backend.update_user_stats(USER, wrong_delta=2, module_name=MODULE)
+    stats = backend.get_user_stats(USER)
+    assert (stats["xp"], stats["stats_correct"], stats["stats_wrong"]) == (25, 1, 2), stats
+    assert backend.get_user_module_stats(USER)[MODULE] == {"correct": 1, "wrong": 2}
+
+    now = datetime.now().replace(microsecond=0)
+    rows = [(USER, first_id, 0, True, 1200, now), (USER, first_id, 1, False, 800, now),
+            (USER, second_id, 1, False, 1500, now)]
+    assert backend.insert_question_attempts(rows)
+    assert backend.insert_question_attempts([])
+    weights = dict((w[0], w[1:]) for w in backend.get_question_weights(USER, MODULE))
+    assert weights == {first_id: (1, 1), second_id: (0, 1)}, weights
+
+    difficulty = {row["question_id"]: row for row in backend.get_question_difficulty(MODULE)}
+    assert difficulty[first_id]["attempts"] == 2 and difficulty[first_id]["correct"] == 1, difficulty
+    assert float(difficulty[second_id]["accuracy"]) == 0.0, difficulty
+
+    # Przeliczenie z dziennika odtwarza liczniki przyrostowe pytań; statystyk modułów
+    # (źródło: update_user_stats, nie dziennik) nie zmienia
+    module_stats = backend.get_module_stats()[MODULE]
+    assert backend.rebuild_stats_rollups()
+    assert dict((w[0], w[1:]) for w in backend.get_question_weights(USER, MODULE)) == weights
+    assert {row["question_id"]: row for row in backend.get_question_difficulty(MODULE)} == difficulty
+    assert backend.get_user_module_stats(USER)[MODULE] == {"correct": 1, "wrong": 2}
+    assert backend.get_module_stats()[MODULE] == module_stats
+
+
+def check_module_order(backend):
+    def own(rows):
+        return [row for row in rows if row[0].startswith(PREFIX)]
+    # add_module dokłada moduł na koniec kolejności
+    assert own(backend.get_module_order()) == [(MODULE, None), (IMPORT_MODULE, None), (OTHER_MODULE, None)]
+    assert backend.set_module_order([(OTHER_MODULE, None), (MODULE, OTHER_MODULE), (IMPORT_MODULE, None)])
+    assert own(backend.get_module_order()) == [(OTHER_MODULE, None), (MODULE, OTHER_MODULE), (IMPORT_MODULE, None)]
+    assert [name for name in backend.get_quiz_data() if name.startswith(PREFIX)] == [OTHER_MODULE, MODULE,
+                                                                                     IMPORT_MODULE]
+
+
+CHECKS = [check_users, check_questions, check_unlocks_and_achievements, check_module_order,
+          check_attempts_and_stats]
+
+
+def timed(func, repeat):
+    """Zwraca (p50, p95) czasu wykonania w ms"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def run_performance(backend, repeat, questions):
+    for i in range(questions):
+        backend.add_question(MODULE, question(100 + i))
+    ids = [w[0] for w in backend.get_question_weights(USER, MODULE)][:10]
+    now = datetime.now().replace(microsecond=0)
+    operations = {
+        "get_user_stats": lambda: backend.get_user_stats(USER),
+        "get_module_questions": lambda: backend.get_module_questions(MODULE),
+        "get_question_weights": lambda: backend.get_question_weights(USER, MODULE),
+        "get_questions_by_ids": lambda: backend.get_questions_by_ids(ids),
+        "update_user_stats": lambda: backend.update_user_stats(USER, 0, 1, 0, MODULE),
+        "insert_question_attempts": lambda: backend.insert_question_attempts(
+            [(USER, qid, 0, True, 1000, now) for qid in ids]),
+        "check_achievement": lambda: backend.check_achievement(USER, "first_quiz"),
+    }
+    print(f"{'Operacja':<28}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, func in operations.items():
+        p50, p95 = timed(func, repeat)
+        print(f"{name:<28}{p50:>10.3f}{p95:>10.3f}")
+
+
+def cleanup(backend):
+    """Usuwa dane testowe z bazy MySQL (SQLite korzysta z pliku tymczasowego)"""
+    def operation(connection):
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM question_attempts WHERE username LIKE %s", (PREFIX + "%",))
+        cursor.execute("DELETE FROM users WHERE username LIKE %s", (PREFIX + "%",))
+        cursor.execute("DELETE FROM modules WHERE module_name LIKE %s", (PREFIX + "%",))
+        cursor.execute("DELETE FROM module_stats WHERE module_name LIKE %s", (PREFIX + "%",))
+        connection.commit()
+        cursor.close()
+        return True
+    backend.run("cleanup", operation, False)
+
+
+def create_backend(name, sqlite_path):
+    if name == "sqlite":
+        return storage.SQLiteStorage(sqlite_path)
+    import quiz
+    return storage.MySQLStorage(quiz.DB_CONFIG)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test zgodności i wydajności backendów danych")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--sqlite-path", help="plik bazy SQLite (domyślnie tymczasowy)")
+    parser.add_argument("--repeat", type=int, default=200, help="liczba powtórzeń każdej operacji")
+    parser.add_argument("--questions", type=int, default=100, help="liczba pytań w module testowym")
+    args = parser.parse_args()
+
+    temp_dir = None
+    sqlite_path = args.sqlite_path
+    if args.backend == "sqlite" and not sqlite_path:
+        temp_dir = tempfile.TemporaryDirectory()
+        sqlite_path = os.path.join(temp_dir.name, "conformance.db")
+
+    backend = create_backend(args.backend, sqlite_path)
+    if not (backend.init_database() and backend.migrate()):
+        print("BŁĄD: Nie można zainicjalizować bazy danych!")
+        sys.exit(1)
+    if args.backend == "mysql":
+        cleanup(backend)
+
+    failures = 0
+    try:
+        for check in CHECKS:
+            try:
+                check(backend)
+                print(f"  ✓ {check.__name__}")
+            except AssertionError as e:
+                failures += 1
+                print(f"  ✗ {check.__name__}: {e}")
+        if not failures:
+            print()
+            run_performance(backend, args.repeat, args.questions)
+    finally:
+        if args.backend == "mysql":
+            cleanup(backend)
+        backend.close()
+        if temp_dir:
+            temp_dir.cleanup()
+
+    errors = {name: s["errors"] for name, s in backend.get_db_stats().items() if s["errors"]}
+    if errors:
+        print(f"Błędy bazy danych: {errors}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test obciążeniowy zapisów z wielu procesów (wiele stanowisk na jednej bazie).
+
+Każdy klient to osobny proces z własnym połączeniem. Wszystkie startują razem
+(bariera) i jednocześnie:
+- rejestrują te same nazwy kont (create_user) - każda nazwa może powstać raz,
+- dodają XP i liczniki odpowiedzi wspólnemu użytkownikowi (update_user_stats),
+  a w połowie wykonują naprawę starego konta przy logowaniu (zmiana hasła
+  zapisanego czystym tekstem na hash i odblokowanie pierwszego modułu),
+- zdobywają to samo osiągnięcie i odblokowują ten sam moduł - True może
+  zwrócić tylko jeden klient,
+- usuwają to samo pytanie (po ID) - True może zwrócić tylko jeden klient.
+
+Na końcu stan bazy porównywany jest z oczekiwanym: brak utraconych
+aktualizacji XP, brak duplikatów. --legacy odtwarza dawną naprawę konta
+(get_all_users + save_user z całym słownikiem), która gubi XP zdobyte
+w międzyczasie przez inne stanowiska.
+
+    python benchmarks/stress_concurrency.py --clients 200
+    python benchmarks/stress_concurrency.py --clients 50 --legacy
+    python benchmarks/stress_concurrency.py --backend mysql --clients 300
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import storage  # noqa: E402
+
+MODULES = ["stress_A", "stress_B"]
+DELETE_MODULE = "stress_delete"
+SHARED_USER = "stress_shared"
+LEGACY_PASSWORD = "haslo123"  # Stare konto - hasło zapisane czystym tekstem
+REGISTERED = [f"stress_new_{i}" for i in range(10)]
+XP_PER_ANSWER = 10
+
+
+def password_hash(password):
+    return hashlib.sha256((password + "agile_scrum_quiz_2024").encode("utf-8")).hexdigest()
+
+
+def open_backend(args):
+    if args.backend == "sqlite":
+        return storage.SQLiteStorage(args.sqlite_path)
+    import quiz
+    return storage.MySQLStorage(dict(quiz.DB_CONFIG, database=args.mysql_database), pool_size=1)
+
+
+def repair_account(backend, legacy):
+    """Naprawa starego konta przy logowaniu (zmiana hasła na hash, pierwszy moduł)"""
+    if legacy:
+        # Dawny kod auth_screen: cały słownik użytkownika zapisywany ponownie
+        user = backend.get_all_users()[SHARED_USER]
+        user["pw"] = password_hash(LEGACY_PASSWORD)
+        time.sleep(0.001)  # Odstęp między odczytem a zapisem, jak przy obsłudze ekranu
+        backend.save_user(SHARED_USER, user)
+    else:
+        backend.update_password_hash(SHARED_USER, LEGACY_PASSWORD, password_hash(LEGACY_PASSWORD))
+        backend.ensure_first_module(SHARED_USER)
+
+
+def client(args, barrier, results):
+    """Jeden klient (proces) - zwraca liczniki sukcesów i błędów przez kolejkę"""
+    backend = open_backend(args)
+    counts = {"registered": 0, "register_errors": 0, "achievement": 0, "unlock": 0, "deleted": 0}
+    first_question = backend.get_module_question_ids(DELETE_MODULE)[0]
+    barrier.wait()
+    start = time.perf_counter()
+    for name in REGISTERED:
+        created = backend.create_user(name, password_hash(name), False)
+        if created:
+            counts["registered"] += 1
+        elif created is None:
+            counts["register_errors"] += 1
+    for i in range(args.increments):
+        backend.update_user_stats(SHARED_USER, XP_PER_ANSWER, 1, 0, MODULES[0])
+        if i == args.increments // 2:
+            repair_account(backend, args.legacy)
+    counts["achievement"] += bool(backend.check_achievement(SHARED_USER, "first_quiz"))
+    counts["unlock"] += bool(backend.unlock_module_for_user(SHARED_USER, MODULES[1]))
+    counts["deleted"] += bool(backend.delete_question_by_id(DELETE_MODULE, first_question))
+    counts["seconds"] = time.perf_counter() - start
+    counts["db_errors"] = sum(stat["errors"] for stat in backend.get_db_stats().values())
+    backend.close()
+    results.put(counts)
+
+
+def prepare(args):
+    """Świeża baza: moduły, wspólny użytkownik ze starym hasłem, pytania do usuwania"""
+    backend = open_backend(args)
+    if args.backend == "mysql":
+        def recreate(connection):
+            cursor = connection.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {args.mysql_database}")
+            cursor.close()
+            return True
+        backend.run("drop_database", recreate, False, use_database=False)
+    if not backend.ensure_schema(MODULES):
+        raise RuntimeError("Nie można zainicjalizować bazy danych")
+    backend.add_module(DELETE_MODULE)
+    for i in range(args.questions):
+        backend.add_question(DELETE_MODULE, {"question": f"Pytanie {i}", "options": list("ABCD"), "correct": 0})
+    backend.save_user(SHARED_USER, {"pw": LEGACY_PASSWORD, "achievements": [], "unlocked": []})
+    return backend
+
+
+def verify(backend, args, totals):
+    """Lista (opis, oczekiwane, otrzymane) - stan bazy po teście"""
+    clients = args.clients
+    stats = backend.get_user_stats(SHARED_USER) or {}
+    users = backend.get_all_users()
+    module_stats = backend.get_user_module_stats(SHARED_USER).get(MODULES[0], {})
+    remaining = len(backend.get_module_questions(DELETE_MODULE))
+    return [
+        ("XP wspólnego użytkownika", clients * args.increments * XP_PER_ANSWER, stats.get("xp")),
+        ("poprawne odpowiedzi", clients * args.increments, stats.get("stats_correct")),
+        ("statystyki modułu (poprawne)", clients * args.increments, module_stats.get("correct")),
+        ("hasło zamienione na hash", password_hash(LEGACY_PASSWORD), users.get(SHARED_USER, {}).get("pw")),
+        ("zarejestrowane konta (sukcesy)", len(REGISTERED), totals["registered"]),
+        ("zarejestrowane konta (w bazie)", len(REGISTERED), sum(1 for name in REGISTERED if name in users)),
+        ("osiągnięcie zdobyte (True)", 1, totals["achievement"]),
+        ("moduł odblokowany (True)", 1, totals["unlock"]),
+        ("pytanie usunięte (True)", 1, totals["deleted"]),
+        ("pozostałe pytania", args.questions - 1, remaining),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test równoległych zapisów z wielu procesów")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--clients", type=int, default=200, help="liczba równoległych procesów")
+    parser.add_argument("--increments", type=int, default=20, help="odpowiedzi (update_user_stats) na klienta")
+    parser.add_argument("--questions", type=int, default=150, help="pytań w module do usuwania")
+    parser.add_argument("--mysql-database", default="quiz_stress")
+    parser.add_argument("--legacy", action="store_true", help="dawna naprawa konta (get_all_users + save_user)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        args.sqlite_path = os.path.join(work_dir, "stress.db")
+        backend = prepare(args)
+        barrier = multiprocessing.Barrier(args.clients)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=client, args=(args, barrier, results))
+                     for _ in range(args.clients)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        counts = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        totals = {key: sum(c[key] for c in counts) for key in counts[0]}
+        checks = verify(backend, args, totals)
+        backend.close()
+
+    mode = "dawna naprawa konta (--legacy)" if args.legacy else "zapisy atomowe"
+    print(f"Backend: {args.backend}, klientów: {args.clients}, tryb: {mode}, czas: {elapsed:.1f} s "
+          f"(najwolniejszy klient {max(c['seconds'] for c in counts):.1f} s)")
+    print(f"Błędy bazy po stronie klientów: {totals['db_errors']}, nieudane rejestracje: {totals['register_errors']}")
+    failed = 0
+    for description, expected, actual in checks:
+        ok = expected == actual
+        failed += not ok
+        print(f"{'✓' if ok else '✗'} {description:<32} oczekiwano {expected!s:<12.12} otrzymano {actual!s:.12}")
+    if totals["db_errors"]:
+        failed += 1
+    print("WYNIK: " + ("brak utraconych aktualizacji" if not failed else f"{failed} niezgodności"))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
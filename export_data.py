@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Eksport bazy do plików users.json / quiz_data.json (format migrate_json_to_mysql.py)
+albo JSON Lines - kopia zapasowa i przeniesienie danych do innej instalacji.
+
+Konta i pytania czytane są strumieniowo (export_users / export_questions w
+storage.py - kursor niebuforowany, partie po EXPORT_FETCH_SIZE wierszy) i od razu
+zapisywane do pliku, więc zużycie pamięci nie zależy od rozmiaru bazy. Każdy plik
+powstaje w jednym spójnym odczycie (InnoDB CONSISTENT SNAPSHOT, w SQLite transakcja
+odczytu w trybie WAL) - bez blokad tabel, stanowiska mogą w tym czasie grać.
+
+Pliki zapisywane są jako .tmp i podmieniane po udanym eksporcie. manifest.json
+zawiera SHA-256, rozmiar i liczbę rekordów każdego pliku oraz wersję schematu.
+
+JSON Lines: users.jsonl - jedno konto w wierszu (z kluczem "username"),
+quiz_data.jsonl - jedno pytanie w wierszu (z kluczem "module"); moduł bez pytań
+to wiersz z samym kluczem "module".
+
+    python export_data.py --output kopia
+    python export_data.py --output kopia --format jsonl --gzip
+    python export_data.py --verify kopia
+
+Odtworzenie: users.json i quiz_data.json (po gunzip) w katalogu roboczym, potem
+    python migrate_json_to_mysql.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from offline import OfflineStorage
+from storage import QuizStorage
+
+MANIFEST_FILE = "manifest.json"
+WRITE_BUFFER = 1 << 16
+HASH_CHUNK = 1 << 20
+
+
+class HashingFile(io.RawIOBase):
+    """Plik binarny liczący SHA-256 i rozmiar bajtów zapisanych na dysk (po kompresji)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.file.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.file.close()
+        super().close()
+
+
+class ExportSink:
+    """Odbiera wiersze z export_users / export_questions i od razu zapisuje je do pliku .tmp"""
+
+    def __init__(self, directory: str, name: str, fmt: str, compress: bool):
+        self.fmt = fmt
+        self.compress = compress
+        self.file_name = name + (".json" if fmt == "json" else ".jsonl") + (".gz" if compress else "")
+        self.path = os.path.join(directory, self.file_name)
+        self.raw = None
+        self.records = 0
+
+    def start(self):
+        """Nowy plik - przy ponowieniu operacji przez backend poprzednia część jest odrzucana"""
+        if self.raw is not None:
+            self.discard()
+        self.raw = HashingFile(self.path + ".tmp")
+        self.buffer = io.BufferedWriter(self.raw, WRITE_BUFFER)
+        # mtime=0 - ten sam stan bazy daje ten sam plik .gz (i tę samą sumę kontrolną)
+        self.gzip = gzip.GzipFile(fileobj=self.buffer, mode="wb", mtime=0) if self.compress else None
+        self.text = io.TextIOWrapper(self.gzip or self.buffer, encoding="utf-8", newline="\n")
+        self.records = 0
+        self.entries = 0
+        if self.fmt == "json":
+            self.text.write("{")
+
+    def write_line(self, record: Dict):
+        self.text.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_key(self, key: str):
+        """Początek wpisu obiektu JSON najwyższego poziomu ("klucz": ...)"""
+        self.text.write(("," if self.entries else "") + "\n  " + json.dumps(key, ensure_ascii=False) + ": ")
+        self.entries += 1
+
+    def finish(self) -> Dict:
+        """Zamyka plik, podmienia .tmp i zwraca wpis manifestu"""
+        if self.fmt == "json":
+            self.text.write("\n}\n")
+        self.close_streams()
+        os.replace(self.path + ".tmp", self.path)
+        return {"sha256": self.raw.sha256.hexdigest(), "bytes": self.raw.size, "records": self.records}
+
+    def close_streams(self):
+        # GzipFile nie zamyka przekazanego fileobj - bufor zamykany jest osobno
+        self.text.close()
+        if self.gzip is not None:
+            self.buffer.close()
+
+    def discard(self):
+        self.close_streams()
+        os.remove(self.path + ".tmp")
+        self.raw = None
+
+
+class UsersSink(ExportSink):
+    def add(self, username: str, user: Dict):
+        if self.fmt == "json":
+            self.write_key(username)
+            self.text.write(json.dumps(user, ensure_ascii=False))
+        else:
+            self.write_line({"username": username, **user})
+        self.records += 1
+
+
+class QuestionsSink(ExportSink):
+    def start(self):
+        super().start()
+        self.module = None  # Moduł, którego lista pytań jest otwarta (quiz_data.json)
+
+    def add(self, module_name: str, question: Optional[Dict]):
+        if self.fmt == "jsonl":
+            self.write_line({"module": module_name, **(question or {})})
+        else:
+            if module_name != self.module:
+                self.close_module()
+                self.write_key(module_name)
+                self.text.write("[")
+                self.module, self.module_questions = module_name, 0
+            if question is not None:
+                self.text.write(("," if self.module_questions else "") + "\n    " +
+                                json.dumps(question, ensure_ascii=False))
+                self.module_questions += 1
+        if question is not None:
+            self.records += 1
+
+    def close_module(self):
+        if self.module is not None:
+            self.text.write("\n  ]" if self.module_questions else "]")
+
+    def finish(self) -> Dict:
+        if self.fmt == "json":
+            self.close_module()
+        return super().finish()
+
+
+def export_database(storage: QuizStorage, directory: str, fmt: str = "json", compress: bool = False) -> bool:
+    """Eksportuje konta i pytania do katalogu z manifestem; False przy błędzie bazy"""
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for sink, export in ((UsersSink(directory, "users", fmt, compress), storage.export_users),
+                         (QuestionsSink(directory, "quiz_data", fmt, compress), storage.export_questions)):
+        start = time.perf_counter()
+        if export(sink) is None:
+            if sink.raw is not None:
+                sink.discard()
+            print(f"BŁĄD: eksport {sink.file_name} nie powiódł się - baza danych niedostępna")
+            return False
+        files[sink.file_name] = sink.finish()
+        print(f"  ✓ {sink.file_name}: {files[sink.file_name]['records']} rekordów, "
+              f"{files[sink.file_name]['bytes'] / 1e6:.1f} MB, {time.perf_counter() - start:.1f} s")
+    manifest = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "backend": storage.name,
+        "schema_version": storage.get_schema_version(),
+        "format": fmt,
+        "compressed": compress,
+        "files": files,
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return True
+
+
+def file_sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def verify_export(directory: str) -> bool:
+    """Sprawdza pliki eksportu z sumami kontrolnymi manifestu"""
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    ok = True
+    for name, entry in manifest["files"].items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            print(f"  ✗ {name}: brak pliku")
+            ok = False
+        elif os.path.getsize(path) != entry["bytes"] or file_sha256(path) != entry["sha256"]:
+            print(f"  ✗ {name}: suma kontrolna niezgodna")
+            ok = False
+        else:
+            print(f"  ✓ {name}: {entry['records']} rekordów")
+    return ok
+
+
+def print_peak_memory():
+    """Szczytowe zużycie pamięci - nie rośnie z liczbą eksportowanych wierszy.
+    Moduł resource jest tylko na Uniksie; na Windows raport jest pomijany"""
+    try:
+        import resource
+    except ImportError:
+        return
+    # ru_maxrss w KB (Linux)
+    print(f"Szczytowe zużycie pamięci: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strumieniowy eksport bazy do users.json / quiz_data.json")
+    parser.add_argument("--output", default="export", help="katalog wynikowy")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json",
+                        help="json - format migrate_json_to_mysql.py, jsonl - JSON Lines")
+    parser.add_argument("--gzip", action="store_true", help="kompresja plików (.gz)")
+    parser.add_argument("--verify", metavar="KATALOG", help="tylko sprawdź pliki eksportu z manifestem")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify_export(args.verify) else 1)
+
+    import quiz
+    storage = quiz.get_storage()
+    if isinstance(storage, OfflineStorage):
+        storage = storage.primary
+    print(f"Eksport z backendu {storage.name} do {args.output} ({args.format}{', gzip' if args.gzip else ''})")
+    try:
+        ok = export_database(storage, args.output, args.format, args.gzip)
+    except NotImplementedError:
+        print("BŁĄD: eksport wymaga bezpośredniego dostępu do bazy (QUIZ_STORAGE=mysql lub sqlite)")
+        sys.exit(1)
+    print_peak_memory()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Tryb profilowania interfejsu: cProfile i czasy klatek osobno dla każdego ekranu.
+
+Włączany zmienną środowiskową QUIZ_PROFILE=<katalog> albo flagą
+`python quiz.py --profile <katalog>`. Każdy ekran w quiz.py (Screen.name)
+ma własny profiler cProfile - przy otwarciu ekranu (App.push) profiler ekranu
+pod nim jest wstrzymywany, więc czas quizu nie trafia do menu głównego.
+
+Dla każdej klatki (present_frame) zapisywany jest czas od poprzedniej klatki
+oraz liczba wywołań wrap_text, truncate_text i font.render. Przy wyjściu
+z aplikacji w katalogu zapisywane są pliki <ekran>.pstats i summary.txt:
+
+    python -m pstats profile/quiz_loop.pstats
+"""
+
+import cProfile
+import os
+import time
+from collections import deque
+from typing import Dict, List
+
+COUNTED_CALLS = ("wrap_text", "truncate_text", "font.render")
+RECENT_FRAMES = 120  # Liczba klatek, z których liczone są FPS i p95 na nakładce
+
+
+class ScreenStats:
+    """Profiler i czasy klatek jednego ekranu"""
+
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.frame_times = []
+        self.call_totals = {call: 0 for call in COUNTED_CALLS}
+
+
+class FrameProfiler:
+    """Profilowanie ekranów: stos aktywnych ekranów, czasy klatek i liczniki wywołań"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.screens: Dict[str, ScreenStats] = {}
+        self.stack: List[str] = []
+        self.counts = {call: 0 for call in COUNTED_CALLS}
+        self.last_counts = dict(self.counts)
+        self.recent = deque(maxlen=RECENT_FRAMES)
+        self.frame_start = time.perf_counter()
+        self.font_class = None
+
+    def screen(self, name) -> ScreenStats:
+        if name not in self.screens:
+            self.screens[name] = ScreenStats(name)
+        return self.screens[name]
+
+    def restart_frame(self):
+        """Pierwsza klatka ekranu nie obejmuje czasu spędzonego w innym ekranie"""
+        self.frame_start = time.perf_counter()
+        self.counts = {call: 0 for call in COUNTED_CALLS}
+        self.recent.clear()
+
+    def enter(self, name):
+        """Wejście do ekranu - wstrzymuje profiler ekranu nadrzędnego"""
+        if self.stack:
+            self.screen(self.stack[-1]).profile.disable()
+        self.stack.append(name)
+        self.screen(name).profile.enable()
+        self.restart_frame()
+
+    def leave(self):
+        name = self.stack.pop()
+        self.screen(name).profile.disable()
+        if self.stack:
+            self.screen(self.stack[-1]).profile.enable()
+        self.restart_frame()
+
+    def count(self, call):
+        self.counts[call] += 1
+
+    def end_frame(self):
+        """Wywoływane po pygame.display.flip()"""
+        now = time.perf_counter()
+        elapsed_ms = (now - self.frame_start) * 1000
+        self.frame_start = now
+        if self.stack:
+            stats = self.screen(self.stack[-1])
+            stats.frame_times.append(elapsed_ms)
+            for call, value in self.counts.items():
+                stats.call_totals[call] += value
+        self.recent.append(elapsed_ms)
+        self.last_counts = self.counts
+        self.counts = {call: 0 for call in COUNTED_CALLS}
+
+    def font_constructor(self, pygame):
+        """Konstruktor czcionek dla pygame.font.SysFont - czcionka zlicza wywołania render"""
+        if self.font_class is None:
+            profiler = self
+
+            class CountingFont(pygame.font.Font):
+                def render(self, *args, **kwargs):
+                    profiler.counts["font.render"] += 1
+                    return super().render(*args, **kwargs)
+
+            self.font_class = CountingFont
+
+        def construct(path, size, bold, italic):
+            font = self.font_class(path, size)
+            font.set_bold(bold)
+            font.set_italic(italic)
+            return font
+        return construct
+
+    def overlay_lines(self) -> List[str]:
+        """Tekst nakładki: ekran, FPS, czas klatki i liczniki wywołań z ostatniej klatki"""
+        name = self.stack[-1] if self.stack else "-"
+        if not self.recent:
+            return [f"{name} | pomiar..."]
+        ordered = sorted(self.recent)
+        mean = sum(ordered) / len(ordered)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        counts = " | ".join(f"{call} {self.last_counts[call]}" for call in COUNTED_CALLS)
+        return [
+            f"{name} | {1000 / mean if mean else 0:.0f} FPS | klatka {self.recent[-1]:.1f} ms, p95 {p95:.1f} ms",
+            f"na klatkę: {counts}",
+        ]
+
+    def summary(self) -> List[str]:
+        lines = [f"{'ekran':<24}{'klatek':>8}{'FPS':>8}{'p50 ms':>9}{'p95 ms':>9}"
+                 + "".join(f"{call + '/kl.':>20}" for call in COUNTED_CALLS)]
+        for name, stats in sorted(self.screens.items()):
+            times = sorted(stats.frame_times)
+            frames = len(times)
+            if not frames:
+                lines.append(f"{name:<24}{0:>8}")
+                continue
+            mean = sum(times) / frames
+            lines.append(f"{name:<24}{frames:>8}{1000 / mean if mean else 0:>8.1f}{times[frames // 2]:>9.2f}"
+                         f"{times[min(frames - 1, int(0.95 * frames))]:>9.2f}"
+                         + "".join(f"{stats.call_totals[call] / frames:>20.1f}" for call in COUNTED_CALLS))
+        return lines
+
+    def dump(self):
+        """Zapisuje <ekran>.pstats i summary.txt (wywoływane przy wyjściu z aplikacji)"""
+        while self.stack:
+            self.screen(self.stack.pop()).profile.disable()
+        os.makedirs(self.output_dir, exist_ok=True)
+        for name, stats in self.screens.items():
+            stats.profile.dump_stats(os.path.join(self.output_dir, f"{name}.pstats"))
+        lines = self.summary()
+        with open(os.path.join(self.output_dir, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        print("\n".join(lines))
+        print(f"Profile ekranów zapisano w {self.output_dir}")
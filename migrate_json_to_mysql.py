@@ -4,13 +4,19 @@ Skrypt migracji danych z plików JSON do bazy danych MySQL.
 Uruchom ten skrypt raz, aby przenieść istniejące dane z JSON do MySQL.
 """
 
+import argparse
 import json
 import os
 import sys
 from quiz import (
     init_database, get_db_connection, add_module, add_question,
-    save_user, unlock_module_for_user, DB_CONFIG
+    save_user, unlock_module_for_user, rebuild_stats_rollups, get_storage, set_module_order, update_password_hash,
+    DB_CONFIG,
+    STORAGE_BACKEND, SQLITE_PATH
 )
+from migrations import MIGRATIONS, SCHEMA_VERSION, pending_migrations
+from passwords import hash_password, is_password_hash
+from progression import ProgressionGraph, parse_module_order, validate_module_order
 
 DATA_FILE = "quiz_data.json"
 USERS_FILE = "users.json"
@@ -64,7 +70,6 @@ def migrate_users():
             # Konwersja starego formatu hasła jeśli potrzeba
             pw = user_data.get("pw", "")
             if len(pw) < 64:  # Plain text password
-                from quiz import hash_password
                 pw = hash_password(pw)
                 user_data["pw"] = pw
             
@@ -116,28 +121,143 @@ def migrate_users():
         print(f"Błąd przy migracji użytkowników: {e}")
 
 
+def hash_plaintext_passwords():
+    """Jednorazowa zamiana haseł zapisanych czystym tekstem (dawny format, krótsze niż 64 znaki)
+    na hash - logowanie czystego tekstu nie akceptuje"""
+    users = get_storage().get_all_users()
+    converted = 0
+    for username, user_data in users.items():
+        pw = user_data.get("pw", "")
+        if is_password_hash(pw):
+            continue
+        if len(pw) >= 64:
+            print(f"  ✗ {username}: nierozpoznany format hasha - pominięto (wymaga resetu hasła)")
+            continue
+        # Porównaj i zamień - hasło zmienione w międzyczasie nie zostanie nadpisane
+        if update_password_hash(username, pw, hash_password(pw)):
+            converted += 1
+            print(f"  ✓ {username}")
+    print(f"Zamieniono hasła {converted} kont.")
+
+
+def rebuild_stats():
+    """Przelicza statystyki pytań z dziennika odpowiedzi"""
+    print("Przeliczanie statystyk pytań z dziennika odpowiedzi...")
+    if rebuild_stats_rollups():
+        print("Statystyki przeliczone pomyślnie.")
+    else:
+        print("BŁĄD: Nie udało się przeliczyć statystyk!")
+        sys.exit(1)
+
+
+def check_migrations():
+    """Wypisuje stan migracji schematu; zwraca True, gdy schemat jest aktualny"""
+    applied = get_storage().get_applied_migrations()
+    applied_versions = [m['version'] for m in applied]
+    print(f"Wersja schematu w bazie: {max(applied_versions, default=0)}, oczekiwana: {SCHEMA_VERSION}")
+    for m in applied:
+        print(f"  ✓ {m['version']:>3}  {m['description']}  ({m['applied_at']})")
+    pending = pending_migrations(applied_versions)
+    for m in pending:
+        print(f"  ✗ {m.version:>3}  {m.description}")
+    if not applied_versions:
+        print("Schemat nie istnieje - zostanie utworzony przy pierwszym uruchomieniu lub z --migrate.")
+    return bool(applied_versions) and not pending
+
+
+def apply_migrations(target, dry_run=False):
+    """Stosuje brakujące migracje do wersji target (DDL online w MySQL)"""
+    storage = get_storage()
+    applied_versions = [m['version'] for m in storage.get_applied_migrations()]
+    pending = pending_migrations(applied_versions, target)
+    if not pending:
+        print("Brak migracji do zastosowania.")
+        return True
+    for migration in pending:
+        print(f"Migracja {migration.version}: {migration.description}")
+        for statement in migration.statements(storage.name):
+            print(f"    {statement}")
+        if dry_run:
+            continue
+        if not storage.apply_migration(migration):
+            print(f"  ✗ Migracja {migration.version} nie powiodła się - kolejne migracje wstrzymane.")
+            return False
+        print(f"  ✓ Zastosowano migrację {migration.version}")
+    return True
+
+
+def apply_module_order(items):
+    """Ustawia kolejność modułów i wymagane moduły (graf odblokowywania, progression.py)"""
+    current = get_storage().get_module_order()
+    if current is None:
+        print("BŁĄD: Nie można odczytać modułów (czy zastosowano migrację 7?)")
+        sys.exit(1)
+    modules = parse_module_order(items)
+    errors = validate_module_order(modules, [name for name, _ in current])
+    if errors:
+        for error in errors:
+            print(f"BŁĄD: {error}")
+        sys.exit(1)
+    # Moduły pominięte na liście trafiają na koniec, w dotychczasowej kolejności
+    listed = {name for name, _ in modules}
+    modules += [(name, None) for name, _ in current if name not in listed]
+    if not set_module_order(modules):
+        print("BŁĄD: Nie udało się zapisać kolejności modułów!")
+        sys.exit(1)
+    graph = ProgressionGraph(modules)
+    print("Kolejność modułów:")
+    for i, name in enumerate(graph.order, 1):
+        prerequisite = graph.prerequisites[name]
+        print(f"  {i:>3}. {name}  " + (f"(po ukończeniu {prerequisite})" if prerequisite else "(od początku)"))
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Migracja danych z JSON do MySQL")
+    parser.add_argument("--rebuild-stats", action="store_true",
+                        help="tylko przelicz statystyki pytań (question_difficulty, user_question_stats) "
+                             "z tabeli question_attempts")
+    parser.add_argument("--hash-plaintext-passwords", action="store_true",
+                        help="tylko zamień hasła zapisane czystym tekstem (dawny format) na hash")
+    parser.add_argument("--check", action="store_true",
+                        help="tylko pokaż stan migracji schematu (kod wyjścia 1, gdy są niezastosowane)")
+    parser.add_argument("--migrate", action="store_true", help="tylko zastosuj brakujące migracje schematu")
+    parser.add_argument("--target", type=int, default=SCHEMA_VERSION,
+                        choices=[m.version for m in MIGRATIONS] or None,
+                        help="wersja docelowa dla --migrate (domyślnie najnowsza)")
+    parser.add_argument("--dry-run", action="store_true", help="z --migrate: wypisz polecenia bez wykonywania")
+    parser.add_argument("--module-order", nargs="+", metavar="MODUŁ[:WYMAGANY]",
+                        help="tylko ustaw kolejność modułów; po dwukropku moduł, którego bezbłędne "
+                             "ukończenie odblokowuje dany (domyślnie poprzedni na liście)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("MIGRACJA DANYCH Z JSON DO MYSQL")
     print("=" * 60)
     print()
     print(f"Konfiguracja bazy danych:")
-    print(f"  Host: {DB_CONFIG['host']}")
-    print(f"  Database: {DB_CONFIG['database']}")
-    print(f"  User: {DB_CONFIG['user']}")
+    if STORAGE_BACKEND == "sqlite":
+        print(f"  SQLite: {SQLITE_PATH}")
+    else:
+        print(f"  Host: {DB_CONFIG['host']}")
+        print(f"  Database: {DB_CONFIG['database']}")
+        print(f"  User: {DB_CONFIG['user']}")
     print()
     
-    # Sprawdź połączenie
-    connection = get_db_connection()
-    if not connection:
-        print("BŁĄD: Nie można połączyć się z bazą danych!")
-        print("Upewnij się, że:")
-        print("  1. MySQL jest uruchomiony")
-        print("  2. Baza danych istnieje lub może być utworzona")
-        print("  3. Użytkownik ma odpowiednie uprawnienia")
-        print("  4. Dane w DB_CONFIG są poprawne")
-        sys.exit(1)
-    connection.close()
+    # Sprawdź połączenie (wbudowana baza SQLite nie wymaga serwera)
+    if STORAGE_BACKEND == "mysql":
+        connection = get_db_connection()
+        if not connection:
+            print("BŁĄD: Nie można połączyć się z bazą danych!")
+            print("Upewnij się, że:")
+            print("  1. MySQL jest uruchomiony")
+            print("  2. Baza danych istnieje lub może być utworzona")
+            print("  3. Użytkownik ma odpowiednie uprawnienia")
+            print("  4. Dane w DB_CONFIG są poprawne")
+            sys.exit(1)
+        connection.close()
+    
+    if args.check:
+        sys.exit(0 if check_migrations() else 1)
     
     # Inicjalizuj bazę danych
     print("Inicjalizacja bazy danych...")
@@ -147,6 +267,23 @@ def main():
     
     print()
     
+    if args.rebuild_stats:
+        rebuild_stats()
+        return
+
+    if args.hash_plaintext_passwords:
+        hash_plaintext_passwords()
+        return
+    
+    if args.migrate:
+        if not apply_migrations(args.target, args.dry_run):
+            sys.exit(1)
+        return
+    
+    if args.module_order:
+        apply_module_order(args.module_order)
+        return
+    
     # Migruj dane
     migrate_quiz_data()
     print()
@@ -0,0 +1,98 @@
+"""
+Wersjonowane migracje schematu bazy danych.
+
+Wersja 1 to schemat tworzony przez init_database(). Każda kolejna zmiana schematu
+(np. nowy indeks) to nowa migracja z kolejnym numerem, dopisywana na końcu listy
+MIGRATIONS - zastosowanych migracji nie zmieniamy. Numery zastosowanych migracji
+zapisywane są w tabeli schema_version.
+
+Polecenia MySQL używają DDL online (ALGORITHM=INPLACE, LOCK=NONE): tabela
+pozostaje dostępna do odczytu i zapisu w trakcie budowy indeksu. Jeśli serwer
+nie potrafi wykonać zmiany bez blokady, zgłasza błąd zamiast po cichu
+zablokować tabelę. Każda migracja MySQL to jedno polecenie DDL, bo DDL
+zatwierdza transakcję i nie da się go wycofać razem z zapisem wersji.
+
+Migracje online (domyślnie) stosuje aplikacja przy starcie (ensure_schema) - kod
+zakłada nowy schemat, więc nie może działać na starszym. Migracja oznaczona
+online=False (np. przepisanie danych dużej tabeli) blokuje start aplikacji, dopóki
+administrator jej nie zastosuje:
+    python migrate_json_to_mysql.py --migrate
+"""
+
+from typing import List
+
+
+class Migration:
+    """Jedna zmiana schematu - osobne polecenia dla MySQL i SQLite"""
+
+    def __init__(self, version: int, description: str, mysql: List[str], sqlite: List[str], online: bool = True):
+        self.version = version
+        self.description = description
+        self.mysql = mysql
+        self.sqlite = sqlite
+        self.online = online  # Bez blokady tabel - może ją zastosować aplikacja przy starcie
+
+    def statements(self, backend: str) -> List[str]:
+        return self.mysql if backend == "mysql" else self.sqlite
+
+
+BASELINE_VERSION = 1  # Schemat z init_database()
+
+MIGRATIONS = [
+    Migration(
+        2, "Indeks na users.xp (ranking graczy)",
+        mysql=["ALTER TABLE users ADD INDEX idx_users_xp (xp), ALGORITHM=INPLACE, LOCK=NONE"],
+        sqlite=["CREATE INDEX IF NOT EXISTS idx_users_xp ON users (xp)"],
+    ),
+    Migration(
+        3, "Indeks question_attempts (username, question_id) - przeliczanie statystyk",
+        mysql=["ALTER TABLE question_attempts ADD INDEX idx_attempt_user_question (username, question_id), "
+               "ALGORITHM=INPLACE, LOCK=NONE"],
+        sqlite=["CREATE INDEX IF NOT EXISTS idx_attempt_user_question ON question_attempts (username, question_id)"],
+    ),
+    Migration(
+        4, "Indeks user_question_stats (question_id) - kaskadowe usuwanie pytań",
+        # InnoDB tworzy indeks dla klucza obcego automatycznie; SQLite przeszukiwał cały klucz główny
+        mysql=[],
+        sqlite=["CREATE INDEX IF NOT EXISTS idx_uqs_question ON user_question_stats (question_id)"],
+    ),
+    Migration(
+        5, "Dłuższa kolumna users.password_hash - hashe z algorytmem, kosztem i solą (passwords.py)",
+        # VARCHAR(64) w utf8mb4 ma już dwubajtową długość, więc wydłużenie jest zmianą online;
+        # SQLite nie sprawdza długości VARCHAR
+        mysql=["ALTER TABLE users MODIFY password_hash VARCHAR(255) NOT NULL, ALGORITHM=INPLACE, LOCK=NONE"],
+        sqlite=[],
+    ),
+    Migration(
+        6, "Tabela sync_applied - wpisy dziennika stanowisk offline już zastosowane (offline.py)",
+        mysql=["""CREATE TABLE IF NOT EXISTS sync_applied (
+                   entry_id VARCHAR(64) PRIMARY KEY,
+                   applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+               ) ENGINE=InnoDB"""],
+        sqlite=["""CREATE TABLE IF NOT EXISTS sync_applied (
+                    entry_id TEXT PRIMARY KEY,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )"""],
+    ),
+    Migration(
+        7, "Kolumny modules.sort_order i modules.prerequisite (z indeksem) - jawna kolejność odblokowywania",
+        # Wszystkie istniejące moduły dostają sort_order 0, więc kolejność (sort_order, nazwa)
+        # jest taka sama jak dotychczasowa alfabetyczna - bez przepisywania danych
+        # Indeks (sort_order, module_name) - pierwszy moduł nowego konta bez sortowania tabeli
+        mysql=["ALTER TABLE modules ADD COLUMN sort_order INT NOT NULL DEFAULT 0, "
+               "ADD COLUMN prerequisite VARCHAR(50) NULL, ADD INDEX idx_modules_order (sort_order, module_name), "
+               "ALGORITHM=INPLACE, LOCK=NONE"],
+        sqlite=["ALTER TABLE modules ADD COLUMN sort_order INT NOT NULL DEFAULT 0",
+                "ALTER TABLE modules ADD COLUMN prerequisite VARCHAR(50)",
+                "CREATE INDEX IF NOT EXISTS idx_modules_order ON modules (sort_order, module_name)"],
+    ),
+]
+
+# Wersja schematu oczekiwana przez aplikację
+SCHEMA_VERSION = MIGRATIONS[-1].version if MIGRATIONS else BASELINE_VERSION
+
+
+def pending_migrations(applied: List[int], target: int = SCHEMA_VERSION) -> List[Migration]:
+    """Migracje jeszcze niezastosowane, do wersji target włącznie, w kolejności numerów"""
+    done = set(applied)
+    return [m for m in MIGRATIONS if m.version not in done and m.version <= target]
@@ -0,0 +1,637 @@
+"""
+Tryb offline-first stanowiska: lokalna replika SQLite i kolejka synchronizacji.
+
+OfflineStorage opakowuje główny backend (zwykle MySQLStorage) i ma ten sam
+interfejs QuizStorage:
+- bank pytań i profil zalogowanego użytkownika (statystyki, osiągnięcia,
+  odblokowane moduły, statystyki pytań) są kopiowane do repliki i z niej
+  czytane - ekran nie czeka na sieć, a przy awarii serwera quiz działa dalej,
+- logowanie sprawdza hasło na serwerze; po udanym logowaniu replika zapisuje
+  własny hash hasła (serwer hashy nie wydaje), którym przy awarii serwera
+  logują się konta znane stanowisku,
+- zapisy quizu (update_user_stats, check_achievement, unlock_module_for_user,
+  insert_question_attempts) trafiają w jednej transakcji do repliki i do
+  trwałego dziennika sync_journal w tym samym pliku,
+- wątek w tle odtwarza dziennik na serwerze partiami (apply_journal) i odświeża
+  bank pytań oraz profile z serwera.
+
+Pozostałe operacje (rejestracja, panel moderatora, ranking) idą do serwera;
+odczyty przy jego awarii korzystają z repliki. Zasady rozwiązywania konfliktów
+opisuje README_MYSQL.md ("Tryb offline stanowiska").
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from passwords import hash_password, needs_rehash, verify_password
+from question_bank import questions_from_storage
+from storage import QuizStorage, SQLiteStorage
+
+SYNC_INTERVAL = float(os.environ.get("QUIZ_SYNC_INTERVAL", "5"))  # Co ile sekund wysyłać dziennik
+SYNC_BATCH_SIZE = 100  # Wpisów dziennika w jednej transakcji na serwerze
+BANK_REFRESH_INTERVAL = 300.0  # Co ile sekund odświeżać bank pytań i profile z serwera
+
+# Operacje zapisywane w dzienniku -> zapytania backendu bez zatwierdzania (te same odtwarza
+# replay_journal na serwerze)
+JOURNALED_WRITES = {
+    "update_user_stats": "write_user_stats",
+    "check_achievement": "write_achievement",
+    "unlock_module_for_user": "write_unlock",
+    "insert_question_attempts": "write_question_attempts",
+}
+
+REPLICA_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sync_journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        operation VARCHAR(50) NOT NULL,
+        args TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_meta (
+        key VARCHAR(50) PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS offline_credentials (
+        username VARCHAR(50) PRIMARY KEY,
+        password_hash VARCHAR(255) NOT NULL
+    )
+    """,
+]
+
+
+def journal_args(operation: str, args: Tuple) -> str:
+    """Argumenty operacji jako JSON (czas odpowiedzi w formacie ISO)"""
+    if operation == "insert_question_attempts":
+        rows = [list(row[:5]) + [row[5].isoformat()] for row in args[0]]
+        return json.dumps([rows])
+    return json.dumps(list(args))
+
+
+class OfflineStorage(QuizStorage):
+    """Główny backend z lokalną repliką do odczytu i dziennikiem zapisów"""
+
+    name = "offline"
+
+    def __init__(self, primary: QuizStorage, replica_path: str, sync_interval: float = SYNC_INTERVAL,
+                 start_worker: bool = True):
+        super().__init__()
+        self.primary = primary
+        self.replica = SQLiteStorage(replica_path)
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()  # Zapis do dziennika kontra nadpisanie profilu z serwera
+        self.local = threading.local()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.replica_id = None
+        self.bank_ready = False
+        self.profiles = set()  # Użytkownicy z profilem w replice
+        self.pending_profiles = set()
+        self.last_refresh = 0.0
+        self.replica_ready = self.open_replica()
+        self.worker = None
+        self.credential_worker = None
+        if start_worker and self.replica_ready:
+            self.worker = threading.Thread(target=self.sync_loop, name="offline_sync", daemon=True)
+            self.worker.start()
+
+    # --- replika ---
+
+    def open_replica(self) -> bool:
+        """Schemat repliki (bez domyślnych modułów - moduły pochodzą z serwera) i jej identyfikator"""
+        if not self.replica.ensure_schema():
+            return False
+
+        def prepare(connection):
+            for statement in REPLICA_SCHEMA:
+                connection.execute(statement)
+            connection.execute("INSERT OR IGNORE INTO sync_meta (key, value) VALUES ('replica_id', ?)",
+                               (uuid.uuid4().hex,))
+            connection.commit()
+            meta = dict(connection.execute("SELECT key, value FROM sync_meta"))
+            profiles = {row[0] for row in connection.execute("SELECT username FROM users")}
+            return meta, profiles
+
+        opened = self.replica.run("open_replica", prepare)
+        if opened is None:
+            return False
+        meta, self.profiles = opened
+        self.replica_id = meta["replica_id"]
+        self.bank_ready = "bank_synced_at" in meta
+        return True
+
+    def journal(self, operation: str, args: Tuple, apply_locally: bool):
+        """Zapis do dziennika - razem ze zmianą w replice, jeśli jest w niej profil użytkownika"""
+
+        def append(connection):
+            result = True
+            if apply_locally:
+                result = getattr(self.replica, JOURNALED_WRITES[operation])(connection, *args)
+            connection.execute("INSERT INTO sync_journal (operation, args) VALUES (?, ?)",
+                               (operation, journal_args(operation, args)))
+            connection.commit()
+            return True if result is None else result
+
+        with self.lock:
+            return self.replica.run(f"journal_{operation}", append, default=None)
+
+    def pending_writes(self) -> int:
+        """Liczba wpisów dziennika czekających na wysłanie"""
+        count = self.replica.run("pending_writes",
+                                 lambda connection: connection.execute("SELECT COUNT(*) FROM sync_journal").fetchone())
+        return count[0] if count else 0
+
+    # --- synchronizacja w tle ---
+
+    def sync_loop(self):
+        while not self.stopping:
+            self.sync_once()
+            self.wake.wait(self.sync_interval)
+            self.wake.clear()
+
+    def sync_once(self) -> bool:
+        """Jeden przebieg: wysłanie dziennika, potem (gdy pusty) odświeżenie banku i profili"""
+        if not self.drain_journal():
+            return False
+        if not self.bank_ready or self.refresh_due():
+            if not self.sync_bank():
+                return False
+            self.pending_profiles |= self.profiles
+            self.last_refresh = time.monotonic()
+        for username in sorted(self.pending_profiles):
+            if not self.sync_profile(username):
+                return False
+            self.pending_profiles.discard(username)
+        return True
+
+    def refresh_due(self) -> bool:
+        return time.monotonic() - self.last_refresh >= BANK_REFRESH_INTERVAL
+
+    def drain_journal(self) -> bool:
+        """Wysyła dziennik partiami - każda partia to zapisy jednego gracza (usługa quiz_api przyjmuje
+        je tylko w sesji właściciela konta). Wpis usuwany jest dopiero po zatwierdzeniu partii na serwerze;
+        po awarii między zatwierdzeniem a usunięciem partia wraca - serwer pomija ją dzięki sync_applied.
+        Gracz, którego partii serwer nie przyjął mimo działającego połączenia (brak sesji po logowaniu
+        offline), czeka do kolejnego logowania online - zapisy pozostałych idą dalej"""
+        after_seq, held = 0, set()
+        while not self.stopping:
+            batch = self.replica.run("read_journal", lambda connection: connection.execute(
+                "SELECT seq, operation, args FROM sync_journal WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after_seq, SYNC_BATCH_SIZE)).fetchall())
+            if batch is None:
+                return False
+            if not batch:
+                if not held:
+                    # Lokalne kopie odpowiedzi są już na serwerze (statystyki pytań zostają w profilu)
+                    self.replica.run("prune_attempts", self.prune_attempts)
+                return True
+            after_seq = batch[-1][0]
+            users = {}  # gracz -> (numery wpisów, wpisy) w kolejności dziennika
+            for seq, operation, args in batch:
+                args = json.loads(args)
+                username = args[0][0][0] if operation == "insert_question_attempts" else args[0]
+                if username not in held:
+                    seqs, entries = users.setdefault(username, ([], []))
+                    seqs.append(seq)
+                    entries.append((f"{self.replica_id}:{seq}", operation, args))
+            for username, (seqs, entries) in users.items():
+                if self.primary.apply_journal(entries) is None:
+                    if not self.primary.ping():
+                        return False
+                    held.add(username)  # Kolejne wpisy gracza też czekają - zachowują kolejność
+                    continue
+                # Profil po wysłaniu zmian odświeżany jest stanem serwera (zawiera zmiany innych stanowisk)
+                self.pending_profiles.add(username)
+                self.replica.run("trim_journal", lambda connection: self.trim_journal(connection, seqs))
+        return False
+
+    @staticmethod
+    def trim_journal(connection, seqs):
+        connection.executemany("DELETE FROM sync_journal WHERE seq = ?", [(seq,) for seq in seqs])
+        connection.commit()
+        return True
+
+    @staticmethod
+    def prune_attempts(connection):
+        connection.execute("DELETE FROM question_attempts")
+        connection.commit()
+        return True
+
+    def sync_bank(self) -> bool:
+        """Kopiuje moduły i pytania z serwera (z ich ID - dziennik odpowiedzi odwołuje się do ID serwera)"""
+        quiz_data = questions_from_storage(self.primary)
+        order = self.primary.get_module_order()
+        if not self.primary.is_available() or order is None:
+            return False
+        if not self.replica.run("sync_bank", lambda connection: self.store_bank(connection, quiz_data, order),
+                                default=False):
+            return False
+        self.bank_ready = True
+        return True
+
+    @staticmethod
+    def store_bank(connection, quiz_data: Dict[str, List[Dict]], order: List[Tuple[str, Optional[str]]]) -> bool:
+        modules = {row[0] for row in connection.execute("SELECT module_name FROM modules")}
+        current_modules = set(quiz_data) | {name for name, _ in order}
+        # Usunięcie modułu kasuje kaskadowo jego pytania, odblokowania i statystyki w replice
+        connection.executemany("DELETE FROM modules WHERE module_name = ?",
+                               [(name,) for name in modules - current_modules])
+        connection.executemany("""
+            INSERT INTO modules (module_name, sort_order, prerequisite) VALUES (?, ?, ?)
+            ON CONFLICT(module_name) DO UPDATE SET
+                sort_order = excluded.sort_order, prerequisite = excluded.prerequisite
+        """, [(name, i, prerequisite) for i, (name, prerequisite) in enumerate(order, 1)])
+        connection.executemany("INSERT OR IGNORE INTO modules (module_name) VALUES (?)",
+                               [(name,) for name in quiz_data])
+        rows = [(q['id'], module_name, q['question'], *q['options'], q['correct'])
+                for module_name, questions in quiz_data.items() for q in questions]
+        current = {row[0] for row in rows}
+        stored = {row[0] for row in connection.execute("SELECT question_id FROM questions")}
+        connection.executemany("DELETE FROM questions WHERE question_id = ?",
+                               [(q_id,) for q_id in stored - current])
+        # UPSERT zamiast INSERT OR REPLACE - REPLACE usuwa wiersz i kaskadowo statystyki pytania
+        connection.executemany("""
+            INSERT INTO questions
+                (question_id, module_name, question_text, option_a, option_b, option_c, option_d, correct_answer)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(question_id) DO UPDATE SET
+                module_name = excluded.module_name, question_text = excluded.question_text,
+                option_a = excluded.option_a, option_b = excluded.option_b, option_c = excluded.option_c,
+                option_d = excluded.option_d, correct_answer = excluded.correct_answer
+        """, rows)
+        connection.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES ('bank_synced_at', ?)",
+                           (datetime.now().isoformat(timespec="seconds"),))
+        connection.commit()
+        return True
+
+    def sync_profile(self, username: str) -> bool:
+        """Nadpisuje profil w replice stanem z serwera - tylko przy pustym dzienniku,
+        inaczej zniknęłyby lokalne zmiany jeszcze niewysłane"""
+        if not self.bank_ready:
+            return False
+        stats = self.primary.get_user_stats(username)
+        if not self.primary.is_available():
+            return False
+        if stats is None:
+            # Konto usunięte na serwerze - usuwamy też lokalny profil
+            with self.lock:
+                self.replica.run("drop_profile", lambda connection: self.drop_profile(connection, username))
+                self.profiles.discard(username)
+            return True
+        profile = {
+            'stats': stats,
+            'achievements': self.primary.get_user_achievements(username),
+            'unlocked': self.primary.get_user_unlocked_modules(username),
+            'module_stats': self.primary.get_user_module_stats(username),
+            'question_stats': [row for module_name in self.replica.get_quiz_data()
+                               for row in self.primary.get_question_weights(username, module_name) if row[1] or row[2]],
+        }
+        if not self.primary.is_available():
+            return False
+        with self.lock:
+            stored = self.replica.run("sync_profile",
+                                      lambda connection: self.store_profile(connection, username, profile))
+            if stored:
+                self.profiles.add(username)
+        return bool(stored)
+
+    @staticmethod
+    def store_profile(connection, username: str, profile: Dict) -> Optional[bool]:
+        """None - w dzienniku są niewysłane wpisy, profil zostaje do następnego przebiegu"""
+        if connection.execute("SELECT 1 FROM sync_journal LIMIT 1").fetchone():
+            return None
+        stats = profile['stats']
+        # Bez hasha - hasło do logowania offline jest w offline_credentials
+        connection.execute("""
+            INSERT INTO users (username, password_hash, is_mod, xp, stats_correct, stats_wrong)
+            VALUES (?, '', ?, ?, ?, ?)
+            ON CONFLICT(username) DO UPDATE SET
+                is_mod = excluded.is_mod, xp = excluded.xp,
+                stats_correct = excluded.stats_correct, stats_wrong = excluded.stats_wrong
+        """, (username, bool(stats.get('is_mod')), stats.get('xp', 0),
+              stats.get('stats_correct', 0), stats.get('stats_wrong', 0)))
+        modules = {row[0] for row in connection.execute("SELECT module_name FROM modules")}
+        questions = {row[0] for row in connection.execute("SELECT question_id FROM questions")}
+        for table in ("user_achievements", "user_unlocked_modules", "user_module_stats", "user_question_stats"):
+            connection.execute(f"DELETE FROM {table} WHERE username = ?", (username,))
+        connection.executemany("INSERT INTO user_achievements (username, achievement_id) VALUES (?, ?)",
+                               [(username, ach_id) for ach_id in profile['achievements']])
+        connection.executemany("INSERT INTO user_unlocked_modules (username, module_name) VALUES (?, ?)",
+                               [(username, name) for name in profile['unlocked'] if name in modules])
+        connection.executemany("""
+            INSERT INTO user_module_stats (username, module_name, correct_count, wrong_count)
+            VALUES (?, ?, ?, ?)
+        """, [(username, name, s['correct'], s['wrong'])
+              for name, s in profile['module_stats'].items() if name in modules])
+        connection.executemany("""
+            INSERT INTO user_question_stats (username, question_id, correct_count, wrong_count)
+            VALUES (?, ?, ?, ?)
+        """, [(username, q_id, correct, wrong)
+              for q_id, correct, wrong in profile['question_stats'] if q_id in questions])
+        connection.commit()
+        return True
+
+    @staticmethod
+    def drop_profile(connection, username: str) -> bool:
+        connection.execute("DELETE FROM users WHERE username = ?", (username,))
+        connection.execute("DELETE FROM offline_credentials WHERE username = ?", (username,))
+        connection.commit()
+        return True
+
+    @staticmethod
+    def store_credential(connection, username: str, password_hash: str) -> bool:
+        connection.execute("INSERT OR REPLACE INTO offline_credentials (username, password_hash) VALUES (?, ?)",
+                           (username, password_hash))
+        connection.commit()
+        return True
+
+    @staticmethod
+    def read_credential(connection, username: str) -> Optional[str]:
+        row = connection.execute("SELECT password_hash FROM offline_credentials WHERE username = ?",
+                                 (username,)).fetchone()
+        return row[0] if row else None
+
+    def request_sync(self, username: Optional[str] = None):
+        """Budzi wątek synchronizacji (opcjonalnie z odświeżeniem profilu użytkownika)"""
+        if username is not None:
+            self.pending_profiles.add(username)
+        self.wake.set()
+
+    # --- trasowanie wywołań ---
+
+    def read(self, name: str, *args):
+        """Odczyt z serwera, a przy jego awarii - z repliki"""
+        result = getattr(self.primary, name)(*args)
+        if self.primary.is_available():
+            self.local.available = True
+            return result
+        result = getattr(self.replica, name)(*args)
+        self.local.available = self.replica_ready and self.replica.is_available()
+        return result
+
+    def read_local(self, name: str, *args):
+        """Odczyt z repliki"""
+        result = getattr(self.replica, name)(*args)
+        self.local.available = self.replica.is_available()
+        return result
+
+    def read_profile(self, name: str, username: str, *args):
+        """Profil z repliki, jeśli jest w niej zsynchronizowany; inaczej jak read()"""
+        if username in self.profiles:
+            return self.read_local(name, username, *args)
+        return self.read(name, username, *args)
+
+    def read_bank(self, name: str, *args):
+        if self.bank_ready:
+            return self.read_local(name, *args)
+        return self.read(name, *args)
+
+    def write(self, name: str, *args):
+        """Zapis quizu: z profilem w replice - replika i dziennik; bez profilu - serwer,
+        a przy jego awarii sam dziennik"""
+        usernames = {row[0] for row in args[0]} if name == "insert_question_attempts" else {args[0]}
+        if usernames <= self.profiles:
+            result = self.journal(name, args, apply_locally=True)
+        else:
+            result = getattr(self.primary, name)(*args)
+            if self.primary.is_available():
+                self.local.available = True
+                return result
+            journaled = self.journal(name, args, apply_locally=False)
+            # Bez lokalnego profilu nie wiadomo, czy osiągnięcie lub moduł są nowe - bez powiadomienia
+            result = None if journaled is None else name in ("update_user_stats", "insert_question_attempts")
+        self.local.available = result is not None
+        return bool(result)
+
+    def direct(self, name: str, *args):
+        """Operacja wyłącznie na serwerze (rejestracja, panel moderatora)"""
+        result = getattr(self.primary, name)(*args)
+        self.local.available = self.primary.is_available()
+        return result
+
+    # --- infrastruktura ---
+
+    def is_available(self):
+        """Wynik ostatniej operacji w bieżącym wątku (odczyt z repliki przy awarii serwera to sukces)"""
+        available = getattr(self.local, "available", None)
+        return self.primary.is_available() if available is None else available
+
+    def close(self):
+        self.stopping = True
+        self.wake.set()
+        if self.worker is not None:
+            self.worker.join(timeout=self.sync_interval + 1)
+        if self.credential_worker is not None:
+            self.credential_worker.join()
+        self.primary.close()
+        self.replica.close()
+
+    def add_query_listener(self, listener):
+        self.primary.add_query_listener(listener)
+        self.replica.add_query_listener(listener)
+
+    def remove_query_listener(self, listener):
+        self.primary.remove_query_listener(listener)
+        self.replica.remove_query_listener(listener)
+
+    def add_call_listener(self, listener):
+        self.primary.add_call_listener(listener)
+        self.replica.add_call_listener(listener)
+
+    def remove_call_listener(self, listener):
+        self.primary.remove_call_listener(listener)
+        self.replica.remove_call_listener(listener)
+
+    def get_db_stats(self) -> Dict[str, Dict]:
+        stats = self.primary.get_db_stats()
+        stats.update({f"replica.{name}": stat for name, stat in self.replica.get_db_stats().items()})
+        return stats
+
+    def ping(self) -> bool:
+        return self.direct("ping")
+
+    # --- schemat ---
+
+    def init_database(self, default_modules: List[str] = ()) -> bool:
+        return self.direct("init_database", default_modules)
+
+    def get_schema_version(self) -> int:
+        return self.direct("get_schema_version")
+
+    def get_applied_migrations(self) -> List[Dict]:
+        return self.direct("get_applied_migrations")
+
+    def apply_migration(self, migration) -> bool:
+        return self.direct("apply_migration", migration)
+
+    def migrate(self, *args) -> bool:
+        return self.direct("migrate", *args)
+
+    def ensure_schema(self, default_modules: List[str] = ()) -> bool:
+        """Stanowisko startuje także bez serwera, jeśli replika jest gotowa"""
+        ready = self.primary.ensure_schema(default_modules)
+        self.pending_schema = self.primary.pending_schema
+        if ready:
+            self.request_sync()
+        return ready or self.replica_ready
+
+    # --- użytkownicy ---
+
+    def get_all_users(self) -> Dict:
+        return self.read("get_all_users")
+
+    def save_user(self, username: str, user_data: Dict) -> bool:
+        return self.direct("save_user", username, user_data)
+
+    def create_user(self, username: str, password_hash: str, is_mod: bool = False) -> Optional[bool]:
+        return self.direct("create_user", username, password_hash, is_mod)
+
+    def update_password_hash(self, username: str, old_hash: str, new_hash: str) -> bool:
+        return self.direct("update_password_hash", username, old_hash, new_hash)
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        return self.direct("get_password_hash", username)
+
+    def login(self, username: str, password: str) -> Optional[bool]:
+        """Na serwerze (zmiana hasła, usunięte konto); przy awarii - hashem z repliki: logowanie
+        offline działa dla kont, które logowały się już online na tym stanowisku"""
+        result = self.primary.login(username, password)
+        if result is not None:
+            self.local.available = True
+            if result:
+                # Hash dla repliki w tle - logowanie nie czeka na drugie hashowanie
+                self.credential_worker = threading.Thread(target=self.refresh_credential, args=(username, password),
+                                                          name="offline_credential", daemon=True)
+                self.credential_worker.start()
+                self.request_sync(username)
+            return result
+        if self.credential_worker is not None:
+            self.credential_worker.join()  # Hash z właśnie zakończonego logowania online
+        password_hash = self.replica.run("read_credential",
+                                         lambda connection: self.read_credential(connection, username))
+        if password_hash is None:
+            self.local.available = False  # Brak konta w replice to nie "błędny login"
+            return None
+        self.local.available = True
+        return verify_password(password, password_hash)
+
+    def refresh_credential(self, username: str, password: str):
+        """Hash do logowania offline liczony lokalnie (serwer i usługa quiz_api hashy nie wydają) -
+        tylko gdy go brak, jest w starym formacie albo nie pasuje (hasło zmienione na serwerze)"""
+        password_hash = self.replica.run("read_credential",
+                                         lambda connection: self.read_credential(connection, username))
+        if password_hash is not None and not needs_rehash(password_hash) and verify_password(password, password_hash):
+            return
+        password_hash = hash_password(password)
+        self.replica.run("store_credential",
+                         lambda connection: self.store_credential(connection, username, password_hash))
+
+    def register(self, username: str, password: str, is_mod: bool = False) -> Optional[bool]:
+        return self.direct("register", username, password, is_mod)
+
+    def ensure_first_module(self, username: str) -> bool:
+        """Wywoływane po udanym logowaniu - profil użytkownika trafia do repliki"""
+        result = self.direct("ensure_first_module", username)
+        if self.primary.is_available():
+            self.request_sync(username)
+        return result
+
+    def update_user_stats(self, username: str, xp_delta: int = 0, correct_delta: int = 0, wrong_delta: int = 0,
+                          module_name: Optional[str] = None) -> bool:
+        return self.write("update_user_stats", username, xp_delta, correct_delta, wrong_delta, module_name)
+
+    def get_user_stats(self, username: str) -> Optional[Dict]:
+        return self.read_profile("get_user_stats", username)
+
+    def get_leaderboard(self, limit: int = 5) -> List[Tuple[str, Dict]]:
+        return self.read("get_leaderboard", limit)
+
+    # --- moduły i pytania ---
+
+    def get_quiz_data(self) -> Dict:
+        return self.read_bank("get_quiz_data")
+
+    def add_module(self, module_name: str) -> bool:
+        return self.direct_bank("add_module", module_name)
+
+    def get_module_order(self) -> Optional[List[Tuple[str, Optional[str]]]]:
+        return self.read_bank("get_module_order")
+
+    def set_module_order(self, modules: List[Tuple[str, Optional[str]]]) -> bool:
+        return self.direct_bank("set_module_order", modules)
+
+    def add_question(self, module_name: str, question_data: Dict) -> bool:
+        return self.direct_bank("add_question", module_name, question_data)
+
+    def add_questions(self, module_name: str, questions: List[Dict]) -> bool:
+        return self.direct_bank("add_questions", module_name, questions)
+
+    def delete_question_by_id(self, module_name: str, question_id: int) -> bool:
+        return self.direct_bank("delete_question_by_id", module_name, question_id)
+
+    def direct_bank(self, name: str, *args):
+        """Zmiana banku pytań na serwerze - replika kopiowana od razu, żeby quiz na tym
+        stanowisku nie losował usuniętych pytań"""
+        result = self.direct(name, *args)
+        if result and self.bank_ready:
+            self.sync_bank()
+        return result
+
+    def get_module_questions(self, module_name: str) -> List[Dict]:
+        """Panel moderatora i eksport - z serwera (replika może być nieaktualna o kilka minut),
+        przy awarii z repliki"""
+        return self.read("get_module_questions", module_name)
+
+    def get_question_weights(self, username: str, module_name: str) -> List[Tuple[int, int, int]]:
+        if self.bank_ready:
+            return self.read_profile("get_question_weights", username, module_name)
+        return self.read("get_question_weights", username, module_name)
+
+    def get_questions_by_ids(self, question_ids: List[int]) -> List[Dict]:
+        return self.read_bank("get_questions_by_ids", question_ids)
+
+    def get_module_question_ids(self, module_name: str) -> List[int]:
+        return self.read_bank("get_module_question_ids", module_name)
+
+    # --- osiągnięcia i odblokowane moduły ---
+
+    def unlock_module_for_user(self, username: str, module_name: str) -> bool:
+        return self.write("unlock_module_for_user", username, module_name)
+
+    def get_user_unlocked_modules(self, username: str) -> List[str]:
+        return self.read_profile("get_user_unlocked_modules", username)
+
+    def get_user_achievements(self, username: str) -> List[str]:
+        return self.read_profile("get_user_achievements", username)
+
+    def check_achievement(self, username: str, ach_id: str) -> bool:
+        return self.write("check_achievement", username, ach_id)
+
+    # --- dziennik odpowiedzi i statystyki ---
+
+    def insert_question_attempts(self, rows: List[Tuple]) -> bool:
+        return self.write("insert_question_attempts", rows)
+
+    def get_question_difficulty(self, module_name: str) -> List[Dict]:
+        return self.read("get_question_difficulty", module_name)
+
+    def get_user_module_stats(self, username: str) -> Dict[str, Dict]:
+        return self.read_profile("get_user_module_stats", username)
+
+    def get_module_stats(self) -> Dict[str, Dict]:
+        return self.read("get_module_stats")
+
+    def rebuild_stats_rollups(self) -> bool:
+        return self.direct("rebuild_stats_rollups")
+
+    def apply_journal(self, entries) -> Optional[int]:
+        return self.direct("apply_journal", entries)
@@ -0,0 +1,142 @@
+"""
+Hashowanie haseł funkcją z kosztem (PBKDF2-SHA256 albo scrypt z hashlib).
+
+Każde hasło ma własną losową sól, a hash zapisywany jest razem z algorytmem
+i kosztem, więc koszt można podnieść bez unieważniania starych kont:
+
+    pbkdf2_sha256$600000$<sól hex>$<hash hex>
+    scrypt$16384$8$1$<sól hex>$<hash hex>
+
+verify_password rozpoznaje też stary format: SHA-256 ze stałą solą (64 znaki
+hex). needs_rehash mówi, że hash trzeba przeliczyć przy logowaniu (stary format,
+inny algorytm albo niższy koszt). Hasła zapisane czystym tekstem nie są przy
+logowaniu akceptowane - zamienia je jednorazowo
+migrate_json_to_mysql.py --hash-plaintext-passwords.
+
+Hashowanie trwa celowo setki milisekund, dlatego ekran logowania nie wywołuje
+go bezpośrednio, tylko przez PasswordService - pula wątków zwraca Future,
+a pętla ekranu w tym czasie rysuje wskaźnik oczekiwania. hashlib zwalnia GIL
+na czas liczenia PBKDF2 i scrypt, więc wątek wystarcza.
+"""
+
+import functools
+import hashlib
+import hmac
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+PASSWORD_KDF = os.environ.get("QUIZ_PASSWORD_KDF", "pbkdf2_sha256")  # "pbkdf2_sha256" albo "scrypt"
+PBKDF2_ITERATIONS = int(os.environ.get("QUIZ_PBKDF2_ITERATIONS", "600000"))
+SCRYPT_N = int(os.environ.get("QUIZ_SCRYPT_N", "16384"))  # Koszt CPU i pamięci (potęga dwójki)
+SCRYPT_R = 8
+SCRYPT_P = 1
+PASSWORD_WORKERS = int(os.environ.get("QUIZ_PASSWORD_WORKERS", "1"))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+LEGACY_SALT = "agile_scrum_quiz_2024"  # Stała sól dawnego hash_password (SHA-256)
+LEGACY_HASH_LENGTH = 64
+
+
+def legacy_hash(password: str) -> str:
+    """Dawny format: SHA-256 ze stałą solą - tylko do weryfikacji starych kont"""
+    return hashlib.sha256((password + LEGACY_SALT).encode('utf-8')).hexdigest()
+
+
+def scrypt_maxmem(n: int, r: int) -> int:
+    """Limit pamięci dla hashlib.scrypt (domyślne 32 MiB nie wystarcza dla większego N)"""
+    return 128 * n * r * 2
+
+
+def derive(kdf: str, password: str, salt: bytes, cost) -> bytes:
+    """Klucz z hasła; cost to liczba iteracji PBKDF2 albo krotka (n, r, p) dla scrypt"""
+    if kdf == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", password.encode('utf-8'), salt, cost, HASH_BYTES)
+    if kdf == "scrypt":
+        n, r, p = cost
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                              maxmem=scrypt_maxmem(n, r), dklen=HASH_BYTES)
+    raise ValueError(f"Nieznany algorytm hashowania haseł: {kdf}")
+
+
+def configured_cost(kdf: str):
+    return (SCRYPT_N, SCRYPT_R, SCRYPT_P) if kdf == "scrypt" else PBKDF2_ITERATIONS
+
+
+def hash_password(password: str, kdf: Optional[str] = None, cost=None) -> str:
+    """Hash z nową losową solą i kosztem z konfiguracji (albo podanym)"""
+    kdf = kdf or PASSWORD_KDF
+    cost = configured_cost(kdf) if cost is None else cost
+    salt = os.urandom(SALT_BYTES)
+    digest = derive(kdf, password, salt, cost).hex()
+    if kdf == "scrypt":
+        n, r, p = cost
+        return f"scrypt${n}${r}${p}${salt.hex()}${digest}"
+    return f"pbkdf2_sha256${cost}${salt.hex()}${digest}"
+
+
+def parse_hash(stored_hash: str):
+    """(algorytm, koszt, sól, hash) albo None dla starych formatów i uszkodzonych wartości"""
+    parts = stored_hash.split("$")
+    try:
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            return parts[0], int(parts[1]), bytes.fromhex(parts[2]), bytes.fromhex(parts[3])
+        if parts[0] == "scrypt" and len(parts) == 6:
+            cost = (int(parts[1]), int(parts[2]), int(parts[3]))
+            return parts[0], cost, bytes.fromhex(parts[4]), bytes.fromhex(parts[5])
+    except ValueError:
+        return None
+    return None
+
+
+def is_password_hash(stored_hash: str) -> bool:
+    """Czy zapisana wartość jest hashem w obsługiwanym formacie (a nie np. czystym tekstem)"""
+    return parse_hash(stored_hash) is not None or len(stored_hash) == LEGACY_HASH_LENGTH
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    """Sprawdza hasło w każdym obsługiwanym formacie hasha (porównanie w stałym czasie).
+    Wartość w innym formacie (uszkodzony hash, czysty tekst) nie pasuje do żadnego hasła"""
+    parsed = parse_hash(stored_hash)
+    if parsed is not None:
+        kdf, cost, salt, digest = parsed
+        return hmac.compare_digest(derive(kdf, password, salt, cost), digest)
+    if len(stored_hash) == LEGACY_HASH_LENGTH:
+        return hmac.compare_digest(legacy_hash(password), stored_hash)
+    return False
+
+
+@functools.lru_cache(maxsize=1)
+def dummy_hash() -> str:
+    """Hash sprawdzany przy logowaniu na nieistniejące konto - odpowiedź trwa tyle samo co dla
+    istniejącego, więc czas nie zdradza, które nazwy użytkowników są zajęte"""
+    return hash_password(os.urandom(SALT_BYTES).hex())
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """Czy hash trzeba przeliczyć: stary format, inny algorytm albo koszt niższy niż w konfiguracji"""
+    parsed = parse_hash(stored_hash)
+    if parsed is None or parsed[0] != PASSWORD_KDF:
+        return True
+    return parsed[1] < configured_cost(PASSWORD_KDF)
+
+
+class PasswordService:
+    """Pula wątków do hashowania - ekran odpytuje Future zamiast czekać w pętli zdarzeń"""
+
+    def __init__(self, workers: int = PASSWORD_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+
+    def submit(self, func, *args) -> Future:
+        """Dowolna operacja logowania/rejestracji (hash + zapytania do bazy) poza wątkiem UI"""
+        return self.executor.submit(func, *args)
+
+    def hash(self, password: str) -> Future:
+        return self.executor.submit(hash_password, password)
+
+    def verify(self, password: str, stored_hash: str) -> Future:
+        return self.executor.submit(verify_password, password, stored_hash)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
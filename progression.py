@@ -0,0 +1,66 @@
+"""
+Graf przejścia przez moduły - który moduł odblokowuje bezbłędny quiz.
+
+Kolejność i wymagane moduły pochodzą z tabeli modules (kolumny sort_order
+i prerequisite, migracja 7). Moduł bez wymaganego modułu odblokowuje się po
+poprzednim w kolejności, więc bez żadnej konfiguracji przejście jest liniowe.
+Graf budowany jest z jednego zapytania (get_module_order - bez pytań), a
+odpowiedź na pytanie "co odblokowuje wynik 100% w module X" to odczyt słownika.
+
+Kolejność ustawia administrator:
+    python migrate_json_to_mysql.py --module-order Agile_Podstawy Scrum Praktyki:Agile_Podstawy
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+class ProgressionGraph:
+    """Kolejność modułów i odwrotna mapa wymagań: moduł -> moduły, które odblokowuje"""
+
+    def __init__(self, modules: List[Tuple[str, Optional[str]]]):
+        self.order = [name for name, _ in modules]
+        self.prerequisites: Dict[str, Optional[str]] = {}
+        self.unlocks: Dict[str, Tuple[str, ...]] = {}
+        known = set(self.order)
+        previous = None
+        for name, prerequisite in modules:
+            # Wymaganie wskazujące nieistniejący moduł (np. usunięty) - jak brak wymagania
+            if prerequisite not in known or prerequisite == name:
+                prerequisite = previous
+            self.prerequisites[name] = prerequisite
+            if prerequisite is not None:
+                self.unlocks[prerequisite] = self.unlocks.get(prerequisite, ()) + (name,)
+            previous = name
+
+    def first(self) -> Optional[str]:
+        """Moduł odblokowany każdemu nowemu kontu"""
+        return self.order[0] if self.order else None
+
+    def next_modules(self, module_name: str) -> Tuple[str, ...]:
+        """Moduły odblokowywane przez bezbłędny quiz w module_name"""
+        return self.unlocks.get(module_name, ())
+
+
+def parse_module_order(items: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Argumenty "moduł" albo "moduł:wymagany_moduł" -> [(moduł, wymagany moduł albo None)]"""
+    modules = []
+    for item in items:
+        name, _, prerequisite = item.partition(":")
+        modules.append((name, prerequisite or None))
+    return modules
+
+
+def validate_module_order(modules: List[Tuple[str, Optional[str]]], existing: List[str]) -> List[str]:
+    """Błędy kolejności: nieznane moduły, powtórzenia i wymagania spoza wcześniejszych modułów
+    (wymaganie musi być wcześniej w kolejności - graf nie może mieć cykli)"""
+    errors = []
+    seen = set()
+    for name, prerequisite in modules:
+        if name not in existing:
+            errors.append(f"nieznany moduł: {name}")
+        if name in seen:
+            errors.append(f"moduł podany dwukrotnie: {name}")
+        if prerequisite is not None and prerequisite not in seen:
+            errors.append(f"{name}: wymagany moduł {prerequisite} musi być wcześniej w kolejności")
+        seen.add(name)
+    return errors
@@ -0,0 +1,119 @@
+"""
+Monitor zapytań warstwy danych: dziennik wolnych wywołań i statystyki na żywo.
+
+QueryMonitor nasłuchuje wywołań backendu (QuizStorage.add_call_listener) i dla
+każdego dostaje StorageCall: nazwę operacji (get_all_users, update_user_stats, ...),
+czas pobrania połączenia, czas zapytań, liczbę zapytań i pobranych wierszy.
+Dzięki temu na wolnym stanowisku widać, czy czas idzie na łączenie z bazą,
+czy na same zapytania.
+
+Wywołania dłuższe niż próg (QUIZ_SLOW_QUERY_MS) zapisywane są do rotowanego
+pliku dziennika (QUIZ_SLOW_QUERY_LOG). Parametry zapytań nie są zapisywane -
+zawierają m.in. hashe haseł.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+SLOW_QUERY_MS = float(os.environ.get("QUIZ_SLOW_QUERY_MS", "200"))  # 0 wyłącza dziennik
+SLOW_QUERY_LOG = os.environ.get("QUIZ_SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_LOG_BYTES = 1024 * 1024  # Rozmiar pliku przed rotacją
+SLOW_QUERY_LOG_BACKUPS = 3  # Liczba zachowanych starszych plików
+MONITOR_WINDOW_SECONDS = 5.0  # Okno, z którego liczone są zapytania/s i p95
+
+
+def percentile(values, fraction):
+    """Percentyl metodą najbliższego rangi (values nie musi być posortowane)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class QueryMonitor:
+    """Zbiera wywołania backendu z ostatnich sekund i zapisuje wolne wywołania"""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, log_path: Optional[str] = SLOW_QUERY_LOG,
+                 window: float = MONITOR_WINDOW_SECONDS):
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self.window = window
+        self.calls = deque()  # (czas zakończenia, StorageCall)
+        self.lock = threading.Lock()
+        self.logger = None
+        self.storage = None
+
+    def attach(self, storage):
+        """Zaczyna nasłuchiwać wywołań backendu"""
+        self.detach()
+        self.storage = storage
+        storage.add_call_listener(self.record)
+
+    def detach(self):
+        if self.storage is not None:
+            self.storage.remove_call_listener(self.record)
+            self.storage = None
+
+    def record(self, call):
+        """Listener StorageCall - wywoływany w wątku, który wykonał operację"""
+        now = time.monotonic()
+        with self.lock:
+            self.calls.append((now, call))
+            self.expire(now)
+        if self.slow_ms and call.total_ms >= self.slow_ms:
+            self.log_slow(call)
+
+    def expire(self, now):
+        while self.calls and self.calls[0][0] < now - self.window:
+            self.calls.popleft()
+
+    def get_slow_logger(self) -> logging.Logger:
+        """Logger dziennika tworzony przy pierwszym wolnym wywołaniu (plik nie powstaje bez potrzeby)"""
+        if self.logger is None:
+            self.logger = logging.getLogger("quiz.slow_queries")
+            self.logger.setLevel(logging.WARNING)
+            self.logger.propagate = False
+            if self.log_path and not self.logger.handlers:
+                handler = RotatingFileHandler(self.log_path, maxBytes=SLOW_QUERY_LOG_BYTES,
+                                              backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.logger.addHandler(handler)
+        return self.logger
+
+    def log_slow(self, call):
+        sql = " ".join(call.slowest_sql.split()) if call.slowest_sql else "-"
+        self.get_slow_logger().warning(
+            "%s%s: %.1f ms (połączenie %.1f ms, zapytania %.1f ms w %d, wierszy %d) najwolniejsze %.1f ms: %s",
+            call.operation, " [błąd]" if call.error else "", call.total_ms, call.connect_ms, call.execute_ms,
+            call.queries, call.rows, call.slowest_ms, sql[:500])
+
+    def snapshot(self) -> Dict[str, float]:
+        """Statystyki z ostatniego okna: wywołania/s, zapytania/s, p95 wywołania i połączenia (ms)"""
+        now = time.monotonic()
+        with self.lock:
+            self.expire(now)
+            calls = [call for _, call in self.calls]
+        return {
+            "calls_per_second": len(calls) / self.window,
+            "queries_per_second": sum(call.queries for call in calls) / self.window,
+            "p95_ms": percentile([call.total_ms for call in calls], 0.95),
+            "connect_p95_ms": percentile([call.connect_ms for call in calls], 0.95),
+            "rows_per_second": sum(call.rows for call in calls) / self.window,
+            "errors": sum(1 for call in calls if call.error),
+        }
+
+    def slowest_operations(self, limit: int = 3):
+        """Operacje z najdłuższym łącznym czasem w oknie: [(nazwa, łączny czas ms, wywołania)]"""
+        with self.lock:
+            self.expire(time.monotonic())
+            totals = {}
+            for _, call in self.calls:
+                total, count = totals.get(call.operation, (0.0, 0))
+                totals[call.operation] = (total + call.total_ms, count + 1)
+        ordered = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+        return [(name, total, count) for name, (total, count) in ordered[:limit]]
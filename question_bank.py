@@ -0,0 +1,251 @@
+"""
+Skompilowany bank pytań - binarny plik tylko do odczytu, ładowany przez mmap.
+
+Na dni egzaminacyjne ten sam zestaw pytań trafia na wiele stanowisk. Zamiast
+pobierać pytania z bazy lub parsować quiz_data.json przy każdym starcie,
+stanowisko mapuje plik banku do pamięci i odczytuje tylko potrzebne pytania.
+
+Układ pliku (liczby little-endian):
+    nagłówek   - BANK_HEADER: magic, wersja, liczba modułów i pytań, przesunięcia sekcji
+    moduły     - MODULE_RECORD na moduł: nazwa (przesunięcie, długość), pierwsze pytanie, liczba pytań
+    indeks     - QUESTION_RECORD na pytanie: id, moduł, poprawna odpowiedź, 5 tekstów (przesunięcie, długość)
+    sterta     - teksty UTF-8 (treść pytania i odpowiedzi), bez separatorów
+
+Otwarcie banku czyta tylko nagłówek i tabelę modułów, więc czas startu i zużycie
+pamięci nie zależą od liczby pytań. Teksty są dekodowane dopiero przy odczycie pytania.
+
+ID pytania to question_id z bazy - po nim quiz czyta wyniki użytkownika (wagi losowania)
+i zapisuje odpowiedzi. Pytanie bez ID z bazy (quiz_data.json bez klucza "id") ma ID 0:
+jest losowane z równą wagą, a odpowiedzi na nie nie trafiają do dziennika.
+
+Kompilacja:
+    python question_bank.py --from-json quiz_data.json -o questions.qbank
+    python question_bank.py --from-db -o questions.qbank
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+BANK_MAGIC = b"QBNK"
+BANK_VERSION = 2  # Wersja 2: ID 0 - pytanie bez ID z bazy (wersja 1 numerowała pytania z JSON od 1)
+NO_QUESTION_ID = 0
+BANK_HEADER = struct.Struct("<4sHHIIIIII")  # magic, wersja, zarezerwowane, moduły, pytania, 4 przesunięcia/rozmiary
+MODULE_RECORD = struct.Struct("<IIII")  # nazwa (przesunięcie, długość), pierwsze pytanie, liczba pytań
+QUESTION_RECORD = struct.Struct("<IHBx10I")  # id, moduł, poprawna, treść + 4 odpowiedzi (przesunięcie, długość)
+OPTIONS_COUNT = 4
+
+
+class QuestionBankError(Exception):
+    """Plik banku pytań jest uszkodzony lub ma nieobsługiwany format"""
+
+
+class ModuleQuestions(Sequence):
+    """Pytania jednego modułu; każde pytanie dekodowane jest dopiero przy odczycie"""
+
+    def __init__(self, bank, first, count):
+        self.bank = bank
+        self.first = first
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.bank.question(self.first + index)
+
+    def ids(self) -> List[int]:
+        """ID pytań modułu (bez dekodowania tekstów)"""
+        return [self.bank.question_id(self.first + i) for i in range(self.count)]
+
+
+class QuestionBank:
+    """Bank pytań zmapowany do pamięci (tylko do odczytu)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        try:
+            self._read_header()
+        except (QuestionBankError, struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise QuestionBankError(f"Nieprawidłowy bank pytań {path}: {e}")
+
+    def _read_header(self):
+        if len(self.mm) < BANK_HEADER.size:
+            raise QuestionBankError("plik jest za krótki")
+        (magic, version, _, self.module_count, self.question_count,
+         modules_offset, self.index_offset, self.heap_offset, heap_size) = BANK_HEADER.unpack_from(self.mm, 0)
+        if magic != BANK_MAGIC:
+            raise QuestionBankError("brak sygnatury QBNK")
+        if version != BANK_VERSION:
+            raise QuestionBankError(f"nieobsługiwana wersja {version}")
+        if (modules_offset + self.module_count * MODULE_RECORD.size > self.index_offset
+                or self.index_offset + self.question_count * QUESTION_RECORD.size > self.heap_offset
+                or self.heap_offset + heap_size > len(self.mm)):
+            raise QuestionBankError("sekcje wykraczają poza plik")
+        # Tabela modułów jest mała (liczba modułów, nie pytań) - czytamy ją od razu
+        self.modules = {}
+        for i in range(self.module_count):
+            name_offset, name_length, first, count = MODULE_RECORD.unpack_from(
+                self.mm, modules_offset + i * MODULE_RECORD.size)
+            if first + count > self.question_count:
+                raise QuestionBankError("moduł wskazuje pytania spoza indeksu")
+            self.modules[self._text(name_offset, name_length)] = (first, count)
+
+    def _text(self, offset, length):
+        start = self.heap_offset + offset
+        return str(self.view[start:start + length], "utf-8")
+
+    def close(self):
+        """Zwalnia mapowanie pliku"""
+        self.view.release()
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def module_names(self) -> List[str]:
+        return list(self.modules)
+
+    def module_questions(self, module_name: str) -> ModuleQuestions:
+        first, count = self.modules.get(module_name, (0, 0))
+        return ModuleQuestions(self, first, count)
+
+    def quiz_data(self) -> Dict[str, ModuleQuestions]:
+        """Wszystkie moduły w formacie get_quiz_data() (pytania dekodowane leniwie)"""
+        return {name: ModuleQuestions(self, first, count) for name, (first, count) in self.modules.items()}
+
+    def question_id(self, position: int) -> int:
+        return struct.unpack_from("<I", self.mm, self.index_offset + position * QUESTION_RECORD.size)[0]
+
+    def question(self, position: int) -> Dict:
+        """Pytanie o podanej pozycji w indeksie (z kluczem 'id')"""
+        record = QUESTION_RECORD.unpack_from(self.mm, self.index_offset + position * QUESTION_RECORD.size)
+        question_id, _, correct = record[:3]
+        texts = [self._text(record[i], record[i + 1]) for i in range(3, 13, 2)]
+        return {'id': question_id, 'question': texts[0], 'options': texts[1:], 'correct': correct}
+
+
+# ================== KOMPILACJA ==================
+
+def compile_question_bank(quiz_data: Dict[str, List[Dict]], path: str) -> int:
+    """Zapisuje pytania (moduł -> lista pytań z kluczem 'id') do pliku banku.
+    Zwraca liczbę zapisanych pytań. Plik podmieniany jest atomowo."""
+    heap = bytearray()
+    heap_offsets = {}
+
+    def add_text(text):
+        # Powtarzające się teksty (np. odpowiedzi "Wszystkie powyższe") zapisujemy raz
+        data = str(text).encode("utf-8")
+        if data not in heap_offsets:
+            heap_offsets[data] = len(heap)
+            heap.extend(data)
+        return heap_offsets[data], len(data)
+
+    module_records = bytearray()
+    question_records = bytearray()
+    position = 0
+    for module_index, (module_name, questions) in enumerate(quiz_data.items()):
+        module_records += MODULE_RECORD.pack(*add_text(module_name), position, len(questions))
+        for q in questions:
+            options = list(q['options'])
+            if len(options) != OPTIONS_COUNT or not 0 <= int(q['correct']) < OPTIONS_COUNT:
+                raise ValueError(f"Pytanie w module {module_name} nie ma {OPTIONS_COUNT} odpowiedzi: {q['question']}")
+            texts = []
+            for text in [q['question']] + options:
+                texts.extend(add_text(text))
+            question_records += QUESTION_RECORD.pack(int(q['id']), module_index, int(q['correct']), *texts)
+            position += 1
+
+    modules_offset = BANK_HEADER.size
+    index_offset = modules_offset + len(module_records)
+    heap_offset = index_offset + len(question_records)
+    header = BANK_HEADER.pack(BANK_MAGIC, BANK_VERSION, 0, len(quiz_data), position,
+                              modules_offset, index_offset, heap_offset, len(heap))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(module_records)
+        f.write(question_records)
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+    # Stanowiska z otwartym starym bankiem dalej widzą poprzednią wersję pliku
+    os.replace(tmp_path, path)
+    return position
+
+
+def questions_from_json(path: str) -> Dict[str, List[Dict]]:
+    """Wczytuje quiz_data.json; ID pytania z klucza "id" (question_id z bazy), bez niego NO_QUESTION_ID.
+    Kolejne numery nie odpowiadają ID w bazie (usunięte pytania, luki auto-increment)"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {module_name: [dict(q, id=int(q.get("id", NO_QUESTION_ID))) for q in questions]
+            for module_name, questions in data.items()}
+
+
+def questions_from_storage(storage) -> Dict[str, List[Dict]]:
+    """Pobiera pytania z tabeli questions wraz z ich ID z bazy"""
+    quiz_data = {}
+    for module_name in storage.get_quiz_data():
+        quiz_data[module_name] = storage.get_questions_by_ids(storage.get_module_question_ids(module_name))
+    return quiz_data
+
+
+def open_question_bank(path: Optional[str]) -> Optional[QuestionBank]:
+    """Otwiera bank pytań; przy braku pliku lub błędzie zwraca None"""
+    if not path:
+        return None
+    try:
+        return QuestionBank(path)
+    except (OSError, ValueError, QuestionBankError) as e:  # ValueError - pusty plik (mmap)
+        print(f"Nie można otworzyć banku pytań: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompilacja banku pytań do formatu mmap")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-json", metavar="PLIK", help="plik quiz_data.json")
+    source.add_argument("--from-db", action="store_true", help="tabela questions (backend wg QUIZ_STORAGE)")
+    parser.add_argument("-o", "--output", default="questions.qbank", help="plik wynikowy")
+    args = parser.parse_args()
+
+    if args.from_json:
+        quiz_data = questions_from_json(args.from_json)
+        without_id = sum(q["id"] == NO_QUESTION_ID for questions in quiz_data.values() for q in questions)
+        if without_id:
+            print(f"Uwaga: {without_id} pytań bez ID z bazy - losowane z równą wagą, odpowiedzi nie będą "
+                  f"zapisywane (bank z bazy: --from-db)")
+    else:
+        import quiz
+        quiz_data = questions_from_storage(quiz.get_storage())
+        if not quiz_data:
+            print("BŁĄD: Brak pytań w bazie danych lub baza jest niedostępna!")
+            sys.exit(1)
+
+    count = compile_question_bank(quiz_data, args.output)
+    print(f"Zapisano {count} pytań z {len(quiz_data)} modułów do {args.output} "
+          f"({os.path.getsize(args.output)} bajtów)")
+
+
+if __name__ == "__main__":
+    main()
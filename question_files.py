@@ -0,0 +1,100 @@
+"""
+Pliki pytań do importu i eksportu modułu (panel moderatora).
+
+CSV: kolumny question, option_a, option_b, option_c, option_d, correct - poprawna
+odpowiedź jako litera A-D (przy imporcie także 0-3), wiersz nagłówka opcjonalny.
+Separator (przecinek albo średnik z polskiego Excela) rozpoznawany jest po pierwszym wierszu.
+JSON: lista pytań w formacie quiz_data.json ({"question", "options", "correct"})
+albo cały quiz_data.json - wtedy brane są pytania modułu o tej samej nazwie.
+
+Odczyt zwraca surowe wiersze; walidację i sanityzację wykonuje quiz.validate_question.
+"""
+
+import csv
+import json
+import os
+from typing import Dict, List, Tuple
+
+CSV_FIELDS = ["question", "option_a", "option_b", "option_c", "option_d", "correct"]
+ANSWER_LETTERS = "ABCD"
+
+
+class QuestionFileError(Exception):
+    """Nieobsługiwany format albo plik, którego nie da się odczytać"""
+
+
+def file_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".csv", ".json"):
+        raise QuestionFileError("obsługiwane są pliki .csv i .json")
+    return extension[1:]
+
+
+def answer_letter(value) -> str:
+    """Poprawna odpowiedź z pliku (litera albo indeks 0-3) jako litera; inne wartości bez zmian"""
+    text = str(value).strip().upper()
+    if text.isdigit() and int(text) < len(ANSWER_LETTERS):
+        return ANSWER_LETTERS[int(text)]
+    return text
+
+
+def read_question_file(path: str, module_name: str) -> List[Tuple[str, List[str], str]]:
+    """Wiersze pliku jako (treść, [opcje A-D], odpowiedź) - bez walidacji"""
+    try:
+        if file_format(path) == "csv":
+            return read_csv(path)
+        return read_json(path, module_name)
+    except (OSError, UnicodeDecodeError, csv.Error, ValueError) as e:
+        raise QuestionFileError(str(e)) from e
+
+
+def read_csv(path: str) -> List[Tuple[str, List[str], str]]:
+    # utf-8-sig - pliki zapisane w Excelu zaczynają się od BOM
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        first_line = f.readline()
+        f.seek(0)
+        delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+        rows = []
+        for row in csv.reader(f, delimiter=delimiter):
+            if not any(cell.strip() for cell in row):
+                continue
+            if not rows and [cell.strip().lower() for cell in row] == CSV_FIELDS:
+                continue
+            row = (row + [""] * len(CSV_FIELDS))[:len(CSV_FIELDS)]
+            rows.append((row[0], row[1:5], answer_letter(row[5])))
+    return rows
+
+
+def read_json(path: str, module_name: str) -> List[Tuple[str, List[str], str]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        if module_name not in data:
+            raise QuestionFileError(f"w pliku nie ma modułu {module_name}")
+        data = data[module_name]
+    if not isinstance(data, list):
+        raise QuestionFileError("oczekiwano listy pytań")
+    rows = []
+    for item in data:
+        item = item if isinstance(item, dict) else {}
+        options = item.get("options")
+        options = (list(options) + [""] * 4)[:4] if isinstance(options, list) else [""] * 4
+        rows.append((item.get("question", ""), options, answer_letter(item.get("correct", ""))))
+    return rows
+
+
+def write_question_file(path: str, questions: List[Dict]) -> int:
+    """Zapisuje pytania modułu w formacie wg rozszerzenia; zwraca liczbę pytań"""
+    fmt = file_format(path)
+    temp_path = path + ".tmp"
+    # Zapis do pliku tymczasowego i podmiana - przerwany eksport nie zostawia uciętego pliku
+    with open(temp_path, "w", newline="", encoding="utf-8-sig" if fmt == "csv" else "utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            writer.writerows([q["question"], *q["options"], ANSWER_LETTERS[q["correct"]]] for q in questions)
+        else:
+            json.dump([{"question": q["question"], "options": q["options"], "correct": q["correct"]}
+                       for q in questions], f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return len(questions)
@@ -1,13 +1,27 @@
-import pygame
 import json
 import os
 import random
 import math
-import hashlib
 import re
-import mysql.connector
-from mysql.connector import Error
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
+from storage import QuizStorage, MySQLStorage, create_storage
+from offline import OfflineStorage
+from question_bank import NO_QUESTION_ID, QuestionBank, open_question_bank
+from question_files import QuestionFileError, read_question_file, write_question_file
+from progression import ProgressionGraph
+from query_monitor import QueryMonitor
+from frame_profiler import FrameProfiler
+from passwords import PasswordService
+from async_data import AsyncData, DataRequest, LOADING, ERROR, gather
+
+# pygame importowany jest w main() (import_pygame) - narzędzia korzystające tylko
+# z funkcji danych (migracja, benchmarki) nie ładują biblioteki graficznej
+pygame = None
 
 # ================== KONFIGURACJA ==================
 MIN_WIDTH, MIN_HEIGHT = 800, 600
@@ -19,6 +33,13 @@ BTN_HOVER = (100, 100, 240)
 BTN_LOCKED = (50, 50, 80)
 INPUT_BG = (50, 50, 50)
 BASE_FONT_SIZE = 22
+FPS = 60
+# Przeciąganie rogu okna wysyła serię VIDEORESIZE - układ ekranu przeliczany jest raz,
+# gdy rozmiar nie zmienia się przez tyle ms
+RESIZE_DEBOUNCE_MS = 150
+MESSAGE_MS = 2000  # Czas wyświetlania komunikatu (MessageScreen)
+RESULT_MS = 3000  # Czas wyświetlania wyniku quizu
+WIDGET_ATLAS_SIZE = 512  # Najwięcej zapamiętanych widżetów (przycisków, pól, pól wyboru)
 
 # Konfiguracja MySQL
 DB_CONFIG = {
@@ -28,9 +49,25 @@ DB_CONFIG = {
     'password': 'root',
     'charset': 'utf8mb4',
     'collation': 'utf8mb4_unicode_ci',
-    'unix_socket': '/Applications/MAMP/tmp/mysql/mysql.sock',
     'autocommit': False
 }
+# Gniazdo MySQL z MAMP (macOS) - używane tylko jeśli istnieje
+MAMP_SOCKET = '/Applications/MAMP/tmp/mysql/mysql.sock'
+if os.path.exists(MAMP_SOCKET):
+    DB_CONFIG['unix_socket'] = MAMP_SOCKET
+
+# Backend danych: "mysql", "sqlite" (wbudowana baza w pliku, bez serwera) albo "remote"
+# (lokalna usługa quiz_api.py pod adresem QUIZ_API_URL - stanowisko nie łączy się z bazą)
+STORAGE_BACKEND = os.environ.get("QUIZ_STORAGE", "mysql")
+SQLITE_PATH = os.environ.get("QUIZ_SQLITE_PATH", "quiz.db")
+API_URL = os.environ.get("QUIZ_API_URL")
+# Skompilowany bank pytań (question_bank.py) - jeśli ustawiony, quiz czyta pytania z pliku, a nie z bazy
+QUESTION_BANK_PATH = os.environ.get("QUIZ_QUESTION_BANK")
+# Tryb offline-first (offline.py): plik lokalnej repliki SQLite; zapisy czekają w nim na wysłanie do bazy
+OFFLINE_REPLICA_PATH = os.environ.get("QUIZ_OFFLINE_REPLICA")
+
+# Moduły tworzone przy pierwszej inicjalizacji bazy
+DEFAULT_MODULES = ["Agile_Podstawy", "Scrum", "Praktyki"]
 
 # Lista dozwolonych kont moderatorów (tylko te konta mogą być moderatorskie)
 # Maksymalnie 3 konta mogą być moderatorskie
@@ -45,19 +82,28 @@ MAX_QUESTION_LEN = 500
 MAX_OPTION_LEN = 200
 USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_]+$')
 
+# Losowanie pytań do quizu
+QUIZ_SIZE = 10  # Liczba pytań w jednym quizie
+WRONG_ANSWER_WEIGHT = 3.0  # Jak mocno błędna odpowiedź zwiększa szansę wylosowania pytania
 
-# ================== DANE I LOGIKA ==================
-def hash_password(password):
-    """Hashuje hasło używając SHA-256 z solą"""
-    salt = "agile_scrum_quiz_2024"
-    return hashlib.sha256((password + salt).encode('utf-8')).hexdigest()
+# Dziennik odpowiedzi (question_attempts)
+ATTEMPT_BATCH_SIZE = 50  # Liczba odpowiedzi buforowanych przed zapisem do bazy
+
+# Graf odblokowywania modułów (progression.py) - moduły dodane na innym stanowisku
+# widoczne są w grafie najpóźniej po tym czasie
+PROGRESSION_TTL = 300  # s
 
+# Monitor zapytań (query_monitor.py): wolne wywołania trafiają do QUIZ_SLOW_QUERY_LOG,
+# F3 pokazuje nakładkę z liczbą zapytań na sekundę i p95 czasu wywołań
+QUERY_MONITOR_ENABLED = os.environ.get("QUIZ_QUERY_MONITOR", "1") != "0"
+OVERLAY_FONT_SIZE = 16
+OVERLAY_BG = (0, 0, 0, 190)
 
-def verify_password(password, stored_hash):
-    """Weryfikuje hasło"""
-    return hash_password(password) == stored_hash
+# Tryb profilowania (frame_profiler.py): katalog na pliki .pstats; także flaga --profile
+PROFILE_DIR = os.environ.get("QUIZ_PROFILE")
 
 
+# ================== DANE I LOGIKA ==================
 def sanitize_input(text, max_length=1000):
     """Czyści i ogranicza długość tekstu"""
     if not isinstance(text, str):
@@ -91,13 +137,88 @@ def validate_password(password):
     return True, ""
 
 
+def validate_question(question, options, answer):
+    """Waliduje i sanityzuje pytanie (formularz i import z pliku);
+    zwraca (pytanie w formacie bazy, "") albo (None, komunikat)"""
+    question = sanitize_input(question)
+    options = [sanitize_input(opt) for opt in options]
+    answer = answer.upper().strip() if isinstance(answer, str) else ""
+    if not question:
+        return None, "Treść pytania jest wymagana!"
+    if len(options) != 4 or not all(options):
+        return None, "Wszystkie opcje są wymagane!"
+    if len(answer) != 1 or answer not in "ABCD":
+        return None, "Poprawna odpowiedź musi być A, B, C lub D!"
+    if len(question) > MAX_QUESTION_LEN:
+        return None, f"Pytanie może mieć maksymalnie {MAX_QUESTION_LEN} znaków!"
+    if any(len(opt) > MAX_OPTION_LEN for opt in options):
+        return None, f"Opcje mogą mieć maksymalnie {MAX_OPTION_LEN} znaków!"
+    return {"question": question, "options": options, "correct": "ABCD".index(answer)}, ""
+
+
 # ================== POŁĄCZENIE Z BAZĄ DANYCH ==================
 
+STORAGE = None
+
+
+def get_storage() -> QuizStorage:
+    """Zwraca aktywny backend danych (tworzony przy pierwszym użyciu wg STORAGE_BACKEND)"""
+    global STORAGE
+    if STORAGE is None:
+        STORAGE = create_storage(STORAGE_BACKEND, DB_CONFIG, SQLITE_PATH, API_URL)
+        if OFFLINE_REPLICA_PATH:
+            STORAGE = OfflineStorage(STORAGE, OFFLINE_REPLICA_PATH)
+    return STORAGE
+
+
+def set_storage(storage: QuizStorage):
+    """Podmienia backend danych (np. na SQLite w benchmarkach)"""
+    global STORAGE
+    STORAGE = storage
+    invalidate_progression()
+
+
+QUESTION_BANK = None
+PROGRESSION = None
+PROGRESSION_LOADED_AT = 0.0
+
+
+def get_progression() -> Optional[ProgressionGraph]:
+    """Graf odblokowywania modułów - budowany z jednego zapytania i trzymany PROGRESSION_TTL.
+    Gdy baza nie odpowiada, zwraca poprzedni graf (albo None)"""
+    global PROGRESSION, PROGRESSION_LOADED_AT
+    if PROGRESSION is None or time.monotonic() - PROGRESSION_LOADED_AT > PROGRESSION_TTL:
+        modules = get_storage().get_module_order()
+        if modules is not None:
+            PROGRESSION = ProgressionGraph(modules)
+            PROGRESSION_LOADED_AT = time.monotonic()
+    return PROGRESSION
+
+
+def invalidate_progression():
+    """Po zmianie listy lub kolejności modułów graf budowany jest od nowa przy następnym użyciu"""
+    global PROGRESSION
+    PROGRESSION = None
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    """Zwraca bank pytań zmapowany do pamięci (otwierany przy pierwszym użyciu) albo None"""
+    global QUESTION_BANK
+    if QUESTION_BANK is None and QUESTION_BANK_PATH:
+        QUESTION_BANK = open_question_bank(QUESTION_BANK_PATH)
+    return QUESTION_BANK
+
+
 def get_db_connection():
-    """Tworzy połączenie z bazą danych MySQL"""
+    """Tworzy bezpośrednie połączenie z bazą danych MySQL (dla narzędzi administracyjnych)"""
+    storage = get_storage()
+    if isinstance(storage, OfflineStorage):
+        storage = storage.primary
+    if not isinstance(storage, MySQLStorage):
+        return None
+    from mysql.connector import Error
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
+        return storage.connect()
     except Error as e:
         print(f"Błąd połączenia z bazą danych: {e}")
         return None
@@ -105,479 +226,348 @@ def get_db_connection():
 
 def init_database():
     """Inicjalizuje bazę danych i tworzy tabele jeśli nie istnieją"""
-    try:
-        # Połączenie bez wyboru bazy danych (do utworzenia bazy)
-        config_no_db = DB_CONFIG.copy()
-        db_name = config_no_db.pop('database')
-        
-        connection = mysql.connector.connect(**config_no_db)
-        cursor = connection.cursor()
-        
-        # Utworzenie bazy danych jeśli nie istnieje
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
-        cursor.execute(f"USE {db_name}")
-        
-        # Tabela użytkowników
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                username VARCHAR(20) PRIMARY KEY,
-                password_hash VARCHAR(64) NOT NULL,
-                is_mod BOOLEAN DEFAULT FALSE,
-                xp INT DEFAULT 0,
-                stats_correct INT DEFAULT 0,
-                stats_wrong INT DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-        
-        # Tabela modułów
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS modules (
-                module_name VARCHAR(50) PRIMARY KEY,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-        
-        # Tabela pytań
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS questions (
-                question_id INT AUTO_INCREMENT PRIMARY KEY,
-                module_name VARCHAR(50) NOT NULL,
-                question_text TEXT NOT NULL,
-                option_a VARCHAR(200) NOT NULL,
-                option_b VARCHAR(200) NOT NULL,
-                option_c VARCHAR(200) NOT NULL,
-                option_d VARCHAR(200) NOT NULL,
-                correct_answer INT NOT NULL CHECK (correct_answer BETWEEN 0 AND 3),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (module_name) REFERENCES modules(module_name) ON DELETE CASCADE,
-                INDEX idx_module (module_name)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-        
-        # Tabela osiągnięć użytkowników
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_achievements (
-                username VARCHAR(20),
-                achievement_id VARCHAR(50),
-                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (username, achievement_id),
-                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-        
-        # Tabela odblokowanych modułów użytkowników
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_unlocked_modules (
-                username VARCHAR(20),
-                module_name VARCHAR(50),
-                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (username, module_name),
-                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE,
-                FOREIGN KEY (module_name) REFERENCES modules(module_name) ON DELETE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """)
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
+    if get_storage().init_database(DEFAULT_MODULES):
         print("Baza danych zainicjalizowana pomyślnie.")
         return True
-    except Error as e:
-        print(f"Błąd przy inicjalizacji bazy danych: {e}")
-        return False
+    return False
+
+
+DATABASE_THREAD = None
+DATABASE_READY = False
+QUERY_MONITOR = QueryMonitor() if QUERY_MONITOR_ENABLED else None
+
+
+def prepare_database():
+    """Przygotowanie bazy przy starcie: przy aktualnym schemacie jedno zapytanie o wersję"""
+    return get_storage().ensure_schema(DEFAULT_MODULES)
+
+
+def start_database_preparation():
+    """Uruchamia prepare_database w tle, żeby ekran logowania pojawił się od razu"""
+    global DATABASE_THREAD
+
+    def prepare():
+        global DATABASE_READY
+        if QUERY_MONITOR is not None:
+            QUERY_MONITOR.attach(get_storage())
+        DATABASE_READY = prepare_database()
+
+    DATABASE_THREAD = threading.Thread(target=prepare, name="prepare_database", daemon=True)
+    DATABASE_THREAD.start()
+
+
+def wait_for_database() -> bool:
+    """Czeka na przygotowanie bazy; po nieudanej próbie ponawia ją"""
+    global DATABASE_THREAD, DATABASE_READY
+    if DATABASE_THREAD is not None:
+        DATABASE_THREAD.join()
+        DATABASE_THREAD = None
+    if not DATABASE_READY:
+        DATABASE_READY = prepare_database()
+    return DATABASE_READY
+
+
+def database_error_message() -> str:
+    """Komunikat, gdy operacja nie powiodła się po stronie bazy"""
+    if get_storage().pending_schema:
+        return "Schemat bazy wymaga migracji - skontaktuj się z administratorem"
+    return "Baza danych niedostępna - spróbuj ponownie"
+
+
+def get_db_stats() -> Dict[str, Dict]:
+    """Zwraca liczniki wywołań, błędów, ponowień i czasu wykonania operacji na bazie"""
+    return get_storage().get_db_stats()
+
+
+def is_db_available():
+    """Czy ostatnia operacja na bazie w bieżącym wątku się powiodła ("brak danych" czy awaria)"""
+    return get_storage().is_available()
+
+
+# Operacje zlecane z pętli ekranów (async_data.py) - ekran sprawdza wynik raz na klatkę
+DATA = AsyncData(is_available=is_db_available)
 
 
 # ================== OPERACJE NA BAZIE DANYCH ==================
 
 def get_all_users() -> Dict:
     """Pobiera wszystkich użytkowników z bazy danych"""
-    connection = get_db_connection()
-    if not connection:
-        return {}
-    
-    users = {}
-    try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Pobierz użytkowników
-        cursor.execute("SELECT * FROM users")
-        user_rows = cursor.fetchall()
-        
-        for user_row in user_rows:
-            username = user_row['username']
-            
-            # Pobierz osiągnięcia
-            cursor.execute("SELECT achievement_id FROM user_achievements WHERE username = %s", (username,))
-            achievements = [row['achievement_id'] for row in cursor.fetchall()]
-            
-            # Pobierz odblokowane moduły
-            cursor.execute("SELECT module_name FROM user_unlocked_modules WHERE username = %s", (username,))
-            unlocked = [row['module_name'] for row in cursor.fetchall()]
-            
-            users[username] = {
-                'pw': user_row['password_hash'],
-                'is_mod': bool(user_row['is_mod']),
-                'xp': user_row['xp'],
-                'stats_correct': user_row['stats_correct'],
-                'stats_wrong': user_row['stats_wrong'],
-                'achievements': achievements,
-                'unlocked': unlocked
-            }
-        
-        cursor.close()
-    except Error as e:
-        print(f"Błąd przy pobieraniu użytkowników: {e}")
-    finally:
-        connection.close()
-    
-    return users
+    return get_storage().get_all_users()
 
 
 def save_user(username: str, user_data: Dict):
     """Zapisuje lub aktualizuje użytkownika w bazie danych"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        
-        # Sprawdź czy użytkownik istnieje
-        cursor.execute("SELECT username FROM users WHERE username = %s", (username,))
-        exists = cursor.fetchone() is not None
-        
-        if exists:
-            # Aktualizuj użytkownika
-            cursor.execute("""
-                UPDATE users 
-                SET password_hash = %s, is_mod = %s, xp = %s, 
-                    stats_correct = %s, stats_wrong = %s
-                WHERE username = %s
-            """, (
-                user_data['pw'],
-                user_data.get('is_mod', False),
-                user_data.get('xp', 0),
-                user_data.get('stats_correct', 0),
-                user_data.get('stats_wrong', 0),
-                username
-            ))
-        else:
-            # Dodaj nowego użytkownika
-            cursor.execute("""
-                INSERT INTO users (username, password_hash, is_mod, xp, stats_correct, stats_wrong)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                username,
-                user_data['pw'],
-                user_data.get('is_mod', False),
-                user_data.get('xp', 0),
-                user_data.get('stats_correct', 0),
-                user_data.get('stats_wrong', 0)
-            ))
-        
-        # Aktualizuj osiągnięcia
-        cursor.execute("DELETE FROM user_achievements WHERE username = %s", (username,))
-        for achievement in user_data.get('achievements', []):
-            cursor.execute("""
-                INSERT INTO user_achievements (username, achievement_id)
-                VALUES (%s, %s)
-            """, (username, achievement))
-        
-        # Aktualizuj odblokowane moduły
-        cursor.execute("DELETE FROM user_unlocked_modules WHERE username = %s", (username,))
-        for module in user_data.get('unlocked', []):
-            cursor.execute("""
-                INSERT INTO user_unlocked_modules (username, module_name)
-                VALUES (%s, %s)
-            """, (username, module))
-        
-        connection.commit()
-        cursor.close()
-        return True
-    except Error as e:
-        print(f"Błąd przy zapisywaniu użytkownika: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
+    return get_storage().save_user(username, user_data)
+
+
+def create_user(username: str, password_hash: str, is_mod: bool = False) -> Optional[bool]:
+    """Zakłada konto z odblokowanym pierwszym modułem.
+    True - konto założone, False - nazwa zajęta, None - błąd bazy"""
+    return get_storage().create_user(username, password_hash, is_mod)
+
+
+def update_password_hash(username: str, old_hash: str, new_hash: str) -> bool:
+    """Zmienia hash hasła, jeśli w bazie jest nadal old_hash"""
+    return get_storage().update_password_hash(username, old_hash, new_hash)
+
+
+def ensure_first_module(username: str) -> bool:
+    """Odblokowuje pierwszy moduł kontu, które nie ma żadnego"""
+    return get_storage().ensure_first_module(username)
 
 
 def get_quiz_data() -> Dict:
-    """Pobiera wszystkie pytania quizu z bazy danych, pogrupowane według modułów"""
-    connection = get_db_connection()
-    if not connection:
-        return {}
-    
-    quiz_data = {}
-    try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Pobierz wszystkie moduły
-        cursor.execute("SELECT module_name FROM modules")
-        modules = [row['module_name'] for row in cursor.fetchall()]
-        
-        # Dla każdego modułu pobierz pytania
-        for module in modules:
-            cursor.execute("""
-                SELECT question_text, option_a, option_b, option_c, option_d, correct_answer
-                FROM questions
-                WHERE module_name = %s
-            """, (module,))
-            
-            questions = []
-            for row in cursor.fetchall():
-                questions.append({
-                    'question': row['question_text'],
-                    'options': [
-                        row['option_a'],
-                        row['option_b'],
-                        row['option_c'],
-                        row['option_d']
-                    ],
-                    'correct': row['correct_answer']
-                })
-            
-            quiz_data[module] = questions
-        
-        cursor.close()
-    except Error as e:
-        print(f"Błąd przy pobieraniu danych quizu: {e}")
-    finally:
-        connection.close()
-    
-    return quiz_data
+    """Pobiera wszystkie pytania quizu z bazy danych (lub banku pytań), pogrupowane według modułów"""
+    bank = get_question_bank()
+    if bank is not None:
+        return bank.quiz_data()
+    return get_storage().get_quiz_data()
+
+
+def get_module_names() -> List[str]:
+    """Nazwy modułów w kolejności przejścia - bez pobierania pytań (lista w wyborze modułu)"""
+    bank = get_question_bank()
+    if bank is not None:
+        return bank.module_names()
+    return [name for name, _ in get_storage().get_module_order() or []]
 
 
 def add_module(module_name: str):
-    """Dodaje nowy moduł do bazy danych"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("INSERT IGNORE INTO modules (module_name) VALUES (%s)", (module_name,))
-        connection.commit()
-        cursor.close()
-        return True
-    except Error as e:
-        print(f"Błąd przy dodawaniu modułu: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
+    """Dodaje nowy moduł do bazy danych (na końcu kolejności)"""
+    result = get_storage().add_module(module_name)
+    invalidate_progression()
+    return result
+
+
+def set_module_order(modules: List[Tuple[str, Optional[str]]]) -> bool:
+    """Ustawia kolejność modułów i wymagane moduły: [(nazwa, wymagany moduł albo None)]"""
+    result = get_storage().set_module_order(modules)
+    invalidate_progression()
+    return result
 
 
 def add_question(module_name: str, question_data: Dict):
     """Dodaje nowe pytanie do bazy danych"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("""
-            INSERT INTO questions (module_name, question_text, option_a, option_b, option_c, option_d, correct_answer)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (
-            module_name,
-            question_data['question'],
-            question_data['options'][0],
-            question_data['options'][1],
-            question_data['options'][2],
-            question_data['options'][3],
-            question_data['correct']
-        ))
-        connection.commit()
-        cursor.close()
-        return True
-    except Error as e:
-        print(f"Błąd przy dodawaniu pytania: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
-
-
-def delete_question(module_name: str, question_index: int):
-    """Usuwa pytanie z bazy danych"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        # Pobierz ID pytania na podstawie indeksu w module
-        cursor.execute("""
-            SELECT question_id FROM questions
-            WHERE module_name = %s
-            ORDER BY question_id
-            LIMIT 1 OFFSET %s
-        """, (module_name, question_index))
-        
-        result = cursor.fetchone()
-        if result:
-            question_id = result[0]
-            cursor.execute("DELETE FROM questions WHERE question_id = %s", (question_id,))
-            connection.commit()
-            cursor.close()
-            return True
-        cursor.close()
-        return False
-    except Error as e:
-        print(f"Błąd przy usuwaniu pytania: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
+    return get_storage().add_question(module_name, question_data)
+
+
+def add_questions(module_name: str, questions: List[Dict]) -> bool:
+    """Dodaje partię pytań w jednej transakcji (import z pliku)"""
+    return get_storage().add_questions(module_name, questions)
+
+
+def delete_question_by_id(module_name: str, question_id: int) -> bool:
+    """Usuwa pytanie o podanym ID; False, gdy już go nie ma"""
+    return get_storage().delete_question_by_id(module_name, question_id)
 
 
 def get_module_questions(module_name: str) -> List[Dict]:
     """Pobiera wszystkie pytania dla danego modułu"""
-    connection = get_db_connection()
-    if not connection:
-        return []
-    
-    questions = []
-    try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT question_text, option_a, option_b, option_c, option_d, correct_answer
-            FROM questions
-            WHERE module_name = %s
-        """, (module_name,))
-        
-        for row in cursor.fetchall():
-            questions.append({
-                'question': row['question_text'],
-                'options': [
-                    row['option_a'],
-                    row['option_b'],
-                    row['option_c'],
-                    row['option_d']
-                ],
-                'correct': row['correct_answer']
-            })
-        
-        cursor.close()
-    except Error as e:
-        print(f"Błąd przy pobieraniu pytań modułu: {e}")
-    finally:
-        connection.close()
-    
-    return questions
-
-
-def update_user_stats(username: str, xp_delta: int = 0, correct_delta: int = 0, wrong_delta: int = 0):
-    """Aktualizuje statystyki użytkownika"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("""
-            UPDATE users 
-            SET xp = xp + %s, stats_correct = stats_correct + %s, stats_wrong = stats_wrong + %s
-            WHERE username = %s
-        """, (xp_delta, correct_delta, wrong_delta, username))
-        connection.commit()
-        cursor.close()
-        return True
-    except Error as e:
-        print(f"Błąd przy aktualizacji statystyk użytkownika: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
+    return get_storage().get_module_questions(module_name)
+
+
+def update_user_stats(username: str, xp_delta: int = 0, correct_delta: int = 0, wrong_delta: int = 0,
+                      module_name: Optional[str] = None):
+    """Aktualizuje statystyki użytkownika.
+    Jeśli podano moduł, w tej samej transakcji aktualizuje też statystyki zbiorcze modułu."""
+    return get_storage().update_user_stats(username, xp_delta, correct_delta, wrong_delta, module_name)
 
 
 def get_user_stats(username: str) -> Optional[Dict]:
     """Pobiera statystyki użytkownika"""
-    connection = get_db_connection()
-    if not connection:
-        return None
-    
-    try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT xp, stats_correct, stats_wrong, is_mod
-            FROM users WHERE username = %s
-        """, (username,))
-        result = cursor.fetchone()
-        cursor.close()
-        return result
-    except Error as e:
-        print(f"Błąd przy pobieraniu statystyk użytkownika: {e}")
-        return None
-    finally:
-        connection.close()
+    return get_storage().get_user_stats(username)
+
+
+def get_leaderboard(limit: int = 5) -> List[Tuple[str, Dict]]:
+    """Ranking TOP N wg XP: [(nazwa, {xp})]"""
+    return get_storage().get_leaderboard(limit)
 
 
 def unlock_module_for_user(username: str, module_name: str):
-    """Odblokowuje moduł dla użytkownika"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("""
-            INSERT IGNORE INTO user_unlocked_modules (username, module_name)
-            VALUES (%s, %s)
-        """, (username, module_name))
-        connection.commit()
-        cursor.close()
-        return True
-    except Error as e:
-        print(f"Błąd przy odblokowywaniu modułu: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
+    """Odblokowuje moduł dla użytkownika; True tylko gdy został właśnie odblokowany"""
+    return get_storage().unlock_module_for_user(username, module_name)
 
 
 def get_user_unlocked_modules(username: str) -> List[str]:
     """Pobiera listę odblokowanych modułów użytkownika"""
-    connection = get_db_connection()
-    if not connection:
-        return []
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT module_name FROM user_unlocked_modules WHERE username = %s
-        """, (username,))
-        modules = [row[0] for row in cursor.fetchall()]
-        cursor.close()
-        return modules
-    except Error as e:
-        print(f"Błąd przy pobieraniu odblokowanych modułów: {e}")
-        return []
-    finally:
-        connection.close()
+    return get_storage().get_user_unlocked_modules(username)
 
 
 def get_user_achievements(username: str) -> List[str]:
     """Pobiera listę osiągnięć użytkownika"""
-    connection = get_db_connection()
-    if not connection:
-        return []
-    
-    try:
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT achievement_id FROM user_achievements WHERE username = %s
-        """, (username,))
-        achievements = [row[0] for row in cursor.fetchall()]
-        cursor.close()
-        return achievements
-    except Error as e:
-        print(f"Błąd przy pobieraniu osiągnięć: {e}")
+    return get_storage().get_user_achievements(username)
+
+
+def get_question_weights(username: str, module_name: str) -> List[Tuple[int, int, int]]:
+    """Pobiera ID pytań modułu wraz z liczbą poprawnych i błędnych odpowiedzi użytkownika"""
+    return get_storage().get_question_weights(username, module_name)
+
+
+def get_questions_by_ids(question_ids: List[int]) -> List[Dict]:
+    """Pobiera wskazane pytania zachowując kolejność podanych ID"""
+    return get_storage().get_questions_by_ids(question_ids)
+
+
+def insert_question_attempts(rows: List[Tuple]) -> bool:
+    """Zapisuje partię odpowiedzi w jednej transakcji i przyrostowo aktualizuje agregaty.
+    Wiersz: (username, question_id, chosen_option, is_correct, latency_ms, answered_at)"""
+    return get_storage().insert_question_attempts(rows)
+
+
+def get_question_difficulty(module_name: str) -> List[Dict]:
+    """Pobiera trudność pytań modułu (od najtrudniejszego) z zagregowanego widoku"""
+    return get_storage().get_question_difficulty(module_name)
+
+
+def get_user_module_stats(username: str) -> Dict[str, Dict]:
+    """Pobiera statystyki zbiorcze użytkownika dla każdego modułu (odczyt po kluczu głównym)"""
+    return get_storage().get_user_module_stats(username)
+
+
+def get_module_stats() -> Dict[str, Dict]:
+    """Pobiera statystyki zbiorcze wszystkich modułów"""
+    return get_storage().get_module_stats()
+
+
+def rebuild_stats_rollups() -> bool:
+    """Przelicza od nowa statystyki pytań (trudność, wagi losowania) z dziennika odpowiedzi"""
+    return get_storage().rebuild_stats_rollups()
+
+
+def accuracy_percent(correct: int, wrong: int) -> int:
+    """Zwraca skuteczność w procentach (0 gdy brak odpowiedzi)"""
+    total = correct + wrong
+    return round(100 * correct / total) if total else 0
+
+
+class AttemptLogBuffer:
+    """Bufor odpowiedzi zapisywanych partiami do tabeli question_attempts.
+    add() wywołuje wątek interfejsu, flush() - wątek puli DATA (i atexit)"""
+
+    def __init__(self, batch_size=ATTEMPT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rows = []
+        self.lock = threading.Lock()  # Zamiana listy rows
+        self.flush_lock = threading.Lock()  # Jeden zapis naraz - odpowiedzi w kolejności udzielenia
+        self.pending = None  # DataRequest zapisu zleconego przez add()
+
+    def add(self, username, question_id, chosen_option, correct, latency_ms):
+        with self.lock:
+            self.rows.append((username, question_id, chosen_option, bool(correct), int(latency_ms), datetime.now()))
+            full = len(self.rows) >= self.batch_size
+        # Zapis w tle - ponowienia przy awarii bazy nie blokują pętli ekranu
+        if full and (self.pending is None or self.pending.state != LOADING):
+            self.pending = DATA.submit(self.flush)
+
+    def flush(self):
+        """Zapisuje zbuforowane odpowiedzi; przy błędzie zostają w buforze do kolejnej próby"""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.rows = self.rows, []
+            if not batch:
+                return True
+            by_user = {}
+            for row in batch:
+                by_user.setdefault(row[0], []).append(row)
+            # Osobno dla każdego gracza - usługa quiz_api przyjmuje zapis tylko w sesji właściciela konta
+            failed = [row for rows in by_user.values() if not insert_question_attempts(rows) for row in rows]
+            if not failed:
+                return True
+            with self.lock:
+                self.rows = failed + self.rows
+            return False
+
+
+ATTEMPT_LOG = AttemptLogBuffer()
+atexit.register(ATTEMPT_LOG.flush)
+
+
+# ================== LOSOWANIE PYTAŃ ==================
+
+class FenwickSampler:
+    """Losowanie ważone bez zwracania oparte na drzewie Fenwicka (O(log n) na losowanie)"""
+
+    def __init__(self, weights):
+        self.n = len(weights)
+        self.weights = [max(float(w), 0.0) for w in weights]
+        self.tree = [0.0] * (self.n + 1)
+        # Budowa drzewa w czasie O(n)
+        for i in range(1, self.n + 1):
+            self.tree[i] += self.weights[i - 1]
+            parent = i + (i & -i)
+            if parent <= self.n:
+                self.tree[parent] += self.tree[i]
+        self.total = sum(self.weights)
+        self.top_bit = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def _add(self, index, delta):
+        i = index + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def draw(self, rng=random):
+        """Losuje indeks proporcjonalnie do wagi i usuwa go z puli"""
+        if self.total <= 0:
+            return None
+        target = rng.random() * self.total
+        pos = 0
+        step = self.top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= target:
+                target -= self.tree[nxt]
+                pos = nxt
+            step >>= 1
+        # Zabezpieczenie przed błędami zaokrągleń liczb zmiennoprzecinkowych
+        if pos >= self.n or self.weights[pos] <= 0:
+            pos = next((i for i in range(self.n - 1, -1, -1) if self.weights[i] > 0), None)
+            if pos is None:
+                return None
+        weight = self.weights[pos]
+        self.weights[pos] = 0.0
+        self.total -= weight
+        self._add(pos, -weight)
+        return pos
+
+
+def question_weight(correct_count, wrong_count):
+    """Waga pytania - częściej losujemy pytania, na które użytkownik odpowiadał błędnie"""
+    return (1.0 + WRONG_ANSWER_WEIGHT * wrong_count) / (1.0 + correct_count)
+
+
+def weighted_sample(weights, k, rng=random):
+    """Zwraca k indeksów wylosowanych bez zwracania zgodnie z wagami"""
+    sampler = FenwickSampler(weights)
+    picked = []
+    for _ in range(min(k, sampler.n)):
+        index = sampler.draw(rng)
+        if index is None:
+            break
+        picked.append(index)
+    return picked
+
+
+def get_quiz_sample(username: str, module_name: str, size: int = QUIZ_SIZE) -> List[Dict]:
+    """Losuje pytania do quizu z uwzględnieniem wyników użytkownika.
+    Pobiera pełną treść tylko wylosowanych pytań."""
+    bank = get_question_bank()
+    if bank is not None:
+        # Treść pytań z banku, wyniki użytkownika z bazy (przy awarii bazy - równe wagi).
+        # Pytania bez ID z bazy (bank z quiz_data.json) - równe wagi, bez zapytania o wyniki
+        questions = bank.module_questions(module_name)
+        ids = questions.ids()
+        results = {}
+        if any(qid != NO_QUESTION_ID for qid in ids):
+            results = {row[0]: row[1:] for row in get_question_weights(username, module_name)}
+        weights = [question_weight(*results.get(qid, (0, 0))) for qid in ids]
+        return [questions[i] for i in weighted_sample(weights, size)]
+    rows = get_question_weights(username, module_name)
+    if not rows:
         return []
-    finally:
-        connection.close()
+    weights = [question_weight(correct, wrong) for _, correct, wrong in rows]
+    picked = weighted_sample(weights, size)
+    return get_questions_by_ids([rows[i][0] for i in picked])
 
 
 def get_level(xp):
@@ -601,44 +591,18 @@ ACHIEVEMENTS_DEF = {
 
 def check_achievement(username, ach_id):
     """Sprawdza i dodaje osiągnięcie użytkownika jeśli jeszcze go nie ma"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        # Sprawdź czy osiągnięcie już istnieje
-        cursor.execute("""
-            SELECT COUNT(*) FROM user_achievements
-            WHERE username = %s AND achievement_id = %s
-        """, (username, ach_id))
-        
-        if cursor.fetchone()[0] == 0:
-            # Dodaj osiągnięcie
-            cursor.execute("""
-                INSERT INTO user_achievements (username, achievement_id)
-                VALUES (%s, %s)
-            """, (username, ach_id))
-            connection.commit()
-            cursor.close()
-            return True
-        cursor.close()
-        return False
-    except Error as e:
-        print(f"Błąd przy sprawdzaniu osiągnięcia: {e}")
-        connection.rollback()
-        return False
-    finally:
-        connection.close()
+    return get_storage().check_achievement(username, ach_id)
 
 
 def truncate_text(text, font, max_width):
+    if PROFILER is not None: PROFILER.count("truncate_text")
     if font.size(text)[0] <= max_width: return text
     while font.size(text + "...")[0] > max_width and len(text) > 0: text = text[:-1]
     return text + "..."
 
 
 def wrap_text(text, font, max_width):
+    if PROFILER is not None: PROFILER.count("wrap_text")
     words = text.split(' ')
     lines, current_line = [], []
     for word in words:
@@ -682,6 +646,44 @@ def get_content_offset(screen_width, screen_height):
 
 
 # ================== UI ELEMENTY ==================
+class WidgetAtlas:
+    """Gotowe powierzchnie stanów widżetów - rysowanie widżetu to jeden blit.
+
+    Klucz zawiera rodzaj, rozmiar, skalę, czcionkę i tekst widżetu, więc ekrany
+    budujące przyciski od nowa trafiają w te same powierzchnie. Zmiana skali
+    (Window.apply) czyści atlas; najdawniej użyte wpisy ponad WIDGET_ATLAS_SIZE
+    są usuwane."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.surfaces = OrderedDict()
+        self.renders = 0  # Liczba renderowań (bench_render)
+
+    def get(self, key, render):
+        surfaces = self.surfaces.get(key)
+        if surfaces is None:
+            surfaces = self.surfaces[key] = render()
+            self.renders += 1
+            if len(self.surfaces) > self.limit:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surfaces
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+WIDGET_ATLAS = WidgetAtlas(WIDGET_ATLAS_SIZE)
+
+
+def widget_surface(size):
+    """Nieprzezroczysta powierzchnia w kolorze tła - wszystkie ekrany rysują na BG_COLOR"""
+    surface = pygame.Surface(size)
+    surface.fill(BG_COLOR)
+    return surface
+
+
 class Button:
     def __init__(self, x, y, width, text, font, padding=12, data=None, locked=False, scale=1.0, screen_width=None, center_horizontal=False):
         self.scale = scale
@@ -714,6 +716,23 @@ class Button:
         
         self.y = scale_value(self.base_y, self.scale)
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.atlas_key = ("button", self.width, self.height, self.padding, self.scale, self.font,
+                          tuple(self.text_lines), self.locked)
+        WIDGET_ATLAS.get(self.atlas_key, self.render_states)
+
+    def render_states(self):
+        """Przycisk zablokowany ma jeden stan, pozostałe - zwykły i najechany"""
+        states = {"locked": (BTN_LOCKED, (140, 140, 140))} if self.locked else {
+            "normal": (BTN_COLOR, TEXT_COLOR), "hover": (BTN_HOVER, TEXT_COLOR)}
+        surfaces = {}
+        for state, (color, text_color) in states.items():
+            surface = widget_surface((self.width, self.height))
+            pygame.draw.rect(surface, color, surface.get_rect(), border_radius=scale_value(8, self.scale))
+            for i, line in enumerate(self.text_lines):
+                surface.blit(self.font.render(line, True, text_color),
+                             (self.padding, self.padding + i * self.line_height))
+            surfaces[state] = surface
+        return surfaces
 
     def set_scale(self, scale, screen_width=None):
         """Ustawia nowy współczynnik skalowania"""
@@ -721,13 +740,8 @@ class Button:
         self.update_position_and_size(screen_width)
 
     def draw(self, screen, mouse_pos):
-        color = BTN_LOCKED if self.locked else (BTN_HOVER if self.rect.collidepoint(mouse_pos) else BTN_COLOR)
-        border_radius = scale_value(8, self.scale)
-        pygame.draw.rect(screen, color, self.rect, border_radius=border_radius)
-        for i, line in enumerate(self.text_lines):
-            c = (140, 140, 140) if self.locked else TEXT_COLOR
-            screen.blit(self.font.render(line, True, c),
-                        (self.x + self.padding, self.y + self.padding + i * self.line_height))
+        state = "locked" if self.locked else ("hover" if self.rect.collidepoint(mouse_pos) else "normal")
+        screen.blit(WIDGET_ATLAS.get(self.atlas_key, self.render_states)[state], self.rect)
 
     def clicked(self, event):
         return event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(
@@ -744,6 +758,8 @@ class InputBox:
         self.password = password
         self.screen_width = screen_width
         self.center_horizontal = center_horizontal
+        self.surface = None
+        self.surface_key = None  # (ramka, tekst) wyrenderowane w self.surface
         self.update_rect()
 
     def update_rect(self, screen_width=None):
@@ -763,6 +779,18 @@ class InputBox:
         
         y_pos = scale_value(y, self.scale)
         self.rect = pygame.Rect(x_pos, y_pos, width, height)
+        self.atlas_key = ("input", width, height, self.scale)
+        WIDGET_ATLAS.get(self.atlas_key, self.render_frames)
+
+    def render_frames(self):
+        """Ramka pola w stanie zwykłym (False) i aktywnym (True)"""
+        surfaces = {}
+        for active, color in ((False, (80, 80, 80)), (True, (100, 100, 255))):
+            surface = widget_surface(self.rect.size)
+            pygame.draw.rect(surface, color, surface.get_rect(), border_radius=scale_value(5, self.scale),
+                             width=scale_value(2, self.scale))
+            surfaces[active] = surface
+        return surfaces
 
     def set_scale(self, scale, screen_width=None):
         """Ustawia nowy współczynnik skalowania"""
@@ -780,15 +808,17 @@ class InputBox:
                 self.text += sanitized
 
     def draw(self, screen, font):
-        color = (100, 100, 255) if self.active else (80, 80, 80)
-        border_radius = scale_value(5, self.scale)
-        border_width = scale_value(2, self.scale)
-        pygame.draw.rect(screen, color, self.rect, border_radius=border_radius, width=border_width)
-        display = "*" * len(self.text) if self.password else self.text
-        txt = font.render(display if self.text else self.placeholder, True,
-                          TEXT_COLOR if self.text else (130, 130, 130))
-        padding = scale_value(10, self.scale)
-        screen.blit(txt, (self.rect.x + padding, self.rect.y + padding))
+        # Tekst zmienia się przy pisaniu - pole renderowane od nowa tylko po zmianie
+        key = (self.atlas_key, self.active, font, self.text)
+        if key != self.surface_key:
+            self.surface_key = key
+            self.surface = WIDGET_ATLAS.get(self.atlas_key, self.render_frames)[self.active].copy()
+            display = "*" * len(self.text) if self.password else self.text
+            txt = font.render(display if self.text else self.placeholder, True,
+                              TEXT_COLOR if self.text else (130, 130, 130))
+            padding = scale_value(10, self.scale)
+            self.surface.blit(txt, (padding, padding))
+        screen.blit(self.surface, self.rect)
 
 
 class Checkbox:
@@ -825,685 +855,1261 @@ class Checkbox:
         self.scale = scale
         self.update_rect(screen_width)
 
-    def draw(self, screen, font):
-        border_width = scale_value(2, self.scale)
-        pygame.draw.rect(screen, (200, 200, 200), self.rect, border_width)
-        if self.checked:
-            inflate = scale_value(-8, self.scale)
-            pygame.draw.rect(screen, (100, 255, 100), self.rect.inflate(inflate, inflate))
+    def render_states(self, font):
+        """Pole z etykietą - niezaznaczone (False) i zaznaczone (True)"""
+        label = font.render(self.label, True, TEXT_COLOR)
         label_padding = scale_value(10, self.scale)
-        screen.blit(font.render(self.label, True, TEXT_COLOR), (self.rect.right + label_padding, self.rect.y))
+        size = self.rect.width
+        box = pygame.Rect(0, 0, size, size)
+        surfaces = {}
+        for checked in (False, True):
+            surface = widget_surface((size + label_padding + label.get_width(), max(size, label.get_height())))
+            pygame.draw.rect(surface, (200, 200, 200), box, scale_value(2, self.scale))
+            if checked:
+                inflate = scale_value(-8, self.scale)
+                pygame.draw.rect(surface, (100, 255, 100), box.inflate(inflate, inflate))
+            surface.blit(label, (size + label_padding, 0))
+            surfaces[checked] = surface
+        return surfaces
+
+    def draw(self, screen, font):
+        key = ("checkbox", self.rect.width, self.scale, font, self.label)
+        screen.blit(WIDGET_ATLAS.get(key, lambda: self.render_states(font))[self.checked], self.rect)
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos):
             self.checked = not self.checked
 
 
+def draw_spinner(screen, center, scale, color=(255, 200, 100)):
+    """Obracający się łuk - wskaźnik oczekiwania na operację w tle"""
+    radius = scale_value(18, scale)
+    rect = pygame.Rect(center[0] - radius, center[1] - radius, radius * 2, radius * 2)
+    start = (pygame.time.get_ticks() / 1000 * 2 * math.pi) % (2 * math.pi)
+    pygame.draw.arc(screen, color, rect, start, start + 1.5 * math.pi, max(2, scale_value(4, scale)))
+
+
+def draw_request_state(screen, font, request, screen_width, y, scale):
+    """Wskaźnik ładowania albo komunikat o błędzie żądania DataRequest; zwraca jego stan"""
+    state = request.state
+    if state == LOADING:
+        draw_spinner(screen, (screen_width // 2, y), scale)
+    elif state == ERROR:
+        msg = font.render("Baza danych niedostępna - spróbuj ponownie", True, (255, 100, 100))
+        screen.blit(msg, (screen_width // 2 - msg.get_width() // 2, y))
+    return state
+
+
+# ================== PROFILOWANIE EKRANÓW ==================
+PROFILER = None
+
+
+def enable_profiling(output_dir):
+    """Włącza profilowanie ekranów; wyniki zapisywane są przy wyjściu z aplikacji"""
+    global PROFILER
+    if PROFILER is None:
+        PROFILER = FrameProfiler(output_dir)
+        atexit.register(PROFILER.dump)
+    return PROFILER
+
+
+def get_font(size):
+    """Czcionka interfejsu; w trybie profilowania zlicza wywołania font.render"""
+    if PROFILER is None:
+        return pygame.font.SysFont("Arial", size)
+    return pygame.font.SysFont("Arial", size, constructor=PROFILER.font_constructor(pygame))
+
+
+# ================== NAKŁADKA MONITORA ZAPYTAŃ ==================
+SHOW_QUERY_OVERLAY = False
+OVERLAY_FONT = None
+
+
+def overlay_panel(lines, color):
+    """Półprzezroczysty panel z liniami tekstu (nakładki diagnostyczne)"""
+    global OVERLAY_FONT
+    if OVERLAY_FONT is None:
+        OVERLAY_FONT = pygame.font.SysFont("Consolas", OVERLAY_FONT_SIZE)
+    surfaces = [OVERLAY_FONT.render(line, True, color) for line in lines]
+    width = max(s.get_width() for s in surfaces) + 16
+    height = sum(s.get_height() for s in surfaces) + 12
+    panel = pygame.Surface((width, height), pygame.SRCALPHA)
+    panel.fill(OVERLAY_BG)
+    y = 6
+    for surface in surfaces:
+        panel.blit(surface, (8, y))
+        y += surface.get_height()
+    return panel
+
+
+def draw_query_overlay(screen):
+    """Rysuje w prawym górnym rogu statystyki zapytań z ostatnich sekund"""
+    stats = QUERY_MONITOR.snapshot()
+    lines = [
+        f"SQL: {stats['queries_per_second']:.1f} zap/s, {stats['calls_per_second']:.1f} wyw/s",
+        f"p95: {stats['p95_ms']:.1f} ms (połączenie {stats['connect_p95_ms']:.1f} ms)",
+        f"wiersze/s: {stats['rows_per_second']:.0f}, błędy: {stats['errors']}",
+    ]
+    lines += [f"{name}: {total:.0f} ms / {count}" for name, total, count in QUERY_MONITOR.slowest_operations()]
+    panel = overlay_panel(lines, (120, 255, 120))
+    screen.blit(panel, (screen.get_width() - panel.get_width() - 8, 8))
+
+
+def draw_profiler_overlay(screen):
+    """Rysuje w lewym dolnym rogu FPS, czas klatki i liczniki wywołań (tryb profilowania)"""
+    panel = overlay_panel(PROFILER.overlay_lines(), (255, 220, 120))
+    screen.blit(panel, (8, screen.get_height() - panel.get_height() - 8))
+
+
+def present_frame():
+    """Wyświetla klatkę - wszystkie ekrany kończą nią rysowanie"""
+    if SHOW_QUERY_OVERLAY and QUERY_MONITOR is not None:
+        draw_query_overlay(pygame.display.get_surface())
+    if PROFILER is not None:
+        draw_profiler_overlay(pygame.display.get_surface())
+    pygame.display.flip()
+    if PROFILER is not None:
+        PROFILER.end_frame()
+
+
+def get_events():
+    """Zdarzenia dla pętli ekranu; F3 (nakładka monitora zapytań) obsługiwany jest tutaj"""
+    global SHOW_QUERY_OVERLAY
+    events = []
+    for event in pygame.event.get():
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            SHOW_QUERY_OVERLAY = not SHOW_QUERY_OVERLAY
+            continue
+        events.append(event)
+    return events
+
+
+# ================== OKNO I MASZYNA STANÓW EKRANÓW ==================
+# Wszystkie ekrany działają w jednej pętli (App.run): układ -> update -> draw -> klatka ->
+# zdarzenia. Ekran to obiekt Screen, a przejścia między ekranami to operacje na stosie
+# (push / pop / replace). Tylko Window wywołuje set_mode: zdarzenia VIDEORESIZE z
+# przeciągania rogu okna są zbierane, a skala, czcionka i układ ekranu przeliczane są
+# raz - gdy rozmiar nie zmienia się przez RESIZE_DEBOUNCE_MS
+
+
+class Window:
+    """Okno aplikacji: rozmiar (co najmniej MIN_WIDTH x MIN_HEIGHT), skala i czcionka interfejsu"""
+
+    def __init__(self, size):
+        pygame.display.set_mode(size, pygame.RESIZABLE)
+        self.fonts = {}  # Rozmiar -> czcionka; SysFont tylko przy nowym rozmiarze
+        self.pending_size = None
+        self.pending_since = 0
+        self.scale = None
+        self.apply(self.surface.get_size())
+
+    @property
+    def surface(self):
+        return pygame.display.get_surface()
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def apply(self, size):
+        self.width, self.height = size
+        scale = get_scale_factor(self.width, self.height)
+        if scale != self.scale:
+            WIDGET_ATLAS.clear()  # Powierzchnie widżetów w starej skali nie wrócą
+        self.scale = scale
+        font_size = get_font_size(self.scale)
+        if font_size not in self.fonts:
+            self.fonts[font_size] = get_font(font_size)
+        self.font = self.fonts[font_size]
+
+    def request_resize(self, width, height):
+        """VIDEORESIZE - zapamiętywany jest tylko ostatni rozmiar"""
+        self.pending_size = (max(width, MIN_WIDTH), max(height, MIN_HEIGHT))
+        self.pending_since = pygame.time.get_ticks()
+
+    def settle(self) -> bool:
+        """Stosuje rozmiar niezmieniony od RESIZE_DEBOUNCE_MS; True - ekran wymaga nowego układu"""
+        if self.pending_size is None or pygame.time.get_ticks() - self.pending_since < RESIZE_DEBOUNCE_MS:
+            return False
+        size, self.pending_size = self.pending_size, None
+        # Powierzchnię okna SDL zmienia sam - set_mode tylko przy wymuszaniu minimalnego rozmiaru
+        if self.surface.get_size() != size:
+            pygame.display.set_mode(size, pygame.RESIZABLE)
+        if size == self.size:
+            return False
+        self.apply(size)
+        return True
+
+
+class Screen:
+    """Ekran aplikacji - stan między klatkami trzymany jest w atrybutach"""
+    name = "screen"  # Nazwa w trybie profilowania i w bench_render.py
+
+    def __init__(self, app):
+        self.app = app
+        self.layout_size = None
+
+    def layout(self, window):
+        """Pozycje i rozmiary elementów - przy wejściu na ekran i raz na ustalony rozmiar okna"""
+        self.layout_size = window.size
+        self.screen_width, self.screen_height = window.size
+        self.scale, self.font = window.scale, window.font
+
+    def resume(self):
+        """Powrót na ekran po zamknięciu ekranu otwartego nad nim"""
+
+    def update(self):
+        """Raz na klatkę przed rysowaniem - wyniki operacji w tle i przejścia zależne od czasu"""
+
+    def draw(self, screen, mouse):
+        raise NotImplementedError
+
+    def handle_event(self, event):
+        pass
+
+
+class App:
+    """Stos ekranów i jedyna pętla zdarzeń aplikacji"""
+
+    def __init__(self, window):
+        self.window = window
+        self.stack: List[Screen] = []
+        self.clock = pygame.time.Clock()
+
+    @property
+    def current(self) -> Optional[Screen]:
+        return self.stack[-1] if self.stack else None
+
+    def push(self, screen: Screen):
+        """Otwiera ekran nad bieżącym"""
+        if PROFILER is not None:
+            PROFILER.enter(screen.name)
+        self.stack.append(screen)
+
+    def pop(self):
+        """Zamyka bieżący ekran i wraca do poprzedniego"""
+        self.close()
+        if self.stack:
+            self.stack[-1].resume()
+
+    def replace(self, screen: Screen):
+        """Zamienia bieżący ekran na inny (np. wybór modułu -> quiz)"""
+        self.close()
+        self.push(screen)
+
+    def close(self):
+        self.stack.pop()
+        if PROFILER is not None:
+            PROFILER.leave()
+
+    def run(self):
+        """Pętla aplikacji - działa, dopóki na stosie jest jakiś ekran"""
+        while self.stack:
+            self.window.settle()
+            screen = self.current
+            # Nowy układ przy wejściu na ekran i po zmianie rozmiaru okna (także w czasie,
+            # gdy ekran był przykryty innym)
+            if screen.layout_size != self.window.size:
+                screen.layout(self.window)
+            screen.update()
+            if screen is not self.current:
+                continue
+            surface = self.window.surface
+            surface.fill(BG_COLOR)
+            screen.draw(surface, pygame.mouse.get_pos())
+            present_frame()
+            for event in get_events():
+                if event.type == pygame.QUIT:
+                    while self.stack:
+                        self.close()
+                    return
+                if event.type == pygame.VIDEORESIZE:
+                    self.window.request_resize(event.w, event.h)
+                elif screen is self.current:
+                    # Zdarzenia po przejściu do innego ekranu dotyczyły poprzedniego - są pomijane
+                    screen.handle_event(event)
+            self.clock.tick(FPS)
+
+
+class MessageScreen(Screen):
+    """Komunikat na środku ekranu przez MESSAGE_MS, potem powrót do poprzedniego ekranu"""
+    name = "message"
+
+    def __init__(self, app, text, color=(255, 100, 100)):
+        super().__init__(app)
+        self.text, self.color = text, color
+        self.shown_at = pygame.time.get_ticks()
+
+    def update(self):
+        if pygame.time.get_ticks() - self.shown_at >= MESSAGE_MS:
+            self.app.pop()
+
+    def draw(self, screen, mouse):
+        msg = self.font.render(self.text, True, self.color)
+        screen.blit(msg, (self.screen_width // 2 - msg.get_width() // 2, self.screen_height // 2))
+
+
 # ================== WIDOKI TABELARYCZNE ==================
 
-def show_achievements(screen, font, username, screen_width, screen_height, scale):
-    back_btn = Button(375, 750, 200, "Powrót", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-    # Kolumny dla tabeli achievementów - wyśrodkowane
-    table_width = scale_value(790, scale)  # przybliżona szerokość tabeli
-    table_start_x = center_x(screen_width, table_width)
-    COL_STATUS = table_start_x + scale_value(20, scale)
-    COL_NAME = table_start_x + scale_value(120, scale)
-    COL_DESC = table_start_x + scale_value(370, scale)
-
-    while True:
-        back_btn.update_position_and_size(screen_width)
-        screen.fill(BG_COLOR);
-        mouse = pygame.mouse.get_pos()
-        title = font.render(f"OSIĄGNIĘCIA UŻYTKOWNIKA: {username}", True, (255, 215, 0))
-        screen.blit(title, (screen_width // 2 - title.get_width() // 2, scale_value(40, scale)))
+class AchievementsScreen(Screen):
+    name = "show_achievements"
+
+    def __init__(self, app, username):
+        super().__init__(app)
+        self.username = username
+        self.user_achievements, self.summary_txt = None, ""
+        self.state = LOADING
+        self.load()
+
+    def load(self):
+        # Dane pobierane raz przy wejściu na ekran (równolegle) - statystyki z gotowych liczników
+        self.request = gather(DATA.submit(get_user_achievements, self.username),
+                              DATA.submit(get_user_stats, self.username))
+
+    def layout(self, window):
+        super().layout(window)
+        scale = self.scale
+        self.back_btn = Button(375, 750, 200, "Powrót", self.font, scale=scale, screen_width=self.screen_width,
+                               center_horizontal=True)
+        self.retry_btn = Button(375, 450, 200, "Ponów", self.font, scale=scale, screen_width=self.screen_width,
+                                center_horizontal=True)
+        # Kolumny dla tabeli achievementów - wyśrodkowane
+        self.table_width = scale_value(790, scale)  # przybliżona szerokość tabeli
+        self.table_start_x = center_x(self.screen_width, self.table_width)
+        self.col_status = self.table_start_x + scale_value(20, scale)
+        self.col_name = self.table_start_x + scale_value(120, scale)
+        self.col_desc = self.table_start_x + scale_value(370, scale)
+
+    def update(self):
+        if self.user_achievements is None and self.request.ready():
+            self.user_achievements, user_stats = self.request.result()
+            user_stats = user_stats or {}
+            correct_total = user_stats.get('stats_correct', 0)
+            wrong_total = user_stats.get('stats_wrong', 0)
+            self.summary_txt = (f"Skuteczność ogółem: {accuracy_percent(correct_total, wrong_total)}% "
+                                f"(poprawne: {correct_total}, błędne: {wrong_total})")
+
+    def draw(self, screen, mouse):
+        font, scale = self.font, self.scale
+        title = font.render(f"OSIĄGNIĘCIA UŻYTKOWNIKA: {self.username}", True, (255, 215, 0))
+        screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, scale_value(40, scale)))
 
         # Nagłówki tabeli
-        h1 = font.render("Status", True, (150, 150, 150))
-        h2 = font.render("Nazwa", True, (150, 150, 150))
-        h3 = font.render("Wymaganie", True, (150, 150, 150))
         header_y = scale_value(100, scale)
-        screen.blit(h1, (COL_STATUS, header_y))
-        screen.blit(h2, (COL_NAME, header_y))
-        screen.blit(h3, (COL_DESC, header_y))
+        screen.blit(font.render("Status", True, (150, 150, 150)), (self.col_status, header_y))
+        screen.blit(font.render("Nazwa", True, (150, 150, 150)), (self.col_name, header_y))
+        screen.blit(font.render("Wymaganie", True, (150, 150, 150)), (self.col_desc, header_y))
         line_y = scale_value(130, scale)
-        line_start_x = table_start_x + scale_value(0, scale)
-        line_end_x = table_start_x + table_width
-        pygame.draw.line(screen, (100, 100, 100), (line_start_x, line_y), (line_end_x, line_y), scale_value(2, scale))
-
+        pygame.draw.line(screen, (100, 100, 100), (self.table_start_x, line_y),
+                         (self.table_start_x + self.table_width, line_y), scale_value(2, scale))
+
+        self.state = draw_request_state(screen, font, self.request, self.screen_width, scale_value(300, scale), scale)
+        if self.user_achievements is None:
+            if self.state == ERROR:
+                self.retry_btn.draw(screen, mouse)
+            self.back_btn.draw(screen, mouse)
+            return
         y_off = scale_value(150, scale)
         row_spacing = scale_value(40, scale)
         desc_width = scale_value(400, scale)
-        user_achievements = get_user_achievements(username)
         for ach_id, info in ACHIEVEMENTS_DEF.items():
-            has_it = ach_id in user_achievements
+            has_it = ach_id in self.user_achievements
             color = (100, 255, 100) if has_it else (100, 100, 100)
-
             status_txt = "[ V ]" if has_it else "[   ]"
-            s_surf = font.render(status_txt, True, color)
-            n_surf = font.render(info["name"], True, color)
-            d_surf = font.render(truncate_text(info["desc"], font, desc_width), True, (180, 180, 180))
-
-            screen.blit(s_surf, (COL_STATUS, y_off))
-            screen.blit(n_surf, (COL_NAME, y_off))
-            screen.blit(d_surf, (COL_DESC, y_off))
+            screen.blit(font.render(status_txt, True, color), (self.col_status, y_off))
+            screen.blit(font.render(info["name"], True, color), (self.col_name, y_off))
+            screen.blit(font.render(truncate_text(info["desc"], font, desc_width), True, (180, 180, 180)),
+                        (self.col_desc, y_off))
             y_off += row_spacing
 
-        back_btn.draw(screen, mouse);
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-            if event.type == pygame.VIDEORESIZE:
-                screen_width, screen_height = event.w, event.h
-                if screen_width < MIN_WIDTH:
-                    screen_width = MIN_WIDTH
-                if screen_height < MIN_HEIGHT:
-                    screen_height = MIN_HEIGHT
-                screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                scale = get_scale_factor(screen_width, screen_height)
-                font = pygame.font.SysFont("Arial", get_font_size(scale))
-                break
-            if back_btn.clicked(event): return
-
-
-def show_leaderboard(screen, font, screen_width, screen_height, scale):
-    back_btn = Button(375, 650, 200, "Powrót", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-    users = get_all_users()
-    sorted_users = sorted(users.items(), key=lambda x: x[1].get('xp', 0), reverse=True)[:5]
-    # Wyśrodkowanie tabeli
-    table_width = scale_value(570, scale)
-    table_start_x = center_x(screen_width, table_width)
-    COL_RANK = table_start_x + scale_value(0, scale)
-    COL_NICK = table_start_x + scale_value(100, scale)
-    COL_XP = table_start_x + scale_value(400, scale)
-
-    while True:
-        back_btn.update_position_and_size(screen_width)
-        screen.fill(BG_COLOR);
-        mouse = pygame.mouse.get_pos()
-        t = font.render("RANKING TOP 5", True, (255, 215, 0));
-        screen.blit(t, (screen_width // 2 - t.get_width() // 2, scale_value(50, scale)))
-
-        h1 = font.render("Poz.", True, (150, 150, 150))
-        h2 = font.render("Użytkownik", True, (150, 150, 150))
-        h3 = font.render("Punkty XP", True, (150, 150, 150))
+        summary_surf = font.render(self.summary_txt, True, (200, 200, 100))
+        screen.blit(summary_surf, (self.screen_width // 2 - summary_surf.get_width() // 2, y_off + scale_value(20, scale)))
+        self.back_btn.draw(screen, mouse)
+
+    def handle_event(self, event):
+        if self.back_btn.clicked(event):
+            self.app.pop()
+        elif self.state == ERROR and self.retry_btn.clicked(event):
+            self.load()
+
+
+class LeaderboardScreen(Screen):
+    name = "show_leaderboard"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.request = DATA.submit(get_leaderboard)
+        self.sorted_users = None
+        self.state = LOADING
+
+    def layout(self, window):
+        super().layout(window)
+        scale = self.scale
+        self.back_btn = Button(375, 650, 200, "Powrót", self.font, scale=scale, screen_width=self.screen_width,
+                               center_horizontal=True)
+        self.retry_btn = Button(375, 450, 200, "Ponów", self.font, scale=scale, screen_width=self.screen_width,
+                                center_horizontal=True)
+        # Wyśrodkowanie tabeli
+        self.table_width = scale_value(570, scale)
+        self.table_start_x = center_x(self.screen_width, self.table_width)
+        self.col_rank = self.table_start_x
+        self.col_nick = self.table_start_x + scale_value(100, scale)
+        self.col_xp = self.table_start_x + scale_value(400, scale)
+
+    def update(self):
+        if self.sorted_users is None and self.request.ready():
+            self.sorted_users = self.request.result()
+
+    def draw(self, screen, mouse):
+        font, scale = self.font, self.scale
+        t = font.render("RANKING TOP 5", True, (255, 215, 0))
+        screen.blit(t, (self.screen_width // 2 - t.get_width() // 2, scale_value(50, scale)))
+
         header_y = scale_value(120, scale)
-        screen.blit(h1, (COL_RANK, header_y))
-        screen.blit(h2, (COL_NICK, header_y))
-        screen.blit(h3, (COL_XP, header_y))
+        screen.blit(font.render("Poz.", True, (150, 150, 150)), (self.col_rank, header_y))
+        screen.blit(font.render("Użytkownik", True, (150, 150, 150)), (self.col_nick, header_y))
+        screen.blit(font.render("Punkty XP", True, (150, 150, 150)), (self.col_xp, header_y))
         line_y = scale_value(150, scale)
-        line_start_x = table_start_x
-        line_end_x = table_start_x + table_width
-        pygame.draw.line(screen, (180, 180, 180), (line_start_x, line_y), (line_end_x, line_y), scale_value(2, scale))
+        pygame.draw.line(screen, (180, 180, 180), (self.table_start_x, line_y),
+                         (self.table_start_x + self.table_width, line_y), scale_value(2, scale))
 
         start_y = scale_value(170, scale)
         row_spacing = scale_value(50, scale)
         name_width = scale_value(250, scale)
-        for i, (name, stats) in enumerate(sorted_users):
-            r_s = font.render(f"{i + 1}.", True, TEXT_COLOR)
-            n_s = font.render(truncate_text(name, font, name_width), True, TEXT_COLOR)
-            x_s = font.render(str(stats.get('xp', 0)), True, (100, 255, 100))
+        self.state = draw_request_state(screen, font, self.request, self.screen_width, scale_value(300, scale), scale)
+        for i, (name, stats) in enumerate(self.sorted_users or []):
             y_pos = start_y + i * row_spacing
-            screen.blit(r_s, (COL_RANK, y_pos))
-            screen.blit(n_s, (COL_NICK, y_pos))
-            screen.blit(x_s, (COL_XP, y_pos))
+            screen.blit(font.render(f"{i + 1}.", True, TEXT_COLOR), (self.col_rank, y_pos))
+            screen.blit(font.render(truncate_text(name, font, name_width), True, TEXT_COLOR), (self.col_nick, y_pos))
+            screen.blit(font.render(str(stats.get('xp', 0)), True, (100, 255, 100)), (self.col_xp, y_pos))
+
+        if self.state == ERROR:
+            self.retry_btn.draw(screen, mouse)
+        self.back_btn.draw(screen, mouse)
+
+    def handle_event(self, event):
+        if self.back_btn.clicked(event):
+            self.app.pop()
+        elif self.state == ERROR and self.retry_btn.clicked(event):
+            self.request = DATA.submit(get_leaderboard)
+
+
+class StatsScreen(Screen):
+    name = "show_stats_screen"
+
+    def __init__(self, app, username):
+        super().__init__(app)
+        self.username = username
+        self.user_stats, self.all_stats, self.modules = None, None, None
+        self.state = LOADING
+        self.load()
+
+    def load(self):
+        # Statystyki czytane z tabel zbiorczych - bez przeliczania dziennika odpowiedzi
+        self.request = gather(DATA.submit(get_user_module_stats, self.username), DATA.submit(get_module_stats))
+
+    def layout(self, window):
+        super().layout(window)
+        scale = self.scale
+        self.back_btn = Button(375, 750, 200, "Powrót", self.font, scale=scale, screen_width=self.screen_width,
+                               center_horizontal=True)
+        self.retry_btn = Button(375, 450, 200, "Ponów", self.font, scale=scale, screen_width=self.screen_width,
+                                center_horizontal=True)
+        self.table_width = scale_value(790, scale)
+        self.table_start_x = center_x(self.screen_width, self.table_width)
+        self.columns = [self.table_start_x + scale_value(offset, scale) for offset in (0, 300, 430, 550, 680)]
+
+    def update(self):
+        if self.modules is None and self.request.ready():
+            self.user_stats, self.all_stats = self.request.result()
+            self.modules = sorted(set(self.user_stats) | set(self.all_stats))
+
+    def draw(self, screen, mouse):
+        font, scale = self.font, self.scale
+        title = font.render(f"STATYSTYKI UŻYTKOWNIKA: {self.username}", True, (255, 215, 0))
+        screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, scale_value(40, scale)))
+
+        header_y = scale_value(100, scale)
+        for col, label in zip(self.columns, ("Moduł", "Poprawne", "Błędne", "Twoja %", "Wszyscy %")):
+            screen.blit(font.render(label, True, (150, 150, 150)), (col, header_y))
+        line_y = scale_value(130, scale)
+        pygame.draw.line(screen, (100, 100, 100), (self.table_start_x, line_y),
+                         (self.table_start_x + self.table_width, line_y), scale_value(2, scale))
+
+        self.state = draw_request_state(screen, font, self.request, self.screen_width, scale_value(300, scale), scale)
+        if self.modules is None:
+            if self.state == ERROR:
+                self.retry_btn.draw(screen, mouse)
+            self.back_btn.draw(screen, mouse)
+            return
+        y_off = scale_value(150, scale)
+        row_spacing = scale_value(40, scale)
+        name_width = scale_value(280, scale)
+        if not self.modules:
+            empty = font.render("Brak rozegranych quizów", True, (180, 180, 180))
+            screen.blit(empty, (self.screen_width // 2 - empty.get_width() // 2, y_off))
+        col_module, col_correct, col_wrong, col_user_acc, col_all_acc = self.columns
+        for m_name in self.modules:
+            mine = self.user_stats.get(m_name, {'correct': 0, 'wrong': 0})
+            everyone = self.all_stats.get(m_name, {'correct': 0, 'wrong': 0})
+            screen.blit(font.render(truncate_text(m_name, font, name_width), True, TEXT_COLOR), (col_module, y_off))
+            screen.blit(font.render(str(mine['correct']), True, (100, 255, 100)), (col_correct, y_off))
+            screen.blit(font.render(str(mine['wrong']), True, (255, 100, 100)), (col_wrong, y_off))
+            screen.blit(font.render(f"{accuracy_percent(mine['correct'], mine['wrong'])}%", True, TEXT_COLOR),
+                        (col_user_acc, y_off))
+            screen.blit(font.render(f"{accuracy_percent(everyone['correct'], everyone['wrong'])}%", True,
+                                    (180, 180, 180)), (col_all_acc, y_off))
+            y_off += row_spacing
 
-        back_btn.draw(screen, mouse);
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-            if event.type == pygame.VIDEORESIZE:
-                screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
-                break
-            if back_btn.clicked(event): return
+        self.back_btn.draw(screen, mouse)
+
+    def handle_event(self, event):
+        if self.back_btn.clicked(event):
+            self.app.pop()
+        elif self.state == ERROR and self.retry_btn.clicked(event):
+            self.load()
 
 
 # ================== MODYFIKACJA PYTAŃ ==================
 
-def add_question_screen(screen, font, module, username, screen_width, screen_height, scale):
-    # Sprawdzenie uprawnień - tylko moderatorzy mogą dodawać pytania
-    user_data = get_all_users().get(username, {})
-    if not user_data.get("is_mod", False):
-        screen.fill(BG_COLOR)
-        error_msg = font.render("Brak uprawnień! Tylko moderatorzy mogą dodawać pytania.", True, (255, 100, 100))
-        screen.blit(error_msg, (screen_width // 2 - error_msg.get_width() // 2, screen_height // 2))
-        pygame.display.flip()
-        pygame.time.wait(2000)
-        return
-    inputs = [
-        InputBox((225, 80, 500, 45), "Treść pytania", scale=scale, screen_width=screen_width, center_horizontal=True),
-        InputBox((225, 140, 500, 45), "Opcja A", scale=scale, screen_width=screen_width, center_horizontal=True),
-        InputBox((225, 200, 500, 45), "Opcja B", scale=scale, screen_width=screen_width, center_horizontal=True),
-        InputBox((225, 260, 500, 45), "Opcja C", scale=scale, screen_width=screen_width, center_horizontal=True),
-        InputBox((225, 320, 500, 45), "Opcja D", scale=scale, screen_width=screen_width, center_horizontal=True),
-        InputBox((225, 380, 200, 45), "Poprawna (A-D)", scale=scale, screen_width=screen_width, center_horizontal=True)
-    ]
-    save_btn = Button(225, 460, 240, "Zapisz pytanie", font, scale=scale, screen_width=screen_width, center_horizontal=False)
-    back_btn = Button(485, 460, 240, "Powrót", font, scale=scale, screen_width=screen_width, center_horizontal=False)
-    msg = ""
-
-    while True:
-        # Aktualizacja pozycji
-        for inp in inputs:
-            inp.update_rect(screen_width)
-        save_btn.update_position_and_size(screen_width)
-        back_btn.update_position_and_size(screen_width)
+class AddQuestionScreen(Screen):
+    name = "add_question_screen"
+
+    def __init__(self, app, module, username, is_mod):
+        super().__init__(app)
+        self.module, self.username = module, username
+        # Sprawdzenie uprawnień - tylko moderatorzy mogą dodawać pytania (is_mod z profilu wczytanego
+        # przez menu główne, bez pobierania listy wszystkich kont)
+        self.allowed = is_mod
+        self.inputs = [InputBox((225, y, width, 45), placeholder, center_horizontal=True)
+                       for y, width, placeholder in ((80, 500, "Treść pytania"), (140, 500, "Opcja A"),
+                                                     (200, 500, "Opcja B"), (260, 500, "Opcja C"),
+                                                     (320, 500, "Opcja D"), (380, 200, "Poprawna (A-D)"))]
+        self.msg = ""
+        self.saving = None  # DataRequest zapisu pytania
+
+    def layout(self, window):
+        super().layout(window)
+        for inp in self.inputs:
+            inp.set_scale(self.scale, self.screen_width)
+        self.save_btn = Button(225, 460, 240, "Zapisz pytanie", self.font, scale=self.scale,
+                               screen_width=self.screen_width)
+        self.back_btn = Button(485, 460, 240, "Powrót", self.font, scale=self.scale, screen_width=self.screen_width)
         # Wyśrodkowanie przycisków obok siebie (grupa przycisków wyśrodkowana)
-        btn_spacing = scale_value(20, scale)
-        total_btn_width = save_btn.width + btn_spacing + back_btn.width
-        center_start = center_x(screen_width, total_btn_width)
-        save_btn.x = center_start
-        save_btn.rect.x = save_btn.x
-        back_btn.x = center_start + save_btn.width + btn_spacing
-        back_btn.rect.x = back_btn.x
-        
-        screen.fill(BG_COLOR);
-        mouse = pygame.mouse.get_pos()
-        for i in inputs: i.draw(screen, font)
-        save_btn.draw(screen, mouse);
-        back_btn.draw(screen, mouse)
-        if msg:
-            msg_surf = font.render(msg, True, (100, 255, 100))
-            screen.blit(msg_surf, (screen_width // 2 - msg_surf.get_width() // 2, scale_value(550, scale)))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-            if event.type == pygame.VIDEORESIZE:
-                screen_width, screen_height = event.w, event.h
-                if screen_width < MIN_WIDTH:
-                    screen_width = MIN_WIDTH
-                if screen_height < MIN_HEIGHT:
-                    screen_height = MIN_HEIGHT
-                screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                scale = get_scale_factor(screen_width, screen_height)
-                font = pygame.font.SysFont("Arial", get_font_size(scale))
-                break
-            if back_btn.clicked(event): return
-            for i in inputs: i.handle_event(event)
-            if save_btn.clicked(event):
-                # Walidacja i sanityzacja danych
-                question = sanitize_input(inputs[0].text, MAX_QUESTION_LEN)
-                options = [sanitize_input(inputs[i].text, MAX_OPTION_LEN) for i in range(1, 5)]
-                ans = inputs[5].text.upper().strip()
-                
-                if not question:
-                    msg = "Treść pytania jest wymagana!"
-                elif not all(options):
-                    msg = "Wszystkie opcje są wymagane!"
-                elif ans not in "ABCD":
-                    msg = "Poprawna odpowiedź musi być A, B, C lub D!"
-                elif len(question) > MAX_QUESTION_LEN:
-                    msg = f"Pytanie może mieć maksymalnie {MAX_QUESTION_LEN} znaków!"
-                elif any(len(opt) > MAX_OPTION_LEN for opt in options):
-                    msg = f"Opcje mogą mieć maksymalnie {MAX_OPTION_LEN} znaków!"
-                else:
-                    question_data = {
-                        "question": question,
-                        "options": options,
-                        "correct": "ABCD".index(ans)
-                    }
-                    if add_question(module, question_data):
-                        check_achievement(username, "add_q")
-                        msg = "Dodano pomyślnie!"
-                        for i in inputs: i.text = ""
-                    else:
-                        msg = "Błąd przy dodawaniu pytania!"
+        btn_spacing = scale_value(20, self.scale)
+        total_btn_width = self.save_btn.width + btn_spacing + self.back_btn.width
+        center_start = center_x(self.screen_width, total_btn_width)
+        self.save_btn.x = self.save_btn.rect.x = center_start
+        self.back_btn.x = self.back_btn.rect.x = center_start + self.save_btn.width + btn_spacing
+
+    def update(self):
+        if not self.allowed:
+            self.app.replace(MessageScreen(self.app, "Brak uprawnień! Tylko moderatorzy mogą dodawać pytania."))
+        elif self.saving is not None and self.saving.state != LOADING:
+            if self.saving.ready() and self.saving.result():
+                # Osiągnięcie w tle - jego błąd nie zmienia tego, że pytanie zostało dodane
+                DATA.submit(check_achievement, self.username, "add_q")
+                self.msg = "Dodano pomyślnie!"
+                for i in self.inputs: i.text = ""
+            else:
+                self.msg = "Błąd przy dodawaniu pytania!"
+            self.saving = None
+
+    def draw(self, screen, mouse):
+        for i in self.inputs: i.draw(screen, self.font)
+        self.save_btn.draw(screen, mouse)
+        self.back_btn.draw(screen, mouse)
+        if self.saving is not None:
+            draw_request_state(screen, self.font, self.saving, self.screen_width, scale_value(570, self.scale),
+                               self.scale)
+        elif self.msg:
+            msg_surf = self.font.render(self.msg, True, (100, 255, 100))
+            screen.blit(msg_surf, (self.screen_width // 2 - msg_surf.get_width() // 2, scale_value(550, self.scale)))
+
+    def handle_event(self, event):
+        if self.back_btn.clicked(event):
+            self.app.pop()
+            return
+        for i in self.inputs: i.handle_event(event)
+        if self.save_btn.clicked(event) and self.saving is None:
+            # Walidacja i sanityzacja danych
+            inputs = self.inputs
+            question_data, self.msg = validate_question(inputs[0].text, [inputs[i].text for i in range(1, 5)],
+                                                        inputs[5].text)
+            if question_data is not None:
+                self.saving = DATA.submit(add_question, self.module, question_data)
+
+
+class DeleteManagerScreen(Screen):
+    name = "delete_manager_screen"
+
+    def __init__(self, app, module):
+        super().__init__(app)
+        self.module = module
+        self.questions = None
+        self.state = LOADING
+        self.load()
+
+    def load(self):
+        self.request = DATA.submit(get_module_questions, self.module)
+
+    def delete(self, question_id):
+        """Wątek puli DATA: usunięcie pytania i ponowne pobranie listy (tylko po usunięciu, nie w każdej klatce)"""
+        # Po ID, nie po pozycji na liście - inne stanowisko mogło w międzyczasie
+        # usunąć lub dodać pytania, a wtedy indeks wskazałby inne pytanie
+        delete_question_by_id(self.module, question_id)
+        return get_module_questions(self.module)
+
+    def layout(self, window):
+        super().layout(window)
+        self.back_btn = Button(375, 750, 200, "Powrót", self.font, scale=self.scale, screen_width=self.screen_width,
+                               center_horizontal=True)
+        self.retry_btn = Button(375, 450, 200, "Ponów", self.font, scale=self.scale, screen_width=self.screen_width,
+                                center_horizontal=True)
+        self.build_buttons()
+
+    def build_buttons(self):
+        scale = self.scale
+        btn_width = scale_value(750, scale)
+        start_y = scale_value(70, scale)
+        btn_spacing = scale_value(55, scale)
+        question_width = scale_value(700, scale)
+        self.buttons = [
+            Button(100, start_y + i * btn_spacing, btn_width, truncate_text(q.get("question", ""), self.font, question_width),
+                   self.font, padding=scale_value(8, scale), data=q["id"], scale=scale,
+                   screen_width=self.screen_width, center_horizontal=True)
+            for i, q in enumerate(self.questions or [])]
+
+    def update(self):
+        if self.request is not None and self.request.ready():
+            self.questions, self.request = self.request.result(), None
+            self.build_buttons()
+        if self.questions == []:
+            self.app.pop()
+
+    def draw(self, screen, mouse):
+        if self.request is None:
+            for b in self.buttons: b.draw(screen, mouse)
+        else:
+            # Lista do czasu odpowiedzi jest ukryta - mogła się zmienić na innym stanowisku
+            self.state = draw_request_state(screen, self.font, self.request, self.screen_width,
+                                            scale_value(300, self.scale), self.scale)
+            if self.state == ERROR:
+                self.retry_btn.draw(screen, mouse)
+        self.back_btn.draw(screen, mouse)
+
+    def handle_event(self, event):
+        if self.back_btn.clicked(event):
+            self.app.pop()
+            return
+        if self.request is not None:
+            if self.state == ERROR and self.retry_btn.clicked(event):
+                self.load()
+            return
+        for b in self.buttons:
+            if b.clicked(event):
+                self.state = LOADING
+                self.request = DATA.submit(self.delete, b.data)
+                return
+
+
+# ================== IMPORT I EKSPORT PYTAŃ ==================
+# Plik wczytywany i walidowany w wątku puli DATA, zapis jednym add_questions
+# (executemany, jedna transakcja) - ekran w tym czasie pokazuje postęp
+
+class ImportProgress:
+    """Postęp importu - zapisuje wątek roboczy, ekran odczytuje raz na klatkę"""
+
+    def __init__(self):
+        self.phase = "Odczyt pliku"
+        self.done = 0
+        self.total = 0
+
+    def describe(self) -> str:
+        return f"{self.phase}: {self.done}/{self.total}" if self.total else f"{self.phase}..."
+
+
+def import_questions(module_name: str, path: str, username: str,
+                     progress: ImportProgress) -> Tuple[int, List[str]]:
+    """Importuje pytania z pliku CSV/JSON do modułu - wszystkie albo żadne.
+    Zwraca (liczba zaimportowanych, błędy)"""
+    try:
+        rows = read_question_file(path, module_name)
+    except QuestionFileError as e:
+        return 0, [f"Nie można wczytać pliku: {e}"]
+    if not rows:
+        return 0, ["Plik nie zawiera pytań"]
+    progress.phase, progress.total = "Walidacja", len(rows)
+    questions, errors = [], []
+    for i, (question, options, answer) in enumerate(rows, 1):
+        question_data, error = validate_question(question, options, answer)
+        if question_data is None:
+            errors.append(f"Pytanie {i}: {error}")
+        else:
+            questions.append(question_data)
+        progress.done = i
+    if errors:
+        return 0, errors
+    progress.phase, progress.total = f"Zapis {len(questions)} pytań do bazy", 0
+    if not add_questions(module_name, questions):
+        return 0, ["Błąd zapisu do bazy - nic nie zaimportowano"]
+    check_achievement(username, "add_q")
+    return len(questions), []
+
+
+def export_questions(module_name: str, path: str) -> Tuple[int, List[str]]:
+    """Zapisuje pytania modułu do pliku CSV/JSON; zwraca (liczba pytań, błędy)"""
+    questions = get_module_questions(module_name)
+    if not is_db_available():
+        return 0, []  # Pusta lista to awaria, nie pusty moduł - AsyncData zgłosi błąd bazy
+    try:
+        return write_question_file(path, questions), []
+    except (QuestionFileError, OSError) as e:
+        return 0, [f"Nie można zapisać pliku: {e}"]
+
+
+class QuestionFileScreen(Screen):
+    name = "question_file_screen"
+
+    def __init__(self, app, module, username):
+        super().__init__(app)
+        self.module, self.username = module, username
+        self.path_input = InputBox((225, 140, 500, 45), "Plik .csv lub .json", center_horizontal=True)
+        self.path_input.text = f"{module}.csv"
+        self.request, self.progress, self.action = None, None, None
+        self.lines = []  # (tekst, kolor) - wynik ostatniej operacji
+
+    def layout(self, window):
+        super().layout(window)
+        self.path_input.set_scale(self.scale, self.screen_width)
+        self.import_btn = Button(375, 220, 200, "Importuj", self.font, scale=self.scale,
+                                 screen_width=self.screen_width, center_horizontal=True)
+        self.export_btn = Button(375, 300, 200, "Eksportuj", self.font, scale=self.scale,
+                                 screen_width=self.screen_width, center_horizontal=True)
+        self.back_btn = Button(375, 750, 200, "Powrót", self.font, scale=self.scale,
+                               screen_width=self.screen_width, center_horizontal=True)
+
+    @property
+    def busy(self):
+        return self.request is not None and self.request.state == LOADING
+
+    def update(self):
+        request = self.request
+        if request is None or request.state == LOADING:
+            return
+        if request.ready():
+            count, errors = request.result()
+            if errors:
+                summary = "nic nie zaimportowano" if self.action == "import" else "eksport przerwany"
+                self.lines = [(f"Błędy: {len(errors)} - {summary}", (255, 100, 100))]
+                self.lines += [(error, (255, 150, 150)) for error in errors[:5]]
+            elif self.action == "import":
+                self.lines = [(f"Zaimportowano {count} pytań do modułu {self.module}", (100, 255, 100))]
+            else:
+                self.lines = [(f"Wyeksportowano {count} pytań do {self.path_input.text}", (100, 255, 100))]
+            self.request = None
+        elif request.state == ERROR:
+            self.lines = []
+
+    def draw(self, screen, mouse):
+        font, scale = self.font, self.scale
+        title = font.render(f"Import / eksport pytań: {self.module}", True, TEXT_COLOR)
+        screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, scale_value(80, scale)))
+        self.path_input.draw(screen, font)
+        if not self.busy:
+            self.import_btn.draw(screen, mouse)
+            self.export_btn.draw(screen, mouse)
+        self.back_btn.draw(screen, mouse)
+        status_y = scale_value(400, scale)
+        if self.busy:
+            status = font.render(self.progress.describe() if self.progress else "Eksport...", True, TEXT_COLOR)
+            screen.blit(status, (self.screen_width // 2 - status.get_width() // 2, status_y))
+            draw_spinner(screen, (self.screen_width // 2, status_y + scale_value(60, scale)), scale)
+        elif self.request is not None:
+            draw_request_state(screen, font, self.request, self.screen_width, status_y, scale)
+        line_width = scale_value(800, scale)
+        for i, (text, color) in enumerate(self.lines):
+            surf = font.render(truncate_text(text, font, line_width), True, color)
+            screen.blit(surf, (self.screen_width // 2 - surf.get_width() // 2, status_y + i * scale_value(35, scale)))
+
+    def handle_event(self, event):
+        # Powrót w trakcie importu nie przerywa go - transakcja kończy się w tle
+        if self.back_btn.clicked(event):
+            self.app.pop()
+            return
+        self.path_input.handle_event(event)
+        if self.busy:
+            return
+        path = self.path_input.text.strip()
+        if self.import_btn.clicked(event) and path:
+            self.action, self.progress, self.lines = "import", ImportProgress(), []
+            self.request = DATA.submit(import_questions, self.module, path, self.username, self.progress)
+        elif self.export_btn.clicked(event) and path:
+            self.action, self.progress, self.lines = "export", None, []
+            self.request = DATA.submit(export_questions, self.module, path)
 
 
 # ================== QUIZ I LOGIKA ODBLOKOWANIA ==================
 
-def quiz_loop(screen, font, module_name, username, screen_width, screen_height, scale):
-    questions = get_module_questions(module_name)
-    if not questions:
-        screen.fill(BG_COLOR)
-        msg = font.render("Brak pytań w tym module!", True, (255, 100, 100))
-        screen.blit(msg, (screen_width // 2 - msg.get_width() // 2, screen_height // 2))
-        pygame.display.flip()
-        pygame.time.wait(2000)
-        return
-    
-    random.shuffle(questions)
-    idx, score, total = 0, 0, len(questions)
-    question_width = scale_value(800, scale)
-
-    while idx < total:
-        q = questions[idx]
-        correct_content = q["options"][q["correct"]]
-        shuffled_opts = list(q["options"]);
-        random.shuffle(shuffled_opts)
-        answered = False
-        while not answered:
-            screen.fill(BG_COLOR)
-            stats = font.render(f"{username} | Pytanie: {idx + 1}/{total} | Wynik: {score}", True, (100, 255, 100))
-            screen.blit(stats, (scale_value(20, scale), scale_value(20, scale)))
-            curr_y = scale_value(120, scale)
-            question_start_x = center_x(screen_width, question_width)
-            for line in wrap_text(q["question"], font, question_width):
-                line_surf = font.render(line, True, TEXT_COLOR)
-                screen.blit(line_surf, (question_start_x, curr_y));
-                curr_y += scale_value(35, scale)
-            ans_btns = []
-            btn_width = scale_value(400, scale)
-            for opt in shuffled_opts:
-                btn = Button(275, curr_y + scale_value(40, scale), btn_width, opt, font, data=opt, scale=scale, screen_width=screen_width, center_horizontal=True)
-                btn.update_position_and_size(screen_width)
-                ans_btns.append(btn);
-                curr_y += btn.height + scale_value(15, scale)
-            mouse = pygame.mouse.get_pos()
-            for b in ans_btns: b.draw(screen, mouse)
-            pygame.display.flip()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); exit()
-                if event.type == pygame.VIDEORESIZE:
-                    screen_width, screen_height = event.w, event.h
-                    if screen_width < MIN_WIDTH:
-                        screen_width = MIN_WIDTH
-                    if screen_height < MIN_HEIGHT:
-                        screen_height = MIN_HEIGHT
-                    screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                    scale = get_scale_factor(screen_width, screen_height)
-                    font = pygame.font.SysFont("Arial", get_font_size(scale))
-                    question_width = scale_value(800, scale)
-                    break
-                for b in ans_btns:
-                    if b.clicked(event):
-                        correct = b.data == correct_content
-                        xp_delta = 15 if correct else 5
-                        correct_delta = 1 if correct else 0
-                        wrong_delta = 0 if correct else 1
-                        
-                        update_user_stats(username, xp_delta, correct_delta, wrong_delta)
-                        
-                        if correct:
-                            score += 1
-                        idx += 1;
-                        answered = True;
-
-    # Sprawdź osiągnięcia na podstawie aktualnych statystyk
+def award_stat_achievements(username: str):
+    """Osiągnięcia za łączne statystyki (po zapisaniu odpowiedzi z quizu)"""
     stats = get_user_stats(username)
     if stats:
         if stats['stats_correct'] >= 25:
             check_achievement(username, "correct_25")
         if stats['stats_wrong'] >= 10:
             check_achievement(username, "wrong_10")
-        check_achievement(username, "first_quiz")
-
-    unlocked_msg = ""
-    if score == total:
-        check_achievement(username, f"perfection_{module_name}")
-        # Pobierz listę modułów z bazy
-        quiz_data = get_quiz_data()
-        module_list = list(quiz_data.keys())
-        if module_name in module_list:
-            current_idx = module_list.index(module_name)
-            if current_idx + 1 < len(module_list):
-                next_mod = module_list[current_idx + 1]
-                unlocked_modules = get_user_unlocked_modules(username)
-                if next_mod not in unlocked_modules:
-                    unlock_module_for_user(username, next_mod)
-                    unlocked_msg = f"BRAWO! ODBLOKOWANO: {next_mod}"
-
-    screen.fill(BG_COLOR)
-    res_t = font.render(f"KONIEC! WYNIK: {score}/{total}", True, (255, 255, 255))
-    screen.blit(res_t, (screen_width // 2 - res_t.get_width() // 2, screen_height // 2))
-    if unlocked_msg:
-        u_t = font.render(unlocked_msg, True, (100, 255, 100))
-        screen.blit(u_t, (screen_width // 2 - u_t.get_width() // 2, screen_height // 2 + scale_value(50, scale)))
-    pygame.display.flip();
-    pygame.time.wait(3000)
+
+
+def unlock_next_module(username: str, module_name: str) -> List[str]:
+    """Odblokowuje moduły, które wymagają module_name (graf z pamięci, bez pobierania pytań);
+    zwraca nazwy modułów właśnie odblokowanych"""
+    progression = get_progression()
+    if progression is None:
+        return []
+    # INSERT IGNORE - komunikat pokazuje tylko stanowisko, które faktycznie odblokowało moduł
+    return [next_mod for next_mod in progression.next_modules(module_name)
+            if unlock_module_for_user(username, next_mod)]
+
+
+class QuizScreen(Screen):
+    """Quiz w trzech fazach: losowanie pytań (loading), pytania (question) i wynik (result)"""
+    name = "quiz_loop"
+
+    def __init__(self, app, module_name, username):
+        super().__init__(app)
+        self.module_name, self.username = module_name, username
+        # Losowanie pytań w tle - do tego czasu ekran rysuje wskaźnik ładowania
+        self.request = DATA.submit(get_quiz_sample, username, module_name)
+        self.phase = "loading"
+        self.writes = []  # DataRequest zapisów statystyk po każdej odpowiedzi
+
+    def layout(self, window):
+        super().layout(window)
+        if self.phase == "question":
+            self.layout_question()
+
+    def update(self):
+        if self.phase == "loading" and self.request.state != LOADING:
+            self.questions = self.request.result() if self.request.ready() else []
+            if not self.questions:
+                msg_txt = "Baza danych jest niedostępna!" if self.request.state == ERROR else "Brak pytań w tym module!"
+                self.app.replace(MessageScreen(self.app, msg_txt))
+                return
+            self.idx, self.score, self.total = 0, 0, len(self.questions)
+            self.phase = "question"
+            self.show_question()
+        elif self.phase == "result":
+            self.update_result()
+
+    def show_question(self):
+        # Kolejność odpowiedzi jako indeksy - opcje o tej samej treści pozostają rozróżnialne
+        self.shuffled_opts = list(range(len(self.questions[self.idx]["options"])))
+        random.shuffle(self.shuffled_opts)
+        self.shown_at = pygame.time.get_ticks()
+        self.layout_question()
+
+    def layout_question(self):
+        """Treść pytania (zawinięta raz) i przyciski odpowiedzi - po zmianie pytania lub rozmiaru okna"""
+        font, scale = self.font, self.scale
+        question_width = scale_value(800, scale)
+        question_start_x = center_x(self.screen_width, question_width)
+        curr_y = scale_value(120, scale)
+        self.question_lines = []
+        for line in wrap_text(self.questions[self.idx]["question"], font, question_width):
+            self.question_lines.append((font.render(line, True, TEXT_COLOR), (question_start_x, curr_y)))
+            curr_y += scale_value(35, scale)
+        self.ans_btns = []
+        btn_width = scale_value(400, scale)
+        options = self.questions[self.idx]["options"]
+        for index in self.shuffled_opts:
+            btn = Button(275, curr_y + scale_value(40, scale), btn_width, options[index], font,
+                         data=(index, options[index]), scale=scale,
+                         screen_width=self.screen_width, center_horizontal=True)
+            self.ans_btns.append(btn)
+            curr_y += btn.height + scale_value(15, scale)
+
+    def answer(self, option):
+        """option - (indeks w q["options"], treść) z Button.data"""
+        q = self.questions[self.idx]
+        index = option[0]
+        correct = index == q["correct"]
+        xp_delta = 15 if correct else 5
+        correct_delta = 1 if correct else 0
+        wrong_delta = 0 if correct else 1
+        # Zapis w tle - kolejne pytanie pojawia się bez czekania na bazę
+        self.writes.append(DATA.submit(update_user_stats, self.username, xp_delta, correct_delta, wrong_delta,
+                                       self.module_name))
+        if q["id"] != NO_QUESTION_ID:  # Pytanie z banku bez ID z bazy - nie ma do czego przypisać odpowiedzi
+            ATTEMPT_LOG.add(self.username, q["id"], index, correct, pygame.time.get_ticks() - self.shown_at)
+        if correct:
+            self.score += 1
+        self.idx += 1
+        if self.idx < self.total:
+            self.show_question()
+        else:
+            self.finish()
+
+    def finish(self):
+        username, module_name = self.username, self.module_name
+        # Zapis odpowiedzi (aktualizuje też wagi losowania) i statystyk z tego quizu
+        self.saving = gather(*self.writes, DATA.submit(ATTEMPT_LOG.flush))
+        # Osiągnięcia i odblokowanie modułu nie zależą od zapisu statystyk - startują od razu, równolegle
+        self.rewards = [DATA.submit(check_achievement, username, "first_quiz")]
+        if self.score == self.total:
+            self.rewards.append(DATA.submit(check_achievement, username, f"perfection_{module_name}"))
+            self.rewards.append(DATA.submit(unlock_next_module, username, module_name))
+        self.finishing = None  # Osiągnięcia za statystyki - po zapisaniu odpowiedzi
+        self.result_shown_at = None
+        self.phase = "result"
+
+    def update_result(self):
+        if self.finishing is None and self.saving.state != LOADING:
+            self.finishing = gather(DATA.submit(award_stat_achievements, self.username), *self.rewards)
+        if self.finishing is not None and self.finishing.state != LOADING and self.result_shown_at is None:
+            self.result_shown_at = pygame.time.get_ticks()
+        if self.result_shown_at is not None and pygame.time.get_ticks() - self.result_shown_at >= RESULT_MS:
+            self.app.pop()
+
+    def draw(self, screen, mouse):
+        font, scale = self.font, self.scale
+        if self.phase == "loading":
+            draw_request_state(screen, font, self.request, self.screen_width, self.screen_height // 2, scale)
+        elif self.phase == "question":
+            stats = font.render(f"{self.username} | Pytanie: {self.idx + 1}/{self.total} | Wynik: {self.score}",
+                                True, (100, 255, 100))
+            screen.blit(stats, (scale_value(20, scale), scale_value(20, scale)))
+            for surf, pos in self.question_lines:
+                screen.blit(surf, pos)
+            for b in self.ans_btns: b.draw(screen, mouse)
+        else:
+            self.draw_result(screen)
+
+    def draw_result(self, screen):
+        font, scale = self.font, self.scale
+        res_t = font.render(f"KONIEC! WYNIK: {self.score}/{self.total}", True, (255, 255, 255))
+        screen.blit(res_t, (self.screen_width // 2 - res_t.get_width() // 2, self.screen_height // 2))
+        status_y = self.screen_height // 2 + scale_value(60, scale)
+        finishing, saving = self.finishing, self.saving
+        if finishing is None:
+            draw_spinner(screen, (self.screen_width // 2, status_y), scale)
+            return
+        # Błąd zapisu odpowiedzi ma pierwszeństwo przed błędem osiągnięć
+        draw_request_state(screen, font, saving if saving.state == ERROR else finishing,
+                           self.screen_width, status_y, scale)
+        unlocked = finishing.result()[-1] if finishing.ready() and self.score == self.total else None
+        if unlocked and saving.state != ERROR:
+            u_t = font.render(f"BRAWO! ODBLOKOWANO: {', '.join(unlocked)}", True, (100, 255, 100))
+            screen.blit(u_t, (self.screen_width // 2 - u_t.get_width() // 2, status_y))
+
+    def handle_event(self, event):
+        if self.phase != "question":
+            return
+        for b in self.ans_btns:
+            if b.clicked(event):
+                self.answer(b.data)
+                return
 
 
 # ================== LOGOWANIE I REJESTRACJA ==================
+# Hashowanie haseł trwa setki milisekund (passwords.py) - logowanie i rejestracja
+# wykonywane są w wątku PasswordService, a ekran w tym czasie rysuje wskaźnik
+PASSWORDS = PasswordService()
 
-def auth_screen(screen, font, screen_width, screen_height, scale):
-    mode = "login";
-    u_box = InputBox((325, 250, 300, 45), "Username", scale=scale, screen_width=screen_width, center_horizontal=True)
-    p_box = InputBox((325, 310, 300, 45), "Password", password=True, scale=scale, screen_width=screen_width, center_horizontal=True)
-    btn_action = Button(325, 420, 300, "Zaloguj", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-    btn_switch = Button(325, 480, 300, "Zmień na Rejestrację", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-    feedback = ""
-
-    while True:
-        # Aktualizacja pozycji przy zmianie rozmiaru
-        u_box.update_rect(screen_width)
-        p_box.update_rect(screen_width)
-        btn_action.update_position_and_size(screen_width)
-        btn_switch.update_position_and_size(screen_width)
-        
-        screen.fill(BG_COLOR);
-        mouse = pygame.mouse.get_pos()
-        title_txt = "LOGOWANIE" if mode == "login" else "REJESTRACJA"
-        title_surf = font.render(title_txt, True, (255, 200, 100))
-        screen.blit(title_surf, (screen_width // 2 - title_surf.get_width() // 2, scale_value(150, scale)))
-        u_box.draw(screen, font);
-        p_box.draw(screen, font)
-        btn_action.draw(screen, mouse);
-        btn_switch.draw(screen, mouse)
-        if feedback:
-            f_s = font.render(feedback, True, (255, 100, 100))
-            screen.blit(f_s, (screen_width // 2 - f_s.get_width() // 2, scale_value(550, scale)))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-            if event.type == pygame.VIDEORESIZE:
-                screen_width, screen_height = event.w, event.h
-                if screen_width < MIN_WIDTH:
-                    screen_width = MIN_WIDTH
-                if screen_height < MIN_HEIGHT:
-                    screen_height = MIN_HEIGHT
-                screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                scale = get_scale_factor(screen_width, screen_height)
-                font = pygame.font.SysFont("Arial", get_font_size(scale))
-                break
-            u_box.handle_event(event);
-            p_box.handle_event(event)
-            if btn_switch.clicked(event):
-                mode = "register" if mode == "login" else "login"
-                btn_action = Button(325, 420, 300, "Zaloguj" if mode == "login" else "Zarejestruj", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-                btn_switch = Button(325, 480, 300, "Zmień na Rejestrację" if mode == "login" else "Zmień na Logowanie",
-                                    font, scale=scale, screen_width=screen_width, center_horizontal=True)
-                feedback = ""
-            if btn_action.clicked(event):
-                u = sanitize_input(u_box.text, MAX_USERNAME_LEN)
-                p = p_box.text
-                
-                # Walidacja
-                if mode == "register":
-                    username_valid, username_msg = validate_username(u)
-                    password_valid, password_msg = validate_password(p)
-                    
-                    if not username_valid:
-                        feedback = username_msg
-                    elif not password_valid:
-                        feedback = password_msg
-                    else:
-                        # Sprawdź czy użytkownik już istnieje w bazie
-                        users = get_all_users()
-                        if u in users:
-                            feedback = "Użytkownik już istnieje!"
-                        else:
-                            # Pobierz pierwszy moduł z bazy
-                            quiz_data = get_quiz_data()
-                            first_mod = list(quiz_data.keys())[0] if quiz_data else ""
-                            
-                            # Ustaw is_mod na True tylko jeśli użytkownik jest na liście moderatorów
-                            is_moderator = u in MODERATOR_USERS
-                            
-                            # Utwórz nowego użytkownika
-                            new_user = {
-                                "pw": hash_password(p),
-                                "is_mod": is_moderator,
-                                "xp": 0,
-                                "unlocked": [first_mod] if first_mod else [],
-                                "achievements": [],
-                                "stats_correct": 0,
-                                "stats_wrong": 0
-                            }
-                            
-                            if save_user(u, new_user):
-                                # Odblokuj pierwszy moduł jeśli istnieje
-                                if first_mod:
-                                    unlock_module_for_user(u, first_mod)
-                                mode = "login"
-                                feedback = "Konto założone! Zaloguj się."
-                                u_box.text = ""
-                                p_box.text = ""
-                            else:
-                                feedback = "Błąd przy rejestracji!"
-                else:
-                    if not u:
-                        feedback = "Wprowadź nazwę użytkownika"
-                    elif not p:
-                        feedback = "Wprowadź hasło"
-                    else:
-                        users = get_all_users()
-                        if u in users:
-                            # Sprawdzanie hasła
-                            stored_pw = users[u].get("pw", "")
-                            # Kompatybilność wsteczna - jeśli hasło jest w plain text, przekształć na hash
-                            if len(stored_pw) < 64:  # SHA-256 hash ma 64 znaki hex
-                                if stored_pw == p:  # Stary format - plain text
-                                    users[u]["pw"] = hash_password(p)
-                                    save_user(u, users[u])
-                                else:
-                                    feedback = "Błędny login lub hasło!"
-                                    continue
-                            elif not verify_password(p, stored_pw):
-                                feedback = "Błędny login lub hasło!"
-                                continue
-                            
-                            # Naprawa starych kont - upewnij się że użytkownik ma wszystkie wymagane pola
-                            quiz_data = get_quiz_data()
-                            first_mod = list(quiz_data.keys())[0] if quiz_data else ""
-                            user_data = users[u]
-                            changed = False
-                            
-                            # Upewnij się że użytkownik ma odblokowany pierwszy moduł jeśli nie ma żadnego
-                            unlocked_modules = get_user_unlocked_modules(u)
-                            if not unlocked_modules and first_mod:
-                                unlock_module_for_user(u, first_mod)
-                                changed = True
-                            
-                            if changed:
-                                # Odśwież dane użytkownika
-                                user_data['unlocked'] = get_user_unlocked_modules(u)
-                                save_user(u, user_data)
-                            
-                            return u
-                        else:
-                            feedback = "Błędny login lub hasło!"
-
-
-def select_module_screen(screen, font, username, is_mod, screen_width, screen_height, scale):
-    back_btn = Button(375, 750, 200, "Powrót", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-    quiz_data = get_quiz_data()
-    user_unlocked = get_user_unlocked_modules(username)
-    while True:
-        screen.fill(BG_COLOR);
-        mouse = pygame.mouse.get_pos()
-        m_btns = []
-        btn_width = scale_value(400, scale)
-        start_y = scale_value(120, scale)
-        btn_spacing = scale_value(90, scale)
-        for i, m_name in enumerate(quiz_data.keys()):
-            locked = (m_name not in user_unlocked) and not is_mod
+
+def login_user(username: str, password: str) -> Optional[bool]:
+    """True - poprawne dane, False - błędny login lub hasło, None - baza niedostępna"""
+    if not wait_for_database():
+        return None
+    # Weryfikacja i przeliczenie starego hasha w backendzie (przy usłudze quiz_api - po stronie
+    # usługi), potem naprawa starych kont - pierwszy moduł, jeśli użytkownik nie ma żadnego
+    return get_storage().login(username, password)
+
+
+def register_user(username: str, password: str) -> Optional[bool]:
+    """True - konto założone, False - nazwa zajęta, None - błąd bazy"""
+    if not wait_for_database():
+        return None
+    # Jedno INSERT (z odblokowaniem pierwszego modułu) - zajętą nazwę zgłasza
+    # klucz główny, więc dwie równoczesne rejestracje nie nadpiszą konta.
+    # Moderatorem jest tylko użytkownik z listy (usługa quiz_api sprawdza własną listę)
+    return get_storage().register(username, password, username in MODERATOR_USERS)
+
+
+class AuthScreen(Screen):
+    name = "auth_screen"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.mode = "login"
+        self.u_box = InputBox((325, 250, 300, 45), "Username", center_horizontal=True)
+        self.p_box = InputBox((325, 310, 300, 45), "Password", password=True, center_horizontal=True)
+        self.feedback = ""
+        self.pending = None  # DataRequest logowania/rejestracji w puli PASSWORDS
+        self.pending_user = ""
+
+    def layout(self, window):
+        super().layout(window)
+        self.u_box.set_scale(self.scale, self.screen_width)
+        self.p_box.set_scale(self.scale, self.screen_width)
+        self.build_buttons()
+
+    def build_buttons(self):
+        login = self.mode == "login"
+        self.btn_action = Button(325, 420, 300, "Zaloguj" if login else "Zarejestruj", self.font, scale=self.scale,
+                                 screen_width=self.screen_width, center_horizontal=True)
+        self.btn_switch = Button(325, 480, 300, "Zmień na Rejestrację" if login else "Zmień na Logowanie", self.font,
+                                 scale=self.scale, screen_width=self.screen_width, center_horizontal=True)
+
+    def update(self):
+        # Wynik operacji w tle - sprawdzany raz na klatkę, bez czekania
+        pending = self.pending
+        if pending is not None and pending.state == ERROR:
+            self.pending = None
+            self.feedback = "Błąd logowania - spróbuj ponownie" if self.mode == "login" else "Błąd przy rejestracji!"
+        elif pending is not None and pending.ready():
+            result = pending.result()
+            self.pending = None
+            if self.mode == "login":
+                if result:
+                    self.app.replace(MainMenuScreen(self.app, self.pending_user))
+                    return
+                self.feedback = "Błędny login lub hasło!" if result is False else database_error_message()
+            elif result:
+                self.mode = "login"
+                self.feedback = "Konto założone! Zaloguj się."
+                self.u_box.text = ""
+                self.p_box.text = ""
+                self.build_buttons()
+            elif result is False:
+                self.feedback = "Użytkownik już istnieje!"
+            elif not DATABASE_READY:
+                self.feedback = database_error_message()
+            else:
+                self.feedback = "Błąd przy rejestracji!"
+
+    def draw(self, screen, mouse):
+        font, scale = self.font, self.scale
+        title_surf = font.render("LOGOWANIE" if self.mode == "login" else "REJESTRACJA", True, (255, 200, 100))
+        screen.blit(title_surf, (self.screen_width // 2 - title_surf.get_width() // 2, scale_value(150, scale)))
+        self.u_box.draw(screen, font)
+        self.p_box.draw(screen, font)
+        self.btn_action.draw(screen, mouse)
+        self.btn_switch.draw(screen, mouse)
+        if self.pending is not None:
+            draw_request_state(screen, font, self.pending, self.screen_width, scale_value(565, scale), scale)
+        elif self.feedback:
+            f_s = font.render(self.feedback, True, (255, 100, 100))
+            screen.blit(f_s, (self.screen_width // 2 - f_s.get_width() // 2, scale_value(550, scale)))
+
+    def handle_event(self, event):
+        if self.pending is not None:
+            # Trwa logowanie/rejestracja - formularz zablokowany do czasu wyniku
+            return
+        self.u_box.handle_event(event)
+        self.p_box.handle_event(event)
+        if self.btn_switch.clicked(event):
+            self.mode = "register" if self.mode == "login" else "login"
+            self.build_buttons()
+            self.feedback = ""
+        if self.btn_action.clicked(event):
+            self.submit()
+
+    def submit(self):
+        u = sanitize_input(self.u_box.text, MAX_USERNAME_LEN)
+        p = self.p_box.text
+        # Walidacja
+        if self.mode == "register":
+            username_valid, username_msg = validate_username(u)
+            password_valid, password_msg = validate_password(p)
+            if not username_valid:
+                self.feedback = username_msg
+            elif not password_valid:
+                self.feedback = password_msg
+            else:
+                self.pending = DataRequest(PASSWORDS.submit(register_user, u, p))
+        elif not u:
+            self.feedback = "Wprowadź nazwę użytkownika"
+        elif not p:
+            self.feedback = "Wprowadź hasło"
+        else:
+            self.pending = DataRequest(PASSWORDS.submit(login_user, u, p))
+            self.pending_user = u
+        if self.pending is not None:
+            self.feedback = ""
+
+
+class SelectModuleScreen(Screen):
+    """Wybór modułu; on_select(moduł) zwraca ekran, który zastępuje wybór (quiz, dodawanie pytań, ...)"""
+    name = "select_module_screen"
+
+    def __init__(self, app, username, is_mod, on_select):
+        super().__init__(app)
+        self.username, self.is_mod, self.on_select = username, is_mod, on_select
+        self.module_names, self.user_unlocked = None, None
+        self.m_btns = []
+        self.state = LOADING
+        self.load()
+
+    def load(self):
+        # Moduły i odblokowania są niezależne - oba zapytania wykonują się równolegle
+        self.request = gather(DATA.submit(get_module_names), DATA.submit(get_user_unlocked_modules, self.username))
+
+    def layout(self, window):
+        super().layout(window)
+        self.back_btn = Button(375, 750, 200, "Powrót", self.font, scale=self.scale, screen_width=self.screen_width,
+                               center_horizontal=True)
+        self.retry_btn = Button(375, 450, 200, "Ponów", self.font, scale=self.scale, screen_width=self.screen_width,
+                                center_horizontal=True)
+        self.build_buttons()
+
+    def build_buttons(self):
+        btn_width = scale_value(400, self.scale)
+        start_y = scale_value(120, self.scale)
+        btn_spacing = scale_value(90, self.scale)
+        self.m_btns = []
+        for i, m_name in enumerate(self.module_names or []):
+            locked = (m_name not in self.user_unlocked) and not self.is_mod
             btn_text = f"{m_name} {'[ZABLOKOWANE]' if locked else ''}"
-            m_btns.append(
-                Button(275, start_y + i * btn_spacing, btn_width, btn_text, font, data=m_name,
-                       locked=locked, scale=scale, screen_width=screen_width, center_horizontal=True))
-        # Aktualizacja pozycji
-        back_btn.update_position_and_size(screen_width)
-        for btn in m_btns:
-            btn.update_position_and_size(screen_width)
-        for b in m_btns: b.draw(screen, mouse)
-        back_btn.draw(screen, mouse);
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-            if event.type == pygame.VIDEORESIZE:
-                screen_width, screen_height = event.w, event.h
-                if screen_width < MIN_WIDTH:
-                    screen_width = MIN_WIDTH
-                if screen_height < MIN_HEIGHT:
-                    screen_height = MIN_HEIGHT
-                screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                scale = get_scale_factor(screen_width, screen_height)
-                font = pygame.font.SysFont("Arial", get_font_size(scale))
-                break
-            if back_btn.clicked(event): return None
-            for b in m_btns:
-                if b.clicked(event): return b.data
-
-
-def delete_manager_screen(screen, font, module, screen_width, screen_height, scale):
-    while True:
-        screen.fill(BG_COLOR);
-        mouse = pygame.mouse.get_pos()
-        questions = get_module_questions(module)
-        if not questions: return
-        btns = []
-        btn_width = scale_value(750, scale)
-        start_y = scale_value(70, scale)
-        btn_spacing = scale_value(55, scale)
-        question_width = scale_value(700, scale)
-        for i, q in enumerate(questions):
-            txt = truncate_text(q.get("question", ""), font, question_width)
-            btns.append(Button(100, start_y + i * btn_spacing, btn_width, txt, font, padding=scale_value(8, scale), data=i, scale=scale, screen_width=screen_width, center_horizontal=True))
-        back = Button(375, 750, 200, "Powrót", font, scale=scale, screen_width=screen_width, center_horizontal=True)
-        # Aktualizacja pozycji
-        back.update_position_and_size(screen_width)
-        for btn in btns:
-            btn.update_position_and_size(screen_width)
-        for b in btns: b.draw(screen, mouse)
-        back.draw(screen, mouse);
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-            if event.type == pygame.VIDEORESIZE:
-                screen_width, screen_height = event.w, event.h
-                if screen_width < MIN_WIDTH:
-                    screen_width = MIN_WIDTH
-                if screen_height < MIN_HEIGHT:
-                    screen_height = MIN_HEIGHT
-                screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                scale = get_scale_factor(screen_width, screen_height)
-                font = pygame.font.SysFont("Arial", get_font_size(scale))
-                break
-            if back.clicked(event): return
-            for b in btns:
+            self.m_btns.append(Button(275, start_y + i * btn_spacing, btn_width, btn_text, self.font, data=m_name,
+                                      locked=locked, scale=self.scale, screen_width=self.screen_width,
+                                      center_horizontal=True))
+
+    def update(self):
+        if self.module_names is None and self.request.ready():
+            self.module_names, self.user_unlocked = self.request.result()
+            self.build_buttons()
+
+    def draw(self, screen, mouse):
+        self.state = draw_request_state(screen, self.font, self.request, self.screen_width,
+                                        scale_value(300, self.scale), self.scale)
+        for b in self.m_btns: b.draw(screen, mouse)
+        if self.state == ERROR:
+            self.retry_btn.draw(screen, mouse)
+        self.back_btn.draw(screen, mouse)
+
+    def handle_event(self, event):
+        if self.back_btn.clicked(event):
+            self.app.pop()
+        elif self.state == ERROR and self.retry_btn.clicked(event):
+            self.load()
+        else:
+            for b in self.m_btns:
                 if b.clicked(event):
-                    if 0 <= b.data < len(questions):
-                        delete_question(module, b.data)
-                        break
+                    self.app.replace(self.on_select(b.data))
+                    return
+
+
+# ================== MENU GŁÓWNE ==================
+
+class MainMenuScreen(Screen):
+    name = "main_menu"
+
+    def __init__(self, app, username):
+        super().__init__(app)
+        self.username = username
+        self.user_data = {}
+        self.is_mod = False
+        self.resume()
+
+    def resume(self):
+        # Dane gracza wczytywane w tle po zalogowaniu i po powrocie z każdego ekranu;
+        # do czasu wyniku menu pokazuje poprzednie wartości
+        self.user_request = DATA.submit(get_user_stats, self.username)
+
+    def layout(self, window):
+        super().layout(window)
+        self.build_buttons()
+
+    def build_buttons(self):
+        # Tylko moderatorzy widzą przyciski administracyjne
+        items = [("Start Quiz", "start")]
+        if self.is_mod:
+            items += [("Dodaj Pytanie", "add"), ("Usuń Pytania", "del"), ("Import/Eksport", "io")]
+        items += [("Achievements", "ach"), ("Statystyki", "stats"), ("Ranking", "rank"), ("Wyloguj", "logout")]
+        self.main_btns = [Button(375, 150 + i * 80, 200, text, self.font, data=data, scale=self.scale,
+                                 screen_width=self.screen_width, center_horizontal=True)
+                          for i, (text, data) in enumerate(items)]
+
+    def update(self):
+        if self.user_request is not None and self.user_request.state != LOADING:
+            if self.user_request.ready():
+                self.user_data = self.user_request.result() or {}
+            self.user_request = None
+            is_mod = bool(self.user_data.get("is_mod", False))
+            if is_mod != self.is_mod:
+                self.is_mod = is_mod
+                self.build_buttons()
+
+    def draw(self, screen, mouse):
+        user_xp = self.user_data.get("xp", 0)
+        stats_text = f"Gracz: {self.username} | LVL: {get_level(user_xp)} | XP: {user_xp}"
+        stats_surf = self.font.render(stats_text, True, (200, 200, 100))
+        screen.blit(stats_surf, (scale_value(20, self.scale), scale_value(20, self.scale)))
+        for b in self.main_btns: b.draw(screen, mouse)
+
+    def handle_event(self, event):
+        for b in self.main_btns:
+            if b.clicked(event):
+                self.open(b.data)
+                return
+
+    def open(self, act):
+        app, user = self.app, self.username
+        if act == "start":
+            app.push(SelectModuleScreen(app, user, self.is_mod, lambda m: QuizScreen(app, m, user)))
+        elif act in ("add", "del", "io"):
+            # Dodatkowe sprawdzenie uprawnień (na wypadek próby ominięcia)
+            if not self.is_mod:
+                return
+            next_screen = {
+                "add": lambda m: AddQuestionScreen(app, m, user, self.is_mod),
+                "del": lambda m: DeleteManagerScreen(app, m),
+                "io": lambda m: QuestionFileScreen(app, m, user),
+            }[act]
+            app.push(SelectModuleScreen(app, user, self.is_mod, next_screen))
+        elif act == "ach":
+            app.push(AchievementsScreen(app, user))
+        elif act == "stats":
+            app.push(StatsScreen(app, user))
+        elif act == "rank":
+            app.push(LeaderboardScreen(app))
+        elif act == "logout":
+            app.replace(AuthScreen(app))
 
 
 # ================== MAIN ==================
 
+def import_pygame():
+    """Importuje pygame przy pierwszym użyciu interfejsu"""
+    global pygame
+    if pygame is None:
+        import pygame
+    return pygame
+
+
 def main():
-    pygame.init();
-    screen = pygame.display.set_mode((INIT_WIDTH, INIT_HEIGHT), pygame.RESIZABLE)
+    import_pygame()
+    pygame.init()
+    window = Window((INIT_WIDTH, INIT_HEIGHT))
     pygame.display.set_caption("Quiz Agile/Scrum")
-    clock = pygame.time.Clock()
-    
-    # Inicjalizacja bazy danych
-    print("Inicjalizacja bazy danych...")
-    if not init_database():
-        print("BŁĄD: Nie można zainicjalizować bazy danych!")
-        print("Upewnij się, że MySQL jest uruchomiony i dane w DB_CONFIG są poprawne.")
-        return
-    
-    # Utworzenie domyślnych modułów jeśli nie istnieją
-    default_modules = ["Agile_Podstawy", "Scrum", "Praktyki"]
-    for module in default_modules:
-        add_module(module)
-    
-    # Pobieranie aktualnych wymiarów ekranu
-    screen_width, screen_height = screen.get_size()
-    scale = get_scale_factor(screen_width, screen_height)
-    font_size = get_font_size(scale)
-    font = pygame.font.SysFont("Arial", font_size)
-
-    while True:
-        screen_width, screen_height = screen.get_size()
-        # Wymuszanie minimalnego rozmiaru
-        if screen_width < MIN_WIDTH:
-            screen_width = MIN_WIDTH
-        if screen_height < MIN_HEIGHT:
-            screen_height = MIN_HEIGHT
-        if screen.get_size() != (screen_width, screen_height):
-            screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-        
-        scale = get_scale_factor(screen_width, screen_height)
-        font_size = get_font_size(scale)
-        font = pygame.font.SysFont("Arial", font_size)
-        
-        curr_u = auth_screen(screen, font, screen_width, screen_height, scale)
-
-        while True:
-            screen_width, screen_height = screen.get_size()
-            if screen_width < MIN_WIDTH:
-                screen_width = MIN_WIDTH
-            if screen_height < MIN_HEIGHT:
-                screen_height = MIN_HEIGHT
-            if screen.get_size() != (screen_width, screen_height):
-                screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-            
-            scale = get_scale_factor(screen_width, screen_height)
-            font_size = get_font_size(scale)
-            font = pygame.font.SysFont("Arial", font_size)
-            
-            # Pobierz aktualne dane użytkownika z bazy
-            users = get_all_users()
-            user_data = users.get(curr_u, {})
-            is_mod = user_data.get("is_mod", False)
-            user_xp = user_data.get("xp", 0)
-            
-            screen.fill(BG_COLOR);
-            mouse = pygame.mouse.get_pos()
-            lvl = get_level(user_xp)
-            stats_text = f"Gracz: {curr_u} | LVL: {lvl} | XP: {user_xp}"
-            stats_surf = font.render(stats_text, True, (200, 200, 100))
-            screen.blit(stats_surf, (scale_value(20, scale), scale_value(20, scale)))
-
-            # Budowanie listy przycisków menu - tylko moderatorzy widzą przyciski administracyjne
-            main_btns = [
-                Button(375, 150, 200, "Start Quiz", font, data="start", scale=scale, screen_width=screen_width, center_horizontal=True),
-            ]
-            
-            # Przyciski tylko dla moderatorów
-            if is_mod:
-                main_btns.append(Button(375, 230, 200, "Dodaj Pytanie", font, data="add", scale=scale, screen_width=screen_width, center_horizontal=True))
-                main_btns.append(Button(375, 310, 200, "Usuń Pytania", font, data="del", scale=scale, screen_width=screen_width, center_horizontal=True))
-                achievements_y = 390
-                ranking_y = 470
-                logout_y = 550
-            else:
-                achievements_y = 230
-                ranking_y = 310
-                logout_y = 390
-            
-            main_btns.extend([
-                Button(375, achievements_y, 200, "Achievements", font, data="ach", scale=scale, screen_width=screen_width, center_horizontal=True),
-                Button(375, ranking_y, 200, "Ranking", font, data="rank", scale=scale, screen_width=screen_width, center_horizontal=True),
-                Button(375, logout_y, 200, "Wyloguj", font, data="logout", scale=scale, screen_width=screen_width, center_horizontal=True)
-            ])
-            # Aktualizacja pozycji przycisków
-            for btn in main_btns:
-                btn.update_position_and_size(screen_width)
-            for b in main_btns: b.draw(screen, mouse)
-            pygame.display.flip()
-
-            act = None
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); exit()
-                if event.type == pygame.VIDEORESIZE:
-                    # Obsługa zmiany rozmiaru okna
-                    screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
-                    break
-                for b in main_btns:
-                    if b.clicked(event): act = b.data
-
-            if act == "start":
-                m = select_module_screen(screen, font, curr_u, is_mod, screen_width, screen_height, scale)
-                if m: quiz_loop(screen, font, m, curr_u, screen_width, screen_height, scale)
-            elif act == "add":
-                # Dodatkowe sprawdzenie uprawnień (na wypadek próby ominięcia)
-                if is_mod:
-                    m = select_module_screen(screen, font, curr_u, is_mod, screen_width, screen_height, scale)
-                    if m: add_question_screen(screen, font, m, curr_u, screen_width, screen_height, scale)
-            elif act == "del":
-                # Dodatkowe sprawdzenie uprawnień (na wypadek próby ominięcia)
-                if is_mod:
-                    m = select_module_screen(screen, font, curr_u, is_mod, screen_width, screen_height, scale)
-                    if m: delete_manager_screen(screen, font, m, screen_width, screen_height, scale)
-            elif act == "ach":
-                show_achievements(screen, font, curr_u, screen_width, screen_height, scale)
-            elif act == "rank":
-                show_leaderboard(screen, font, screen_width, screen_height, scale)
-            elif act == "logout":
-                break
-            
-            clock.tick(60)
+
+    # Baza danych przygotowywana jest w tle (sprawdzenie wersji schematu, w razie
+    # potrzeby init_database); logowanie czeka na wynik w wait_for_database()
+    start_database_preparation()
+
+    app = App(window)
+    app.push(AuthScreen(app))
+    app.run()
+    pygame.quit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Quiz Agile/Scrum")
+    parser.add_argument("--profile", metavar="KATALOG", default=PROFILE_DIR,
+                        help="profilowanie ekranów: pliki .pstats i podsumowanie w katalogu")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(args.profile)
+    main()
@@ -0,0 +1,613 @@
+"""
+Lokalna usługa HTTP/JSON z operacjami na danych quizu.
+
+Stanowiska zamiast łączyć się z MySQL (z hasłem z DB_CONFIG i własnymi
+połączeniami) wywołują usługę - jeden proces z jedną pulą połączeń:
+
+    QUIZ_STORAGE=mysql python quiz_api.py --port 8765      # usługa
+    QUIZ_STORAGE=remote QUIZ_API_URL=http://127.0.0.1:8765 python quiz.py
+
+Protokół: POST /batch z {"calls": [[operacja, [argumenty], token sesji], ...]} -
+odpowiedź {"results": [[wynik, dostępność bazy], ...]} w tej samej kolejności;
+operacje partii wykonywane są po kolei, błąd jednej (także brak uprawnień) daje
+[null, false] i nie przerywa pozostałych. GET /health zwraca liczniki usługi i bazy.
+
+- QuizService wykonuje operacje z listy API_OPERATIONS (bez DDL, migracji
+  i save_user) na wspólnym backendzie; liczba równoczesnych operacji nie
+  przekracza rozmiaru puli połączeń,
+- hasła sprawdza usługa (login, register) - hashe haseł nie wychodzą z usługi,
+  a uprawnienia moderatora nadaje ona sama według MODERATOR_USERS,
+- login zwraca token sesji; bez niego działają tylko ping, login i register.
+  Operacje moderatora wymagają sesji moderatora (is_mod z bazy), a zapisy na
+  koncie (XP, osiągnięcia, odpowiedzi, dziennik stanowiska offline) - sesji
+  właściciela konta,
+- bank pytań i ranking są buforowane (CACHE_TTL); zmiana pytań przez
+  moderatora unieważnia bufor banku od razu,
+- RemoteStorage to backend klienta z interfejsem QuizStorage. Wywołania z
+  wielu wątków stanowiska, które zbiorą się w czasie trwania poprzedniego
+  żądania, wysyłane są razem jednym żądaniem /batch.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import secrets
+import select
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from storage import DB_POOL_SIZE, QuizStorage
+
+API_HOST = os.environ.get("QUIZ_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("QUIZ_API_PORT", "8765"))
+API_URL = os.environ.get("QUIZ_API_URL", f"http://{API_HOST}:{API_PORT}")
+API_TIMEOUT = 10.0  # Czas oczekiwania klienta na odpowiedź (s)
+BATCH_WINDOW = float(os.environ.get("QUIZ_API_BATCH_WINDOW", "0"))  # Dodatkowe czekanie na wywołania do partii (s)
+MAX_BATCH_SIZE = 100
+
+# Operacja -> czas ważności odpowiedzi w buforze usługi (s)
+CACHE_TTL = {
+    "get_quiz_data": 60.0,
+    "get_module_questions": 60.0,
+    "get_module_question_ids": 60.0,
+    "get_module_order": 60.0,
+    "get_leaderboard": 2.0,
+}
+# get_questions_by_ids nie jest buforowane - każdy quiz losuje inną listę ID, więc trafień nie ma
+BANK_OPERATIONS = {"get_quiz_data", "get_module_questions", "get_module_question_ids", "get_module_order"}
+CACHE_MAX_ENTRIES = 1000
+# Jak idempotent=False w storage.py - po zerwaniu połączenia nie wiadomo, czy usługa je wykonała
+NON_IDEMPOTENT_OPERATIONS = {"register", "update_user_stats", "add_question", "add_questions",
+                             "delete_question_by_id", "insert_question_attempts"}
+BANK_WRITES = {"add_module", "add_question", "add_questions", "delete_question_by_id", "set_module_order"}
+# Hashowanie trwa setki milisekund - bez zajmowania slotu puli połączeń na ten czas
+PASSWORD_OPERATIONS = {"login", "register"}
+
+SESSION_TTL = 12 * 3600.0  # Ważność sesji od ostatniego użycia (s)
+# Uprawnienia: bez sesji tylko PUBLIC_OPERATIONS; pozostałe odczyty - dowolna ważna sesja
+PUBLIC_OPERATIONS = {"ping", "login", "register"}
+MODERATOR_OPERATIONS = {"get_all_users", "add_module", "set_module_order", "add_question", "add_questions",
+                        "delete_question_by_id"}
+# Zapisy na koncie - tylko w sesji właściciela konta (written_users)
+USER_WRITES = {"ensure_first_module", "update_user_stats", "unlock_module_for_user", "check_achievement",
+               "insert_question_attempts", "apply_journal"}
+
+# Operacje dostępne przez API -> wartość zwracana klientowi, gdy usługa nie odpowiada
+API_OPERATIONS = {
+    "ping": bool,
+    "get_all_users": dict,
+    "login": lambda: None,
+    "register": lambda: None,
+    "ensure_first_module": bool,
+    "update_user_stats": bool,
+    "get_user_stats": lambda: None,
+    "get_leaderboard": list,
+    "get_quiz_data": dict,
+    "add_module": bool,
+    "get_module_order": lambda: None,
+    "set_module_order": bool,
+    "add_question": bool,
+    "add_questions": bool,
+    "delete_question_by_id": bool,
+    "get_module_questions": list,
+    "get_question_weights": list,
+    "get_questions_by_ids": list,
+    "get_module_question_ids": list,
+    "unlock_module_for_user": bool,
+    "get_user_unlocked_modules": list,
+    "get_user_achievements": list,
+    "check_achievement": bool,
+    "insert_question_attempts": bool,
+    "get_question_difficulty": list,
+    "get_user_module_stats": dict,
+    "get_module_stats": dict,
+    "apply_journal": lambda: None,
+}
+
+
+def json_default(value):
+    """Typy z bazy, których nie obsługuje json (DECIMAL z SUM w MySQL, daty)"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Nieobsługiwany typ w odpowiedzi API: {type(value).__name__}")
+
+
+def encode_args(operation: str, args: Tuple) -> List:
+    """Argumenty wywołania jako JSON - czas odpowiedzi w formacie ISO"""
+    if operation == "insert_question_attempts":
+        return [[list(row[:5]) + [row[5].isoformat()] for row in args[0]]]
+    return list(args)
+
+
+def decode_args(operation: str, args: List) -> List:
+    if operation == "insert_question_attempts":
+        return [[tuple(row[:5]) + (datetime.fromisoformat(row[5]),) for row in args[0]]]
+    return args
+
+
+def written_users(operation: str, args: List) -> set:
+    """Konta, których dotyczy zapis z USER_WRITES (argumenty w postaci JSON)"""
+    if operation == "insert_question_attempts":
+        return {row[0] for row in args[0]}
+    if operation == "apply_journal":
+        return {username for _, entry_operation, entry_args in args[0]
+                for username in written_users(entry_operation, entry_args)}
+    return {args[0]}
+
+
+def decode_result(operation: str, result):
+    """Krotki z interfejsu QuizStorage przechodzą przez JSON jako listy"""
+    if operation in ("get_leaderboard", "get_question_weights", "get_module_order") and result is not None:
+        return [tuple(row) for row in result]
+    return result
+
+
+# ================== USŁUGA ==================
+
+class ResponseCache:
+    """Bufor odpowiedzi operacji odczytu z czasem ważności i limitem liczby wpisów"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.entries = {}
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, ttl):
+        with self.lock:
+            now = time.monotonic()
+            if len(self.entries) >= self.max_entries:
+                # Usługa działa tygodniami - bez usuwania bufor rósłby z każdym nowym kluczem
+                self.entries = {k: entry for k, entry in self.entries.items() if entry[0] > now}
+                while len(self.entries) >= self.max_entries:
+                    del self.entries[next(iter(self.entries))]  # Najstarszy wpis
+            self.entries.pop(key, None)
+            self.entries[key] = (now + ttl, value)
+
+    def invalidate(self, operations):
+        with self.lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if key[0] not in operations}
+
+
+class QuizService:
+    """Operacje API na wspólnym backendzie (jedna pula połączeń dla wszystkich stanowisk)"""
+
+    def __init__(self, backend: QuizStorage, max_concurrent: int = DB_POOL_SIZE, moderators=()):
+        self.backend = backend
+        self.moderators = set(moderators)
+        self.cache = ResponseCache()
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.password_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+        self.sessions = {}  # token -> [użytkownik, is_mod, ważna do]
+        self.session_lock = threading.Lock()
+        self.requests = 0
+        self.batched_calls = 0
+        self.denied = 0
+        self.counter_lock = threading.Lock()
+
+    def open_session(self, username: str) -> Optional[str]:
+        """Token sesji po udanym logowaniu; is_mod z bazy, nie od klienta"""
+        stats = self.backend.get_user_stats(username)
+        if stats is None:
+            return None
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self.session_lock:
+            self.sessions = {key: value for key, value in self.sessions.items() if value[2] > now}
+            self.sessions[token] = [username, bool(stats['is_mod']), now + SESSION_TTL]
+        return token
+
+    def session(self, token: Optional[str]) -> Optional[List]:
+        """[użytkownik, is_mod] ważnej sesji (każde użycie przedłuża ważność) albo None"""
+        if not isinstance(token, str):
+            return None
+        now = time.monotonic()
+        with self.session_lock:
+            session = self.sessions.get(token)
+            if session is None or session[2] <= now:
+                self.sessions.pop(token, None)
+                return None
+            session[2] = now + SESSION_TTL
+            return session[:2]
+
+    def authorize(self, operation: str, args: List, token: Optional[str]) -> bool:
+        if operation in PUBLIC_OPERATIONS:
+            return True
+        session = self.session(token)
+        if session is None:
+            return False
+        username, is_mod = session
+        if operation in MODERATOR_OPERATIONS:
+            return is_mod
+        if operation in USER_WRITES:
+            return written_users(operation, args) <= {username}
+        return True
+
+    def call(self, operation: str, args: List, token: Optional[str] = None) -> Tuple[object, bool]:
+        """(wynik, czy baza była dostępna); operacja bez uprawnień daje (None, False)"""
+        if not self.authorize(operation, args, token):
+            with self.counter_lock:
+                self.denied += 1
+            return None, False
+        ttl = CACHE_TTL.get(operation)
+        key = (operation, json.dumps(args)) if ttl else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached[1], True
+        if operation == "register":
+            # Uprawnienia moderatora nadaje usługa, nie klient
+            username, password = args
+            args = [username, password, username in self.moderators]
+        # Więcej równoczesnych operacji niż połączeń w puli kończyłoby się błędem puli
+        with self.password_slots if operation in PASSWORD_OPERATIONS else self.slots:
+            result = getattr(self.backend, operation)(*decode_args(operation, args))
+            available = self.backend.is_available()
+        if operation == "login" and result:
+            result = self.open_session(args[0])
+        if operation == "get_all_users":
+            # Hashe haseł nie wychodzą z usługi (logowanie to operacja login)
+            result = {name: {k: v for k, v in user.items() if k != 'pw'} for name, user in result.items()}
+        if key is not None and available:
+            self.cache.put(key, result, ttl)
+        if operation in BANK_WRITES and result:
+            self.cache.invalidate(BANK_OPERATIONS)
+        return result, available
+
+    def batch(self, calls: List) -> List[Tuple[object, bool]]:
+        with self.counter_lock:
+            self.requests += 1
+            self.batched_calls += len(calls)
+        results = []
+        for operation, args, *token in calls:
+            try:
+                results.append(self.call(operation, args, *token))
+            except Exception as e:
+                # Błąd jednej operacji (np. złe argumenty) nie przerywa partii ani połączenia -
+                # inaczej klient nie dostałby wyników operacji już zatwierdzonych
+                print(f"Błąd operacji API {operation}: {e!r}")
+                results.append((None, False))
+        return results
+
+    def health(self) -> Dict:
+        return {
+            "available": self.backend.ping(),
+            "requests": self.requests,
+            "calls": self.batched_calls,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "sessions": len(self.sessions),
+            "denied": self.denied,
+            "db_stats": self.backend.get_db_stats(),
+        }
+
+
+class QuizAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Połączenie z klientem zostaje otwarte między żądaniami
+    disable_nagle_algorithm = True  # Nagłówki i treść idą osobno - bez tego +40 ms (opóźnione ACK)
+    service: QuizService = None
+
+    def send_json(self, status: int, payload):
+        body = json.dumps(payload, default=json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, self.service.health())
+        else:
+            self.send_json(404, {"error": "nieznany adres"})
+
+    def do_POST(self):
+        if self.path != "/batch":
+            self.send_json(404, {"error": "nieznany adres"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            calls = json.loads(self.rfile.read(length))["calls"]
+            if len(calls) > MAX_BATCH_SIZE:
+                raise ValueError(f"partia większa niż {MAX_BATCH_SIZE}")
+            for operation, args, *token in calls:
+                if operation not in API_OPERATIONS or not isinstance(args, list):
+                    raise ValueError(f"nieznana operacja: {operation}")
+                if len(token) > 1 or not isinstance(token[0] if token else None, (str, type(None))):
+                    raise ValueError(f"zły token sesji: {operation}")
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_json(200, {"results": self.service.batch(calls)})
+
+    def log_message(self, format, *args):
+        """Bez wpisu na każde żądanie - liczniki są w /health"""
+
+
+def create_server(service: QuizService, host: str = API_HOST, port: int = API_PORT) -> ThreadingHTTPServer:
+    handler = type("BoundQuizAPIHandler", (QuizAPIHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ================== KLIENT ==================
+
+class PendingCall:
+    def __init__(self, operation: str, args: List, token: Optional[str]):
+        self.operation = operation
+        self.args = args
+        self.token = token
+        self.result = None
+        self.available = False
+        self.done = threading.Event()
+
+
+class RemoteStorage(QuizStorage):
+    """Backend stanowiska korzystający z usługi quiz_api.py zamiast z bazy"""
+
+    name = "remote"
+
+    def __init__(self, url: str = API_URL, timeout: float = API_TIMEOUT, batch_window: float = BATCH_WINDOW):
+        super().__init__()
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.connection = None
+        self.queue = []
+        self.sending = False
+        self.queue_lock = threading.Lock()
+        self.local = threading.local()
+        self.sessions = {}  # użytkownik -> token sesji z login
+        self.session_user = None  # Ostatnio zalogowany - jego sesją idą odczyty i operacje moderatora
+
+    def session_token(self, operation: str, args: List) -> Optional[str]:
+        """Zapis na koncie idzie sesją właściciela (stanowisko offline wysyła dzienniki wielu
+        graczy), pozostałe operacje - sesją ostatnio zalogowanego użytkownika"""
+        if operation in PUBLIC_OPERATIONS:
+            return None
+        if operation in USER_WRITES:
+            users = written_users(operation, args)
+            if len(users) == 1:
+                return self.sessions.get(users.pop())
+        return self.sessions.get(self.session_user)
+
+    def call(self, operation: str, *args):
+        """Wywołanie operacji usługi. Jeden wątek naraz wysyła żądanie; wywołania, które
+        przyjdą w tym czasie, czekają i idą razem następnym żądaniem /batch"""
+        start = time.perf_counter()
+        monitored = self.start_call(operation)
+        encoded = encode_args(operation, args)
+        pending = PendingCall(operation, encoded, self.session_token(operation, encoded))
+        with self.queue_lock:
+            self.queue.append(pending)
+            leader = not self.sending
+            self.sending = True
+        if leader:
+            if self.batch_window:
+                time.sleep(self.batch_window)
+            self.send_queued()
+        pending.done.wait()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.record_stat(operation, elapsed_ms, error=not pending.available)
+        self.finish_call(monitored, start, error=not pending.available)
+        self.local.available = pending.available
+        if not pending.available and pending.result is None:
+            return API_OPERATIONS[operation]()
+        return decode_result(operation, pending.result)
+
+    def send_queued(self):
+        while True:
+            with self.queue_lock:
+                batch, self.queue = self.queue[:MAX_BATCH_SIZE], self.queue[MAX_BATCH_SIZE:]
+                if not batch:
+                    self.sending = False
+                    return
+            try:
+                results = self.post([[p.operation, p.args, p.token] for p in batch])
+                for p, (result, available) in zip(batch, results):
+                    p.result, p.available = result, available
+            except (OSError, http.client.HTTPException, ValueError, KeyError) as e:
+                print(f"Błąd usługi danych ({self.host}:{self.port}): {e}")
+                self.reset_connection()
+            finally:
+                for p in batch:
+                    p.done.set()
+
+    def post(self, calls: List) -> List:
+        body = json.dumps({"calls": calls}, default=json_default)
+        # Partię ponawiamy tylko, gdy nic nie mogło zostać zapisane dwukrotnie: żądanie nie
+        # doszło do usługi albo wszystkie operacje partii są idempotentne
+        retry_safe = all(call[0] not in NON_IDEMPOTENT_OPERATIONS for call in calls)
+        for attempt in range(2):
+            if self.connection is not None and self.connection_closed():
+                self.reset_connection()
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            sent = False
+            try:
+                self.connection.request("POST", "/batch", body, {"Content-Type": "application/json"})
+                sent = True
+                response = self.connection.getresponse()
+                payload = json.loads(response.read())
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.reset_connection()
+                if attempt or (sent and not retry_safe):
+                    raise
+        if response.status != 200:
+            raise ValueError(payload.get("error", response.status))
+        return payload["results"]
+
+    def connection_closed(self) -> bool:
+        """Czy usługa zamknęła nieużywane połączenie keep-alive (np. po restarcie) -
+        sprawdzane przed wysłaniem, żeby nie ponawiać zapisów po zerwaniu"""
+        sock = self.connection.sock
+        if sock is None:
+            return False
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable)
+
+    def reset_connection(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def is_available(self):
+        """Wynik ostatniego wywołania w bieżącym wątku"""
+        return getattr(self.local, "available", True)
+
+    def close(self):
+        self.reset_connection()
+
+    def ping(self) -> bool:
+        return self.call("ping")
+
+    def ensure_schema(self, default_modules: List[str] = ()) -> bool:
+        """Schemat przygotowuje usługa przy starcie - klient sprawdza tylko, czy odpowiada"""
+        return self.ping()
+
+    def get_all_users(self) -> Dict:
+        """Bez hashy haseł"""
+        return self.call("get_all_users")
+
+    def login(self, username: str, password: str) -> Optional[bool]:
+        """Hasło sprawdza usługa (razem z przeliczeniem hasha i naprawą konta) - po udanym
+        logowaniu zwraca token sesji, którym idą kolejne operacje"""
+        result = self.call("login", username, password)
+        if not isinstance(result, str):
+            return result
+        with self.queue_lock:
+            self.sessions[username] = result
+            self.session_user = username
+        return True
+
+    def register(self, username: str, password: str, is_mod: bool = False) -> Optional[bool]:
+        """is_mod ustala usługa według swojej listy moderatorów - klient go nie wysyła"""
+        return self.call("register", username, password)
+
+    def ensure_first_module(self, username: str) -> bool:
+        return self.call("ensure_first_module", username)
+
+    def update_user_stats(self, username: str, xp_delta: int = 0, correct_delta: int = 0, wrong_delta: int = 0,
+                          module_name: Optional[str] = None) -> bool:
+        return self.call("update_user_stats", username, xp_delta, correct_delta, wrong_delta, module_name)
+
+    def get_user_stats(self, username: str) -> Optional[Dict]:
+        return self.call("get_user_stats", username)
+
+    def get_leaderboard(self, limit: int = 5) -> List[Tuple[str, Dict]]:
+        return self.call("get_leaderboard", limit)
+
+    def get_quiz_data(self) -> Dict:
+        return self.call("get_quiz_data")
+
+    def add_module(self, module_name: str) -> bool:
+        return self.call("add_module", module_name)
+
+    def get_module_order(self) -> Optional[List[Tuple[str, Optional[str]]]]:
+        return self.call("get_module_order")
+
+    def set_module_order(self, modules: List[Tuple[str, Optional[str]]]) -> bool:
+        return self.call("set_module_order", [list(row) for row in modules])
+
+    def add_question(self, module_name: str, question_data: Dict) -> bool:
+        return self.call("add_question", module_name, question_data)
+
+    def add_questions(self, module_name: str, questions: List[Dict]) -> bool:
+        return self.call("add_questions", module_name, questions)
+
+    def delete_question_by_id(self, module_name: str, question_id: int) -> bool:
+        return self.call("delete_question_by_id", module_name, question_id)
+
+    def get_module_questions(self, module_name: str) -> List[Dict]:
+        return self.call("get_module_questions", module_name)
+
+    def get_question_weights(self, username: str, module_name: str) -> List[Tuple[int, int, int]]:
+        return self.call("get_question_weights", username, module_name)
+
+    def get_questions_by_ids(self, question_ids: List[int]) -> List[Dict]:
+        return self.call("get_questions_by_ids", list(question_ids))
+
+    def get_module_question_ids(self, module_name: str) -> List[int]:
+        return self.call("get_module_question_ids", module_name)
+
+    def unlock_module_for_user(self, username: str, module_name: str) -> bool:
+        return self.call("unlock_module_for_user", username, module_name)
+
+    def get_user_unlocked_modules(self, username: str) -> List[str]:
+        return self.call("get_user_unlocked_modules", username)
+
+    def get_user_achievements(self, username: str) -> List[str]:
+        return self.call("get_user_achievements", username)
+
+    def check_achievement(self, username: str, ach_id: str) -> bool:
+        return self.call("check_achievement", username, ach_id)
+
+    def insert_question_attempts(self, rows: List[Tuple]) -> bool:
+        return self.call("insert_question_attempts", rows)
+
+    def get_question_difficulty(self, module_name: str) -> List[Dict]:
+        return self.call("get_question_difficulty", module_name)
+
+    def get_user_module_stats(self, username: str) -> Dict[str, Dict]:
+        return self.call("get_user_module_stats", username)
+
+    def get_module_stats(self) -> Dict[str, Dict]:
+        return self.call("get_module_stats")
+
+    def apply_journal(self, entries) -> Optional[int]:
+        return self.call("apply_journal", [list(entry) for entry in entries])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokalna usługa danych quizu (HTTP/JSON)")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--mysql-database", help="baza MySQL (domyślnie z DB_CONFIG w quiz.py)")
+    args = parser.parse_args()
+
+    import quiz
+    if args.mysql_database:
+        quiz.DB_CONFIG['database'] = args.mysql_database
+    if quiz.STORAGE_BACKEND == "remote":
+        parser.error("usługa potrzebuje bazy: QUIZ_STORAGE=mysql albo sqlite")
+    backend = quiz.get_storage()
+    if not backend.ensure_schema(quiz.DEFAULT_MODULES):
+        print("BŁĄD: Nie można przygotować bazy danych")
+        raise SystemExit(1)
+    server = create_server(QuizService(backend, moderators=quiz.MODERATOR_USERS), args.host, args.port)
+    print(f"Usługa danych quizu: http://{args.host}:{args.port} (backend {backend.name})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
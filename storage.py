@@ -0,0 +1,2364 @@
+"""
+Warstwa przechowywania danych quizu.
+
+QuizStorage opisuje wszystkie operacje na użytkownikach, modułach, pytaniach,
+osiągnięciach i odblokowanych modułach. Dostępne implementacje:
+- MySQLStorage - serwer MySQL (pula połączeń, przygotowane zapytania,
+  ponowienia i bezpiecznik),
+- SQLiteStorage - wbudowana baza SQLite w trybie WAL, z tym samym schematem;
+  pozwala uruchomić aplikację, testy i benchmarki bez serwera MySQL.
+"""
+
+import functools
+import json
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from migrations import BASELINE_VERSION, SCHEMA_VERSION, Migration, pending_migrations
+from passwords import dummy_hash, hash_password, needs_rehash, verify_password
+
+# mysql.connector importowany jest dopiero przy tworzeniu MySQLStorage (import_mysql) -
+# sam import trwa ~0,1 s, a SQLite i narzędzia go nie potrzebują
+mysql = Error = pooling = PoolError = None
+
+# Odporność warstwy bazy danych
+DB_MAX_RETRIES = 3  # Maksymalna liczba ponowień przy błędach przejściowych
+DB_RETRY_BASE_DELAY = 0.1  # Opóźnienie pierwszego ponowienia (s), dalej rośnie wykładniczo
+DB_RETRY_MAX_DELAY = 2.0  # Górny limit opóźnienia ponowienia (s)
+CIRCUIT_FAILURE_THRESHOLD = 5  # Liczba kolejnych awarii, po której bezpiecznik się otwiera
+CIRCUIT_RESET_TIMEOUT = 10.0  # Po ilu sekundach bezpiecznik przepuszcza próbę testową
+# Pula połączeń i przygotowane zapytania (server-side prepared statements)
+DB_POOL_NAME = "quiz_pool"
+DB_POOL_SIZE = 5  # Maksymalnie 32 (limit mysql-connector)
+USE_PREPARED_STATEMENTS = True
+# Kody błędów MySQL uznawane za przejściowe
+TRANSIENT_CONNECT_ERRORS = {2002, 2003, 2005, 2055}  # Brak połączenia z serwerem
+TRANSIENT_LOST_ERRORS = {2006, 2013}  # Połączenie zerwane w trakcie zapytania
+TRANSIENT_ROLLBACK_ERRORS = {1205, 1213}  # Lock wait timeout / deadlock - transakcja wycofana
+ER_NO_SUCH_TABLE = 1146
+ER_DUP_ENTRY = 1062
+# Błędy DDL oznaczające, że zmiana z migracji jest już w bazie (np. przerwany zapis wersji)
+ALREADY_APPLIED_ERRORS = {1050, 1060, 1061, 1091}  # tabela / kolumna / indeks istnieje, brak obiektu do usunięcia
+
+# Import pytań (add_questions) - wierszy w jednym executemany; cały import to jedna transakcja
+QUESTION_BATCH_SIZE = 500
+# Eksport (export_data.py) - wierszy pobieranych naraz z kursora niebuforowanego
+EXPORT_FETCH_SIZE = 1000
+
+# Dziennik odpowiedzi (question_attempts)
+ATTEMPT_PARTITION_MONTHS_AHEAD = 3  # Ile miesięcznych partycji tworzyć z wyprzedzeniem
+
+# SQLite
+SQLITE_BUSY_TIMEOUT_MS = 5000  # Jak długo czekać na blokadę zapisu innego procesu
+
+
+# ================== WSPÓLNE ELEMENTY ==================
+
+class CircuitBreaker:
+    """Bezpiecznik chroniący bazę przed lawiną połączeń, gdy serwer nie odpowiada.
+    closed -> open po serii błędów; po czasie reset_timeout przepuszcza jedną próbę (half_open)."""
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Czy można teraz wykonać operację na bazie"""
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            # half_open: próba testowa już trwa - pozostałe wywołania odrzucamy
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+def retry_delay(attempt):
+    """Wykładnicze opóźnienie z losowym rozrzutem (full jitter)"""
+    return random.uniform(0, min(DB_RETRY_MAX_DELAY, DB_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def import_mysql():
+    """Importuje mysql.connector przy pierwszym użyciu backendu MySQL"""
+    global mysql, Error, pooling, PoolError
+    if mysql is None:
+        import mysql.connector
+        from mysql.connector import Error, pooling
+        from mysql.connector.errors import PoolError
+    return mysql
+
+
+FAILED = object()  # Wynik run() przy błędzie - odróżnia awarię od pustego wyniku operacji
+
+
+def storage_operation(default=None, idempotent=True, use_database=True):
+    """Dekorator metod backendu. Metoda dostaje połączenie jako pierwszy argument
+    (po self), a wywołujący go nie podaje. `default` może być wartością lub fabryką
+    (np. dict, list) - zwracaną, gdy operacja się nie powiedzie. Wynik wywołania
+    zapisywany jest dla bieżącego wątku (is_available)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            result = self.run(func.__name__, lambda connection: func(self, connection, *args, **kwargs),
+                              FAILED, idempotent, use_database)
+            self.outcome.available = result is not FAILED
+            if result is FAILED:
+                return default() if callable(default) else default
+            return result
+        return wrapper
+    return decorator
+
+
+def question_from_row(row) -> Dict:
+    """Zamienia wiersz (question_text, option_a..option_d, correct_answer) na słownik pytania"""
+    return {
+        'question': row[0],
+        'options': [row[1], row[2], row[3], row[4]],
+        'correct': row[5]
+    }
+
+
+def question_params(module_name: str, question_data: Dict) -> Tuple:
+    """Parametry INSERT INTO questions (module_name, question_text, option_a..option_d, correct_answer)"""
+    return (module_name, question_data['question'], *question_data['options'][:4], question_data['correct'])
+
+
+def fetch_batches(cursor, size: int = EXPORT_FETCH_SIZE):
+    """Wiersze kursora pobierane partiami - w pamięci jest najwyżej `size` wierszy naraz"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def export_user(row) -> Dict:
+    """Wiersz zapytania eksportu kont -> dane konta w formacie users.json (jak get_all_users)"""
+    return {
+        'pw': row[1],
+        'is_mod': bool(row[2]),
+        'xp': row[3],
+        'stats_correct': row[4],
+        'stats_wrong': row[5],
+        'achievements': json.loads(row[6]) if row[6] else [],
+        'unlocked': json.loads(row[7]) if row[7] else [],
+    }
+
+
+def aggregate_attempts(rows: List[Tuple]):
+    """Agreguje partię odpowiedzi w pamięci: liczniki na pytanie i na parę (użytkownik, pytanie)"""
+    per_question = {}
+    per_user_question = {}
+    for username, question_id, _, is_correct, latency_ms, _ in rows:
+        attempts, correct, latency = per_question.get(question_id, (0, 0, 0))
+        per_question[question_id] = (attempts + 1, correct + (1 if is_correct else 0), latency + latency_ms)
+        good, bad = per_user_question.get((username, question_id), (0, 0))
+        per_user_question[(username, question_id)] = (good + (1 if is_correct else 0), bad + (0 if is_correct else 1))
+    return per_question, per_user_question
+
+
+def rows_as_dicts(cursor, rows):
+    """Zamienia wiersze z kursora (krotki) na słowniki nazwa kolumny -> wartość"""
+    columns = [c[0] for c in cursor.description] if cursor.description else []
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class StorageCall:
+    """Pomiar jednego wywołania operacji backendu (przekazywany do add_call_listener)"""
+
+    def __init__(self, operation):
+        self.operation = operation  # Nazwa metody QuizStorage, np. get_all_users
+        self.connect_ms = 0.0  # Pobranie połączenia (z puli / otwarcie pliku)
+        self.execute_ms = 0.0  # Suma czasów zapytań
+        self.total_ms = 0.0  # Całe wywołanie, z ponowieniami
+        self.queries = 0
+        self.rows = 0  # Wiersze pobrane z kursorów
+        self.error = False
+        self.slowest_sql = None
+        self.slowest_ms = 0.0
+
+    def record_query(self, sql, elapsed_ms):
+        self.queries += 1
+        self.execute_ms += elapsed_ms
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_sql, self.slowest_ms = sql, elapsed_ms
+
+
+class TracingCursor:
+    """Kursor mierzący zapytania i pobrane wiersze wywołania (StorageCall);
+    każde zapytanie zgłasza też słuchaczom backendu (add_query_listener)"""
+
+    def __init__(self, target, storage, call):
+        self.target = target
+        self.storage = storage
+        self.call = call
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            return self.wrap_result(self.target.execute(sql, params))
+        finally:
+            self.finish_query(sql, params, start)
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        start = time.perf_counter()
+        try:
+            return self.wrap_result(self.target.executemany(sql, seq_params))
+        finally:
+            self.finish_query(sql, seq_params, start)
+
+    def finish_query(self, sql, params, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.call.record_query(sql, elapsed_ms)
+        self.storage.notify_query(self.call.operation, sql, params, elapsed_ms)
+
+    def wrap_result(self, result):
+        """sqlite3 zwraca kursor z execute - też go opakowujemy, żeby liczyć pobrane wiersze"""
+        if result is None or result is self.target:
+            return None if result is None else self
+        return TracingCursor(result, self.storage, self.call)
+
+    def fetchone(self):
+        row = self.target.fetchone()
+        if row is not None:
+            self.call.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self.target.fetchmany(*args, **kwargs)
+        self.call.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.target.fetchall()
+        self.call.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self.target:
+            self.call.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+class TracingConnection(TracingCursor):
+    """Połączenie, którego kursory (oraz execute w SQLite) są mierzone"""
+
+    def cursor(self, *args, **kwargs):
+        return self.wrap(self.target.cursor(*args, **kwargs))
+
+    def wrap(self, cursor):
+        return TracingCursor(cursor, self.storage, self.call)
+
+
+class QuizStorage:
+    """Interfejs magazynu danych quizu.
+
+    Każda metoda zwraca wartość "pustą" (False / [] / {} / None), gdy operacja
+    się nie powiedzie, więc interfejs nie musi obsługiwać wyjątków bazy danych.
+    """
+
+    name = "abstract"
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+        self.query_listeners = []
+        self.call_listeners = []
+        self.outcome = threading.local()  # Wynik ostatniej operacji w danym wątku
+        self.pending_schema = []  # Migracje czekające na administratora (ensure_schema)
+
+    # --- infrastruktura ---
+
+    def run(self, name, operation, default=None, idempotent=True, use_database=True):
+        """Wykonuje operację na połączeniu backendu (implementacja w podklasie)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Zwalnia zasoby backendu (połączenia)"""
+
+    def add_query_listener(self, listener):
+        """Rejestruje listener(operacja, sql, parametry, czas_ms) wywoływany po każdym zapytaniu"""
+        self.query_listeners.append(listener)
+
+    def remove_query_listener(self, listener):
+        self.query_listeners.remove(listener)
+
+    def notify_query(self, operation, sql, params, elapsed_ms):
+        for listener in list(self.query_listeners):
+            listener(operation, sql, params, elapsed_ms)
+
+    def add_call_listener(self, listener):
+        """Rejestruje listener(StorageCall) wywoływany po zakończeniu każdej operacji
+        (czas połączenia, czas zapytań, liczba wierszy)"""
+        self.call_listeners.append(listener)
+
+    def remove_call_listener(self, listener):
+        self.call_listeners.remove(listener)
+
+    def start_call(self, name) -> Optional[StorageCall]:
+        """Pomiar wywołania tylko wtedy, gdy ktoś nasłuchuje - inaczej bez narzutu"""
+        if not (self.query_listeners or self.call_listeners):
+            return None
+        return StorageCall(name)
+
+    def finish_call(self, call, start, error=False):
+        if call is None:
+            return
+        call.total_ms = (time.perf_counter() - start) * 1000
+        call.error = error
+        for listener in list(self.call_listeners):
+            listener(call)
+
+    def traced(self, connection, call):
+        """Opakowuje połączenie, gdy wywołanie jest mierzone (start_call)"""
+        if call is None:
+            return connection
+        return TracingConnection(connection, self, call)
+
+    def record_stat(self, name, elapsed_ms=0.0, error=False, retry=False, rejected=False):
+        """Aktualizuje liczniki wywołań, błędów i czasu wykonania dla operacji"""
+        with self.stats_lock:
+            stat = self.stats.setdefault(name, {
+                'calls': 0, 'errors': 0, 'retries': 0, 'rejected': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            if retry:
+                stat['retries'] += 1
+                return
+            if rejected:
+                stat['rejected'] += 1
+                return
+            stat['calls'] += 1
+            stat['total_ms'] += elapsed_ms
+            stat['max_ms'] = max(stat['max_ms'], elapsed_ms)
+            if error:
+                stat['errors'] += 1
+
+    def get_db_stats(self) -> Dict[str, Dict]:
+        """Zwraca kopię liczników operacji (ze średnim czasem wykonania)"""
+        with self.stats_lock:
+            result = {}
+            for name, stat in self.stats.items():
+                result[name] = dict(stat)
+                result[name]['avg_ms'] = stat['total_ms'] / stat['calls'] if stat['calls'] else 0.0
+            return result
+
+    def is_available(self):
+        """Czy ostatnia operacja w bieżącym wątku się powiodła (do rozróżnienia "brak danych" od
+        awarii). Stan bezpiecznika jest wspólny dla wątków - używany tylko przed pierwszą operacją"""
+        available = getattr(self.outcome, "available", None)
+        if available is None:
+            return self.breaker.state == "closed" and self.breaker.failures == 0
+        return available
+
+    def ping(self) -> bool:
+        """Sprawdza, czy baza odpowiada"""
+        raise NotImplementedError
+
+    # --- schemat ---
+
+    def init_database(self, default_modules: List[str] = ()) -> bool:
+        """Tworzy schemat (tabele, widoki) jeśli nie istnieje, dodaje domyślne moduły
+        i zapisuje BASELINE_VERSION"""
+        raise NotImplementedError
+
+    def get_schema_version(self) -> int:
+        """Wersja schematu zapisana w bazie (0 - brak schematu)"""
+        raise NotImplementedError
+
+    def get_applied_migrations(self) -> List[Dict]:
+        """Zastosowane migracje: {version, description, applied_at}, rosnąco według wersji"""
+        raise NotImplementedError
+
+    def apply_migration(self, migration: Migration) -> bool:
+        """Wykonuje polecenia migracji i zapisuje jej numer w schema_version"""
+        raise NotImplementedError
+
+    def migrate(self, target: int = SCHEMA_VERSION) -> bool:
+        """Stosuje po kolei wszystkie brakujące migracje do wersji target"""
+        applied = [m['version'] for m in self.get_applied_migrations()]
+        for migration in pending_migrations(applied, target):
+            if not self.apply_migration(migration):
+                return False
+        return True
+
+    def ensure_schema(self, default_modules: List[str] = ()) -> bool:
+        """Przy aktualnym schemacie kosztuje jedno zapytanie.
+        Pusta baza dostaje pełny schemat ze wszystkimi migracjami, istniejąca - brakujące
+        migracje online. Migracja bez online zatrzymuje start (False, pending_schema) -
+        stosuje ją administrator (migrate_json_to_mysql.py --migrate)."""
+        version = self.get_schema_version()
+        if version >= SCHEMA_VERSION:
+            self.pending_schema = []
+            return True
+        if version < BASELINE_VERSION:
+            return self.init_database(default_modules) and self.migrate()
+        pending = pending_migrations([m['version'] for m in self.get_applied_migrations()])
+        for i, migration in enumerate(pending):
+            if not migration.online:
+                self.pending_schema = [m.version for m in pending[i:]]
+                print(f"Schemat bazy danych wymaga migracji {self.pending_schema} - "
+                      f"uruchom: python migrate_json_to_mysql.py --migrate")
+                return False
+            print(f"Migracja schematu {migration.version}: {migration.description}")
+            if not self.apply_migration(migration):
+                return False
+        self.pending_schema = []
+        return True
+
+    # --- użytkownicy ---
+
+    def get_all_users(self) -> Dict:
+        """Wszyscy użytkownicy: nazwa -> {pw, is_mod, xp, stats_correct, stats_wrong, achievements, unlocked}"""
+        raise NotImplementedError
+
+    def save_user(self, username: str, user_data: Dict) -> bool:
+        """Zapisuje lub nadpisuje użytkownika wraz z osiągnięciami i odblokowanymi modułami.
+        Nadpisuje też XP i liczniki - tylko dla importu danych, nie dla działającej aplikacji."""
+        raise NotImplementedError
+
+    def create_user(self, username: str, password_hash: str, is_mod: bool = False) -> Optional[bool]:
+        """Zakłada konto i odblokowuje pierwszy moduł w jednej transakcji.
+        True - konto założone, False - nazwa zajęta (klucz główny), None - błąd bazy"""
+        raise NotImplementedError
+
+    def update_password_hash(self, username: str, old_hash: str, new_hash: str) -> bool:
+        """Zmienia hash hasła tylko wtedy, gdy w bazie jest nadal old_hash (porównaj i zamień)"""
+        raise NotImplementedError
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Hash hasła użytkownika (ścieżka logowania) albo None, gdy konta nie ma"""
+        raise NotImplementedError
+
+    def ensure_first_module(self, username: str) -> bool:
+        """Odblokowuje pierwszy moduł, jeśli użytkownik nie ma żadnego (jedno polecenie);
+        True tylko gdy konto zostało naprawione"""
+        raise NotImplementedError
+
+    def login(self, username: str, password: str) -> Optional[bool]:
+        """Sprawdza hasło, przelicza hash w starym formacie (albo z niższym kosztem) i naprawia
+        konto bez modułów. True - poprawne dane, False - błędny login lub hasło, None - baza niedostępna"""
+        # Jedno wyszukiwanie po kluczu głównym - koszt nie zależy od liczby kont
+        stored_hash = self.get_password_hash(username)
+        if stored_hash is None:
+            if not self.is_available():
+                return None
+            verify_password(password, dummy_hash())  # Ten sam koszt co przy istniejącym koncie
+            return False
+        if not verify_password(password, stored_hash):
+            return False
+        if needs_rehash(stored_hash):
+            # Tylko hash hasła i tylko jeśli nikt go w międzyczasie nie zmienił
+            self.update_password_hash(username, stored_hash, hash_password(password))
+        self.ensure_first_module(username)
+        return True
+
+    def register(self, username: str, password: str, is_mod: bool = False) -> Optional[bool]:
+        """Zakłada konto z hashem hasła. True - konto założone, False - nazwa zajęta, None - błąd bazy"""
+        return self.create_user(username, hash_password(password), is_mod)
+
+    def update_user_stats(self, username: str, xp_delta: int = 0, correct_delta: int = 0, wrong_delta: int = 0,
+                          module_name: Optional[str] = None) -> bool:
+        """Zwiększa XP i liczniki odpowiedzi (oraz statystyki zbiorcze modułu)"""
+        raise NotImplementedError
+
+    def get_user_stats(self, username: str) -> Optional[Dict]:
+        """{xp, stats_correct, stats_wrong, is_mod} albo None"""
+        raise NotImplementedError
+
+    def get_leaderboard(self, limit: int = 5) -> List[Tuple[str, Dict]]:
+        """Ranking TOP N wg XP: [(nazwa, {xp})] - odczyt indeksu idx_users_xp zamiast wszystkich kont"""
+        raise NotImplementedError
+
+    # --- moduły i pytania ---
+
+    def get_quiz_data(self) -> Dict:
+        """Wszystkie pytania pogrupowane według modułów (w kolejności sort_order, potem nazwy)"""
+        raise NotImplementedError
+
+    def add_module(self, module_name: str) -> bool:
+        """Dodaje moduł na końcu kolejności"""
+        raise NotImplementedError
+
+    def get_module_order(self) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """Moduły w kolejności: [(nazwa, wymagany moduł albo None)]; None przy błędzie bazy"""
+        raise NotImplementedError
+
+    def set_module_order(self, modules: List[Tuple[str, Optional[str]]]) -> bool:
+        """Ustawia kolejność i wymagane moduły (jak w get_module_order) w jednej transakcji"""
+        raise NotImplementedError
+
+    def add_question(self, module_name: str, question_data: Dict) -> bool:
+        raise NotImplementedError
+
+    def add_questions(self, module_name: str, questions: List[Dict]) -> bool:
+        """Dodaje partię pytań (import moderatora) w jednej transakcji - wszystkie albo żadne"""
+        raise NotImplementedError
+
+    def delete_question_by_id(self, module_name: str, question_id: int) -> bool:
+        """Usuwa pytanie o podanym ID z modułu; False, gdy już go nie ma (np. usunięte
+        z innego stanowiska) - lista w panelu moderatora mogła się w międzyczasie zmienić"""
+        raise NotImplementedError
+
+    def get_module_questions(self, module_name: str) -> List[Dict]:
+        """Pytania modułu w kolejności ID, z ID pytania ('id')"""
+        raise NotImplementedError
+
+    def get_question_weights(self, username: str, module_name: str) -> List[Tuple[int, int, int]]:
+        """(question_id, poprawne, błędne) użytkownika dla każdego pytania modułu"""
+        raise NotImplementedError
+
+    def get_questions_by_ids(self, question_ids: List[int]) -> List[Dict]:
+        """Pytania o podanych ID w kolejności listy (z kluczem 'id')"""
+        raise NotImplementedError
+
+    def get_module_question_ids(self, module_name: str) -> List[int]:
+        """ID pytań modułu w kolejności ID (np. do kompilacji banku pytań)"""
+        raise NotImplementedError
+
+    # --- osiągnięcia i odblokowane moduły ---
+
+    def unlock_module_for_user(self, username: str, module_name: str) -> bool:
+        """Odblokowuje moduł; True tylko gdy został właśnie odblokowany"""
+        raise NotImplementedError
+
+    def get_user_unlocked_modules(self, username: str) -> List[str]:
+        raise NotImplementedError
+
+    def get_user_achievements(self, username: str) -> List[str]:
+        raise NotImplementedError
+
+    def check_achievement(self, username: str, ach_id: str) -> bool:
+        """Dodaje osiągnięcie; True tylko gdy zostało właśnie zdobyte"""
+        raise NotImplementedError
+
+    # --- dziennik odpowiedzi i statystyki ---
+
+    def insert_question_attempts(self, rows: List[Tuple]) -> bool:
+        """Zapisuje partię odpowiedzi (username, question_id, chosen_option, is_correct, latency_ms, answered_at)"""
+        raise NotImplementedError
+
+    def get_question_difficulty(self, module_name: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_user_module_stats(self, username: str) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def get_module_stats(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def rebuild_stats_rollups(self) -> bool:
+        """Przelicza question_difficulty i user_question_stats z dziennika odpowiedzi.
+        user_module_stats i module_stats pochodzą z update_user_stats, nie z dziennika -
+        dziennik buforowany po stronie stanowiska może nie mieć wszystkich odpowiedzi"""
+        raise NotImplementedError
+
+    # --- synchronizacja stanowisk offline (offline.py) ---
+
+    def apply_journal(self, entries: List[Tuple[str, str, List]]) -> Optional[int]:
+        """Stosuje partię wpisów dziennika stanowiska offline (id wpisu, operacja, argumenty) w jednej
+        transakcji. Wpisy już zastosowane (sync_applied) są pomijane, więc powtórzona partia niczego
+        nie dubluje. Zwraca liczbę nowych wpisów albo None przy błędzie bazy"""
+        raise NotImplementedError
+
+    def replay_journal(self, connection, entries, mark_applied, user_exists, module_exists) -> int:
+        """Wspólna część apply_journal: wpisy kont usuniętych w międzyczasie są pomijane,
+        a statystyki i odblokowania usuniętych modułów - odrzucane"""
+        applied = 0
+        for entry_id, operation, args in entries:
+            if not mark_applied(entry_id):
+                continue
+            applied += 1
+            if operation == "insert_question_attempts":
+                rows = [tuple(row[:5]) + (datetime.fromisoformat(row[5]),)
+                        for row in args[0] if user_exists(row[0])]
+                self.write_question_attempts(connection, rows)
+            elif not user_exists(args[0]):
+                continue
+            elif operation == "update_user_stats":
+                username, xp_delta, correct_delta, wrong_delta, module_name = args
+                if module_name and not module_exists(module_name):
+                    module_name = None
+                self.write_user_stats(connection, username, xp_delta, correct_delta, wrong_delta, module_name)
+            elif operation == "check_achievement":
+                self.write_achievement(connection, *args)
+            elif operation == "unlock_module_for_user":
+                if module_exists(args[1]):
+                    self.write_unlock(connection, *args)
+        return applied
+
+    # --- eksport danych (export_data.py) ---
+
+    def export_users(self, sink) -> Optional[int]:
+        """Przekazuje konta strumieniowo do sink.add(nazwa, dane jak w users.json) w jednym spójnym
+        odczycie, bez blokowania tabel. sink.start() wywoływane jest przed pierwszym wierszem (także
+        przy ponowieniu operacji). Zwraca liczbę kont albo None przy błędzie bazy"""
+        raise NotImplementedError
+
+    def export_questions(self, sink) -> Optional[int]:
+        """Jak export_users: sink.add(moduł, pytanie) w kolejności modułów i ID pytań;
+        moduł bez pytań przekazywany jest jako sink.add(moduł, None). Zwraca liczbę pytań"""
+        raise NotImplementedError
+
+
+# ================== MYSQL ==================
+
+def add_months(day: date, months: int) -> date:
+    """Zwraca pierwszy dzień miesiąca przesuniętego o podaną liczbę miesięcy"""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def ensure_attempt_partitions(cursor, months_ahead: int = ATTEMPT_PARTITION_MONTHS_AHEAD):
+    """Dodaje brakujące miesięczne partycje tabeli question_attempts.
+    Nowe partycje są wydzielane z partycji p_future (REORGANIZE PARTITION)."""
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'question_attempts'
+          AND PARTITION_NAME IS NOT NULL
+    """)
+    existing = {row[0] for row in cursor.fetchall()}
+    monthly = sorted(name for name in existing if name != "p_future")
+    last_existing = monthly[-1] if monthly else ""
+
+    this_month = date.today().replace(day=1)
+    new_parts = []
+    for i in range(months_ahead + 1):
+        month = add_months(this_month, i)
+        name = f"p{month.year}{month.month:02d}"
+        # Można wydzielać tylko zakresy powyżej ostatniej istniejącej partycji
+        if name > last_existing:
+            upper = add_months(month, 1)
+            new_parts.append(f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))")
+
+    if new_parts:
+        new_parts.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+        cursor.execute(
+            "ALTER TABLE question_attempts REORGANIZE PARTITION p_future INTO (" + ", ".join(new_parts) + ")")
+
+
+# Najczęściej wykonywane zapytania MySQL - przygotowywane na serwerze raz na połączenie (prepared_cursor)
+SQL_MODULE_QUESTIONS = """
+    SELECT question_id, question_text, option_a, option_b, option_c, option_d, correct_answer
+    FROM questions
+    WHERE module_name = %s
+    ORDER BY question_id
+"""
+SQL_UPDATE_USER_STATS = """
+    UPDATE users 
+    SET xp = xp + %s, stats_correct = stats_correct + %s, stats_wrong = stats_wrong + %s
+    WHERE username = %s
+"""
+SQL_UPSERT_USER_MODULE_STATS = """
+    INSERT INTO user_module_stats (username, module_name, correct_count, wrong_count)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        correct_count = correct_count + VALUES(correct_count),
+        wrong_count = wrong_count + VALUES(wrong_count)
+"""
+SQL_UPSERT_MODULE_STATS = """
+    INSERT INTO module_stats (module_name, correct_count, wrong_count)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        correct_count = correct_count + VALUES(correct_count),
+        wrong_count = wrong_count + VALUES(wrong_count)
+"""
+SQL_USER_STATS = """
+    SELECT xp, stats_correct, stats_wrong, is_mod
+    FROM users WHERE username = %s
+"""
+SQL_QUESTION_WEIGHTS = """
+    SELECT q.question_id, COALESCE(s.correct_count, 0), COALESCE(s.wrong_count, 0)
+    FROM questions q
+    LEFT JOIN user_question_stats s
+        ON s.question_id = q.question_id AND s.username = %s
+    WHERE q.module_name = %s
+    ORDER BY q.question_id
+"""
+SQL_INSERT_ACHIEVEMENT = """
+    INSERT IGNORE INTO user_achievements (username, achievement_id)
+    VALUES (%s, %s)
+"""
+# Pierwszy moduł w kolejności get_quiz_data (sort_order, potem nazwa) - tylko gdy użytkownik nie ma żadnego
+SQL_UNLOCK_FIRST_MODULE = """
+    INSERT IGNORE INTO user_unlocked_modules (username, module_name)
+    SELECT %s, module_name FROM modules
+    WHERE NOT EXISTS (SELECT 1 FROM user_unlocked_modules WHERE username = %s)
+    ORDER BY sort_order, module_name LIMIT 1
+"""
+# Eksport kont - osiągnięcia i odblokowania z indeksów kluczy głównych, w tym samym wierszu,
+# bo kursor niebuforowany pozwala na jedno otwarte zapytanie na połączeniu
+SQL_EXPORT_USERS = """
+    SELECT u.username, u.password_hash, u.is_mod, u.xp, u.stats_correct, u.stats_wrong,
+           (SELECT JSON_ARRAYAGG(a.achievement_id) FROM user_achievements a WHERE a.username = u.username),
+           (SELECT JSON_ARRAYAGG(m.module_name) FROM user_unlocked_modules m WHERE m.username = u.username)
+    FROM users u ORDER BY u.username
+"""
+SQL_PASSWORD_HASH = """
+    SELECT password_hash FROM users WHERE username = %s
+"""
+
+
+def is_transient_error(error, during_operation, idempotent):
+    """Czy błąd MySQL jest przejściowy i operację można bezpiecznie ponowić.
+    Operacji nieidempotentnych nie ponawiamy po zerwaniu połączenia w trakcie wykonania,
+    bo nie wiadomo, czy serwer zdążył zatwierdzić transakcję."""
+    if isinstance(error, PoolError):
+        # Wyczerpana pula - zapytanie nie zostało jeszcze wysłane
+        return not during_operation
+    errno = getattr(error, 'errno', None)
+    if errno in TRANSIENT_ROLLBACK_ERRORS:
+        return True
+    if errno in TRANSIENT_CONNECT_ERRORS:
+        return not during_operation or idempotent
+    if errno in TRANSIENT_LOST_ERRORS:
+        return idempotent
+    return False
+
+
+def raw_connection(connection):
+    """Zwraca właściwe połączenie MySQL (połączenie z puli jest tylko opakowaniem)"""
+    return getattr(connection, '_cnx', connection)
+
+
+class MySQLStorage(QuizStorage):
+    """Backend MySQL: pula połączeń, przygotowane zapytania, ponowienia i bezpiecznik"""
+
+    name = "mysql"
+
+    def __init__(self, config: Dict, pool_size: int = DB_POOL_SIZE, use_prepared: bool = USE_PREPARED_STATEMENTS,
+                 partition_months_ahead: int = ATTEMPT_PARTITION_MONTHS_AHEAD):
+        super().__init__()
+        import_mysql()
+        self.config = dict(config)
+        self.pool_size = pool_size
+        self.use_prepared = use_prepared
+        self.partition_months_ahead = partition_months_ahead
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.prepared_cache = weakref.WeakKeyDictionary()
+
+    def get_pool(self):
+        """Zwraca pulę połączeń (tworzoną przy pierwszym użyciu).
+        pool_reset_session=False - reset sesji usuwałby przygotowane zapytania."""
+        with self.pool_lock:
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(pool_name=DB_POOL_NAME, pool_size=self.pool_size,
+                                                        pool_reset_session=False, **self.config)
+            return self.pool
+
+    def connect(self, use_database=True):
+        """Otwiera osobne połączenie spoza puli (np. do narzędzi administracyjnych)"""
+        config = self.config
+        if not use_database:
+            config = dict(self.config)
+            config.pop('database')
+        return mysql.connector.connect(**config)
+
+    def prepared_cursor(self, connection, sql):
+        """Zwraca kursor z przygotowanym zapytaniem, przechowywany dla danego połączenia z puli.
+        Serwer parsuje zapytanie tylko raz; kolejne wywołania wysyłają same parametry.
+        Zapytanie musi być stałą modułu (SQL_*) - kursor rozpoznaje je po tożsamości obiektu."""
+        if not self.use_prepared:
+            return connection.cursor()
+        raw = raw_connection(connection)
+        cache = self.prepared_cache.get(raw)
+        # Po ponownym połączeniu serwer nie pamięta już przygotowanych zapytań
+        if cache is None or cache['connection_id'] != raw.connection_id:
+            cache = {'connection_id': raw.connection_id, 'cursors': {}}
+            self.prepared_cache[raw] = cache
+        cursor = cache['cursors'].get(sql)
+        if cursor is None:
+            cursor = raw.cursor(prepared=True)
+            cache['cursors'][sql] = cursor
+        if isinstance(connection, TracingConnection):
+            return connection.wrap(cursor)
+        return cursor
+
+    def run(self, name, operation, default=None, idempotent=True, use_database=True):
+        """Wykonuje operację na połączeniu z puli z ponowieniami i bezpiecznikiem.
+        Zwraca wynik operacji albo wartość domyślną, gdy baza jest niedostępna lub wystąpił błąd."""
+        if not self.breaker.allow():
+            self.record_stat(name, rejected=True)
+            return default
+
+        attempt = 0
+        start = time.perf_counter()  # Czas liczony łącznie z ponowieniami
+        call = self.start_call(name)
+        while True:
+            connection = None
+            during_operation = False
+            try:
+                connect_start = time.perf_counter()
+                if use_database:
+                    connection = self.get_pool().get_connection()
+                else:
+                    connection = self.connect(use_database=False)
+                if call is not None:
+                    call.connect_ms += (time.perf_counter() - connect_start) * 1000
+                during_operation = True
+                result = operation(self.traced(connection, call))
+                # Zakończ transakcję odczytu - inaczej połączenie wróci do puli ze starym snapshotem
+                if connection.in_transaction:
+                    connection.rollback()
+                self.breaker.record_success()
+                self.record_stat(name, (time.perf_counter() - start) * 1000)
+                self.finish_call(call, start)
+                return result
+            except Error as e:
+                if connection is not None:
+                    # Kursory przygotowane na tym połączeniu mogą mieć nieodczytane wyniki
+                    self.prepared_cache.pop(raw_connection(connection), None)
+                    try:
+                        connection.rollback()
+                    except Error:
+                        pass
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                transient = is_transient_error(e, during_operation, idempotent)
+                if transient and attempt < DB_MAX_RETRIES:
+                    self.record_stat(name, retry=True)
+                    time.sleep(retry_delay(attempt))
+                    attempt += 1
+                    continue
+                if getattr(e, 'errno', None) in TRANSIENT_CONNECT_ERRORS | TRANSIENT_LOST_ERRORS:
+                    self.breaker.record_failure()
+                else:
+                    # Błąd zapytania (np. naruszenie klucza) - serwer działa
+                    self.breaker.record_success()
+                self.record_stat(name, elapsed_ms, error=True)
+                self.finish_call(call, start, error=True)
+                print(f"Błąd bazy danych ({name}): {e}")
+                return default
+            except Exception:
+                # Błąd programu (np. złe argumenty z quiz_api.py) - wynik trzeba zapisać w bezpieczniku,
+                # inaczej próba testowa half_open nigdy się nie kończy i bezpiecznik odrzuca wszystko
+                if connection is not None:
+                    self.prepared_cache.pop(raw_connection(connection), None)
+                    try:
+                        connection.rollback()
+                    except Error:
+                        pass
+                if during_operation:
+                    self.breaker.record_success()  # Połączenie nawiązane - serwer działa
+                else:
+                    self.breaker.record_failure()
+                self.record_stat(name, (time.perf_counter() - start) * 1000, error=True)
+                self.finish_call(call, start, error=True)
+                raise
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Error:
+                        pass
+
+    @storage_operation(default=False)
+    def ping(self, connection):
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        return True
+
+    @storage_operation(default=0)
+    def get_schema_version(self, connection) -> int:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT MAX(version) FROM schema_version")
+        except Error as e:
+            if e.errno == ER_NO_SUCH_TABLE:
+                return 0
+            raise
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] or 0
+
+    @storage_operation(default=list)
+    def get_applied_migrations(self, connection) -> List[Dict]:
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT version, description, applied_at FROM schema_version ORDER BY version")
+        except Error as e:
+            if e.errno == ER_NO_SUCH_TABLE:
+                return []
+            raise
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    @storage_operation(default=False, idempotent=False)
+    def apply_migration(self, connection, migration: Migration) -> bool:
+        """Wykonuje DDL migracji (online, ALGORITHM=INPLACE / LOCK=NONE) i zapisuje wersję"""
+        cursor = connection.cursor()
+        for statement in migration.mysql:
+            try:
+                cursor.execute(statement)
+            except Error as e:
+                if e.errno not in ALREADY_APPLIED_ERRORS:
+                    raise
+        cursor.execute("INSERT IGNORE INTO schema_version (version, description) VALUES (%s, %s)",
+                       (migration.version, migration.description))
+        connection.commit()
+        cursor.close()
+        return True
+
+    def ensure_schema(self, default_modules: List[str] = ()) -> bool:
+        """Jak w QuizStorage, a dodatkowo dokłada miesięczne partycje dziennika odpowiedzi"""
+        return super().ensure_schema(default_modules) and self.ensure_partitions()
+
+    @storage_operation(default=False)
+    def ensure_partitions(self, connection) -> bool:
+        cursor = connection.cursor()
+        ensure_attempt_partitions(cursor, self.partition_months_ahead)
+        cursor.close()
+        return True
+
+    @storage_operation(default=False, use_database=False)
+    def init_database(self, connection, default_modules: List[str] = ()):
+        """Inicjalizuje bazę danych i tworzy tabele jeśli nie istnieją"""
+        # Połączenie bez wyboru bazy danych (do utworzenia bazy)
+        db_name = self.config['database']
+        cursor = connection.cursor()
+
+        # Utworzenie bazy danych jeśli nie istnieje
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        cursor.execute(f"USE {db_name}")
+
+        # Tabela użytkowników
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                username VARCHAR(20) PRIMARY KEY,
+                password_hash VARCHAR(64) NOT NULL,
+                is_mod BOOLEAN DEFAULT FALSE,
+                xp INT DEFAULT 0,
+                stats_correct INT DEFAULT 0,
+                stats_wrong INT DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Tabela modułów
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS modules (
+                module_name VARCHAR(50) PRIMARY KEY,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Tabela pytań
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS questions (
+                question_id INT AUTO_INCREMENT PRIMARY KEY,
+                module_name VARCHAR(50) NOT NULL,
+                question_text TEXT NOT NULL,
+                option_a VARCHAR(200) NOT NULL,
+                option_b VARCHAR(200) NOT NULL,
+                option_c VARCHAR(200) NOT NULL,
+                option_d VARCHAR(200) NOT NULL,
+                correct_answer INT NOT NULL CHECK (correct_answer BETWEEN 0 AND 3),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (module_name) REFERENCES modules(module_name) ON DELETE CASCADE,
+                INDEX idx_module (module_name)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Tabela osiągnięć użytkowników
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_achievements (
+                username VARCHAR(20),
+                achievement_id VARCHAR(50),
+                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (username, achievement_id),
+                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Tabela odblokowanych modułów użytkowników
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_unlocked_modules (
+                username VARCHAR(20),
+                module_name VARCHAR(50),
+                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (username, module_name),
+                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE,
+                FOREIGN KEY (module_name) REFERENCES modules(module_name) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Tabela wyników użytkowników dla poszczególnych pytań (wagi losowania)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_question_stats (
+                username VARCHAR(20),
+                question_id INT,
+                correct_count INT DEFAULT 0,
+                wrong_count INT DEFAULT 0,
+                PRIMARY KEY (username, question_id),
+                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE,
+                FOREIGN KEY (question_id) REFERENCES questions(question_id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Statystyki zbiorcze użytkownika w module
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_module_stats (
+                username VARCHAR(20),
+                module_name VARCHAR(50),
+                correct_count INT DEFAULT 0,
+                wrong_count INT DEFAULT 0,
+                PRIMARY KEY (username, module_name),
+                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE,
+                FOREIGN KEY (module_name) REFERENCES modules(module_name) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Statystyki zbiorcze modułu (wszyscy użytkownicy)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS module_stats (
+                module_name VARCHAR(50) PRIMARY KEY,
+                correct_count INT DEFAULT 0,
+                wrong_count INT DEFAULT 0,
+                FOREIGN KEY (module_name) REFERENCES modules(module_name) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Dziennik wszystkich odpowiedzi - partycjonowany miesięcznie.
+        # Tabele partycjonowane w MySQL nie obsługują kluczy obcych, a kolumna
+        # partycjonująca musi należeć do klucza głównego.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS question_attempts (
+                attempt_id BIGINT AUTO_INCREMENT,
+                username VARCHAR(20) NOT NULL,
+                question_id INT NOT NULL,
+                chosen_option TINYINT NOT NULL,
+                is_correct BOOLEAN NOT NULL,
+                latency_ms INT NOT NULL,
+                answered_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (attempt_id, answered_at),
+                INDEX idx_attempt_question (question_id, answered_at),
+                INDEX idx_attempt_user (username, answered_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            PARTITION BY RANGE (TO_DAYS(answered_at)) (
+                PARTITION p_future VALUES LESS THAN MAXVALUE
+            )
+        """)
+        ensure_attempt_partitions(cursor, self.partition_months_ahead)
+
+        # Zagregowana trudność pytań - aktualizowana przyrostowo przy zapisie odpowiedzi
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS question_difficulty (
+                question_id INT PRIMARY KEY,
+                attempts INT DEFAULT 0,
+                correct INT DEFAULT 0,
+                total_latency_ms BIGINT DEFAULT 0,
+                FOREIGN KEY (question_id) REFERENCES questions(question_id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        cursor.execute("""
+            CREATE OR REPLACE VIEW question_difficulty_view AS
+            SELECT d.question_id, q.module_name, q.question_text, d.attempts, d.correct,
+                   d.correct / NULLIF(d.attempts, 0) AS accuracy,
+                   d.total_latency_ms / NULLIF(d.attempts, 0) AS avg_latency_ms
+            FROM question_difficulty d
+            JOIN questions q ON q.question_id = d.question_id
+        """)
+
+        # Wersje schematu (sprawdzane przy starcie jednym zapytaniem)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(200),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+
+        # Domyślne moduły - jedno zapytanie zamiast osobnego połączenia na moduł
+        if default_modules:
+            cursor.execute("INSERT IGNORE INTO modules (module_name) VALUES " +
+                           ", ".join(["(%s)"] * len(default_modules)), tuple(default_modules))
+        cursor.execute("INSERT IGNORE INTO schema_version (version, description) VALUES (%s, %s)",
+                       (BASELINE_VERSION, "init_database"))
+
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=dict)
+    def get_all_users(self, connection) -> Dict:
+        """Pobiera wszystkich użytkowników z bazy danych"""
+        users = {}
+        cursor = connection.cursor(dictionary=True)
+
+        # Pobierz użytkowników
+        cursor.execute("SELECT * FROM users")
+        user_rows = cursor.fetchall()
+
+        for user_row in user_rows:
+            username = user_row['username']
+
+            # Pobierz osiągnięcia
+            cursor.execute("SELECT achievement_id FROM user_achievements WHERE username = %s", (username,))
+            achievements = [row['achievement_id'] for row in cursor.fetchall()]
+
+            # Pobierz odblokowane moduły
+            cursor.execute("SELECT module_name FROM user_unlocked_modules WHERE username = %s", (username,))
+            unlocked = [row['module_name'] for row in cursor.fetchall()]
+
+            users[username] = {
+                'pw': user_row['password_hash'],
+                'is_mod': bool(user_row['is_mod']),
+                'xp': user_row['xp'],
+                'stats_correct': user_row['stats_correct'],
+                'stats_wrong': user_row['stats_wrong'],
+                'achievements': achievements,
+                'unlocked': unlocked
+            }
+
+        cursor.close()
+        return users
+
+    @storage_operation(default=False)
+    def save_user(self, connection, username: str, user_data: Dict):
+        """Zapisuje lub aktualizuje użytkownika w bazie danych (import danych - nadpisuje XP i liczniki)"""
+        cursor = connection.cursor()
+
+        # Jedno polecenie zamiast SELECT + INSERT/UPDATE - dwa równoległe zapisy nie kolidują na kluczu
+        cursor.execute("""
+            INSERT INTO users (username, password_hash, is_mod, xp, stats_correct, stats_wrong)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                password_hash = VALUES(password_hash), is_mod = VALUES(is_mod), xp = VALUES(xp),
+                stats_correct = VALUES(stats_correct), stats_wrong = VALUES(stats_wrong)
+        """, (
+            username,
+            user_data['pw'],
+            user_data.get('is_mod', False),
+            user_data.get('xp', 0),
+            user_data.get('stats_correct', 0),
+            user_data.get('stats_wrong', 0)
+        ))
+
+        # Aktualizuj osiągnięcia
+        cursor.execute("DELETE FROM user_achievements WHERE username = %s", (username,))
+        for achievement in user_data.get('achievements', []):
+            cursor.execute("""
+                INSERT INTO user_achievements (username, achievement_id)
+                VALUES (%s, %s)
+            """, (username, achievement))
+
+        # Aktualizuj odblokowane moduły
+        cursor.execute("DELETE FROM user_unlocked_modules WHERE username = %s", (username,))
+        for module in user_data.get('unlocked', []):
+            cursor.execute("""
+                INSERT INTO user_unlocked_modules (username, module_name)
+                VALUES (%s, %s)
+            """, (username, module))
+
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=None, idempotent=False)
+    def create_user(self, connection, username: str, password_hash: str, is_mod: bool = False):
+        """Zakłada konto; duplikat nazwy rozpoznawany po błędzie klucza głównego, bez wcześniejszego SELECT"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("INSERT INTO users (username, password_hash, is_mod) VALUES (%s, %s, %s)",
+                           (username, password_hash, is_mod))
+        except Error as e:
+            if e.errno != ER_DUP_ENTRY:
+                raise
+            connection.rollback()
+            cursor.close()
+            return False
+        cursor.execute(SQL_UNLOCK_FIRST_MODULE, (username, username))
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=None)
+    def get_password_hash(self, connection, username: str) -> Optional[str]:
+        """Hash hasła użytkownika - jedno wyszukiwanie po kluczu głównym"""
+        cursor = self.prepared_cursor(connection, SQL_PASSWORD_HASH)
+        cursor.execute(SQL_PASSWORD_HASH, (username,))
+        rows = cursor.fetchall()
+        return rows[0][0] if rows else None
+
+    @storage_operation(default=False)
+    def ensure_first_module(self, connection, username: str) -> bool:
+        """Naprawa starego konta: odblokowuje pierwszy moduł, jeśli użytkownik nie ma żadnego"""
+        cursor = self.prepared_cursor(connection, SQL_UNLOCK_FIRST_MODULE)
+        cursor.execute(SQL_UNLOCK_FIRST_MODULE, (username, username))
+        unlocked = cursor.rowcount == 1
+        connection.commit()
+        return unlocked
+
+    @storage_operation(default=False)
+    def update_password_hash(self, connection, username: str, old_hash: str, new_hash: str):
+        """Zmienia hash hasła, jeśli nikt go w międzyczasie nie zmienił"""
+        cursor = connection.cursor()
+        cursor.execute("UPDATE users SET password_hash = %s WHERE username = %s AND password_hash = %s",
+                       (new_hash, username, old_hash))
+        changed = cursor.rowcount == 1
+        connection.commit()
+        cursor.close()
+        return changed
+
+    @storage_operation(default=dict)
+    def get_quiz_data(self, connection) -> Dict:
+        """Pobiera wszystkie pytania quizu z bazy danych, pogrupowane według modułów"""
+        quiz_data = {}
+        cursor = connection.cursor(dictionary=True)
+
+        # Pobierz wszystkie moduły (w kolejności przejścia)
+        cursor.execute("SELECT module_name FROM modules ORDER BY sort_order, module_name")
+        modules = [row['module_name'] for row in cursor.fetchall()]
+
+        # Dla każdego modułu pobierz pytania
+        for module in modules:
+            cursor.execute("""
+                SELECT question_text, option_a, option_b, option_c, option_d, correct_answer
+                FROM questions
+                WHERE module_name = %s
+                ORDER BY question_id
+            """, (module,))
+
+            questions = []
+            for row in cursor.fetchall():
+                questions.append({
+                    'question': row['question_text'],
+                    'options': [
+                        row['option_a'],
+                        row['option_b'],
+                        row['option_c'],
+                        row['option_d']
+                    ],
+                    'correct': row['correct_answer']
+                })
+
+            quiz_data[module] = questions
+
+        cursor.close()
+        return quiz_data
+
+    @storage_operation(default=False)
+    def add_module(self, connection, module_name: str):
+        """Dodaje nowy moduł do bazy danych (na końcu kolejności)"""
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT IGNORE INTO modules (module_name, sort_order)
+            SELECT %s, COALESCE(MAX(sort_order), 0) + 1 FROM modules
+        """, (module_name,))
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=None)
+    def get_module_order(self, connection) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """Moduły w kolejności przejścia z wymaganym modułem (bez pobierania pytań)"""
+        cursor = connection.cursor()
+        cursor.execute("SELECT module_name, prerequisite FROM modules ORDER BY sort_order, module_name")
+        rows = [(name, prerequisite) for name, prerequisite in cursor.fetchall()]
+        cursor.close()
+        return rows
+
+    @storage_operation(default=False)
+    def set_module_order(self, connection, modules: List[Tuple[str, Optional[str]]]):
+        """Ustawia kolejność (1, 2, ...) i wymagane moduły; moduły spoza listy nie są zmieniane"""
+        cursor = connection.cursor()
+        cursor.executemany("UPDATE modules SET sort_order = %s, prerequisite = %s WHERE module_name = %s",
+                           [(i, prerequisite, name) for i, (name, prerequisite) in enumerate(modules, 1)])
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=False, idempotent=False)
+    def add_question(self, connection, module_name: str, question_data: Dict):
+        """Dodaje nowe pytanie do bazy danych"""
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO questions (module_name, question_text, option_a, option_b, option_c, option_d, correct_answer)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (
+            module_name,
+            question_data['question'],
+            question_data['options'][0],
+            question_data['options'][1],
+            question_data['options'][2],
+            question_data['options'][3],
+            question_data['correct']
+        ))
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=False, idempotent=False)
+    def add_questions(self, connection, module_name: str, questions: List[Dict]):
+        """Import pytań: executemany (wielowierszowe INSERT) partiami po QUESTION_BATCH_SIZE, jeden commit"""
+        cursor = connection.cursor()
+        for start in range(0, len(questions), QUESTION_BATCH_SIZE):
+            cursor.executemany("""
+                INSERT INTO questions (module_name, question_text, option_a, option_b, option_c, option_d, correct_answer)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, [question_params(module_name, q) for q in questions[start:start + QUESTION_BATCH_SIZE]])
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=False, idempotent=False)
+    def delete_question_by_id(self, connection, module_name: str, question_id: int):
+        """Usuwa pytanie z bazy danych"""
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM questions WHERE question_id = %s AND module_name = %s",
+                       (question_id, module_name))
+        deleted = cursor.rowcount == 1
+        connection.commit()
+        cursor.close()
+        return deleted
+
+    @storage_operation(default=list)
+    def get_module_questions(self, connection, module_name: str) -> List[Dict]:
+        """Pobiera wszystkie pytania dla danego modułu"""
+        questions = []
+        cursor = self.prepared_cursor(connection, SQL_MODULE_QUESTIONS)
+        cursor.execute(SQL_MODULE_QUESTIONS, (module_name,))
+
+        for row in cursor.fetchall():
+            question = question_from_row(row[1:])
+            question['id'] = row[0]
+            questions.append(question)
+
+        return questions
+
+    @storage_operation(default=False, idempotent=False)
+    def update_user_stats(self, connection, username: str, xp_delta: int = 0, correct_delta: int = 0, wrong_delta: int = 0,
+                          module_name: Optional[str] = None):
+        """Aktualizuje statystyki użytkownika.
+        Jeśli podano moduł, w tej samej transakcji aktualizuje też statystyki zbiorcze modułu."""
+        self.write_user_stats(connection, username, xp_delta, correct_delta, wrong_delta, module_name)
+        connection.commit()
+        return True
+
+    def write_user_stats(self, connection, username, xp_delta, correct_delta, wrong_delta, module_name):
+        """Zapytania update_user_stats bez zatwierdzania (także dla apply_journal)"""
+        cursor = self.prepared_cursor(connection, SQL_UPDATE_USER_STATS)
+        cursor.execute(SQL_UPDATE_USER_STATS, (xp_delta, correct_delta, wrong_delta, username))
+        if module_name and (correct_delta or wrong_delta):
+            cursor = self.prepared_cursor(connection, SQL_UPSERT_USER_MODULE_STATS)
+            cursor.execute(SQL_UPSERT_USER_MODULE_STATS, (username, module_name, correct_delta, wrong_delta))
+            cursor = self.prepared_cursor(connection, SQL_UPSERT_MODULE_STATS)
+            cursor.execute(SQL_UPSERT_MODULE_STATS, (module_name, correct_delta, wrong_delta))
+
+    @storage_operation(default=None)
+    def get_user_stats(self, connection, username: str) -> Optional[Dict]:
+        """Pobiera statystyki użytkownika"""
+        cursor = self.prepared_cursor(connection, SQL_USER_STATS)
+        cursor.execute(SQL_USER_STATS, (username,))
+        rows = rows_as_dicts(cursor, cursor.fetchall())
+        return rows[0] if rows else None
+
+    @storage_operation(default=list)
+    def get_leaderboard(self, connection, limit: int = 5) -> List[Tuple[str, Dict]]:
+        """Ranking TOP N wg XP - odczyt indeksu idx_users_xp od końca, bez sortowania"""
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT username, xp FROM users
+            ORDER BY xp DESC
+            LIMIT %s
+        """, (limit,))
+        leaderboard = [(row[0], {'xp': row[1]}) for row in cursor.fetchall()]
+        cursor.close()
+        return leaderboard
+
+    @storage_operation(default=False)
+    def unlock_module_for_user(self, connection, username: str, module_name: str):
+        """Odblokowuje moduł dla użytkownika; True tylko gdy został właśnie odblokowany"""
+        unlocked = self.write_unlock(connection, username, module_name)
+        connection.commit()
+        return unlocked
+
+    def write_unlock(self, connection, username, module_name) -> bool:
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT IGNORE INTO user_unlocked_modules (username, module_name)
+            VALUES (%s, %s)
+        """, (username, module_name))
+        unlocked = cursor.rowcount == 1
+        cursor.close()
+        return unlocked
+
+    @storage_operation(default=list)
+    def get_user_unlocked_modules(self, connection, username: str) -> List[str]:
+        """Pobiera listę odblokowanych modułów użytkownika"""
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT module_name FROM user_unlocked_modules WHERE username = %s
+        """, (username,))
+        modules = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return modules
+
+    @storage_operation(default=list)
+    def get_user_achievements(self, connection, username: str) -> List[str]:
+        """Pobiera listę osiągnięć użytkownika"""
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT achievement_id FROM user_achievements WHERE username = %s
+        """, (username,))
+        achievements = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return achievements
+
+    @storage_operation(default=list)
+    def get_question_weights(self, connection, username: str, module_name: str) -> List[Tuple[int, int, int]]:
+        """Pobiera ID pytań modułu wraz z liczbą poprawnych i błędnych odpowiedzi użytkownika"""
+        cursor = self.prepared_cursor(connection, SQL_QUESTION_WEIGHTS)
+        cursor.execute(SQL_QUESTION_WEIGHTS, (username, module_name))
+        return [(row[0], int(row[1]), int(row[2])) for row in cursor.fetchall()]
+
+    @storage_operation(default=list)
+    def get_module_question_ids(self, connection, module_name: str) -> List[int]:
+        cursor = connection.cursor()
+        cursor.execute("SELECT question_id FROM questions WHERE module_name = %s ORDER BY question_id",
+                       (module_name,))
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return ids
+
+    @storage_operation(default=list)
+    def get_questions_by_ids(self, connection, question_ids: List[int]) -> List[Dict]:
+        """Pobiera wskazane pytania zachowując kolejność podanych ID"""
+        if not question_ids:
+            return []
+        cursor = connection.cursor(dictionary=True)
+        placeholders = ", ".join(["%s"] * len(question_ids))
+        cursor.execute(f"""
+            SELECT question_id, question_text, option_a, option_b, option_c, option_d, correct_answer
+            FROM questions
+            WHERE question_id IN ({placeholders})
+        """, tuple(question_ids))
+
+        by_id = {}
+        for row in cursor.fetchall():
+            by_id[row['question_id']] = {
+                'id': row['question_id'],
+                'question': row['question_text'],
+                'options': [
+                    row['option_a'],
+                    row['option_b'],
+                    row['option_c'],
+                    row['option_d']
+                ],
+                'correct': row['correct_answer']
+            }
+        cursor.close()
+        return [by_id[q_id] for q_id in question_ids if q_id in by_id]
+
+    @storage_operation(default=False, idempotent=False)
+    def insert_question_attempts(self, connection, rows: List[Tuple]) -> bool:
+        """Zapisuje partię odpowiedzi w jednej transakcji i przyrostowo aktualizuje agregaty.
+        Wiersz: (username, question_id, chosen_option, is_correct, latency_ms, answered_at)"""
+        self.write_question_attempts(connection, rows)
+        connection.commit()
+        return True
+
+    def write_question_attempts(self, connection, rows: List[Tuple]):
+        """Zapytania insert_question_attempts bez zatwierdzania (także dla apply_journal)"""
+        if not rows:
+            return
+        cursor = connection.cursor()
+        # Pomiń odpowiedzi na pytania usunięte w międzyczasie (klucze obce agregatów)
+        question_ids = sorted({row[1] for row in rows})
+        placeholders = ", ".join(["%s"] * len(question_ids))
+        cursor.execute(f"SELECT question_id FROM questions WHERE question_id IN ({placeholders})",
+                       tuple(question_ids))
+        existing = {row[0] for row in cursor.fetchall()}
+        rows = [row for row in rows if row[1] in existing]
+        if not rows:
+            cursor.close()
+            return
+
+        cursor.executemany("""
+            INSERT INTO question_attempts
+                (username, question_id, chosen_option, is_correct, latency_ms, answered_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, rows)
+
+        # Agregacja partii w pamięci - jeden UPSERT na pytanie zamiast przeliczania całej tabeli
+        per_question, per_user_question = aggregate_attempts(rows)
+
+        cursor.executemany("""
+            INSERT INTO question_difficulty (question_id, attempts, correct, total_latency_ms)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                attempts = attempts + VALUES(attempts),
+                correct = correct + VALUES(correct),
+                total_latency_ms = total_latency_ms + VALUES(total_latency_ms)
+        """, [(q_id,) + values for q_id, values in per_question.items()])
+
+        cursor.executemany("""
+            INSERT INTO user_question_stats (username, question_id, correct_count, wrong_count)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                correct_count = correct_count + VALUES(correct_count),
+                wrong_count = wrong_count + VALUES(wrong_count)
+        """, [key + values for key, values in per_user_question.items()])
+        cursor.close()
+
+    @storage_operation(default=list)
+    def get_question_difficulty(self, connection, module_name: str) -> List[Dict]:
+        """Pobiera trudność pytań modułu (od najtrudniejszego) z zagregowanego widoku"""
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT question_id, question_text, attempts, correct, accuracy, avg_latency_ms
+            FROM question_difficulty_view
+            WHERE module_name = %s
+            ORDER BY accuracy ASC, attempts DESC
+        """, (module_name,))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    @storage_operation(default=dict)
+    def get_user_module_stats(self, connection, username: str) -> Dict[str, Dict]:
+        """Pobiera statystyki zbiorcze użytkownika dla każdego modułu (odczyt po kluczu głównym)"""
+        stats = {}
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT module_name, correct_count, wrong_count
+            FROM user_module_stats WHERE username = %s
+        """, (username,))
+        for row in cursor.fetchall():
+            stats[row['module_name']] = {'correct': row['correct_count'], 'wrong': row['wrong_count']}
+        cursor.close()
+        return stats
+
+    @storage_operation(default=dict)
+    def get_module_stats(self, connection) -> Dict[str, Dict]:
+        """Pobiera statystyki zbiorcze wszystkich modułów"""
+        stats = {}
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT module_name, correct_count, wrong_count FROM module_stats")
+        for row in cursor.fetchall():
+            stats[row['module_name']] = {'correct': row['correct_count'], 'wrong': row['wrong_count']}
+        cursor.close()
+        return stats
+
+    @storage_operation(default=False)
+    def rebuild_stats_rollups(self, connection) -> bool:
+        """Przelicza od nowa statystyki pytań z dziennika - te same reguły co write_question_attempts
+        (tylko istniejące pytania i konta)"""
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM question_difficulty")
+        cursor.execute("""
+            INSERT INTO question_difficulty (question_id, attempts, correct, total_latency_ms)
+            SELECT a.question_id, COUNT(*), SUM(a.is_correct), SUM(a.latency_ms)
+            FROM question_attempts a
+            JOIN questions q ON q.question_id = a.question_id
+            GROUP BY a.question_id
+        """)
+        cursor.execute("DELETE FROM user_question_stats")
+        cursor.execute("""
+            INSERT INTO user_question_stats (username, question_id, correct_count, wrong_count)
+            SELECT a.username, a.question_id, SUM(a.is_correct), SUM(1 - a.is_correct)
+            FROM question_attempts a
+            JOIN questions q ON q.question_id = a.question_id
+            JOIN users u ON u.username = a.username
+            GROUP BY a.username, a.question_id
+        """)
+        connection.commit()
+        cursor.close()
+        return True
+
+    @storage_operation(default=False)
+    def check_achievement(self, connection, username, ach_id):
+        """Dodaje osiągnięcie użytkownika jeśli jeszcze go nie ma.
+        Jedno polecenie INSERT IGNORE - z dwóch równoległych wywołań tylko jedno zwróci True"""
+        added = self.write_achievement(connection, username, ach_id)
+        connection.commit()
+        return added
+
+    def write_achievement(self, connection, username, ach_id) -> bool:
+        cursor = self.prepared_cursor(connection, SQL_INSERT_ACHIEVEMENT)
+        cursor.execute(SQL_INSERT_ACHIEVEMENT, (username, ach_id))
+        return cursor.rowcount == 1
+
+    @storage_operation(default=None)
+    def apply_journal(self, connection, entries: List[Tuple[str, str, List]]) -> Optional[int]:
+        """Stosuje partię dziennika stanowiska offline w jednej transakcji (ponowienie po błędzie
+        przejściowym jest bezpieczne - wycofana transakcja nie zapisała też sync_applied)"""
+        cursor = connection.cursor(buffered=True)
+        users, modules = {}, {}
+
+        def mark_applied(entry_id):
+            cursor.execute("INSERT IGNORE INTO sync_applied (entry_id) VALUES (%s)", (entry_id,))
+            return cursor.rowcount == 1
+
+        def exists(cache, sql, key):
+            if key not in cache:
+                cursor.execute(sql, (key,))
+                cache[key] = cursor.fetchone() is not None
+            return cache[key]
+
+        applied = self.replay_journal(
+            connection, entries, mark_applied,
+            lambda username: exists(users, "SELECT 1 FROM users WHERE username = %s", username),
+            lambda module_name: exists(modules, "SELECT 1 FROM modules WHERE module_name = %s", module_name))
+        connection.commit()
+        cursor.close()
+        return applied
+
+    @storage_operation(default=None, idempotent=False)
+    def export_users(self, connection, sink) -> Optional[int]:
+        """Kursor niebuforowany - serwer wysyła wiersze w miarę odczytu (fetch_batches), a spójny
+        odczyt InnoDB (CONSISTENT SNAPSHOT) nie zakłada blokad na tabele"""
+        connection.start_transaction(consistent_snapshot=True, readonly=True)
+        sink.start()
+        cursor = connection.cursor(buffered=False)
+        cursor.execute(SQL_EXPORT_USERS)
+        count = 0
+        for row in fetch_batches(cursor):
+            sink.add(row[0], export_user(row))
+            count += 1
+        cursor.close()
+        return count
+
+    @storage_operation(default=None, idempotent=False)
+    def export_questions(self, connection, sink) -> Optional[int]:
+        """Pytania moduł po module - indeks idx_module zwraca je w kolejności ID bez sortowania"""
+        connection.start_transaction(consistent_snapshot=True, readonly=True)
+        sink.start()
+        cursor = connection.cursor(buffered=False)
+        cursor.execute("SELECT module_name FROM modules ORDER BY sort_order, module_name")
+        modules = [row[0] for row in cursor.fetchall()]
+        count = 0
+        for module_name in modules:
+            cursor.execute("""
+                SELECT question_text, option_a, option_b, option_c, option_d, correct_answer
+                FROM questions WHERE module_name = %s ORDER BY question_id
+            """, (module_name,))
+            empty = True
+            for row in fetch_batches(cursor):
+                sink.add(module_name, question_from_row(row))
+                count += 1
+                empty = False
+            if empty:
+                sink.add(module_name, None)
+        cursor.close()
+        return count
+
+
+# ================== SQLITE ==================
+
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        username VARCHAR(20) PRIMARY KEY,
+        password_hash VARCHAR(64) NOT NULL,
+        is_mod BOOLEAN DEFAULT 0,
+        xp INT DEFAULT 0,
+        stats_correct INT DEFAULT 0,
+        stats_wrong INT DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS modules (
+        module_name VARCHAR(50) PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        question_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        module_name VARCHAR(50) NOT NULL REFERENCES modules(module_name) ON DELETE CASCADE,
+        question_text TEXT NOT NULL,
+        option_a VARCHAR(200) NOT NULL,
+        option_b VARCHAR(200) NOT NULL,
+        option_c VARCHAR(200) NOT NULL,
+        option_d VARCHAR(200) NOT NULL,
+        correct_answer INT NOT NULL CHECK (correct_answer BETWEEN 0 AND 3),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_module ON questions (module_name)",
+    """
+    CREATE TABLE IF NOT EXISTS user_achievements (
+        username VARCHAR(20) REFERENCES users(username) ON DELETE CASCADE,
+        achievement_id VARCHAR(50),
+        unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (username, achievement_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_unlocked_modules (
+        username VARCHAR(20) REFERENCES users(username) ON DELETE CASCADE,
+        module_name VARCHAR(50) REFERENCES modules(module_name) ON DELETE CASCADE,
+        unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (username, module_name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_question_stats (
+        username VARCHAR(20) REFERENCES users(username) ON DELETE CASCADE,
+        question_id INT REFERENCES questions(question_id) ON DELETE CASCADE,
+        correct_count INT DEFAULT 0,
+        wrong_count INT DEFAULT 0,
+        PRIMARY KEY (username, question_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_module_stats (
+        username VARCHAR(20) REFERENCES users(username) ON DELETE CASCADE,
+        module_name VARCHAR(50) REFERENCES modules(module_name) ON DELETE CASCADE,
+        correct_count INT DEFAULT 0,
+        wrong_count INT DEFAULT 0,
+        PRIMARY KEY (username, module_name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS module_stats (
+        module_name VARCHAR(50) PRIMARY KEY REFERENCES modules(module_name) ON DELETE CASCADE,
+        correct_count INT DEFAULT 0,
+        wrong_count INT DEFAULT 0
+    )
+    """,
+    # SQLite nie ma partycjonowania - dziennik jest zwykłą tabelą z indeksami po czasie
+    """
+    CREATE TABLE IF NOT EXISTS question_attempts (
+        attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(20) NOT NULL,
+        question_id INT NOT NULL,
+        chosen_option TINYINT NOT NULL,
+        is_correct BOOLEAN NOT NULL,
+        latency_ms INT NOT NULL,
+        answered_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_attempt_question ON question_attempts (question_id, answered_at)",
+    "CREATE INDEX IF NOT EXISTS idx_attempt_user ON question_attempts (username, answered_at)",
+    """
+    CREATE TABLE IF NOT EXISTS question_difficulty (
+        question_id INT PRIMARY KEY REFERENCES questions(question_id) ON DELETE CASCADE,
+        attempts INT DEFAULT 0,
+        correct INT DEFAULT 0,
+        total_latency_ms BIGINT DEFAULT 0
+    )
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS question_difficulty_view AS
+    SELECT d.question_id, q.module_name, q.question_text, d.attempts, d.correct,
+           CAST(d.correct AS REAL) / NULLIF(d.attempts, 0) AS accuracy,
+           CAST(d.total_latency_ms AS REAL) / NULLIF(d.attempts, 0) AS avg_latency_ms
+    FROM question_difficulty d
+    JOIN questions q ON q.question_id = d.question_id
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(200),
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+
+SQLITE_UNLOCK_FIRST_MODULE = """
+    INSERT OR IGNORE INTO user_unlocked_modules (username, module_name)
+    SELECT ?, module_name FROM modules
+    WHERE NOT EXISTS (SELECT 1 FROM user_unlocked_modules WHERE username = ?)
+    ORDER BY sort_order, module_name LIMIT 1
+"""
+
+
+SQLITE_EXPORT_USERS = """
+    SELECT u.username, u.password_hash, u.is_mod, u.xp, u.stats_correct, u.stats_wrong,
+           (SELECT json_group_array(a.achievement_id) FROM user_achievements a WHERE a.username = u.username),
+           (SELECT json_group_array(m.module_name) FROM user_unlocked_modules m WHERE m.username = u.username)
+    FROM users u ORDER BY u.username
+"""
+
+
+def sqlite_timestamp(value):
+    """Zapisuje datę w formacie DATETIME (bez przestarzałego domyślnego adaptera sqlite3)"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='seconds')
+    return value
+
+
+class SQLiteStorage(QuizStorage):
+    """Wbudowany backend SQLite (tryb WAL) - bez serwera bazy danych.
+    Każdy wątek ma własne połączenie; zapisy innych procesów czekają na blokadę (busy_timeout)."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.uri = False
+        if path == ":memory:":
+            # Baza w pamięci współdzielona przez wątki tego procesu
+            self.path = f"file:quiz_memory_{id(self)}?mode=memory&cache=shared"
+            self.uri = True
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+
+    def get_connection(self):
+        """Zwraca połączenie bieżącego wątku (tworzone przy pierwszym użyciu)"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, uri=self.uri,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return connection
+
+    def close(self):
+        with self.connections_lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+        self.local = threading.local()
+
+    def run(self, name, operation, default=None, idempotent=True, use_database=True):
+        """Wykonuje operację w transakcji; ponawia ją, gdy baza jest chwilowo zablokowana"""
+        attempt = 0
+        start = time.perf_counter()
+        call = self.start_call(name)
+        while True:
+            connect_start = time.perf_counter()
+            connection = self.get_connection()
+            if call is not None:
+                call.connect_ms += (time.perf_counter() - connect_start) * 1000
+            try:
+                result = operation(self.traced(connection, call))
+                if connection.in_transaction:
+                    connection.rollback()
+                self.record_stat(name, (time.perf_counter() - start) * 1000)
+                self.finish_call(call, start)
+                return result
+            except sqlite3.Error as e:
+                if connection.in_transaction:
+                    connection.rollback()
+                # "database is locked" - transakcja została wycofana w całości, więc ponowienie jest bezpieczne
+                locked = isinstance(e, sqlite3.OperationalError) and "locked" in str(e)
+                if locked and attempt < DB_MAX_RETRIES:
+                    self.record_stat(name, retry=True)
+                    time.sleep(retry_delay(attempt))
+                    attempt += 1
+                    continue
+                self.record_stat(name, (time.perf_counter() - start) * 1000, error=True)
+                self.finish_call(call, start, error=True)
+                print(f"Błąd bazy danych ({name}): {e}")
+                return default
+            except Exception:
+                # Błąd programu - wycofaj częściowe zapisy, żeby nie zatwierdziła ich następna operacja
+                if connection.in_transaction:
+                    connection.rollback()
+                self.record_stat(name, (time.perf_counter() - start) * 1000, error=True)
+                self.finish_call(call, start, error=True)
+                raise
+
+    @storage_operation(default=False)
+    def ping(self, connection):
+        connection.execute("SELECT 1").fetchall()
+        return True
+
+    @storage_operation(default=False)
+    def init_database(self, connection, default_modules: List[str] = ()):
+        """Tworzy schemat (ten sam układ tabel co w MySQL) jeśli nie istnieje"""
+        for statement in SQLITE_SCHEMA:
+            connection.execute(statement)
+        if default_modules:
+            connection.execute("INSERT OR IGNORE INTO modules (module_name) VALUES " +
+                               ", ".join(["(?)"] * len(default_modules)), tuple(default_modules))
+        connection.execute("INSERT OR IGNORE INTO schema_version (version, description) VALUES (?, ?)",
+                           (BASELINE_VERSION, "init_database"))
+        connection.commit()
+        return True
+
+    @storage_operation(default=0)
+    def get_schema_version(self, connection) -> int:
+        try:
+            row = connection.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        except sqlite3.OperationalError as e:
+            if "no such table" in str(e):
+                return 0
+            raise
+        return row[0] or 0
+
+    @storage_operation(default=list)
+    def get_applied_migrations(self, connection) -> List[Dict]:
+        try:
+            cursor = connection.execute(
+                "SELECT version, description, applied_at FROM schema_version ORDER BY version")
+        except sqlite3.OperationalError as e:
+            if "no such table" in str(e):
+                return []
+            raise
+        return rows_as_dicts(cursor, cursor.fetchall())
+
+    @storage_operation(default=False, idempotent=False)
+    def apply_migration(self, connection, migration: Migration) -> bool:
+        # DDL w SQLite jest transakcyjny - zmiana i zapis wersji zatwierdzane są razem
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+        for statement in migration.sqlite:
+            connection.execute(statement)
+        connection.execute("INSERT OR IGNORE INTO schema_version (version, description) VALUES (?, ?)",
+                           (migration.version, migration.description))
+        connection.commit()
+        return True
+
+    @storage_operation(default=dict)
+    def get_all_users(self, connection) -> Dict:
+        """Pobiera wszystkich użytkowników (trzy zapytania niezależnie od liczby użytkowników)"""
+        users = {}
+        for row in connection.execute(
+                "SELECT username, password_hash, is_mod, xp, stats_correct, stats_wrong FROM users"):
+            users[row[0]] = {
+                'pw': row[1],
+                'is_mod': bool(row[2]),
+                'xp': row[3],
+                'stats_correct': row[4],
+                'stats_wrong': row[5],
+                'achievements': [],
+                'unlocked': []
+            }
+        for username, achievement in connection.execute("SELECT username, achievement_id FROM user_achievements"):
+            if username in users:
+                users[username]['achievements'].append(achievement)
+        for username, module in connection.execute("SELECT username, module_name FROM user_unlocked_modules"):
+            if username in users:
+                users[username]['unlocked'].append(module)
+        return users
+
+    @storage_operation(default=False)
+    def save_user(self, connection, username: str, user_data: Dict):
+        """Zapisuje lub aktualizuje użytkownika"""
+        connection.execute("""
+            INSERT INTO users (username, password_hash, is_mod, xp, stats_correct, stats_wrong)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(username) DO UPDATE SET
+                password_hash = excluded.password_hash, is_mod = excluded.is_mod, xp = excluded.xp,
+                stats_correct = excluded.stats_correct, stats_wrong = excluded.stats_wrong
+        """, (
+            username,
+            user_data['pw'],
+            bool(user_data.get('is_mod', False)),
+            user_data.get('xp', 0),
+            user_data.get('stats_correct', 0),
+            user_data.get('stats_wrong', 0)
+        ))
+        connection.execute("DELETE FROM user_achievements WHERE username = ?", (username,))
+        connection.executemany("INSERT INTO user_achievements (username, achievement_id) VALUES (?, ?)",
+                               [(username, a) for a in user_data.get('achievements', [])])
+        connection.execute("DELETE FROM user_unlocked_modules WHERE username = ?", (username,))
+        connection.executemany("INSERT INTO user_unlocked_modules (username, module_name) VALUES (?, ?)",
+                               [(username, m) for m in user_data.get('unlocked', [])])
+        connection.commit()
+        return True
+
+    @storage_operation(default=None, idempotent=False)
+    def create_user(self, connection, username: str, password_hash: str, is_mod: bool = False):
+        try:
+            connection.execute("INSERT INTO users (username, password_hash, is_mod) VALUES (?, ?, ?)",
+                               (username, password_hash, bool(is_mod)))
+        except sqlite3.IntegrityError:
+            connection.rollback()
+            return False
+        connection.execute(SQLITE_UNLOCK_FIRST_MODULE, (username, username))
+        connection.commit()
+        return True
+
+    @storage_operation(default=None)
+    def get_password_hash(self, connection, username: str) -> Optional[str]:
+        row = connection.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    @storage_operation(default=False)
+    def ensure_first_module(self, connection, username: str) -> bool:
+        cursor = connection.execute(SQLITE_UNLOCK_FIRST_MODULE, (username, username))
+        connection.commit()
+        return cursor.rowcount == 1
+
+    @storage_operation(default=False)
+    def update_password_hash(self, connection, username: str, old_hash: str, new_hash: str):
+        cursor = connection.execute("UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+                                    (new_hash, username, old_hash))
+        connection.commit()
+        return cursor.rowcount == 1
+
+    @storage_operation(default=dict)
+    def get_quiz_data(self, connection) -> Dict:
+        """Pobiera wszystkie pytania pogrupowane według modułów"""
+        quiz_data = {row[0]: [] for row in connection.execute(
+            "SELECT module_name FROM modules ORDER BY sort_order, module_name")}
+        for row in connection.execute("""
+            SELECT module_name, question_text, option_a, option_b, option_c, option_d, correct_answer
+            FROM questions ORDER BY question_id
+        """):
+            quiz_data.setdefault(row[0], []).append(question_from_row(row[1:]))
+        return quiz_data
+
+    @storage_operation(default=False)
+    def add_module(self, connection, module_name: str):
+        connection.execute("""
+            INSERT OR IGNORE INTO modules (module_name, sort_order)
+            SELECT ?, COALESCE(MAX(sort_order), 0) + 1 FROM modules
+        """, (module_name,))
+        connection.commit()
+        return True
+
+    @storage_operation(default=None)
+    def get_module_order(self, connection) -> Optional[List[Tuple[str, Optional[str]]]]:
+        return [tuple(row) for row in connection.execute(
+            "SELECT module_name, prerequisite FROM modules ORDER BY sort_order, module_name")]
+
+    @storage_operation(default=False)
+    def set_module_order(self, connection, modules: List[Tuple[str, Optional[str]]]):
+        connection.executemany("UPDATE modules SET sort_order = ?, prerequisite = ? WHERE module_name = ?",
+                               [(i, prerequisite, name) for i, (name, prerequisite) in enumerate(modules, 1)])
+        connection.commit()
+        return True
+
+    @storage_operation(default=False, idempotent=False)
+    def add_question(self, connection, module_name: str, question_data: Dict):
+        connection.execute("""
+            INSERT INTO questions (module_name, question_text, option_a, option_b, option_c, option_d, correct_answer)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            module_name,
+            question_data['question'],
+            question_data['options'][0],
+            question_data['options'][1],
+            question_data['options'][2],
+            question_data['options'][3],
+            question_data['correct']
+        ))
+        connection.commit()
+        return True
+
+    @storage_operation(default=False, idempotent=False)
+    def add_questions(self, connection, module_name: str, questions: List[Dict]):
+        connection.executemany("""
+            INSERT INTO questions (module_name, question_text, option_a, option_b, option_c, option_d, correct_answer)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (question_params(module_name, q) for q in questions))
+        connection.commit()
+        return True
+
+    @storage_operation(default=False, idempotent=False)
+    def delete_question_by_id(self, connection, module_name: str, question_id: int):
+        cursor = connection.execute("DELETE FROM questions WHERE question_id = ? AND module_name = ?",
+                                    (question_id, module_name))
+        connection.commit()
+        return cursor.rowcount == 1
+
+    @storage_operation(default=list)
+    def get_module_questions(self, connection, module_name: str) -> List[Dict]:
+        questions = []
+        for row in connection.execute("""
+            SELECT question_id, question_text, option_a, option_b, option_c, option_d, correct_answer
+            FROM questions
+            WHERE module_name = ?
+            ORDER BY question_id
+        """, (module_name,)):
+            question = question_from_row(row[1:])
+            question['id'] = row[0]
+            questions.append(question)
+        return questions
+
+    @storage_operation(default=False, idempotent=False)
+    def update_user_stats(self, connection, username: str, xp_delta: int = 0, correct_delta: int = 0,
+                          wrong_delta: int = 0, module_name: Optional[str] = None):
+        self.write_user_stats(connection, username, xp_delta, correct_delta, wrong_delta, module_name)
+        connection.commit()
+        return True
+
+    def write_user_stats(self, connection, username, xp_delta, correct_delta, wrong_delta, module_name):
+        connection.execute("""
+            UPDATE users
+            SET xp = xp + ?, stats_correct = stats_correct + ?, stats_wrong = stats_wrong + ?
+            WHERE username = ?
+        """, (xp_delta, correct_delta, wrong_delta, username))
+        if module_name and (correct_delta or wrong_delta):
+            connection.execute("""
+                INSERT INTO user_module_stats (username, module_name, correct_count, wrong_count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(username, module_name) DO UPDATE SET
+                    correct_count = correct_count + excluded.correct_count,
+                    wrong_count = wrong_count + excluded.wrong_count
+            """, (username, module_name, correct_delta, wrong_delta))
+            connection.execute("""
+                INSERT INTO module_stats (module_name, correct_count, wrong_count)
+                VALUES (?, ?, ?)
+                ON CONFLICT(module_name) DO UPDATE SET
+                    correct_count = correct_count + excluded.correct_count,
+                    wrong_count = wrong_count + excluded.wrong_count
+            """, (module_name, correct_delta, wrong_delta))
+
+    @storage_operation(default=None)
+    def get_user_stats(self, connection, username: str) -> Optional[Dict]:
+        cursor = connection.execute("""
+            SELECT xp, stats_correct, stats_wrong, is_mod
+            FROM users WHERE username = ?
+        """, (username,))
+        rows = rows_as_dicts(cursor, cursor.fetchall())
+        return rows[0] if rows else None
+
+    @storage_operation(default=list)
+    def get_leaderboard(self, connection, limit: int = 5) -> List[Tuple[str, Dict]]:
+        return [(row[0], {'xp': row[1]}) for row in connection.execute("""
+            SELECT username, xp FROM users
+            ORDER BY xp DESC
+            LIMIT ?
+        """, (limit,))]
+
+    @storage_operation(default=False)
+    def unlock_module_for_user(self, connection, username: str, module_name: str):
+        unlocked = self.write_unlock(connection, username, module_name)
+        connection.commit()
+        return unlocked
+
+    def write_unlock(self, connection, username, module_name) -> bool:
+        cursor = connection.execute("""
+            INSERT OR IGNORE INTO user_unlocked_modules (username, module_name)
+            VALUES (?, ?)
+        """, (username, module_name))
+        return cursor.rowcount == 1
+
+    @storage_operation(default=list)
+    def get_user_unlocked_modules(self, connection, username: str) -> List[str]:
+        return [row[0] for row in connection.execute(
+            "SELECT module_name FROM user_unlocked_modules WHERE username = ?", (username,))]
+
+    @storage_operation(default=list)
+    def get_user_achievements(self, connection, username: str) -> List[str]:
+        return [row[0] for row in connection.execute(
+            "SELECT achievement_id FROM user_achievements WHERE username = ?", (username,))]
+
+    @storage_operation(default=False)
+    def check_achievement(self, connection, username, ach_id):
+        added = self.write_achievement(connection, username, ach_id)
+        connection.commit()
+        return added
+
+    def write_achievement(self, connection, username, ach_id) -> bool:
+        cursor = connection.execute("""
+            INSERT OR IGNORE INTO user_achievements (username, achievement_id)
+            VALUES (?, ?)
+        """, (username, ach_id))
+        return cursor.rowcount == 1
+
+    @storage_operation(default=list)
+    def get_question_weights(self, connection, username: str, module_name: str) -> List[Tuple[int, int, int]]:
+        return [(row[0], row[1], row[2]) for row in connection.execute("""
+            SELECT q.question_id, COALESCE(s.correct_count, 0), COALESCE(s.wrong_count, 0)
+            FROM questions q
+            LEFT JOIN user_question_stats s
+                ON s.question_id = q.question_id AND s.username = ?
+            WHERE q.module_name = ?
+            ORDER BY q.question_id
+        """, (username, module_name))]
+
+    @storage_operation(default=list)
+    def get_module_question_ids(self, connection, module_name: str) -> List[int]:
+        return [row[0] for row in connection.execute(
+            "SELECT question_id FROM questions WHERE module_name = ? ORDER BY question_id", (module_name,))]
+
+    @storage_operation(default=list)
+    def get_questions_by_ids(self, connection, question_ids: List[int]) -> List[Dict]:
+        if not question_ids:
+            return []
+        placeholders = ", ".join(["?"] * len(question_ids))
+        by_id = {}
+        for row in connection.execute(f"""
+            SELECT question_id, question_text, option_a, option_b, option_c, option_d, correct_answer
+            FROM questions
+            WHERE question_id IN ({placeholders})
+        """, tuple(question_ids)):
+            question = question_from_row(row[1:])
+            question['id'] = row[0]
+            by_id[row[0]] = question
+        return [by_id[q_id] for q_id in question_ids if q_id in by_id]
+
+    @storage_operation(default=False, idempotent=False)
+    def insert_question_attempts(self, connection, rows: List[Tuple]) -> bool:
+        self.write_question_attempts(connection, rows)
+        connection.commit()
+        return True
+
+    def write_question_attempts(self, connection, rows: List[Tuple]):
+        if not rows:
+            return
+        question_ids = sorted({row[1] for row in rows})
+        placeholders = ", ".join(["?"] * len(question_ids))
+        existing = {row[0] for row in connection.execute(
+            f"SELECT question_id FROM questions WHERE question_id IN ({placeholders})", tuple(question_ids))}
+        rows = [row[:5] + (sqlite_timestamp(row[5]),) for row in rows if row[1] in existing]
+        if not rows:
+            return
+
+        connection.executemany("""
+            INSERT INTO question_attempts
+                (username, question_id, chosen_option, is_correct, latency_ms, answered_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+
+        per_question, per_user_question = aggregate_attempts(rows)
+        connection.executemany("""
+            INSERT INTO question_difficulty (question_id, attempts, correct, total_latency_ms)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(question_id) DO UPDATE SET
+                attempts = attempts + excluded.attempts,
+                correct = correct + excluded.correct,
+                total_latency_ms = total_latency_ms + excluded.total_latency_ms
+        """, [(q_id,) + values for q_id, values in per_question.items()])
+        connection.executemany("""
+            INSERT INTO user_question_stats (username, question_id, correct_count, wrong_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(username, question_id) DO UPDATE SET
+                correct_count = correct_count + excluded.correct_count,
+                wrong_count = wrong_count + excluded.wrong_count
+        """, [key + values for key, values in per_user_question.items()])
+
+    @storage_operation(default=list)
+    def get_question_difficulty(self, connection, module_name: str) -> List[Dict]:
+        cursor = connection.execute("""
+            SELECT question_id, question_text, attempts, correct, accuracy, avg_latency_ms
+            FROM question_difficulty_view
+            WHERE module_name = ?
+            ORDER BY accuracy ASC, attempts DESC
+        """, (module_name,))
+        return rows_as_dicts(cursor, cursor.fetchall())
+
+    @storage_operation(default=dict)
+    def get_user_module_stats(self, connection, username: str) -> Dict[str, Dict]:
+        return {row[0]: {'correct': row[1], 'wrong': row[2]} for row in connection.execute("""
+            SELECT module_name, correct_count, wrong_count
+            FROM user_module_stats WHERE username = ?
+        """, (username,))}
+
+    @storage_operation(default=dict)
+    def get_module_stats(self, connection) -> Dict[str, Dict]:
+        return {row[0]: {'correct': row[1], 'wrong': row[2]} for row in connection.execute(
+            "SELECT module_name, correct_count, wrong_count FROM module_stats")}
+
+    @storage_operation(default=False)
+    def rebuild_stats_rollups(self, connection) -> bool:
+        connection.execute("DELETE FROM question_difficulty")
+        connection.execute("""
+            INSERT INTO question_difficulty (question_id, attempts, correct, total_latency_ms)
+            SELECT a.question_id, COUNT(*), SUM(a.is_correct), SUM(a.latency_ms)
+            FROM question_attempts a
+            JOIN questions q ON q.question_id = a.question_id
+            GROUP BY a.question_id
+        """)
+        connection.execute("DELETE FROM user_question_stats")
+        connection.execute("""
+            INSERT INTO user_question_stats (username, question_id, correct_count, wrong_count)
+            SELECT a.username, a.question_id, SUM(a.is_correct), SUM(1 - a.is_correct)
+            FROM question_attempts a
+            JOIN questions q ON q.question_id = a.question_id
+            JOIN users u ON u.username = a.username
+            GROUP BY a.username, a.question_id
+        """)
+        connection.commit()
+        return True
+
+    @storage_operation(default=None)
+    def apply_journal(self, connection, entries: List[Tuple[str, str, List]]) -> Optional[int]:
+        users, modules = {}, {}
+
+        def mark_applied(entry_id):
+            return connection.execute("INSERT OR IGNORE INTO sync_applied (entry_id) VALUES (?)",
+                                      (entry_id,)).rowcount == 1
+
+        def exists(cache, sql, key):
+            if key not in cache:
+                cache[key] = connection.execute(sql, (key,)).fetchone() is not None
+            return cache[key]
+
+        applied = self.replay_journal(
+            connection, entries, mark_applied,
+            lambda username: exists(users, "SELECT 1 FROM users WHERE username = ?", username),
+            lambda module_name: exists(modules, "SELECT 1 FROM modules WHERE module_name = ?", module_name))
+        connection.commit()
+        return applied
+
+    @storage_operation(default=None, idempotent=False)
+    def export_users(self, connection, sink) -> Optional[int]:
+        # Transakcja odczytu - w trybie WAL widzi jeden stan bazy i nie wstrzymuje zapisów
+        connection.execute("BEGIN")
+        sink.start()
+        count = 0
+        for row in fetch_batches(connection.execute(SQLITE_EXPORT_USERS)):
+            sink.add(row[0], export_user(row))
+            count += 1
+        return count
+
+    @storage_operation(default=None, idempotent=False)
+    def export_questions(self, connection, sink) -> Optional[int]:
+        connection.execute("BEGIN")
+        sink.start()
+        modules = [row[0] for row in connection.execute(
+            "SELECT module_name FROM modules ORDER BY sort_order, module_name")]
+        count = 0
+        for module_name in modules:
+            empty = True
+            for row in fetch_batches(connection.execute("""
+                SELECT question_text, option_a, option_b, option_c, option_d, correct_answer
+                FROM questions WHERE module_name = ? ORDER BY question_id
+            """, (module_name,))):
+                sink.add(module_name, question_from_row(row))
+                count += 1
+                empty = False
+            if empty:
+                sink.add(module_name, None)
+        return count
+
+
+def create_storage(backend: str, mysql_config: Optional[Dict] = None, sqlite_path: str = "quiz.db",
+                   api_url: Optional[str] = None) -> QuizStorage:
+    """Tworzy backend o podanej nazwie ("mysql", "sqlite" lub "remote" - usługa quiz_api.py)"""
+    if backend == "sqlite":
+        return SQLiteStorage(sqlite_path)
+    if backend == "mysql":
+        return MySQLStorage(mysql_config or {})
+    if backend == "remote":
+        from quiz_api import API_URL, RemoteStorage
+        return RemoteStorage(api_url or API_URL)
+    raise ValueError(f"Nieznany backend danych: {backend}")